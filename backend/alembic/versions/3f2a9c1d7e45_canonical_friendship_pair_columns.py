@@ -0,0 +1,55 @@
+"""Canonical friendship pair columns
+
+Revision ID: 3f2a9c1d7e45
+Revises: 60557c9e6c67
+Create Date: 2026-10-19 09:12:40.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f2a9c1d7e45'
+down_revision: Union[str, Sequence[str], None] = '60557c9e6c67'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('friendships', sa.Column('user_low_id', sa.Integer(), nullable=True))
+    op.add_column('friendships', sa.Column('user_high_id', sa.Integer(), nullable=True))
+
+    # The old (requester_id, addressee_id) constraint allowed both (a, b) and (b, a).
+    # Keep one row per pair: an accepted friendship wins, otherwise the oldest request.
+    op.execute("""
+        DELETE FROM friendships f1
+        USING friendships f2
+        WHERE f1.requester_id = f2.addressee_id
+          AND f1.addressee_id = f2.requester_id
+          AND (
+                (f2.status = 'accepted' AND f1.status <> 'accepted')
+             OR ((f2.status = 'accepted') = (f1.status = 'accepted') AND f2.id < f1.id)
+          )
+    """)
+    op.execute("""
+        UPDATE friendships
+        SET user_low_id = LEAST(requester_id, addressee_id),
+            user_high_id = GREATEST(requester_id, addressee_id)
+    """)
+
+    op.alter_column('friendships', 'user_low_id', nullable=False)
+    op.alter_column('friendships', 'user_high_id', nullable=False)
+    op.drop_constraint('_requester_addressee_uc', 'friendships', type_='unique')
+    op.create_unique_constraint('_friendship_pair_uc', 'friendships', ['user_low_id', 'user_high_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('_friendship_pair_uc', 'friendships', type_='unique')
+    op.create_unique_constraint('_requester_addressee_uc', 'friendships', ['requester_id', 'addressee_id'])
+    op.drop_column('friendships', 'user_high_id')
+    op.drop_column('friendships', 'user_low_id')
@@ -0,0 +1,50 @@
+"""Move OTPs off the users table into otp_codes
+
+Revision ID: 8c41e07b2d96
+Revises: 3f2a9c1d7e45
+Create Date: 2026-10-19 11:03:17.552904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c41e07b2d96'
+down_revision: Union[str, Sequence[str], None] = '3f2a9c1d7e45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('otp_codes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('purpose', sa.Enum('signup', 'password_reset', name='otppurposeenum'), nullable=False),
+    sa.Column('code_hash', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('email', 'purpose', name='_otp_email_purpose_uc')
+    )
+    op.create_index(op.f('ix_otp_codes_id'), 'otp_codes', ['id'], unique=False)
+    op.create_index(op.f('ix_otp_codes_expires_at'), 'otp_codes', ['expires_at'], unique=False)
+
+    # Outstanding codes were stored in plain text and can't be carried over as HMACs;
+    # users mid-signup or mid-reset simply request a new one.
+    op.drop_column('users', 'otp_expires_at')
+    op.drop_column('users', 'otp')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('users', sa.Column('otp', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('otp_expires_at', sa.DateTime(timezone=True), nullable=True))
+    op.drop_index(op.f('ix_otp_codes_expires_at'), table_name='otp_codes')
+    op.drop_index(op.f('ix_otp_codes_id'), table_name='otp_codes')
+    op.drop_table('otp_codes')
+    sa.Enum(name='otppurposeenum').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,43 @@
+"""Add team shard directory and id blocks
+
+Revision ID: a7d2e9c4b815
+Revises: f1c83d5a7b26
+Create Date: 2026-10-19 21:04:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d2e9c4b815'
+down_revision: Union[str, Sequence[str], None] = 'f1c83d5a7b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('team_shards',
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.String(), nullable=False),
+    sa.Column('state', sa.Enum('active', 'moving', name='teamshardstateenum'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('team_id')
+    )
+    op.create_index(op.f('ix_team_shards_shard'), 'team_shards', ['shard'], unique=False)
+    op.create_table('id_blocks',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('next_id', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('id_blocks')
+    op.drop_index(op.f('ix_team_shards_shard'), table_name='team_shards')
+    op.drop_table('team_shards')
+    op.execute('DROP TYPE IF EXISTS teamshardstateenum')
@@ -0,0 +1,32 @@
+"""Add due_date indexes for the timeline
+
+Revision ID: b7d5f3a81c20
+Revises: 8c41e07b2d96
+Create Date: 2026-10-19 13:40:02.906117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d5f3a81c20'
+down_revision: Union[str, Sequence[str], None] = '8c41e07b2d96'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_projects_team_id_due_date', 'projects', ['team_id', 'due_date'], unique=False)
+    op.create_index('ix_milestones_project_id_due_date', 'milestones', ['project_id', 'due_date'], unique=False)
+    op.create_index('ix_tasks_project_id_due_date', 'tasks', ['project_id', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tasks_project_id_due_date', table_name='tasks')
+    op.drop_index('ix_milestones_project_id_due_date', table_name='milestones')
+    op.drop_index('ix_projects_team_id_due_date', table_name='projects')
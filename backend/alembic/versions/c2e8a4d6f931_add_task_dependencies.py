@@ -0,0 +1,46 @@
+"""Add task dependencies and task effort estimates
+
+Revision ID: c2e8a4d6f931
+Revises: b7d5f3a81c20
+Create Date: 2026-10-19 15:21:48.330571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2e8a4d6f931'
+down_revision: Union[str, Sequence[str], None] = 'b7d5f3a81c20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tasks', sa.Column('estimated_days', sa.Integer(), server_default='1', nullable=False))
+    op.create_table('task_dependencies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('depends_on_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint('task_id <> depends_on_id', name='_task_not_self_dependent_ck'),
+    sa.ForeignKeyConstraint(['depends_on_id'], ['tasks.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('task_id', 'depends_on_id', name='_task_depends_on_uc')
+    )
+    op.create_index(op.f('ix_task_dependencies_id'), 'task_dependencies', ['id'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_task_id'), 'task_dependencies', ['task_id'], unique=False)
+    op.create_index(op.f('ix_task_dependencies_depends_on_id'), 'task_dependencies', ['depends_on_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_dependencies_depends_on_id'), table_name='task_dependencies')
+    op.drop_index(op.f('ix_task_dependencies_task_id'), table_name='task_dependencies')
+    op.drop_index(op.f('ix_task_dependencies_id'), table_name='task_dependencies')
+    op.drop_table('task_dependencies')
+    op.drop_column('tasks', 'estimated_days')
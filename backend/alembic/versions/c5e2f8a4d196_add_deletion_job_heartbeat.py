@@ -0,0 +1,28 @@
+"""Add a heartbeat to deletion jobs
+
+Revision ID: c5e2f8a4d196
+Revises: a9d4f2b7c361
+Create Date: 2026-10-20 03:02:51.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e2f8a4d196'
+down_revision: Union[str, Sequence[str], None] = 'a9d4f2b7c361'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('deletion_jobs', sa.Column('heartbeat_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('deletion_jobs', 'heartbeat_at')
@@ -0,0 +1,42 @@
+"""Add calendar feeds
+
+Revision ID: c8e4a2f7d913
+Revises: b3f6c1e8d247
+Create Date: 2026-10-19 23:02:18.774120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8e4a2f7d913'
+down_revision: Union[str, Sequence[str], None] = 'b3f6c1e8d247'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('calendar_feeds',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_calendar_feeds_id'), 'calendar_feeds', ['id'], unique=False)
+    op.create_index(op.f('ix_calendar_feeds_user_id'), 'calendar_feeds', ['user_id'], unique=False)
+    op.create_index(op.f('ix_calendar_feeds_token_hash'), 'calendar_feeds', ['token_hash'], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_calendar_feeds_token_hash'), table_name='calendar_feeds')
+    op.drop_index(op.f('ix_calendar_feeds_user_id'), table_name='calendar_feeds')
+    op.drop_index(op.f('ix_calendar_feeds_id'), table_name='calendar_feeds')
+    op.drop_table('calendar_feeds')
@@ -0,0 +1,28 @@
+"""Count the runs of each deletion job
+
+Revision ID: d3a7c9e5f182
+Revises: c5e2f8a4d196
+Create Date: 2026-10-21 09:14:05.271946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a7c9e5f182'
+down_revision: Union[str, Sequence[str], None] = 'c5e2f8a4d196'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('deletion_jobs', sa.Column('attempts', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('deletion_jobs', 'attempts')
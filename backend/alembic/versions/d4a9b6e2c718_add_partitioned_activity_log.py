@@ -0,0 +1,60 @@
+"""Add time-partitioned activity_log
+
+Revision ID: d4a9b6e2c718
+Revises: c2e8a4d6f931
+Create Date: 2026-10-19 17:05:29.774410
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a9b6e2c718'
+down_revision: Union[str, Sequence[str], None] = 'c2e8a4d6f931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Declarative range partitioning by month; the primary key must include the partition key
+    op.execute("""
+        CREATE TABLE activity_log (
+            id BIGSERIAL NOT NULL,
+            occurred_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            actor_id INTEGER,
+            team_id INTEGER,
+            project_id INTEGER,
+            entity_type VARCHAR NOT NULL,
+            entity_id INTEGER,
+            action VARCHAR NOT NULL,
+            changes JSON,
+            PRIMARY KEY (id, occurred_at)
+        ) PARTITION BY RANGE (occurred_at)
+    """)
+    op.execute("CREATE TABLE activity_log_default PARTITION OF activity_log DEFAULT")
+
+    # This month and the next three; the activity writer keeps creating them ahead of time
+    today = date.today()
+    for offset in range(4):
+        month = today.month - 1 + offset
+        start = date(today.year + month // 12, month % 12 + 1, 1)
+        month += 1
+        end = date(today.year + month // 12, month % 12 + 1, 1)
+        op.execute(
+            f"CREATE TABLE activity_log_{start:%Y_%m} PARTITION OF activity_log "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    op.create_index('ix_activity_log_team_id_id', 'activity_log', ['team_id', 'id'], unique=False)
+    op.create_index('ix_activity_log_project_id_id', 'activity_log', ['project_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the parent drops every partition with it
+    op.drop_table('activity_log')
@@ -0,0 +1,39 @@
+"""Add task status snapshots
+
+Revision ID: d4b9e1a6c352
+Revises: c8e4a2f7d913
+Create Date: 2026-10-19 23:41:05.318842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4b9e1a6c352'
+down_revision: Union[str, Sequence[str], None] = 'c8e4a2f7d913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_status_snapshots',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('milestone_id', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('snapshot_date', sa.Date(), nullable=False),
+    sa.Column('todo', sa.Integer(), nullable=False),
+    sa.Column('in_progress', sa.Integer(), nullable=False),
+    sa.Column('done', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id', 'milestone_id', 'snapshot_date')
+    )
+    op.create_index(op.f('ix_task_status_snapshots_snapshot_date'), 'task_status_snapshots', ['snapshot_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_task_status_snapshots_snapshot_date'), table_name='task_status_snapshots')
+    op.drop_table('task_status_snapshots')
@@ -0,0 +1,32 @@
+"""Add version columns to projects, milestones and team members
+
+Revision ID: e2c7a5d9f614
+Revises: d4b9e1a6c352
+Create Date: 2026-10-19 23:58:37.402519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c7a5d9f614'
+down_revision: Union[str, Sequence[str], None] = 'd4b9e1a6c352'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('projects', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('milestones', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('team_members', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('team_members', 'version')
+    op.drop_column('milestones', 'version')
+    op.drop_column('projects', 'version')
@@ -0,0 +1,97 @@
+"""Add ON DELETE cascades, foreign key indexes and deletion jobs
+
+Revision ID: e5b1c7f3a902
+Revises: d4a9b6e2c718
+Create Date: 2026-10-19 17:02:11.904215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b1c7f3a902'
+down_revision: Union[str, Sequence[str], None] = 'd4a9b6e2c718'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (table, column, referenced table, ON DELETE action); the constraints were created
+# unnamed, so they carry Postgres' default <table>_<column>_fkey names
+FOREIGN_KEYS = [
+    ('teams', 'owner_id', 'users', 'SET NULL'),
+    ('team_members', 'user_id', 'users', 'CASCADE'),
+    ('team_members', 'team_id', 'teams', 'CASCADE'),
+    ('projects', 'team_id', 'teams', 'CASCADE'),
+    ('milestones', 'project_id', 'projects', 'CASCADE'),
+    ('tasks', 'project_id', 'projects', 'CASCADE'),
+    ('tasks', 'assignee_id', 'users', 'SET NULL'),
+    ('task_dependencies', 'task_id', 'tasks', 'CASCADE'),
+    ('task_dependencies', 'depends_on_id', 'tasks', 'CASCADE'),
+    ('comments', 'user_id', 'users', 'CASCADE'),
+    ('comments', 'task_id', 'tasks', 'CASCADE'),
+    ('attachments', 'uploader_id', 'users', 'CASCADE'),
+    ('attachments', 'task_id', 'tasks', 'CASCADE'),
+    ('friendships', 'requester_id', 'users', 'CASCADE'),
+    ('friendships', 'addressee_id', 'users', 'CASCADE'),
+]
+
+# Referencing columns that had no index; without one every cascaded delete scans the child table
+NEW_INDEXES = [
+    ('team_members', 'user_id'),
+    ('team_members', 'team_id'),
+    ('tasks', 'assignee_id'),
+    ('comments', 'user_id'),
+    ('comments', 'task_id'),
+    ('attachments', 'uploader_id'),
+    ('attachments', 'task_id'),
+    ('friendships', 'requester_id'),
+    ('friendships', 'addressee_id'),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, column in NEW_INDEXES:
+        op.create_index(op.f(f'ix_{table}_{column}'), table, [column], unique=False)
+
+    for table, column, referred, action in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'], ondelete=action)
+
+    op.create_table('deletion_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('target_type', sa.Enum('team', 'project', name='deletiontargetenum'), nullable=False),
+    sa.Column('target_id', sa.Integer(), nullable=False),
+    sa.Column('requested_by_id', sa.Integer(), nullable=True),
+    sa.Column('status', sa.Enum('pending', 'running', 'completed', 'failed', name='deletionjobstatusenum'), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=False),
+    sa.Column('deleted_rows', sa.Integer(), nullable=False),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['requested_by_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_deletion_jobs_id'), 'deletion_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_deletion_jobs_requested_by_id'), 'deletion_jobs', ['requested_by_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_deletion_jobs_requested_by_id'), table_name='deletion_jobs')
+    op.drop_index(op.f('ix_deletion_jobs_id'), table_name='deletion_jobs')
+    op.drop_table('deletion_jobs')
+    op.execute('DROP TYPE IF EXISTS deletionjobstatusenum')
+    op.execute('DROP TYPE IF EXISTS deletiontargetenum')
+
+    for table, column, referred, _ in FOREIGN_KEYS:
+        name = f'{table}_{column}_fkey'
+        op.drop_constraint(name, table, type_='foreignkey')
+        op.create_foreign_key(name, table, referred, [column], ['id'])
+
+    for table, column in reversed(NEW_INDEXES):
+        op.drop_index(op.f(f'ix_{table}_{column}'), table_name=table)
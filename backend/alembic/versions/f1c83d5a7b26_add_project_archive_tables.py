@@ -0,0 +1,61 @@
+"""Add project archive cold-storage tables
+
+Revision ID: f1c83d5a7b26
+Revises: e5b1c7f3a902
+Create Date: 2026-10-19 18:11:37.520913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c83d5a7b26'
+down_revision: Union[str, Sequence[str], None] = 'e5b1c7f3a902'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('project_archives',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('state', sa.Enum('archiving', 'archived', 'restoring', name='archivestateenum'), nullable=False),
+    # projectstatusenum already exists (projects.status)
+    sa.Column('previous_status', postgresql.ENUM('active', 'completed', 'on_hold', 'archived', name='projectstatusenum', create_type=False), nullable=True),
+    sa.Column('task_count', sa.Integer(), nullable=False),
+    sa.Column('comment_count', sa.Integer(), nullable=False),
+    sa.Column('attachment_count', sa.Integer(), nullable=False),
+    sa.Column('dependency_count', sa.Integer(), nullable=False),
+    sa.Column('raw_bytes', sa.Integer(), nullable=False),
+    sa.Column('stored_bytes', sa.Integer(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+    op.create_table('project_archive_chunks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('task_count', sa.Integer(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('restored', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('project_id', 'seq', name='_archive_chunk_project_seq_uc')
+    )
+    op.create_index(op.f('ix_project_archive_chunks_id'), 'project_archive_chunks', ['id'], unique=False)
+    # Chunks are already compressed; keep Postgres from trying again
+    op.execute("ALTER TABLE project_archive_chunks ALTER COLUMN payload SET STORAGE EXTERNAL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_project_archive_chunks_id'), table_name='project_archive_chunks')
+    op.drop_table('project_archive_chunks')
+    op.drop_table('project_archives')
+    op.execute('DROP TYPE IF EXISTS archivestateenum')
@@ -0,0 +1,88 @@
+"""Add chat channels, time-partitioned chat messages and read markers
+
+Revision ID: f7a3c9e1b468
+Revises: e2c7a5d9f614
+Create Date: 2026-10-20 00:21:44.905163
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a3c9e1b468'
+down_revision: Union[str, Sequence[str], None] = 'e2c7a5d9f614'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('chat_channels',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('team_id', 'project_id', name='_chat_channel_team_project_uc')
+    )
+    op.create_index(op.f('ix_chat_channels_id'), 'chat_channels', ['id'], unique=False)
+    op.create_index(op.f('ix_chat_channels_team_id'), 'chat_channels', ['team_id'], unique=False)
+    # One team channel (project_id NULL) per team; the unique constraint treats NULLs as distinct
+    op.create_index(
+        'uq_chat_channels_team_channel', 'chat_channels', ['team_id'], unique=True,
+        postgresql_where=sa.text('project_id IS NULL'),
+    )
+
+    # Range partitioned by month, like activity_log; the primary key must include the partition key
+    op.execute("""
+        CREATE TABLE chat_messages (
+            id BIGSERIAL NOT NULL,
+            channel_id INTEGER NOT NULL REFERENCES chat_channels (id) ON DELETE CASCADE,
+            user_id INTEGER REFERENCES users (id) ON DELETE SET NULL,
+            body TEXT NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute("CREATE TABLE chat_messages_default PARTITION OF chat_messages DEFAULT")
+
+    # This month and the next three; the chat writer keeps creating them ahead of time
+    today = date.today()
+    for offset in range(4):
+        month = today.month - 1 + offset
+        start = date(today.year + month // 12, month % 12 + 1, 1)
+        month += 1
+        end = date(today.year + month // 12, month % 12 + 1, 1)
+        op.execute(
+            f"CREATE TABLE chat_messages_{start:%Y_%m} PARTITION OF chat_messages "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+    op.create_index('ix_chat_messages_channel_id_id', 'chat_messages', ['channel_id', 'id'], unique=False)
+
+    op.create_table('chat_read_markers',
+    sa.Column('channel_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('last_read_id', sa.BigInteger(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['channel_id'], ['chat_channels.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('channel_id', 'user_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('chat_read_markers')
+    # Dropping the parent drops every partition with it
+    op.drop_table('chat_messages')
+    op.drop_index('uq_chat_channels_team_channel', table_name='chat_channels')
+    op.drop_index(op.f('ix_chat_channels_team_id'), table_name='chat_channels')
+    op.drop_index(op.f('ix_chat_channels_id'), table_name='chat_channels')
+    op.drop_table('chat_channels')
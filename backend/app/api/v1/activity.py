@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app import models, schemas
+from app.db import get_db
+from app.core.security import get_current_user
+
+from app.api.v1.teams import get_team_and_check_permissions
+
+router = APIRouter()
+
+def _page(query, before: Optional[int], limit: int) -> dict:
+    # Keyset pagination on id (newest first), served by the (team_id, id) / (project_id, id) indexes
+    if before is not None:
+        query = query.filter(models.ActivityLog.id < before)
+    rows = query.order_by(models.ActivityLog.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {"items": rows, "next_cursor": rows[-1].id if has_more else None}
+
+# --- Activity Feeds ---
+
+@router.get("/teams/{team_id}", response_model=schemas.ActivityPage)
+def get_team_activity(
+    team_id: int,
+    before: Optional[int] = Query(None, description="Cursor from a previous page's next_cursor."),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Returns the team's activity feed, newest first.
+    Requires the user to be a member of the team.
+    """
+    get_team_and_check_permissions(team_id, db, current_user, required_role="member")
+    query = db.query(models.ActivityLog).filter(models.ActivityLog.team_id == team_id)
+    return _page(query, before, limit)
+
+@router.get("/projects/{project_id}", response_model=schemas.ActivityPage)
+def get_project_activity(
+    project_id: int,
+    before: Optional[int] = Query(None, description="Cursor from a previous page's next_cursor."),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Returns the project's activity feed, newest first.
+    Requires the user to be a member of the project's team.
+    """
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="member")
+    query = db.query(models.ActivityLog).filter(models.ActivityLog.project_id == project_id)
+    return _page(query, before, limit)
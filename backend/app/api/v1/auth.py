@@ -0,0 +1,105 @@
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.db import get_db
+from app.core import security
+from app.core.rate_limit import RateLimit, rate_limit
+from app.core.revocation import revocations
+
+router = APIRouter()
+
+refresh_limit = rate_limit("refresh", per_ip=RateLimit.per_minute(60, burst=20))
+
+# --- Helpers ---
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _invalid(detail: str = "Invalid or expired refresh token.") -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=detail, headers={"WWW-Authenticate": "Bearer"})
+
+# --- Endpoints ---
+
+@router.post("/refresh", response_model=schemas.Token, dependencies=[Depends(refresh_limit)])
+def refresh_access_token(request: schemas.TokenRefresh, db: Session = Depends(get_db)):
+    """
+    Swaps a refresh token for a new access token and a new refresh token.
+    Each refresh token works once: presenting one that was already swapped
+    means it was copied, so every token from that login (refresh and access
+    tokens alike) is revoked and the user has to sign in again.
+    """
+    now = datetime.now(timezone.utc)
+    row = db.query(models.RefreshToken).filter(
+        models.RefreshToken.token_hash == security.hash_refresh_token(request.refresh_token)
+    ).with_for_update().first()
+    if row is None or row.revoked_at is not None or _as_utc(row.expires_at) <= now:
+        raise _invalid()
+    if row.used_at is not None:
+        security.revoke_login(db, row.family_id)
+        db.commit()
+        print(f"⚠️ Refresh token reuse detected for user {row.user_id}; revoked its login.")
+        raise _invalid("This refresh token was already used. Please sign in again.")
+
+    user = db.query(models.User).filter(models.User.id == row.user_id).first()
+    if user is None or not user.is_active:
+        raise _invalid()
+
+    row.used_at = now
+    refresh_token, family_id = security.create_refresh_token(db, user.id, family_id=row.family_id)
+    db.commit()
+    return {
+        "access_token": security.create_access_token(data={"sub": user.username, "fam": family_id}),
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": security.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    request: schemas.LogoutRequest,
+    token: str = Depends(security.oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    """
+    Signs out: the current access token stops working straight away, and so
+    does the given refresh token along with every token from the same login.
+    """
+    payload = security.decode_access_token(token)
+    if payload and payload.get("jti"):
+        revocations.revoke(db, payload["jti"], datetime.fromtimestamp(payload["exp"], timezone.utc))
+    if request.refresh_token:
+        row = db.query(models.RefreshToken).filter(
+            models.RefreshToken.token_hash == security.hash_refresh_token(request.refresh_token),
+            models.RefreshToken.user_id == current_user.id,
+        ).first()
+        if row is not None:
+            security.revoke_login(db, row.family_id)
+    db.commit()
+    return None
+
+@router.post("/logout-all", status_code=status.HTTP_204_NO_CONTENT)
+def logout_everywhere(
+    token: str = Depends(security.oauth2_scheme),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(security.get_current_user)
+):
+    """
+    Ends every login the user has: all their refresh tokens and the access
+    tokens issued from them stop working straight away.
+    """
+    payload = security.decode_access_token(token)
+    if payload and payload.get("jti"):
+        revocations.revoke(db, payload["jti"], datetime.fromtimestamp(payload["exp"], timezone.utc))
+    family_ids = db.query(models.RefreshToken.family_id).filter(
+        models.RefreshToken.user_id == current_user.id,
+        models.RefreshToken.revoked_at.is_(None),
+        models.RefreshToken.expires_at > datetime.now(timezone.utc),
+    ).distinct().all()
+    for (family_id,) in family_ids:
+        security.revoke_login(db, family_id)
+    db.commit()
+    return None
@@ -0,0 +1,101 @@
+import secrets
+from email.utils import format_datetime, parsedate_to_datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+from typing import List
+
+from app import models, schemas
+from app.db import get_db
+from app.core.security import get_current_user
+from app.utils.calendar_feed import build_feed, calendar_cache, hash_token
+
+from app.api.v1.teams import get_team_and_check_permissions
+
+router = APIRouter()
+
+# --- Feed Management ---
+
+@router.post("/feeds", response_model=schemas.CalendarFeedCreated, status_code=status.HTTP_201_CREATED)
+def create_calendar_feed(
+    feed: schemas.CalendarFeedCreate,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Creates a secret .ics URL for a calendar app to subscribe to: one team's
+    milestones and dated tasks, or (without team_id) the milestones of all the
+    user's teams plus the tasks assigned to them. Creating a feed again for the
+    same scope replaces the old URL.
+    """
+    if feed.team_id is not None:
+        get_team_and_check_permissions(feed.team_id, db, current_user, required_role="member")
+    for old in db.query(models.CalendarFeed).filter(
+        models.CalendarFeed.user_id == current_user.id,
+        models.CalendarFeed.team_id == feed.team_id
+    ).all():
+        db.delete(old)
+    token = secrets.token_urlsafe(32)
+    db_feed = models.CalendarFeed(user_id=current_user.id, team_id=feed.team_id, token_hash=hash_token(token))
+    db.add(db_feed)
+    db.commit()
+    db.refresh(db_feed)
+    return {
+        "id": db_feed.id,
+        "team_id": db_feed.team_id,
+        "created_at": db_feed.created_at,
+        "url": str(request.url_for("get_calendar_feed", token=token)),
+    }
+
+@router.get("/feeds", response_model=List[schemas.CalendarFeed])
+def get_calendar_feeds(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """Lists the user's calendar feeds (their URLs are only shown when created)."""
+    return db.query(models.CalendarFeed).filter(models.CalendarFeed.user_id == current_user.id).order_by(models.CalendarFeed.id).all()
+
+@router.delete("/feeds/{feed_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_calendar_feed(feed_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """Revokes a calendar feed URL."""
+    db_feed = db.query(models.CalendarFeed).filter(
+        models.CalendarFeed.id == feed_id,
+        models.CalendarFeed.user_id == current_user.id
+    ).first()
+    if not db_feed:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar feed not found.")
+    db.delete(db_feed)
+    db.commit()
+
+# --- Feed ---
+
+def _not_modified(request: Request, etag: str, last_modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+@router.get("/{token}.ics", name="get_calendar_feed", response_class=Response)
+def get_calendar_feed(token: str, request: Request):
+    """
+    Serves an iCalendar feed. The token in the URL is the only credential.
+    Feeds are cached in memory and answer conditional requests (If-None-Match /
+    If-Modified-Since) with 304, usually without touching the database.
+    """
+    feed = calendar_cache.feed(hash_token(token))
+    built = build_feed(feed[1], feed[2]) if feed else None
+    if built is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Calendar feed not found.")
+    etag, last_modified, render = built
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "private, max-age=60",
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=render(), media_type="text/calendar; charset=utf-8", headers=headers)
@@ -0,0 +1,332 @@
+import asyncio
+import json
+import time
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app import models, schemas
+from app.db import SessionLocal, get_db
+from app.core.security import claims_revoked, decode_access_token, get_current_user
+from app.core.shards import pin_team
+from app.utils.chat import (
+    MAX_MESSAGE_LENGTH, MEMBERSHIP_TTL_SECONDS, ChatConnection, chat_hub, last_read_id, message_frame, read_history,
+    set_read_marker,
+)
+
+from app.api.v1.teams import get_team_and_check_permissions
+
+router = APIRouter()
+
+# --- Helpers ---
+
+def _channel_for_member(channel_id: int, db: Session, current_user: models.User) -> models.ChatChannel:
+    channel = db.query(models.ChatChannel).filter(models.ChatChannel.id == channel_id).first()
+    if not channel:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Channel not found.")
+    get_team_and_check_permissions(channel.team_id, db, current_user, required_role="member")
+    return channel
+
+def _is_member(db: Session, team_id: int, user_id: int) -> bool:
+    pin_team(db, team_id)
+    return db.query(models.TeamMember.id).filter(
+        models.TeamMember.team_id == team_id,
+        models.TeamMember.user_id == user_id,
+        models.TeamMember.status == models.InvitationStatusEnum.accepted,
+    ).first() is not None
+
+def _check_body(body) -> str:
+    if not isinstance(body, str) or not body.strip():
+        raise ValueError("A message needs a non-empty body.")
+    if len(body) > MAX_MESSAGE_LENGTH:
+        raise ValueError(f"Messages are limited to {MAX_MESSAGE_LENGTH} characters.")
+    return body
+
+# --- Channels ---
+
+@router.get("/teams/{team_id}/channels", response_model=List[schemas.ChatChannel])
+def get_team_channels(team_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """
+    Lists the team's open channels with the newest message id and the user's
+    read marker in each, so clients can show unread badges.
+    Requires the user to be a member of the team.
+    """
+    get_team_and_check_permissions(team_id, db, current_user, required_role="member")
+    last_message = select(func.max(models.ChatMessage.id)).where(
+        models.ChatMessage.channel_id == models.ChatChannel.id
+    ).scalar_subquery()
+    rows = db.query(models.ChatChannel, last_message, models.ChatReadMarker.last_read_id).outerjoin(
+        models.ChatReadMarker,
+        (models.ChatReadMarker.channel_id == models.ChatChannel.id) & (models.ChatReadMarker.user_id == current_user.id),
+    ).filter(models.ChatChannel.team_id == team_id).order_by(models.ChatChannel.id).all()
+    return [
+        {**schemas.ChatChannel.model_validate(channel).model_dump(), "last_message_id": last_id, "last_read_id": read_id or 0}
+        for channel, last_id, read_id in rows
+    ]
+
+@router.post("/teams/{team_id}/channels", response_model=schemas.ChatChannel)
+def open_channel(
+    team_id: int,
+    request: schemas.ChatChannelCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Returns the team's channel, or a project's with `project_id`, creating it
+    on first use. Requires the user to be a member of the team.
+    """
+    team, _ = get_team_and_check_permissions(team_id, db, current_user, required_role="member")
+    name = team.name
+    if request.project_id is not None:
+        project = db.query(models.Project).filter(
+            models.Project.id == request.project_id, models.Project.team_id == team_id
+        ).first()
+        if not project:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found in this team.")
+        name = project.name
+
+    def existing():
+        return db.query(models.ChatChannel).filter(
+            models.ChatChannel.team_id == team_id,
+            models.ChatChannel.project_id.is_(None) if request.project_id is None else models.ChatChannel.project_id == request.project_id,
+        ).first()
+
+    channel = existing()
+    if channel is None:
+        channel = models.ChatChannel(team_id=team_id, project_id=request.project_id, name=name)
+        db.add(channel)
+        try:
+            db.commit()
+        except IntegrityError:
+            # Opened by someone else at the same moment
+            db.rollback()
+            channel = existing()
+    return channel
+
+# --- History and Read Markers ---
+
+@router.get("/channels/{channel_id}/messages", response_model=schemas.ChatMessagePage)
+def get_channel_messages(
+    channel_id: int,
+    before: Optional[int] = Query(None, description="Cursor from a previous page's next_cursor."),
+    after: Optional[int] = Query(None, description="Only messages newer than this id, oldest first (catching up)."),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Returns a page of the channel's history, newest first, with the user's read marker.
+    Requires the user to be a member of the channel's team.
+    """
+    _channel_for_member(channel_id, db, current_user)
+    rows = read_history(db, channel_id, before=before, after=after, limit=limit + 1)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": rows,
+        "next_cursor": rows[-1].id if has_more and after is None else None,
+        "last_read_id": last_read_id(db, channel_id, current_user.id),
+    }
+
+@router.post("/channels/{channel_id}/messages", response_model=schemas.ChatMessage, status_code=status.HTTP_201_CREATED)
+async def post_channel_message(
+    channel_id: int,
+    message: schemas.ChatMessageCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Sends a message without a WebSocket (e.g. from integrations); it is saved
+    and delivered exactly like one sent over the socket.
+    Requires the user to be a member of the channel's team.
+    """
+    channel = await run_in_threadpool(_channel_for_member, channel_id, db, current_user)
+    try:
+        body = _check_body(message.body)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    try:
+        return await chat_hub.post(channel.team_id, channel_id, current_user.id, body)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+@router.put("/channels/{channel_id}/read", response_model=schemas.ChatReadMarker)
+def mark_channel_read(
+    channel_id: int,
+    marker: schemas.ChatReadMarkerUpdate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Moves the user's read marker in the channel forward (it never moves back)."""
+    _channel_for_member(channel_id, db, current_user)
+    set_read_marker(db, channel_id, current_user.id, marker.last_read_id)
+    db.commit()
+    return {"channel_id": channel_id, "last_read_id": last_read_id(db, channel_id, current_user.id)}
+
+# --- WebSocket ---
+
+def _authorize(token: Optional[str], channel_id: int) -> Optional[tuple[int, int, dict]]:
+    """(user id, team id, token claims) if the token's user may join the channel, else None. One short-lived session."""
+    claims = decode_access_token(token) if token else None
+    if claims is None or claims.get("sub") is None:
+        return None
+    db = SessionLocal()
+    try:
+        user = db.query(models.User).filter(models.User.username == claims["sub"]).first()
+        channel = db.query(models.ChatChannel).filter(models.ChatChannel.id == channel_id).first()
+        if user is None or channel is None or not _is_member(db, channel.team_id, user.id):
+            return None
+        return user.id, channel.team_id, claims
+    finally:
+        db.close()
+
+def _still_allowed(connection: ChatConnection, check_membership: bool) -> bool:
+    """Whether the connection's token is still live and (if asked) its user still in the team."""
+    if connection.token_expired() or claims_revoked(connection.token_claims):
+        return False
+    if not check_membership:
+        return True
+    db = SessionLocal()
+    try:
+        return _is_member(db, connection.team_id, connection.user_id)
+    finally:
+        db.close()
+
+async def _recheck(connection: ChatConnection, force: bool = False) -> bool:
+    """
+    Re-checks the connection if its membership check has gone stale (or
+    `force`), closing it with 1008 when the user may no longer be there.
+    """
+    stale = connection.membership_stale()
+    if not (force or stale or connection.token_expired()):
+        return True
+    if not await run_in_threadpool(_still_allowed, connection, stale):
+        chat_hub.leave(connection)
+        try:
+            await connection.websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        except RuntimeError:
+            pass  # Already closed
+        return False
+    if stale:
+        connection.checked_at = time.monotonic()
+    return True
+
+async def _watch(connection: ChatConnection) -> None:
+    """
+    Re-checks a connection on a timer, so a silent socket whose user left the
+    team, or whose token expired or was revoked, is closed rather than kept
+    receiving the channel.
+    """
+    while True:
+        delay = MEMBERSHIP_TTL_SECONDS
+        if connection.token_expires_at is not None:
+            delay = min(delay, max(connection.token_expires_at - time.time(), 0) + 0.1)
+        await asyncio.sleep(delay)
+        if not await _recheck(connection, force=True):
+            return
+
+def _backfill(channel_id: int, after: int) -> list[dict]:
+    db = SessionLocal()
+    try:
+        return [
+            {"id": m.id, "channel_id": m.channel_id, "user_id": m.user_id, "body": m.body, "created_at": m.created_at}
+            for m in read_history(db, channel_id, after=after, limit=500)
+        ]
+    finally:
+        db.close()
+
+async def _send_outbox(connection: ChatConnection, sent_up_to: int) -> None:
+    while True:
+        message_id, frame = await connection.outbox.get()
+        # Skip what the backfill already sent
+        if message_id is None or message_id > sent_up_to:
+            # Nothing goes out on a connection whose membership check has lapsed until it passes again
+            if not await _recheck(connection):
+                return
+            await connection.websocket.send_text(frame)
+
+@router.websocket("/channels/{channel_id}/ws")
+async def chat_socket(websocket: WebSocket, channel_id: int, token: Optional[str] = None, after: Optional[int] = None):
+    """
+    Live chat on one channel. Authenticate with `?token=` (or an Authorization
+    header); `after` replays messages newer than that id first, for reconnects.
+
+    Client frames: {"type": "message", "body": ..., "client_id": ...},
+    {"type": "read", "last_read_id": ...} and {"type": "ping"}. The server sends
+    "message" frames to everyone on the channel, an "ack" with the saved id to
+    the sender, "pong" and "error". Membership is checked on connect and then
+    about once a minute (by a timer, and before delivering once the last check
+    is stale), not per message. The socket is closed with 1008 when the user
+    leaves the team or the token it was opened with expires or is revoked.
+    """
+    if token is None:
+        authorization = websocket.headers.get("authorization", "")
+        token = authorization[7:] if authorization.lower().startswith("bearer ") else None
+    authorized = await run_in_threadpool(_authorize, token, channel_id)
+    if authorized is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    user_id, team_id, claims = authorized
+    await websocket.accept()
+
+    connection = ChatConnection(
+        websocket, user_id, channel_id, team_id, checked_at=time.monotonic(),
+        token_expires_at=claims.get("exp"), token_claims=claims,
+    )
+    chat_hub.join(connection)
+    sender = None
+    watcher = asyncio.create_task(_watch(connection))
+    try:
+        sent_up_to = 0
+        if after is not None:
+            for message in await run_in_threadpool(_backfill, channel_id, after):
+                await websocket.send_text(message_frame(message))
+                sent_up_to = message["id"]
+        sender = asyncio.create_task(_send_outbox(connection, sent_up_to))
+
+        while True:
+            frame = await websocket.receive_text()
+            try:
+                data = json.loads(frame)
+                kind = data.get("type")
+            except (ValueError, AttributeError):
+                await websocket.send_json({"type": "error", "detail": "Frames must be JSON objects."})
+                continue
+            if kind == "ping":
+                await websocket.send_json({"type": "pong"})
+                continue
+            if not await _recheck(connection):
+                return
+            if kind == "message":
+                try:
+                    body = _check_body(data.get("body"))
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "client_id": data.get("client_id"), "detail": str(e)})
+                    continue
+                future = chat_hub.post(team_id, channel_id, user_id, body)
+                future.add_done_callback(lambda f, client_id=data.get("client_id"): _ack(connection, client_id, f))
+            elif kind == "read" and isinstance(data.get("last_read_id"), int):
+                chat_hub.mark_read(team_id, channel_id, user_id, data["last_read_id"])
+            else:
+                await websocket.send_json({"type": "error", "detail": "Unknown frame."})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        chat_hub.leave(connection)
+        watcher.cancel()
+        if sender is not None:
+            sender.cancel()
+
+def _ack(connection: ChatConnection, client_id, future: asyncio.Future) -> None:
+    # Through the outbox, so the sender gets it after the message itself
+    if future.exception() is not None:
+        frame = {"type": "error", "client_id": client_id, "detail": str(future.exception())}
+    else:
+        frame = {"type": "ack", "client_id": client_id, "id": future.result()["id"]}
+    try:
+        connection.outbox.put_nowait((None, json.dumps(frame)))
+    except asyncio.QueueFull:
+        pass
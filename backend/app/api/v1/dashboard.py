@@ -0,0 +1,145 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import or_
+
+from app import models, schemas
+from app.db import get_db, SessionLocal
+from app.core.config import settings
+from app.core.replicas import new_session_like
+from app.core.shards import scatter
+from app.core.security import get_current_user
+from app.api.v1.teams import get_member_permissions
+
+router = APIRouter()
+
+# Each gatherer runs on its own session, so the independent queries below can
+# be issued in parallel on separate pooled connections. The pool has a thread
+# for every gatherer of DASHBOARD_PARALLEL_REQUESTS requests, so a request that
+# gets a slot never waits behind another; one that doesn't (the server is busy
+# anyway) runs its gatherers on its own thread rather than queueing.
+_GATHERERS_PER_REQUEST = 5
+_parallel_slots = threading.BoundedSemaphore(settings.DASHBOARD_PARALLEL_REQUESTS)
+_executor = ThreadPoolExecutor(
+    max_workers=_GATHERERS_PER_REQUEST * settings.DASHBOARD_PARALLEL_REQUESTS, thread_name_prefix="dashboard"
+)
+
+
+# Gatherers of team data, which may be spread over several shards
+_SHARDED_GATHERERS = {"teams", "projects", "pending_invitations"}
+
+
+def _run_in_session(gatherer, user_id: int, request_db: Session, sharded: bool = False):
+    # Reads from wherever the request's own session would (a replica, unless the user just wrote)
+    db = new_session_like(SessionLocal, request_db)
+    try:
+        if sharded:
+            return scatter(SessionLocal, db, lambda shard_db: gatherer(shard_db, user_id))
+        return gatherer(db, user_id)
+    finally:
+        db.close()
+
+# --- Gatherers (one query each) ---
+
+def _gather_teams(db: Session, user_id: int) -> list[dict]:
+    memberships = db.query(models.TeamMember).options(joinedload(models.TeamMember.team)).filter(
+        models.TeamMember.user_id == user_id,
+        models.TeamMember.status == models.InvitationStatusEnum.accepted
+    ).all()
+    teams = []
+    for membership in memberships:
+        team = membership.team
+        teams.append({
+            "id": team.id,
+            "name": team.name,
+            "description": team.description,
+            "owner_id": team.owner_id,
+            **get_member_permissions(team, membership, user_id),
+        })
+    return teams
+
+def _gather_projects(db: Session, user_id: int) -> list[schemas.DashboardProject]:
+    # The team ids come from a subquery so this doesn't have to wait on _gather_teams
+    member_team_ids = db.query(models.TeamMember.team_id).filter(
+        models.TeamMember.user_id == user_id,
+        models.TeamMember.status == models.InvitationStatusEnum.accepted
+    )
+    projects = db.query(models.Project).filter(models.Project.team_id.in_(member_team_ids)).all()
+    return [schemas.DashboardProject.model_validate(project) for project in projects]
+
+def _gather_pending_invitations(db: Session, user_id: int) -> list[schemas.TeamInvitation]:
+    invitations = db.query(models.TeamMember).options(
+        joinedload(models.TeamMember.team).selectinload(models.Team.members).joinedload(models.TeamMember.user)
+    ).filter(
+        models.TeamMember.user_id == user_id,
+        models.TeamMember.status == models.InvitationStatusEnum.pending
+    ).all()
+    return [schemas.TeamInvitation.model_validate(invitation) for invitation in invitations]
+
+def _gather_friends(db: Session, user_id: int) -> list[schemas.User]:
+    friendships = db.query(models.Friendship).options(
+        joinedload(models.Friendship.requester),
+        joinedload(models.Friendship.addressee)
+    ).filter(
+        or_(models.Friendship.requester_id == user_id, models.Friendship.addressee_id == user_id),
+        models.Friendship.status == models.FriendshipStatusEnum.accepted
+    ).all()
+    return [
+        schemas.User.model_validate(f.addressee if f.requester_id == user_id else f.requester)
+        for f in friendships
+    ]
+
+def _gather_pending_friend_requests(db: Session, user_id: int) -> list[schemas.PendingFriendRequest]:
+    requests = db.query(models.Friendship).options(joinedload(models.Friendship.requester)).filter(
+        models.Friendship.addressee_id == user_id,
+        models.Friendship.status == models.FriendshipStatusEnum.pending
+    ).all()
+    return [schemas.PendingFriendRequest.model_validate(request) for request in requests]
+
+# --- Bootstrap Endpoint ---
+
+@router.get("/bootstrap", response_model=schemas.DashboardBootstrap)
+def get_dashboard_bootstrap(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """
+    Returns everything the dashboard needs on first load: the current user, their
+    teams (with role, permissions and projects), pending team invitations, friends
+    and pending friend requests.
+    Authenticates once and runs a fixed number of queries regardless of team count.
+    """
+    user_id = current_user.id
+    gatherers = {
+        "teams": _gather_teams,
+        "projects": _gather_projects,
+        "pending_invitations": _gather_pending_invitations,
+        "friends": _gather_friends,
+        "pending_friend_requests": _gather_pending_friend_requests,
+    }
+    if _parallel_slots.acquire(blocking=False):
+        try:
+            futures = {
+                key: _executor.submit(_run_in_session, gatherer, user_id, db, key in _SHARDED_GATHERERS)
+                for key, gatherer in gatherers.items()
+            }
+            results = {key: future.result() for key, future in futures.items()}
+        finally:
+            _parallel_slots.release()
+    else:
+        results = {
+            key: _run_in_session(gatherer, user_id, db, key in _SHARDED_GATHERERS)
+            for key, gatherer in gatherers.items()
+        }
+
+    projects_by_team: dict[int, list] = {}
+    for project in results["projects"]:
+        projects_by_team.setdefault(project.team_id, []).append(project)
+    for team in results["teams"]:
+        team["projects"] = projects_by_team.get(team["id"], [])
+
+    return {
+        "user": current_user,
+        "teams": results["teams"],
+        "pending_invitations": results["pending_invitations"],
+        "friends": results["friends"],
+        "pending_friend_requests": results["pending_friend_requests"],
+    }
@@ -0,0 +1,68 @@
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.db import get_db
+from app.core.security import get_current_user
+from app.utils.deletion import MAX_ATTEMPTS, is_stale, start_deletion_job, run_deletion_job
+
+from app.api.v1.teams import get_team_and_check_permissions
+
+router = APIRouter()
+
+# --- Background Deletion Jobs ---
+
+@router.post("/", response_model=schemas.DeletionJob, status_code=status.HTTP_202_ACCEPTED)
+def create_deletion_job(
+    request: schemas.DeletionJobCreate,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Deletes a team or project in the background, in bounded chunks, for ones too
+    large to remove within a request. Poll the returned job for progress.
+    Requires the user to own the team, or be an admin of the project's team.
+    Asking again for a job that has failed or stalled resumes it.
+    """
+    existing = db.query(models.DeletionJob).filter(
+        models.DeletionJob.target_type == request.target_type,
+        models.DeletionJob.target_id == request.target_id,
+        models.DeletionJob.status != models.DeletionJobStatusEnum.completed
+    ).order_by(models.DeletionJob.id.desc()).first()
+
+    # A team's memberships are removed when its deletion starts, so the user
+    # who started it is recognised by the job rather than by their membership
+    if existing is None or existing.requested_by_id != current_user.id:
+        if request.target_type == models.DeletionTargetEnum.team:
+            get_team_and_check_permissions(request.target_id, db, current_user, required_role="owner")
+        else:
+            project = db.query(models.Project).filter(models.Project.id == request.target_id).first()
+            if not project:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+            get_team_and_check_permissions(project.team_id, db, current_user, required_role="admin")
+
+    if existing and (existing.status != models.DeletionJobStatusEnum.failed or existing.attempts < MAX_ATTEMPTS):
+        if is_stale(existing):
+            # It failed or its worker died part way through; pick up where it stopped
+            background_tasks.add_task(run_deletion_job, existing.id)
+        return existing
+
+    job = start_deletion_job(db, request.target_type, request.target_id, current_user.id)
+    background_tasks.add_task(run_deletion_job, job.id)
+    return job
+
+@router.get("/{job_id}", response_model=schemas.DeletionJob)
+def get_deletion_job(
+    job_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Reports how far a background deletion has got.
+    Only the user who started the job can see it.
+    """
+    job = db.query(models.DeletionJob).filter(models.DeletionJob.id == job_id).first()
+    if not job or job.requested_by_id != current_user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Deletion job not found.")
+    return job
@@ -0,0 +1,219 @@
+import csv
+import enum
+import io
+import json
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import get_db, SessionLocal
+from app.core.security import get_current_user
+from app.core.replicas import new_session_like
+
+from app.api.v1.teams import get_team_and_check_permissions
+
+router = APIRouter()
+
+# Rows fetched per round trip from the server-side cursor, and written per chunk of the response
+BATCH_SIZE = 1000
+
+class ExportFormatEnum(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+
+_MEDIA_TYPES = {
+    ExportFormatEnum.csv: "text/csv",
+    ExportFormatEnum.ndjson: "application/x-ndjson",
+}
+
+# --- Streaming ---
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _stream_rows(query, fmt: ExportFormatEnum, db: Session):
+    """
+    Runs `query` on its own session with a server-side cursor and yields the
+    encoded rows a batch at a time, so memory stays flat however many rows match.
+    (The request's session is closed before a streaming body is sent.)
+    """
+    db = new_session_like(SessionLocal, db)
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=BATCH_SIZE))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer) if fmt == ExportFormatEnum.csv else None
+        if writer:
+            writer.writerow(columns)
+        for batch in result.partitions():
+            for row in batch:
+                values = [_plain(value) for value in row]
+                if writer:
+                    writer.writerow(values)
+                else:
+                    buffer.write(json.dumps(dict(zip(columns, values)), separators=(",", ":")))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+def _export_response(query, fmt: ExportFormatEnum, filename: str, db: Session) -> StreamingResponse:
+    return StreamingResponse(
+        _stream_rows(query, fmt, db),
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt.value}"'},
+    )
+
+# --- Queries ---
+
+def _tasks_query(
+    status_in: Optional[List[models.TaskStatusEnum]],
+    priority_in: Optional[List[models.TaskPriorityEnum]],
+    assignee_id: Optional[int],
+    due_from: Optional[datetime],
+    due_to: Optional[datetime],
+):
+    query = select(
+        models.Task.id,
+        models.Task.project_id,
+        models.Task.title,
+        models.Task.description,
+        models.Task.status,
+        models.Task.priority,
+        models.Task.due_date,
+        models.Task.estimated_days,
+        models.Task.assignee_id,
+        models.User.username.label("assignee_username"),
+        models.Task.created_at,
+    ).outerjoin(models.User, models.User.id == models.Task.assignee_id)
+    if status_in:
+        query = query.where(models.Task.status.in_(status_in))
+    if priority_in:
+        query = query.where(models.Task.priority.in_(priority_in))
+    if assignee_id is not None:
+        query = query.where(models.Task.assignee_id == assignee_id)
+    if due_from is not None:
+        query = query.where(models.Task.due_date >= due_from)
+    if due_to is not None:
+        query = query.where(models.Task.due_date < due_to)
+    return query
+
+# --- Export Endpoints ---
+
+@router.get("/teams/{team_id}/projects")
+def export_team_projects(
+    team_id: int,
+    format: ExportFormatEnum = ExportFormatEnum.csv,
+    status_in: Optional[List[models.ProjectStatusEnum]] = Query(None, alias="status"),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Streams the team's projects as CSV or NDJSON.
+    Requires the user to be a member of the team.
+    """
+    get_team_and_check_permissions(team_id, db, current_user, required_role="member")
+    query = select(
+        models.Project.id,
+        models.Project.team_id,
+        models.Project.name,
+        models.Project.description,
+        models.Project.status,
+        models.Project.due_date,
+        models.Project.created_at,
+    ).where(models.Project.team_id == team_id).order_by(models.Project.id)
+    if status_in:
+        query = query.where(models.Project.status.in_(status_in))
+    return _export_response(query, format, f"team-{team_id}-projects", db)
+
+@router.get("/teams/{team_id}/tasks")
+def export_team_tasks(
+    team_id: int,
+    format: ExportFormatEnum = ExportFormatEnum.csv,
+    status_in: Optional[List[models.TaskStatusEnum]] = Query(None, alias="status"),
+    priority_in: Optional[List[models.TaskPriorityEnum]] = Query(None, alias="priority"),
+    assignee_id: Optional[int] = None,
+    due_from: Optional[datetime] = Query(None, description="Only tasks due at or after this time."),
+    due_to: Optional[datetime] = Query(None, description="Only tasks due before this time."),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Streams the tasks of every project in the team as CSV or NDJSON, optionally
+    filtered by status, priority, assignee and due-date range.
+    Requires the user to be a member of the team.
+    """
+    get_team_and_check_permissions(team_id, db, current_user, required_role="member")
+    query = _tasks_query(status_in, priority_in, assignee_id, due_from, due_to).join(
+        models.Project, models.Project.id == models.Task.project_id
+    ).where(models.Project.team_id == team_id).order_by(models.Task.id)
+    return _export_response(query, format, f"team-{team_id}-tasks", db)
+
+@router.get("/projects/{project_id}/tasks")
+def export_project_tasks(
+    project_id: int,
+    format: ExportFormatEnum = ExportFormatEnum.csv,
+    status_in: Optional[List[models.TaskStatusEnum]] = Query(None, alias="status"),
+    priority_in: Optional[List[models.TaskPriorityEnum]] = Query(None, alias="priority"),
+    assignee_id: Optional[int] = None,
+    due_from: Optional[datetime] = Query(None, description="Only tasks due at or after this time."),
+    due_to: Optional[datetime] = Query(None, description="Only tasks due before this time."),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Streams the project's tasks as CSV or NDJSON, optionally filtered by status,
+    priority, assignee and due-date range.
+    Requires the user to be a member of the project's team.
+    """
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="member")
+    query = _tasks_query(status_in, priority_in, assignee_id, due_from, due_to).where(
+        models.Task.project_id == project_id
+    ).order_by(models.Task.id)
+    return _export_response(query, format, f"project-{project_id}-tasks", db)
+
+@router.get("/projects/{project_id}/milestones")
+def export_project_milestones(
+    project_id: int,
+    format: ExportFormatEnum = ExportFormatEnum.csv,
+    due_from: Optional[datetime] = Query(None, description="Only milestones due at or after this time."),
+    due_to: Optional[datetime] = Query(None, description="Only milestones due before this time."),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Streams the project's milestones as CSV or NDJSON.
+    Requires the user to be a member of the project's team.
+    """
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="member")
+    query = select(
+        models.Milestone.id,
+        models.Milestone.project_id,
+        models.Milestone.name,
+        models.Milestone.description,
+        models.Milestone.status,
+        models.Milestone.due_date,
+    ).where(models.Milestone.project_id == project_id).order_by(models.Milestone.id)
+    if due_from is not None:
+        query = query.where(models.Milestone.due_date >= due_from)
+    if due_to is not None:
+        query = query.where(models.Milestone.due_date < due_to)
+    return _export_response(query, format, f"project-{project_id}-milestones", db)
@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from typing import List
 
 from app import models, schemas
 from app.db import get_db
 from app.core.security import get_current_user
+from app.utils.friend_graph import friend_graph
+from app.utils.notifications import mark_read, notify
 
 router = APIRouter()
 
@@ -33,18 +36,24 @@ def send_friend_request(request: schemas.FriendRequestCreate, db: Session = Depe
     addressee = db.query(models.User).filter(models.User.username == request.addressee_username).first()
     if not addressee:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"User '{request.addressee_username}' not found.")
+    user_low_id, user_high_id = models.canonical_pair(current_user.id, addressee.id)
     existing_friendship = db.query(models.Friendship).filter(
-        or_(
-            (models.Friendship.requester_id == current_user.id) & (models.Friendship.addressee_id == addressee.id),
-            (models.Friendship.requester_id == addressee.id) & (models.Friendship.addressee_id == current_user.id)
-        )
+        models.Friendship.user_low_id == user_low_id,
+        models.Friendship.user_high_id == user_high_id
     ).first()
     if existing_friendship:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A friend request already exists between you and this user.")
     db_friendship = models.Friendship(requester_id=current_user.id, addressee_id=addressee.id)
     db.add(db_friendship)
-    db.commit()
+    notify(db, [addressee.id], "friend_request", actor_id=current_user.id, entity=db_friendship, payload={"requester": current_user.username})
+    try:
+        db.commit()
+    except IntegrityError:
+        # The other user sent us a request at the same moment; the pair constraint let only one in
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="A friend request already exists between you and this user.")
     db.refresh(db_friendship)
+    friend_graph.add_pending(current_user.id, addressee.id)
     return db_friendship
 
 
@@ -67,31 +76,58 @@ def respond_to_friend_request(friendship_id: int, response: schemas.FriendReques
     ).first()
     if not db_request:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pending friend request not found.")
+    # Either way the request has been dealt with
+    mark_read(db, current_user.id, entity_type="friendships", entity_id=db_request.id)
     if response.accept:
         db_request.status = models.FriendshipStatusEnum.accepted
         db.commit()
         db.refresh(db_request)
+        friend_graph.add_friendship(db_request.requester_id, db_request.addressee_id)
         return db_request
     else:
         db.delete(db_request)
         db.commit()
+        friend_graph.remove_pending(db_request.requester_id, db_request.addressee_id)
         raise HTTPException(status_code=status.HTTP_204_NO_CONTENT)
 
 @router.get("/", response_model=List[schemas.User])
 def get_friends_list(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Gets a list of all accepted friends."""
-    # ... (existing code is correct)
-    friendships = db.query(models.Friendship).filter(
-        or_(models.Friendship.requester_id == current_user.id, models.Friendship.addressee_id == current_user.id),
+    # Straight from the database rather than the friend graph, which other workers' changes reach late
+    low = select(models.Friendship.user_high_id).where(
+        models.Friendship.user_low_id == current_user.id,
         models.Friendship.status == models.FriendshipStatusEnum.accepted
-    ).all()
-    friends = []
-    for friendship in friendships:
-        if friendship.requester_id == current_user.id:
-            friends.append(friendship.addressee)
-        else:
-            friends.append(friendship.requester)
-    return friends
+    )
+    high = select(models.Friendship.user_low_id).where(
+        models.Friendship.user_high_id == current_user.id,
+        models.Friendship.status == models.FriendshipStatusEnum.accepted
+    )
+    return db.query(models.User).filter(models.User.id.in_(low.union_all(high))).all()
+
+@router.get("/suggestions", response_model=List[schemas.FriendSuggestion])
+def get_friend_suggestions(
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Suggests friends-of-friends, ranked by mutual friends and shared team membership.
+    """
+    ranked = friend_graph.suggestions(db, current_user.id, limit=limit)
+    if not ranked:
+        return []
+    users = {u.id: u for u in db.query(models.User).filter(models.User.id.in_([r[0] for r in ranked])).all()}
+    return [
+        {"user": users[uid], "mutual_friends": mutual, "shared_teams": shared, "score": score}
+        for uid, mutual, shared, score in ranked if uid in users
+    ]
+
+@router.get("/mutual/{user_id}", response_model=schemas.MutualFriends)
+def get_mutual_friends(user_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """Gets the friends the current user has in common with another user."""
+    mutual_ids = friend_graph.mutual_friends(current_user.id, user_id)
+    mutual_friends = db.query(models.User).filter(models.User.id.in_(mutual_ids)).all() if mutual_ids else []
+    return {"user_id": user_id, "mutual_count": len(mutual_ids), "mutual_friends": mutual_friends}
 
 # --- NEW: Endpoint to Remove a Friend ---
 @router.delete("/{friend_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -101,11 +137,10 @@ def remove_friend(friend_id: int, db: Session = Depends(get_db), current_user: m
     This will delete the friendship record regardless of who initiated it.
     """
     # Find the friendship record between the current user and the specified friend_id
+    user_low_id, user_high_id = models.canonical_pair(current_user.id, friend_id)
     friendship_to_delete = db.query(models.Friendship).filter(
-        or_(
-            (models.Friendship.requester_id == current_user.id) & (models.Friendship.addressee_id == friend_id),
-            (models.Friendship.requester_id == friend_id) & (models.Friendship.addressee_id == current_user.id)
-        ),
+        models.Friendship.user_low_id == user_low_id,
+        models.Friendship.user_high_id == user_high_id,
         models.Friendship.status == models.FriendshipStatusEnum.accepted
     ).first()
 
@@ -114,4 +149,5 @@ def remove_friend(friend_id: int, db: Session = Depends(get_db), current_user: m
 
     db.delete(friendship_to_delete)
     db.commit()
+    friend_graph.remove_friendship(current_user.id, friend_id)
 
@@ -0,0 +1,87 @@
+import io
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import models, schemas
+from app.db import get_db
+from app.core.security import get_current_user
+from app.utils.bulk_import import import_rows
+
+from app.api.v1.teams import get_team_and_check_permissions
+from app.api.v1.exports import ExportFormatEnum
+
+router = APIRouter()
+
+def _import(
+    kind: str,
+    project_id: int,
+    file: UploadFile,
+    format: Optional[ExportFormatEnum],
+    dry_run: bool,
+    db: Session,
+    current_user: models.User,
+) -> dict:
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="admin")
+    if project.status == models.ProjectStatusEnum.archived:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot import into an archived project.")
+
+    if format is None:
+        name = (file.filename or "").lower()
+        if name.endswith((".ndjson", ".jsonl")):
+            format = ExportFormatEnum.ndjson
+        elif name.endswith(".csv"):
+            format = ExportFormatEnum.csv
+        else:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not tell the file format; pass format=csv or format=ndjson.")
+
+    # Read the upload line by line rather than all at once
+    lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        return import_rows(db, project, kind, lines, format.value, dry_run=dry_run, actor_id=current_user.id)
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The file must be UTF-8 encoded.")
+    except SQLAlchemyError as e:
+        print(f"Error importing {kind} into project {project_id}: {e}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The import could not be loaded; no rows were saved.")
+    finally:
+        lines.detach()
+
+# --- Import Endpoints ---
+
+@router.post("/projects/{project_id}/tasks", response_model=schemas.ImportReport)
+def import_project_tasks(
+    project_id: int,
+    file: UploadFile = File(...),
+    format: Optional[ExportFormatEnum] = None,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Bulk-creates tasks from a CSV (with header) or NDJSON file. Columns: title,
+    description, status, priority, due_date, estimated_days, assignee (username
+    or email of a team member). Bad rows are skipped and listed in the report.
+    Requires the user to be an admin of the project's team.
+    """
+    return _import("tasks", project_id, file, format, dry_run, db, current_user)
+
+@router.post("/projects/{project_id}/milestones", response_model=schemas.ImportReport)
+def import_project_milestones(
+    project_id: int,
+    file: UploadFile = File(...),
+    format: Optional[ExportFormatEnum] = None,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Bulk-creates milestones from a CSV (with header) or NDJSON file. Columns:
+    name, description, due_date, status. Bad rows are skipped and listed in the report.
+    Requires the user to be an admin of the project's team.
+    """
+    return _import("milestones", project_id, file, format, dry_run, db, current_user)
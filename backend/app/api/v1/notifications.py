@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app import models, schemas
+from app.db import get_db
+from app.core.security import get_current_user
+from app.utils.notifications import mark_read, unread_count
+
+router = APIRouter()
+
+# --- Inbox ---
+
+@router.get("/", response_model=schemas.NotificationPage)
+def get_notifications(
+    before: Optional[int] = Query(None, description="Cursor from a previous page's next_cursor."),
+    limit: int = Query(30, ge=1, le=100),
+    unread_only: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Returns the current user's notifications (team invitations, friend requests,
+    task assignments, ...), newest first, with the unread count for the badge.
+    """
+    # Keyset pagination on id, served by the (user_id, id) index
+    query = db.query(models.Notification).filter(models.Notification.user_id == current_user.id)
+    if unread_only:
+        query = query.filter(models.Notification.read_at == None)
+    if before is not None:
+        query = query.filter(models.Notification.id < before)
+    rows = query.order_by(models.Notification.id.desc()).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    return {
+        "items": rows,
+        "next_cursor": rows[-1].id if has_more else None,
+        "unread_count": unread_count(db, current_user.id),
+    }
+
+@router.get("/unread-count", response_model=schemas.UnreadCount)
+def get_unread_count(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """Returns the number of unread notifications, read from a per-user counter."""
+    return {"unread_count": unread_count(db, current_user.id)}
+
+@router.post("/mark-read", response_model=schemas.NotificationMarkReadResult)
+def mark_notifications_read(
+    request: schemas.NotificationMarkRead,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Marks notifications as read: the given ids, everything up to `up_to`, or
+    (with an empty body) the whole inbox.
+    """
+    marked = mark_read(db, current_user.id, ids=request.ids, up_to=request.up_to)
+    db.commit()
+    return {"marked": marked, "unread_count": unread_count(db, current_user.id)}
@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from typing import List
+
+from app import schemas
+from app.core.config import settings
+from app.core.security import oauth2_scheme
+from app.utils.presence import heartbeat, team_members, team_presence, token_subject
+
+router = APIRouter()
+
+# Most teams one presence query may ask about
+MAX_TEAMS_PER_QUERY = 50
+
+# --- Helpers ---
+# Presence is polled constantly, so these endpoints authenticate from the
+# token alone and check membership against the cached member lists; neither
+# queries the database once the caches are warm.
+
+def _username(token: str = Depends(oauth2_scheme)) -> str:
+    username = token_subject(token)
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return username
+
+# --- Endpoints ---
+
+@router.post("/heartbeat", response_model=schemas.PresenceHeartbeat)
+def send_heartbeat(username: str = Depends(_username)):
+    """
+    Marks the current user online. Clients should send one well within
+    `online_for_seconds` (e.g. every half of it) while the app is open.
+    """
+    heartbeat(username)
+    return {"online_for_seconds": settings.PRESENCE_TTL_SECONDS}
+
+@router.get("/teams", response_model=List[schemas.TeamPresence])
+def get_team_presence(
+    team_id: List[int] = Query(..., description="Repeat for each team, e.g. ?team_id=1&team_id=2."),
+    username: str = Depends(_username)
+):
+    """
+    Returns who is online in each of the given teams, most recently seen first.
+    Asking also counts as a heartbeat. Requires the user to be a member of every team asked about.
+    """
+    team_ids = list(dict.fromkeys(team_id))
+    if len(team_ids) > MAX_TEAMS_PER_QUERY:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Ask about at most {MAX_TEAMS_PER_QUERY} teams at a time.")
+    members = team_members.members(team_ids)
+    if any(username not in team.values() for team in members.values()):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found or you are not a member.")
+    heartbeat(username)
+    presence = team_presence(team_ids)
+    return [{"team_id": tid, "online": presence[tid]} for tid in team_ids]
@@ -1,17 +1,52 @@
 # app/api/v1/routers/projects.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Query
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import date, datetime, timedelta, timezone
 
 from app import models, schemas
 from app.db import get_db
 from app.core.security import get_current_user
+from app.utils.task_graph import task_graph_cache
+from app.utils.archive import start_archive, start_restore, archive_project, restore_project, read_archived_tasks
+from app.utils.burndown import read_series, velocity_forecast
+from app.utils.guarded_update import check_version, update_returning
 
-from app.api.v1.teams import get_team_and_check_permissions
+from app.api.v1.teams import admin_team_ids, get_team_and_check_permissions
 
 router = APIRouter()
 
+# --- Helpers for moving projects in and out of cold storage ---
+def _archive(db: Session, project: models.Project, background_tasks: BackgroundTasks) -> models.ProjectArchive:
+    archive = db.get(models.ProjectArchive, project.id)
+    if archive is not None:
+        if archive.state == models.ArchiveStateEnum.restoring:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Project is still being restored.")
+        return archive
+    archive = start_archive(db, project)
+    background_tasks.add_task(archive_project, project.id)
+    return archive
+
+def _restore(db: Session, project: models.Project, background_tasks: BackgroundTasks,
+             new_status: Optional[models.ProjectStatusEnum] = None) -> models.ProjectArchive:
+    archive = db.get(models.ProjectArchive, project.id)
+    if archive is None:
+        if project.status != models.ProjectStatusEnum.archived:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Project is not archived.")
+        # Archived before cold storage existed: its tasks never left the live
+        # tables, so the restore below has no chunks to move and just clears up
+        archive = models.ProjectArchive(project_id=project.id, state=models.ArchiveStateEnum.archived)
+        db.add(archive)
+        db.flush()
+    if archive.state == models.ArchiveStateEnum.archiving:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Project is still being archived.")
+    if archive.state == models.ArchiveStateEnum.archived:
+        archive = start_restore(db, project, new_status)
+        background_tasks.add_task(restore_project, project.id)
+    return archive
+
 # --- Project Endpoints ---
 
 @router.post("/teams/{team_id}/projects", response_model=schemas.Project, status_code=status.HTTP_201_CREATED)
@@ -66,21 +101,44 @@ def get_project_details(
 def update_project(
     project_id: int,
     project_update: schemas.ProjectUpdate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Updates a project's details.
-    Requires the user to be an admin of the project's team.
+    Updates a project's details. Moving it into or out of the archived status
+    also moves its tasks into or out of cold storage.
+    Requires the user to be an admin of the project's team. With `version`, the
+    edit is refused (409) if the project has changed since that version.
     """
+    update_data = project_update.model_dump(exclude_unset=True)
+    version = update_data.pop("version", None)
+    archived = models.ProjectStatusEnum.archived
+    if update_data.get("status") != archived:
+        # Usual case: one UPDATE ... RETURNING. Archived projects need their tasks restored first.
+        criteria = [models.Project.id == project_id, models.Project.team_id.in_(admin_team_ids(current_user))]
+        if update_data.get("status") is not None:
+            criteria.append(models.Project.status != archived)
+        project = update_returning(db, models.Project, criteria, update_data, models.Project.team_id, version)
+        if project is not None:
+            db.commit()
+            return project
+
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
     if not project:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
     # MODIFIED: Changed required_role to "admin"
     get_team_and_check_permissions(project.team_id, db, current_user, required_role="admin")
-    update_data = project_update.model_dump(exclude_unset=True)
+    check_version(project, version)
+    new_status = update_data.pop("status", None)
     for key, value in update_data.items():
         setattr(project, key, value)
+    if new_status == archived and project.status != archived:
+        _archive(db, project, background_tasks)
+    elif new_status not in (None, archived) and project.status == archived:
+        _restore(db, project, background_tasks, new_status)
+    elif new_status is not None:
+        project.status = new_status
     db.commit()
     db.refresh(project)
     return project
@@ -92,7 +150,8 @@ def delete_project(
     current_user: models.User = Depends(get_current_user)
 ):
     """
-    Deletes a project.
+    Deletes a project; its tasks and milestones are removed by the database.
+    Very large projects can be deleted in the background through /deletion-jobs.
     Requires the user to be an admin of the project's team.
     """
     project = db.query(models.Project).filter(models.Project.id == project_id).first()
@@ -103,6 +162,175 @@ def delete_project(
     db.delete(project)
     db.commit()
 
+@router.post("/{project_id}/archive", response_model=schemas.ProjectArchiveStatus, status_code=status.HTTP_202_ACCEPTED)
+def archive_project_endpoint(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Archives a project: its tasks, with their comments, attachments and
+    dependencies, are moved out of the live tables into compressed cold storage
+    in the background. They stay readable through GET /projects/{id}/archive.
+    Requires the user to be an admin of the project's team.
+    """
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="admin")
+    return _archive(db, project, background_tasks)
+
+@router.post("/{project_id}/restore", response_model=schemas.ProjectArchiveStatus, status_code=status.HTTP_202_ACCEPTED)
+def restore_project_endpoint(
+    project_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Brings an archived project back: its tasks are moved back into the live
+    tables in the background and it gets its pre-archive status again.
+    Requires the user to be an admin of the project's team.
+    """
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="admin")
+    return _restore(db, project, background_tasks)
+
+@router.get("/{project_id}/archive", response_model=schemas.ArchivedTaskPage)
+def get_archived_tasks(
+    project_id: int,
+    after: Optional[int] = Query(None, description="Cursor from a previous page's next_cursor."),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Reads an archived project's tasks back from cold storage (read-only), one
+    stored chunk per page, each task with its comments, attachments and blockers.
+    Requires the user to be a member of the project's team.
+    """
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="member")
+    archive = db.get(models.ProjectArchive, project_id)
+    if archive is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project is not archived.")
+    items, next_cursor = read_archived_tasks(db, project_id, after)
+    return {"archive": archive, "items": items, "next_cursor": next_cursor}
+
+@router.get("/{project_id}/schedule", response_model=schemas.ProjectSchedule)
+def get_project_schedule(
+    project_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Returns the project's tasks in dependency order with their critical-path schedule:
+    earliest start/finish and slack in days, the critical path, and whether each task
+    is projected to finish after its due date (counting from today).
+    Requires the user to be a member of the project's team.
+    """
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="member")
+
+    graph = task_graph_cache.get(db, project_id)
+    today = datetime.now(timezone.utc)
+    with task_graph_cache.lock:
+        order = list(graph.topological_order())
+        critical_path = graph.critical_path()
+        entries = []
+        for task_id in order:
+            duration, finish = graph.duration[task_id], graph.head[task_id]
+            slack = graph.slack(task_id)
+            due_date = graph.due_date[task_id]
+            projected_finish = today + timedelta(days=finish)
+            if due_date is not None and due_date.tzinfo is None:
+                due_date = due_date.replace(tzinfo=timezone.utc)
+            entries.append({
+                "task_id": task_id,
+                "duration": duration,
+                "earliest_start": finish - duration,
+                "earliest_finish": finish,
+                "slack": slack,
+                "is_critical": slack == 0 and duration > 0,
+                "due_date": due_date,
+                "projected_finish": projected_finish,
+                "is_late": due_date is not None and due_date < projected_finish,
+            })
+        makespan = graph.makespan
+
+    return {
+        "project_id": project_id,
+        "makespan_days": makespan,
+        "order": order,
+        "critical_path": critical_path,
+        "tasks": entries,
+    }
+
+# --- Burndown Endpoints ---
+
+def _burndown_scope(project_id: int, milestone_id: int, db: Session, current_user: models.User):
+    """The project, and the milestone when one is asked for (0 is the whole project)."""
+    project = db.query(models.Project).filter(models.Project.id == project_id).first()
+    if not project:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found.")
+    get_team_and_check_permissions(project.team_id, db, current_user, required_role="member")
+    milestone = None
+    if milestone_id:
+        milestone = db.query(models.Milestone).filter(
+            models.Milestone.id == milestone_id, models.Milestone.project_id == project_id
+        ).first()
+        if not milestone:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Milestone not found in this project.")
+    return project, milestone
+
+@router.get("/{project_id}/burndown", response_model=schemas.BurndownSeries)
+def get_project_burndown(
+    project_id: int,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    milestone_id: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Daily task counts by status from the nightly snapshots, for the project or
+    one of its milestones (the tasks due by its due date). Defaults to the last 90 days.
+    Requires the user to be a member of the project's team.
+    """
+    _burndown_scope(project_id, milestone_id, db, current_user)
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=90)
+    if start > end:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start must not be after end.")
+    points = read_series(db, project_id, milestone_id, start, end)
+    return {"project_id": project_id, "milestone_id": milestone_id, "points": points}
+
+@router.get("/{project_id}/velocity", response_model=schemas.VelocityForecast)
+def get_project_velocity(
+    project_id: int,
+    window: int = Query(28, ge=2, le=365),
+    milestone_id: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Velocity over the last `window` days of snapshots and the projected
+    completion date, checked against the milestone's (or project's) due date.
+    Requires the user to be a member of the project's team.
+    """
+    project, milestone = _burndown_scope(project_id, milestone_id, db, current_user)
+    due_date = milestone.due_date if milestone else project.due_date
+    end = datetime.now(timezone.utc).date()
+    snapshots = read_series(db, project_id, milestone_id, end - timedelta(days=window - 1), end)
+    forecast = velocity_forecast(snapshots, window, target=due_date.date() if due_date else None)
+    return {"project_id": project_id, "milestone_id": milestone_id, **forecast}
+
 # --- Milestone Endpoints ---
 
 @router.post("/{project_id}/milestones", response_model=schemas.Milestone, status_code=status.HTTP_201_CREATED)
@@ -153,8 +381,22 @@ def update_milestone(
 ):
     """
     Updates a milestone's details.
-    Requires the user to be an admin of the project's team.
+    Requires the user to be an admin of the project's team. With `version`, the
+    edit is refused (409) if the milestone has changed since that version.
     """
+    update_data = milestone_update.model_dump(exclude_unset=True)
+    version = update_data.pop("version", None)
+    team_id = select(models.Project.team_id).where(models.Project.id == models.Milestone.project_id).scalar_subquery()
+    db_milestone = update_returning(db, models.Milestone, [
+        models.Milestone.id == milestone_id,
+        models.Milestone.project_id == project_id,
+        team_id.in_(admin_team_ids(current_user)),
+    ], update_data, team_id, version)
+    if db_milestone is not None:
+        db.commit()
+        return db_milestone
+
+    # Nothing matched: say why
     db_milestone = db.query(models.Milestone).filter(
         models.Milestone.id == milestone_id,
         models.Milestone.project_id == project_id
@@ -163,7 +405,7 @@ def update_milestone(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Milestone not found in this project.")
     # MODIFIED: Changed required_role to "admin"
     get_team_and_check_permissions(db_milestone.project.team_id, db, current_user, required_role="admin")
-    update_data = milestone_update.model_dump(exclude_unset=True)
+    check_version(db_milestone, version)
     for key, value in update_data.items():
         setattr(db_milestone, key, value)
     db.commit()
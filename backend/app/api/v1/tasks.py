@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import List
+
+from app import models, schemas
+from app.db import get_db
+from app.core.security import get_current_user
+from app.utils.task_graph import creates_cycle
+
+from app.api.v1.teams import get_team_and_check_permissions
+
+router = APIRouter()
+
+# --- Helper function for task lookups ---
+def get_task_and_check_permissions(task_id: int, db: Session, current_user: models.User, required_role: str = "member") -> models.Task:
+    task = db.query(models.Task).filter(models.Task.id == task_id).first()
+    if not task:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Task not found.")
+    get_team_and_check_permissions(task.project.team_id, db, current_user, required_role=required_role)
+    return task
+
+# --- Dependency Endpoints ---
+
+@router.get("/{task_id}/dependencies", response_model=List[schemas.TaskDependency])
+def get_task_dependencies(
+    task_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Lists the tasks this task is blocked by.
+    Requires the user to be a member of the project's team.
+    """
+    task = get_task_and_check_permissions(task_id, db, current_user)
+    return task.dependencies
+
+@router.post("/{task_id}/dependencies", response_model=schemas.TaskDependency, status_code=status.HTTP_201_CREATED)
+def add_task_dependency(
+    task_id: int,
+    dependency: schemas.TaskDependencyCreate,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Marks this task as blocked by another task in the same project.
+    Rejects dependencies that would create a cycle.
+    Requires the user to be an admin of the project's team.
+    """
+    task = get_task_and_check_permissions(task_id, db, current_user, required_role="admin")
+    if task.project.status == models.ProjectStatusEnum.archived:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Tasks of an archived project are read-only.")
+    blocker = db.query(models.Task).filter(models.Task.id == dependency.depends_on_id).first()
+    if not blocker or blocker.project_id != task.project_id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blocking task not found in this project.")
+
+    # Serialize dependency changes per project so two concurrent inserts can't form a cycle together
+    db.query(models.Project).filter(models.Project.id == task.project_id).with_for_update().first()
+    if creates_cycle(db, blocker.id, task.id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="This dependency would create a cycle.")
+
+    db_dependency = models.TaskDependency(task_id=task.id, depends_on_id=blocker.id)
+    db.add(db_dependency)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="This dependency already exists.")
+    db.refresh(db_dependency)
+    return db_dependency
+
+@router.delete("/{task_id}/dependencies/{depends_on_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_task_dependency(
+    task_id: int,
+    depends_on_id: int,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Removes a dependency between two tasks.
+    Requires the user to be an admin of the project's team.
+    """
+    get_task_and_check_permissions(task_id, db, current_user, required_role="admin")
+    db_dependency = db.query(models.TaskDependency).filter(
+        models.TaskDependency.task_id == task_id,
+        models.TaskDependency.depends_on_id == depends_on_id
+    ).first()
+    if not db_dependency:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dependency not found.")
+    db.delete(db_dependency)
+    db.commit()
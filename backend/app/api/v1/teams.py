@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
 from sqlalchemy.exc import IntegrityError
 from typing import List
 
@@ -7,14 +8,20 @@ from typing import List
 from psycopg2.errors import NotNullViolation
 
 from app import models, schemas
-from app.db import get_db
+from app.db import get_db, SessionLocal
 from app.core.security import get_current_user
+from app.core.shards import pin_team, scatter
 from app.utils import email
+from app.utils.guarded_update import check_version, update_returning
+from app.utils.notifications import mark_read, notify
+from app.utils.workload import workload_cache
 
 router = APIRouter()
 
 # --- Helper function for permission checks ---
 def get_team_and_check_permissions(team_id: int, db: Session, current_user: models.User, required_role: str = "member"):
+    # Everything the caller does with this team from here on runs on the team's shard
+    pin_team(db, team_id)
     team_member = db.query(models.TeamMember).filter(
         models.TeamMember.team_id == team_id,
         models.TeamMember.user_id == current_user.id
@@ -31,6 +38,41 @@ def get_team_and_check_permissions(team_id: int, db: Session, current_user: mode
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only the team owner can perform this action.")
     return team_member.team, team_member
 
+def admin_team_ids(current_user: models.User):
+    """Teams the user is an admin of, as a subquery for folding the admin check into a WHERE clause."""
+    return select(models.TeamMember.team_id).where(
+        models.TeamMember.user_id == current_user.id,
+        models.TeamMember.status == models.InvitationStatusEnum.accepted,
+        models.TeamMember.role == models.TeamRoleEnum.admin,
+    )
+
+def _compile_permission_matrix() -> dict:
+    """The role and permission flags for every (role, is owner) pair, built once at import."""
+    matrix = {}
+    for role in models.TeamRoleEnum:
+        for is_owner in (False, True):
+            is_admin = role == models.TeamRoleEnum.admin
+            matrix[(role, is_owner)] = {
+                "role": role.value,
+                "is_owner": is_owner,
+                "is_admin": is_admin,
+                "permissions": {
+                    "can_invite_members": is_admin,
+                    "can_remove_members": is_admin,
+                    "can_change_roles": is_admin,
+                    "can_delete_team": is_owner,
+                    "can_manage_settings": is_admin
+                }
+            }
+    return matrix
+
+# Shared between responses; callers copy rather than modify the entries
+PERMISSION_MATRIX = _compile_permission_matrix()
+
+def get_member_permissions(team: models.Team, team_member: models.TeamMember, user_id: int) -> dict:
+    """The role and permission flags a member has in a team."""
+    return PERMISSION_MATRIX[(team_member.role, team.owner_id == user_id)]
+
 # --- Core Team Endpoints ---
 
 @router.post("/", response_model=schemas.Team, status_code=status.HTTP_201_CREATED)
@@ -60,11 +102,35 @@ def create_team(team: schemas.TeamCreate, db: Session = Depends(get_db), current
 
 @router.get("/", response_model=List[schemas.Team])
 def get_user_teams(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    memberships = db.query(models.TeamMember).filter(
-        models.TeamMember.user_id == current_user.id,
-        models.TeamMember.status == models.InvitationStatusEnum.accepted
-    ).all()
-    return [membership.team for membership in memberships]
+    # The user's teams can be on any shard: ask each of them and merge the answers
+    def teams_on_shard(shard_db: Session) -> list[schemas.Team]:
+        memberships = shard_db.query(models.TeamMember).options(
+            joinedload(models.TeamMember.team).selectinload(models.Team.members).joinedload(models.TeamMember.user)
+        ).filter(
+            models.TeamMember.user_id == current_user.id,
+            models.TeamMember.status == models.InvitationStatusEnum.accepted
+        ).all()
+        return [schemas.Team.model_validate(membership.team) for membership in memberships]
+    return sorted(scatter(SessionLocal, db, teams_on_shard), key=lambda team: team.id)
+
+@router.get("/my-roles", response_model=List[schemas.MyTeamRole])
+def get_my_roles(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """
+    The current user's role and permissions in every team they belong to,
+    from one query per shard, instead of a /{team_id}/my-role call per team.
+    """
+    def roles_on_shard(shard_db: Session) -> list[dict]:
+        rows = shard_db.query(models.TeamMember.team_id, models.TeamMember.role, models.Team.owner_id).join(
+            models.Team, models.Team.id == models.TeamMember.team_id
+        ).filter(
+            models.TeamMember.user_id == current_user.id,
+            models.TeamMember.status == models.InvitationStatusEnum.accepted
+        ).all()
+        return [
+            {"team_id": team_id, **PERMISSION_MATRIX[(role, owner_id == current_user.id)]}
+            for team_id, role, owner_id in rows
+        ]
+    return sorted(scatter(SessionLocal, db, roles_on_shard), key=lambda entry: entry["team_id"])
 
 @router.get("/{team_id}", response_model=schemas.Team)
 def get_team_details(team_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
@@ -76,11 +142,15 @@ def get_team_details(team_id: int, db: Session = Depends(get_db), current_user:
 
 @router.get("/invitations/pending", response_model=List[schemas.TeamInvitation])
 def get_pending_invitations(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    pending_invites = db.query(models.TeamMember).filter(
-        models.TeamMember.user_id == current_user.id,
-        models.TeamMember.status == models.InvitationStatusEnum.pending
-    ).all()
-    return pending_invites
+    def invitations_on_shard(shard_db: Session) -> list[schemas.TeamInvitation]:
+        pending_invites = shard_db.query(models.TeamMember).options(
+            joinedload(models.TeamMember.team).selectinload(models.Team.members).joinedload(models.TeamMember.user)
+        ).filter(
+            models.TeamMember.user_id == current_user.id,
+            models.TeamMember.status == models.InvitationStatusEnum.pending
+        ).all()
+        return [schemas.TeamInvitation.model_validate(invite) for invite in pending_invites]
+    return scatter(SessionLocal, db, invitations_on_shard)
 
 @router.post("/invitations/{team_id}/respond", response_model=schemas.TeamMember)
 def respond_to_invitation(team_id: int, response: schemas.InvitationResponse, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
@@ -91,6 +161,8 @@ def respond_to_invitation(team_id: int, response: schemas.InvitationResponse, db
     ).first()
     if not invitation:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Invitation not found.")
+    # Either way the invitation has been dealt with
+    mark_read(db, current_user.id, entity_type="team_members", entity_id=invitation.id)
     if response.accept:
         invitation.status = models.InvitationStatusEnum.accepted
         db.commit()
@@ -124,6 +196,11 @@ def invite_team_member(team_id: int, invite: schemas.TeamInvite, background_task
             status=models.InvitationStatusEnum.pending
         )
         db.add(new_invitation)
+        notify(
+            db, [invited_user.id], "team_invitation",
+            actor_id=current_user.id, team_id=team_id, entity=new_invitation,
+            payload={"team_name": team.name, "role": invite.role.value, "inviter": current_user.username},
+        )
         db.commit()
         background_tasks.add_task(
             email.send_invitation_to_existing_user, 
@@ -169,7 +246,26 @@ def remove_team_member(team_id: int, member_id: int, db: Session = Depends(get_d
 # --- Update Member Role ---
 @router.put("/{team_id}/members/{member_id}/role", response_model=schemas.TeamMember)
 def update_member_role(team_id: int, member_id: int, role_update: schemas.TeamMemberUpdate, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
-    # Only admins can change roles
+    # One UPDATE ... RETURNING when the caller is an admin and the member is neither them nor the owner
+    pin_team(db, team_id)
+    admin = aliased(models.TeamMember)
+    member_to_update = update_returning(db, models.TeamMember, [
+        models.TeamMember.team_id == team_id,
+        models.TeamMember.user_id == member_id,
+        models.TeamMember.user_id != current_user.id,
+        ~exists().where(models.Team.id == team_id, models.Team.owner_id == models.TeamMember.user_id),
+        exists().where(
+            admin.team_id == team_id,
+            admin.user_id == current_user.id,
+            admin.status == models.InvitationStatusEnum.accepted,
+            admin.role == models.TeamRoleEnum.admin,
+        ),
+    ], {"role": role_update.role}, models.TeamMember.team_id, role_update.version)
+    if member_to_update is not None:
+        db.commit()
+        return member_to_update
+
+    # Nothing matched: work out why with the individual checks (only admins can change roles)
     team, self_membership = get_team_and_check_permissions(team_id, db, current_user, required_role="admin")
     
     if member_id == team.owner_id:
@@ -185,7 +281,7 @@ def update_member_role(team_id: int, member_id: int, role_update: schemas.TeamMe
 
     if not member_to_update:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found in this team.")
-    
+    check_version(member_to_update, role_update.version)
     member_to_update.role = role_update.role
     db.commit()
     db.refresh(member_to_update)
@@ -201,7 +297,9 @@ def delete_team(team_id: int, db: Session = Depends(get_db), current_user: model
     
     if not team_to_delete:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found.")
-        
+
+    # One DELETE; members, projects and everything under them go via ON DELETE CASCADE.
+    # Very large teams can be removed in the background through /deletion-jobs instead.
     db.delete(team_to_delete)
     db.commit()
 
@@ -210,19 +308,15 @@ def delete_team(team_id: int, db: Session = Depends(get_db), current_user: model
 def get_my_role_in_team(team_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
     """Get the current user's role and permissions in a team"""
     team, team_member = get_team_and_check_permissions(team_id, db, current_user)
-    
-    is_owner = team.owner_id == current_user.id
-    is_admin = team_member.role == models.TeamRoleEnum.admin
-    
-    return {
-        "role": team_member.role.value,
-        "is_owner": is_owner,
-        "is_admin": is_admin,
-        "permissions": {
-            "can_invite_members": is_admin,
-            "can_remove_members": is_admin,
-            "can_change_roles": is_admin,
-            "can_delete_team": is_owner,
-            "can_manage_settings": is_admin
-        }
-    }
\ No newline at end of file
+    return get_member_permissions(team, team_member, current_user.id)
+
+# --- Team Workload (Managers) ---
+@router.get("/{team_id}/workload", response_model=schemas.TeamWorkload)
+def get_team_workload(team_id: int, db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+    """
+    Open tasks per member (by priority, overdue, due within a week, next due
+    date), most loaded first, with each member's totals across all their teams.
+    Cached briefly and refreshed as soon as a task assigned to a member changes.
+    """
+    get_team_and_check_permissions(team_id, db, current_user, required_role="manager")
+    return workload_cache.get(db, team_id)
@@ -0,0 +1,153 @@
+import base64
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import select, union_all, literal, cast, String, tuple_
+
+from app import models, schemas
+from app.db import get_db, SessionLocal
+from app.core.security import get_current_user
+from app.core.shards import scatter
+
+router = APIRouter()
+
+# Enum classes used to turn the stored status names back into display values
+_STATUS_ENUMS = {
+    "milestone": models.MilestoneStatusEnum,
+    "project": models.ProjectStatusEnum,
+    "task": models.TaskStatusEnum,
+}
+
+# --- Cursor Helpers ---
+
+def _as_utc(value: datetime) -> datetime:
+    # Naive datetimes (from query strings or SQLite) are taken to be UTC
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def _encode_cursor(due_date: datetime, kind: str, item_id: int) -> str:
+    raw = f"{due_date.isoformat()}|{kind}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str) -> tuple[datetime, str, int]:
+    try:
+        due_date, kind, item_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return _as_utc(datetime.fromisoformat(due_date)), kind, int(item_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid timeline cursor.")
+
+# --- Query Builder ---
+
+def _timeline_query(user_id: int, start: datetime, end: datetime, include_completed: bool):
+    """
+    UNION ALL of milestones, projects and tasks due in [start, end) across every team
+    the user has accepted membership in. Each branch is a range scan on its
+    (parent id, due_date) index.
+    """
+    member_team_ids = select(models.TeamMember.team_id).where(
+        models.TeamMember.user_id == user_id,
+        models.TeamMember.status == models.InvitationStatusEnum.accepted
+    )
+
+    milestones = select(
+        literal("milestone").label("kind"),
+        models.Milestone.id.label("id"),
+        models.Milestone.name.label("title"),
+        models.Milestone.due_date.label("due_date"),
+        cast(models.Milestone.status, String).label("status"),
+        models.Milestone.project_id.label("project_id"),
+        models.Project.team_id.label("team_id"),
+    ).join(models.Project, models.Project.id == models.Milestone.project_id).where(
+        models.Project.team_id.in_(member_team_ids),
+        models.Milestone.due_date >= start,
+        models.Milestone.due_date < end,
+    )
+
+    projects = select(
+        literal("project").label("kind"),
+        models.Project.id.label("id"),
+        models.Project.name.label("title"),
+        models.Project.due_date.label("due_date"),
+        cast(models.Project.status, String).label("status"),
+        models.Project.id.label("project_id"),
+        models.Project.team_id.label("team_id"),
+    ).where(
+        models.Project.team_id.in_(member_team_ids),
+        models.Project.due_date >= start,
+        models.Project.due_date < end,
+    )
+
+    tasks = select(
+        literal("task").label("kind"),
+        models.Task.id.label("id"),
+        models.Task.title.label("title"),
+        models.Task.due_date.label("due_date"),
+        cast(models.Task.status, String).label("status"),
+        models.Task.project_id.label("project_id"),
+        models.Project.team_id.label("team_id"),
+    ).join(models.Project, models.Project.id == models.Task.project_id).where(
+        models.Project.team_id.in_(member_team_ids),
+        models.Task.due_date >= start,
+        models.Task.due_date < end,
+    )
+
+    if not include_completed:
+        milestones = milestones.where(models.Milestone.status != models.MilestoneStatusEnum.completed)
+        projects = projects.where(models.Project.status.notin_(
+            [models.ProjectStatusEnum.completed, models.ProjectStatusEnum.archived]
+        ))
+        tasks = tasks.where(models.Task.status != models.TaskStatusEnum.done)
+
+    return union_all(milestones, projects, tasks).subquery("timeline")
+
+# --- Timeline Endpoint ---
+
+@router.get("/", response_model=schemas.TimelinePage)
+def get_timeline(
+    start: Optional[datetime] = Query(None, description="Start of the range (inclusive). Defaults to now."),
+    end: Optional[datetime] = Query(None, description="End of the range (exclusive). Defaults to two weeks after start."),
+    after: Optional[str] = Query(None, description="Cursor from a previous page's next_cursor."),
+    limit: int = Query(50, ge=1, le=500),
+    include_completed: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Lists every milestone, project and task due within a date range, across all
+    teams the user belongs to, ordered by due date.
+    Pages through time with a keyset cursor, so each page is one indexed query.
+    """
+    start = _as_utc(start) if start else datetime.now(timezone.utc)
+    end = _as_utc(end) if end else start + timedelta(days=14)
+    if end <= start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The end of the range must be after its start.")
+
+    cursor = _decode_cursor(after) if after else None
+    # Narrow every branch's range scan to start at the cursor; ties are settled below
+    range_start = max(start, cursor[0]) if cursor else start
+
+    timeline = _timeline_query(current_user.id, range_start, end, include_completed)
+    query = select(timeline).order_by(timeline.c.due_date, timeline.c.kind, timeline.c.id).limit(limit + 1)
+    if cursor:
+        query = query.where(tuple_(timeline.c.due_date, timeline.c.kind, timeline.c.id) > tuple_(*cursor))
+
+    # Each shard returns its own first page; the merged page is the first `limit` of those
+    rows = scatter(SessionLocal, db, lambda shard_db: shard_db.execute(query).all())
+    rows.sort(key=lambda row: (_as_utc(row.due_date), row.kind, row.id))
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    items = [
+        {
+            "kind": row.kind,
+            "id": row.id,
+            "title": row.title,
+            "due_date": row.due_date,
+            "status": _STATUS_ENUMS[row.kind][row.status].value,
+            "project_id": row.project_id,
+            "team_id": row.team_id,
+        }
+        for row in rows
+    ]
+    next_cursor = _encode_cursor(rows[-1].due_date, rows[-1].kind, rows[-1].id) if has_more else None
+    return {"items": items, "next_cursor": next_cursor}
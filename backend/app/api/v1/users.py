@@ -1,19 +1,43 @@
 from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import func
 from sqlalchemy.orm import Session
-from datetime import datetime, timedelta, timezone
 import random
 
 from app import models, schemas
 from app.core import security
+from app.core.replicas import set_session_user
+from app.core.rate_limit import RateLimit, rate_limit
 # Corrected import: Use the centralized db session
 from app.db import get_db
 from app.utils import email
+from app.utils.friend_graph import friend_graph
+from app.utils.otp import otp_store
 
 router = APIRouter()
 
+# --- Throttles for the unauthenticated endpoints ---
+# Each rejected request costs a dict lookup instead of a bcrypt hash, a DB write or an email
+check_username_limit = rate_limit("check-username", per_ip=RateLimit.per_minute(60, burst=20))
+signup_limit = rate_limit(
+    "signup", per_ip=RateLimit.per_hour(20, burst=5),
+    per_account=RateLimit.per_hour(5, burst=3), account_field="email"
+)
+login_limit = rate_limit(
+    "login", per_ip=RateLimit.per_minute(30, burst=10),
+    per_account=RateLimit.per_minute(5, burst=5), account_field="username"
+)
+forgot_password_limit = rate_limit(
+    "forgot-password", per_ip=RateLimit.per_hour(20, burst=5),
+    per_account=RateLimit.per_hour(3, burst=3), account_field="email"
+)
+verify_otp_limit = rate_limit(
+    "verify-otp", per_ip=RateLimit.per_minute(20, burst=10),
+    per_account=RateLimit.per_minute(5, burst=5), account_field="email"
+)
+
 # --- Check Username Availability and Get Suggestions ---
-@router.post("/check-username", response_model=schemas.UsernameCheckResponse)
+@router.post("/check-username", response_model=schemas.UsernameCheckResponse, dependencies=[Depends(check_username_limit)])
 def check_username(request: schemas.UsernameCheckRequest, db: Session = Depends(get_db)):
     """
     Checks if a username is available. If not, provides suggestions.
@@ -42,48 +66,49 @@ def check_username(request: schemas.UsernameCheckRequest, db: Session = Depends(
 
 
 # --- User Signup Endpoint (Now a two-step process) ---
-@router.post("/signup", response_model=schemas.User, status_code=status.HTTP_201_CREATED)
+@router.post("/signup", response_model=schemas.User, status_code=status.HTTP_201_CREATED, dependencies=[Depends(signup_limit)])
 def create_user_signup(user_data: schemas.UserCreate, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Step 1 of Signup: Create an inactive user and send an OTP.
     The user account will not be usable until the OTP is verified.
     """
-    # Delete inactive users with same email before inserting new one
-    db.query(models.User).filter(
-        models.User.email == user_data.email,
-        models.User.is_active == False
-    ).delete()
-    db.commit()
-
-    if db.query(models.User).filter(models.User.email == user_data.email, models.User.is_active == True).first():
+    existing_user = db.query(models.User).filter(models.User.email == user_data.email).first()
+    if existing_user and existing_user.is_active:
         raise HTTPException(status_code=400, detail="An active account with this email already exists.")
-    if db.query(models.User).filter(models.User.username == user_data.username).first():
+    username_owner = db.query(models.User).filter(models.User.username == user_data.username).first()
+    if username_owner and username_owner is not existing_user:
         raise HTTPException(status_code=400, detail="Username is already taken.")
 
     hashed_password = security.get_password_hash(user_data.password)
-    otp = email.generate_otp()
-    otp_expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
-
-    db_user = models.User(
-        username=user_data.username,
-        email=user_data.email,
-        full_name=user_data.full_name,
-        password=hashed_password,
-        is_active=False,
-        otp=otp,
-        otp_expires_at=otp_expires_at
-    )
-    
-    db.add(db_user)
+
+    if existing_user:
+        # Signing up again with an unverified email takes over that pending account
+        db_user = existing_user
+        db_user.username = user_data.username
+        db_user.full_name = user_data.full_name
+        db_user.password = hashed_password
+        # Restarts the clock cleanup_inactive_users.py deletes unverified accounts by
+        db_user.created_at = func.now()
+    else:
+        db_user = models.User(
+            username=user_data.username,
+            email=user_data.email,
+            full_name=user_data.full_name,
+            password=hashed_password,
+            is_active=False
+        )
+        db.add(db_user)
+
+    # Issuing the code commits the account changes along with it
+    otp = otp_store.issue(db, user_data.email, models.OTPPurposeEnum.signup)
     db.commit()
     db.refresh(db_user)
-    
     background_tasks.add_task(email.send_otp_email, email=user_data.email, otp=otp)
     
     return db_user
 
 # --- Verify OTP Endpoint ---
-@router.post("/verify-otp", response_model=schemas.User)
+@router.post("/verify-otp", response_model=schemas.User, dependencies=[Depends(verify_otp_limit)])
 def verify_otp(otp_data: schemas.OTPVerify, db: Session = Depends(get_db)):
     """
     Step 2 of Signup: Verifies the OTP to activate a user account.
@@ -94,12 +119,12 @@ def verify_otp(otp_data: schemas.OTPVerify, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="User not found.")
     if user.is_active:
         raise HTTPException(status_code=400, detail="Account is already active.")
-    if user.otp != otp_data.otp or user.otp_expires_at < datetime.now(timezone.utc):
+    if not otp_store.verify(db, otp_data.email, models.OTPPurposeEnum.signup, otp_data.otp):
         raise HTTPException(status_code=400, detail="Invalid or expired OTP.")
         
     user.is_active = True
-    user.otp = None
-    user.otp_expires_at = None
+    # Keep the new account's first reads (right after login) on the primary
+    set_session_user(db, user.username)
     db.commit()
     db.refresh(user)
     
@@ -108,7 +133,7 @@ def verify_otp(otp_data: schemas.OTPVerify, db: Session = Depends(get_db)):
 
 # --- User Login Endpoint (Now checks if user is active) ---
 # --- User Login Endpoint (Now checks if user is active) ---
-@router.post("/login", response_model=schemas.Token)
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(login_limit)])
 def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
     db: Session = Depends(get_db)
@@ -148,14 +173,21 @@ def login_for_access_token(
             detail="Account is not active. Please verify your email with the OTP."
         )
 
-    access_token = security.create_access_token(data={"sub": user.username})
+    refresh_token, family_id = security.create_refresh_token(db, user.id)
+    access_token = security.create_access_token(data={"sub": user.username, "fam": family_id})
+    db.commit()
     print(f"✅ Login successful. Access token created for {user.username}")
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+        "expires_in": security.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
 
 
 # --- Forgot Password Endpoint ---
-@router.post("/forgot-password")
+@router.post("/forgot-password", dependencies=[Depends(forgot_password_limit)])
 def forgot_password(request: schemas.PasswordResetRequest, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Sends an OTP to the user's email for password reset.
@@ -164,17 +196,13 @@ def forgot_password(request: schemas.PasswordResetRequest, background_tasks: Bac
     if not user:
         return {"message": "If an account with this email exists, a password reset OTP has been sent."}
     
-    otp = email.generate_otp()
-    user.otp = otp
-    user.otp_expires_at = datetime.now(timezone.utc) + timedelta(minutes=10)
-    db.commit()
-    
+    otp = otp_store.issue(db, user.email, models.OTPPurposeEnum.password_reset)
     background_tasks.add_task(email.send_otp_email, email=user.email, otp=otp)
     
     return {"message": "If an account with this email exists, a password reset OTP has been sent."}
 
 # --- Reset Password Endpoint ---
-@router.post("/reset-password")
+@router.post("/reset-password", dependencies=[Depends(verify_otp_limit)])
 def reset_password(request: schemas.PasswordResetConfirm, db: Session = Depends(get_db)):
     """
     Resets the user's password using the OTP.
@@ -183,12 +211,10 @@ def reset_password(request: schemas.PasswordResetConfirm, db: Session = Depends(
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found.")
-    if user.otp != request.otp or user.otp_expires_at < datetime.now(timezone.utc):
+    if not otp_store.verify(db, request.email, models.OTPPurposeEnum.password_reset, request.otp):
         raise HTTPException(status_code=400, detail="Invalid or expired OTP.")
 
     user.password = security.get_password_hash(request.new_password)
-    user.otp = None
-    user.otp_expires_at = None
     db.commit()
     
     return {"message": "Password has been reset successfully."}
@@ -207,8 +233,12 @@ def read_users_me(current_user: models.User = Depends(security.get_current_user)
 @router.delete("/me", status_code=status.HTTP_204_NO_CONTENT)
 def delete_current_user(current_user: models.User = Depends(security.get_current_user), db: Session = Depends(get_db)):
     """
-    Deletes the currently authenticated user's account.
+    Deletes the currently authenticated user's account. Memberships, comments,
+    uploads and friendships go with it via ON DELETE CASCADE; assigned tasks and
+    owned teams are kept and just lose the reference.
     """
+    user_id = current_user.id
     db.delete(current_user)
     db.commit()
+    friend_graph.forget_user(user_id)
     return None
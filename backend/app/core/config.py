@@ -1,10 +1,63 @@
 import os
 from dotenv import load_dotenv
 
-load_dotenv()  # loads from .env file
+# The only place the .env file is read; everything else takes its configuration from `settings`
+load_dotenv()
+
+def _list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+def _named(value: str) -> dict[str, str]:
+    # "name=url,name=url"
+    return dict(item.split("=", 1) for item in _list(value))
 
 class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
-    SECRET_KEY: str = os.getenv("SECRET_KEY")
+    SECRET_KEY: str = os.getenv("SECRET_KEY", "a_very_secret_key_for_dev_that_should_be_changed")
+    OTP_BACKEND: str = os.getenv("OTP_BACKEND", "database")  # "database" or "memory"
+    RATE_LIMIT_ENABLED: bool = os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false"
+    # Proxies (IPs or CIDR ranges, e.g. the nginx in front of the app) whose X-Forwarded-For is believed
+    TRUSTED_PROXIES: list[str] = _list(os.getenv("TRUSTED_PROXIES", ""))
+
+    # Access tokens are short-lived; clients renew them with the refresh token from login
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    # How often each worker picks up access tokens revoked by the others
+    REVOCATION_SYNC_SECONDS: float = float(os.getenv("REVOCATION_SYNC_SECONDS", "10"))
+
+    # Email (SendGrid); without these emails are printed to the console instead
+    SENDGRID_API_KEY: str = os.getenv("SENDGRID_API_KEY")
+    SENDER_EMAIL: str = os.getenv("SENDER_EMAIL")
+    FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:5173")
+
+    # Read replicas (comma-separated URLs) for GET requests; none means everything uses DATABASE_URL
+    REPLICA_DATABASE_URLS: list[str] = _list(os.getenv("REPLICA_DATABASE_URLS", ""))
+    # How long a user's reads stay on the primary after they change something
+    READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+    # Replicas further behind than this are skipped; lag is re-measured at most every REPLICA_LAG_CHECK_SECONDS
+    REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+    REPLICA_LAG_CHECK_SECONDS: float = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "2"))
+
+    # Team shards as "name=url,name=url"; the primary is always the "default" shard
+    SHARD_DATABASE_URLS: dict[str, str] = _named(os.getenv("SHARD_DATABASE_URLS", ""))
+    # How long a process trusts its cached copy of a team's shard directory entry
+    SHARD_DIRECTORY_TTL_SECONDS: float = float(os.getenv("SHARD_DIRECTORY_TTL_SECONDS", "5"))
+
+    # How long responses to POSTs with an Idempotency-Key are kept for replay, and how many keys per process
+    IDEMPOTENCY_TTL_SECONDS: float = float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+    IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "100000"))
+
+    # Users count as online for this long after their last heartbeat
+    PRESENCE_TTL_SECONDS: float = float(os.getenv("PRESENCE_TTL_SECONDS", "60"))
+    # Redis URL for presence shared by every worker; unset keeps it per process
+    PRESENCE_REDIS_URL: str = os.getenv("PRESENCE_REDIS_URL")
+
+    # Dashboard loads that fan their queries out in parallel at once; any beyond that run them one by one
+    DASHBOARD_PARALLEL_REQUESTS: int = int(os.getenv("DASHBOARD_PARALLEL_REQUESTS", "8"))
+
+    # Comma-separated router names to mount (e.g. "users,teams"); empty mounts all of them
+    ENABLED_ROUTERS: list[str] = _list(os.getenv("ENABLED_ROUTERS", ""))
+    # Pooled database connections opened at startup, before /ready reports ready
+    WARMUP_CONNECTIONS: int = int(os.getenv("WARMUP_CONNECTIONS", "2"))
 
 settings = Settings()
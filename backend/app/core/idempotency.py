@@ -0,0 +1,216 @@
+import asyncio
+import hashlib
+import json
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Optional
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.datastructures import Headers
+
+from app.core.security import username_from_token
+
+HEADER = "idempotency-key"
+# Request bodies buffered to fingerprint them; uploads above this pass through untouched
+MAX_BODY_BYTES = 1024 * 1024
+
+
+@dataclass
+class _Entry:
+    """One key's request fingerprint and, once the first request has answered, its response."""
+    fingerprint: bytes
+    expires_at: float
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    status: int = 0
+    headers: list = field(default_factory=list)
+    body: bytes = b""  # zlib-compressed
+    completed: bool = False
+
+
+class IdempotencyStore:
+    """
+    Per-process record of recent Idempotency-Keys, kept for `ttl` seconds and
+    capped at `max_keys` (oldest dropped first). Entries hold 16-byte digests
+    and the compressed response, so a few hundred bytes each for typical JSON.
+    Retries that land on another worker are not deduplicated.
+    """
+
+    def __init__(self, ttl: float = 86400, max_keys: int = 100_000, sweep_interval: float = 60):
+        self._entries: dict[bytes, _Entry] = {}
+        self._ttl = ttl
+        self._max_keys = max_keys
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def get(self, key: bytes) -> Optional[_Entry]:
+        now = time.monotonic()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry.completed and entry.expires_at <= now:
+            del self._entries[key]
+            return None
+        return entry
+
+    def start(self, key: bytes, fingerprint: bytes) -> _Entry:
+        while len(self._entries) >= self._max_keys:
+            self._entries.pop(next(iter(self._entries)))
+        entry = self._entries[key] = _Entry(fingerprint, time.monotonic() + self._ttl)
+        return entry
+
+    def complete(self, key: bytes, entry: _Entry, status: int, headers: list, body: bytes) -> None:
+        entry.status, entry.headers, entry.body = status, headers, zlib.compress(body)
+        entry.completed = True
+        entry.expires_at = time.monotonic() + self._ttl
+        entry.done.set()
+
+    def release(self, key: bytes, entry: _Entry) -> None:
+        """Forgets a key whose request failed, so the next retry runs it again."""
+        if self._entries.get(key) is entry:
+            del self._entries[key]
+        entry.done.set()
+
+    def _sweep(self, now: float) -> None:
+        self._next_sweep = now + self._sweep_interval
+        for key in [k for k, entry in self._entries.items() if entry.completed and entry.expires_at <= now]:
+            del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _replayable(status_code: int) -> bool:
+    # 429s and server errors are transient; the retry should run again
+    return 200 <= status_code < 500 and status_code != 429
+
+def _digest(*parts: bytes) -> bytes:
+    h = hashlib.blake2b(digest_size=16)
+    for part in parts:
+        h.update(len(part).to_bytes(8, "big"))
+        h.update(part)
+    return h.digest()
+
+
+class IdempotencyMiddleware:
+    """
+    Makes authenticated POSTs that carry an `Idempotency-Key` header safe to
+    retry. The first request runs normally and its response is kept; a retry
+    with the same key (from the same user) gets that response back,
+    marked `Idempotent-Replayed: true`, without the endpoint running again.
+    A duplicate that arrives while the first is still running waits for it
+    (up to `wait_seconds`) instead of running alongside it.
+
+    Reusing a key for a different request (method, path, query or body) is a
+    422. Requests without the header, or without a valid bearer token, are
+    untouched, as are bodies over MAX_BODY_BYTES.
+    """
+
+    def __init__(self, app, ttl: float = 86400, max_keys: int = 100_000, wait_seconds: float = 30):
+        self.app = app
+        self.store = IdempotencyStore(ttl=ttl, max_keys=max_keys)
+        self.wait_seconds = wait_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            return await self.app(scope, receive, send)
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(HEADER)
+        if idempotency_key is None:
+            return await self.app(scope, receive, send)
+        # Keyed on who the token is for, so a refreshed token still finds its earlier requests
+        scheme, token = get_authorization_scheme_param(headers.get("authorization"))
+        username = username_from_token(token) if scheme.lower() == "bearer" and token else None
+        if username is None:
+            return await self.app(scope, receive, send)
+        if not 0 < len(idempotency_key) <= 255:
+            return await _error(send, 400, "Idempotency-Key must be 1 to 255 characters long.")
+        try:
+            content_length = int(headers.get("content-length") or 0)
+        except ValueError:
+            return await _error(send, 400, "Content-Length must be a number.")
+        if content_length > MAX_BODY_BYTES:
+            return await self.app(scope, receive, send)
+
+        body, receive = await _buffer_body(receive, MAX_BODY_BYTES)
+        if body is None:
+            # A chunked upload that turned out too large
+            return await self.app(scope, receive, send)
+        key = _digest(username.encode(), idempotency_key.encode())
+        fingerprint = _digest(scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body)
+
+        while True:
+            entry = self.store.get(key)
+            if entry is None:
+                break
+            if entry.fingerprint != fingerprint:
+                return await _error(send, 422, "This Idempotency-Key was already used for a different request.")
+            if entry.completed:
+                return await _replay(send, entry)
+            try:
+                await asyncio.wait_for(entry.done.wait(), self.wait_seconds)
+            except asyncio.TimeoutError:
+                return await _error(send, 409, "A request with this Idempotency-Key is still in progress.", retry_after=1)
+            # Completed (replay it) or released after a failure (run it ourselves)
+
+        entry = self.store.start(key, fingerprint)
+        response = {"status": 0, "headers": [], "body": bytearray()}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"], response["headers"] = message["status"], list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response["body"] += message.get("body", b"")
+                if not message.get("more_body", False) and not entry.done.is_set():
+                    # Recorded as soon as the response is sent, before any background tasks run
+                    if _replayable(response["status"]):
+                        self.store.complete(key, entry, response["status"], response["headers"], bytes(response["body"]))
+                    else:
+                        self.store.release(key, entry)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            if not entry.done.is_set():
+                self.store.release(key, entry)
+
+
+async def _buffer_body(receive, limit: int):
+    """
+    Reads the whole request body, and returns it with a `receive` that hands it
+    to the app again. Stops once more than `limit` bytes have arrived and
+    returns None for the body; the `receive` then hands over what was read so
+    far followed by the rest of the stream.
+    """
+    chunks, size, more_body = [], 0, True
+    while more_body and size <= limit:
+        message = await receive()
+        if message["type"] != "http.request":
+            more_body = False
+            break
+        chunks.append(message.get("body", b""))
+        size += len(chunks[-1])
+        more_body = message.get("more_body", False)
+    body = b"".join(chunks)
+    sent = False
+
+    async def replay_receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": more_body}
+        return await receive()
+
+    return (None if more_body else body), replay_receive
+
+async def _replay(send, entry: _Entry) -> None:
+    await send({"type": "http.response.start", "status": entry.status, "headers": entry.headers + [(b"idempotent-replayed", b"true")]})
+    await send({"type": "http.response.body", "body": zlib.decompress(entry.body)})
+
+async def _error(send, status_code: int, detail: str, retry_after: Optional[int] = None) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    if retry_after is not None:
+        headers.append((b"retry-after", str(retry_after).encode()))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
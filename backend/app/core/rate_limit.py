@@ -0,0 +1,180 @@
+import ipaddress
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """A token bucket: up to `capacity` requests in a burst, refilled at `per_second`."""
+    capacity: int
+    per_second: float
+
+    @classmethod
+    def per_minute(cls, count: int, burst: Optional[int] = None) -> "RateLimit":
+        return cls(capacity=burst or count, per_second=count / 60)
+
+    @classmethod
+    def per_hour(cls, count: int, burst: Optional[int] = None) -> "RateLimit":
+        return cls(capacity=burst or count, per_second=count / 3600)
+
+
+# --- Stores ---
+
+class RateLimitStore(ABC):
+    """
+    Where bucket state lives. The in-memory store below is per-process; a shared
+    backend (e.g. Redis running the same refill arithmetic in a Lua script) can be
+    plugged in with `configure_store()` for multi-worker deployments.
+    """
+
+    @abstractmethod
+    def consume(self, key: str, limit: RateLimit, now: float) -> float:
+        """Takes one token from `key`'s bucket. Returns 0 if allowed, otherwise seconds until a token frees up."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forgets every bucket."""
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    Per-process token buckets keyed by string.
+
+    Buckets are spread over striped locks so concurrent requests for different keys
+    rarely contend, and idle buckets (which would have refilled anyway) are swept
+    out every `sweep_interval` seconds so memory tracks active clients only.
+    """
+
+    def __init__(self, stripes: int = 64, idle_ttl: float = 3600, sweep_interval: float = 60):
+        self._buckets: dict[str, list[float]] = {}
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._sweep_lock = threading.Lock()
+        self._idle_ttl = idle_ttl
+        self._sweep_interval = sweep_interval
+        self._next_sweep = time.monotonic() + sweep_interval
+
+    def consume(self, key: str, limit: RateLimit, now: float) -> float:
+        if now >= self._next_sweep:
+            self._sweep(now)
+
+        with self._locks[hash(key) % len(self._locks)]:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                self._buckets[key] = [limit.capacity - 1, now]
+                return 0.0
+            tokens = min(limit.capacity, bucket[0] + (now - bucket[1]) * limit.per_second)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / limit.per_second
+
+    def _sweep(self, now: float) -> None:
+        # Only one caller sweeps; everyone else carries on without waiting
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            self._next_sweep = now + self._sweep_interval
+            cutoff = now - self._idle_ttl
+            for key in [k for k, bucket in list(self._buckets.items()) if bucket[1] < cutoff]:
+                self._buckets.pop(key, None)
+        finally:
+            self._sweep_lock.release()
+
+    def reset(self) -> None:
+        self._buckets.clear()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+_store: RateLimitStore = MemoryRateLimitStore()
+
+def configure_store(store: RateLimitStore) -> None:
+    """Swaps the backing store, e.g. for a shared backend or a fresh one in tests."""
+    global _store
+    _store = store
+
+def get_store() -> RateLimitStore:
+    return _store
+
+
+# --- Client Address ---
+
+_trusted_proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
+def _is_trusted(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in _trusted_proxies)
+
+def client_ip(request: Request) -> str:
+    """
+    The address a request came from. When it arrives through a trusted proxy,
+    that is the right-most X-Forwarded-For entry not added by a trusted proxy;
+    entries left of it were sent by the client and could say anything.
+    """
+    address = request.client.host if request.client else "unknown"
+    if not _is_trusted(address):
+        return address
+    hops = [hop.strip() for header in request.headers.getlist("x-forwarded-for") for hop in header.split(",")]
+    for hop in reversed([hop for hop in hops if hop]):
+        if not _is_trusted(hop):
+            return hop
+        address = hop
+    return address
+
+
+# --- FastAPI Dependency ---
+
+def _too_many_requests(retry_after: float) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Too many requests. Please try again later.",
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+    )
+
+async def _account_key(request: Request, field: str) -> Optional[str]:
+    # FastAPI has already parsed the body for the endpoint and Starlette caches it,
+    # so reading it again here costs nothing extra
+    content_type = request.headers.get("content-type", "")
+    try:
+        if content_type.startswith("application/json"):
+            value = (await request.json()).get(field)
+        else:
+            value = (await request.form()).get(field)
+    except Exception:
+        return None
+    return str(value).strip().lower() if value else None
+
+def rate_limit(scope: str, per_ip: RateLimit, per_account: Optional[RateLimit] = None, account_field: Optional[str] = None):
+    """
+    Builds a dependency that throttles an endpoint per client IP and, optionally,
+    per account (the `account_field` of the JSON or form body).
+    Add it to the route's `dependencies=[...]` so it runs before the endpoint's own
+    dependencies and any database or password-hashing work.
+    """
+    async def dependency(request: Request):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        now = time.monotonic()
+        retry_after = _store.consume(f"{scope}:ip:{client_ip(request)}", per_ip, now)
+        if retry_after:
+            raise _too_many_requests(retry_after)
+        if per_account and account_field:
+            account = await _account_key(request, account_field)
+            if account:
+                retry_after = _store.consume(f"{scope}:account:{account}", per_account, now)
+                if retry_after:
+                    raise _too_many_requests(retry_after)
+
+    return dependency
@@ -0,0 +1,168 @@
+import itertools
+import threading
+import time
+from typing import Callable, Optional
+from sqlalchemy import Delete, Insert, Update, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+# session.info keys
+ROUTER_KEY = "replica_router"
+READ_ONLY_KEY = "replica_read_only"  # set for safe (GET/HEAD) requests
+USER_KEY = "replica_user"            # username of the authenticated user, for read-your-writes
+_WROTE_KEY = "replica_wrote"
+
+# Replication lag in seconds as seen from a Postgres standby (0 when fully
+# replayed, or when the server isn't a standby at all)
+_POSTGRES_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+def default_lag_probe(engine: Engine) -> float:
+    """Measures a replica's lag. Other databases can't report it, so they count as in sync."""
+    if engine.dialect.name != "postgresql":
+        return 0.0
+    with engine.connect() as connection:
+        return float(connection.exec_driver_sql(_POSTGRES_LAG_SQL).scalar() or 0)
+
+
+class _Replica:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.lag = 0.0
+        self.checked_at = None  # monotonic time of the last probe
+
+
+class ReplicaRouter:
+    """
+    Chooses the engine for each read: a replica when one is caught up enough,
+    otherwise the primary.
+
+    Each replica's lag is probed at most every `lag_check_seconds` (on the
+    request that notices it is due) and a replica further behind than
+    `max_lag_seconds`, or one that can't be reached, is skipped until the next
+    probe. For read-your-writes, a user's reads stay on the primary for
+    `sticky_seconds` after they commit a change, and after that only go to a
+    replica whose lag is shorter than the time since that change.
+
+    The last-write times are kept in process memory, so with several workers a
+    user is only pinned on the worker that handled the write; the lag check
+    still keeps them off replicas that are behind.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: list[Engine],
+        sticky_seconds: float = 5.0,
+        max_lag_seconds: float = 10.0,
+        lag_check_seconds: float = 2.0,
+        lag_probe: Callable[[Engine], float] = default_lag_probe,
+    ):
+        self.primary = primary
+        self.replicas = [_Replica(engine) for engine in replicas]
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self.lag_probe = lag_probe
+        self.lock = threading.Lock()
+        self._last_write: dict[str, float] = {}
+        self._turn = itertools.count()
+
+    # --- Read-your-writes ---
+
+    def record_write(self, username: str) -> None:
+        now = time.monotonic()
+        with self.lock:
+            self._last_write[username] = now
+            if len(self._last_write) > 10000:
+                # Past both windows the entry can no longer pin anyone
+                horizon = now - max(self.sticky_seconds, self.max_lag_seconds)
+                self._last_write = {user: at for user, at in self._last_write.items() if at > horizon}
+
+    def _seconds_since_write(self, username: Optional[str]) -> Optional[float]:
+        if username is None:
+            return None
+        with self.lock:
+            at = self._last_write.get(username)
+        return None if at is None else time.monotonic() - at
+
+    # --- Lag ---
+
+    def _refresh(self, replica: _Replica) -> None:
+        now = time.monotonic()
+        with self.lock:
+            if replica.checked_at is not None and now - replica.checked_at < self.lag_check_seconds:
+                return
+            # Claim the probe so concurrent requests keep using the previous reading
+            replica.checked_at = now
+        try:
+            lag = self.lag_probe(replica.engine)
+        except Exception as e:
+            print(f"WARNING: Replica {replica.engine.url!r} is unavailable: {e}")
+            lag = float("inf")
+        replica.lag = lag
+
+    def replica_lags(self) -> dict[str, float]:
+        """Current lag of each replica, probing the ones that are due."""
+        for replica in self.replicas:
+            self._refresh(replica)
+        return {replica.engine.url.render_as_string(hide_password=True): replica.lag for replica in self.replicas}
+
+    # --- Routing ---
+
+    def engine_for_read(self, username: Optional[str] = None) -> Engine:
+        if not self.replicas:
+            return self.primary
+        since_write = self._seconds_since_write(username)
+        if since_write is not None and since_write < self.sticky_seconds:
+            return self.primary
+        limit = self.max_lag_seconds if since_write is None else min(self.max_lag_seconds, since_write)
+        start = next(self._turn)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            self._refresh(replica)
+            if replica.lag <= limit:
+                return replica.engine
+        return self.primary
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a replica when it was opened for a read-only
+    request and hasn't written anything yet; everything else, including every
+    read after the session's first write, goes to the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router: Optional[ReplicaRouter] = self.info.get(ROUTER_KEY)
+        if router is None:
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            self.info[_WROTE_KEY] = True
+            return router.primary
+        if not self.info.get(READ_ONLY_KEY) or self.info.get(_WROTE_KEY):
+            return router.primary
+        return router.engine_for_read(self.info.get(USER_KEY))
+
+
+def set_session_user(db: Session, username: str) -> None:
+    """
+    Tells the session who it is serving: their reads stay on the primary if
+    they changed something moments ago, and their commits pin them in turn.
+    """
+    db.info[USER_KEY] = username
+
+def new_session_like(factory, db: Session) -> Session:
+    """Opens another session that reads from the same place `db` would."""
+    return factory(info={key: db.info[key] for key in (READ_ONLY_KEY, USER_KEY) if key in db.info})
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _record_write(session: Session) -> None:
+    router: Optional[ReplicaRouter] = session.info.get(ROUTER_KEY)
+    if session.info.get(_WROTE_KEY) and router is not None and session.info.get(USER_KEY):
+        router.record_write(session.info[USER_KEY])
@@ -1,21 +1,33 @@
-import os
+import hashlib
+import secrets
+import uuid
 from datetime import datetime, timedelta, timezone
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from functools import lru_cache
+from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.db import get_db
+from app.core.config import settings
+from app.core.replicas import set_session_user
+from app.core.revocation import revocations
+from app.utils.activity import set_actor
 
 # --- Configuration ---
-SECRET_KEY = os.getenv("SECRET_KEY", "a_very_secret_key_for_dev_that_should_be_changed")
+SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 3000
+ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+REFRESH_TOKEN_EXPIRE_DAYS = settings.REFRESH_TOKEN_EXPIRE_DAYS
 
 # --- Password Hashing Context ---
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib and jose are slow to import; they are loaded on first use (or by the
+# startup warm-up) rather than when the app module is imported.
+@lru_cache(maxsize=None)
+def get_password_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # --- OAuth2 Scheme ---
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
@@ -23,15 +35,17 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
 
 # --- Utility Functions ---
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_password_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_password_context().verify(plain_password, hashed_password)
 
 def create_access_token(data: dict) -> str:
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    # The jti lets a single token be revoked (e.g. on logout) before it expires
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -49,6 +63,7 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    from jose import JWTError, jwt
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         print(f"Decoded Payload: {payload}")
@@ -57,9 +72,13 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         if username is None:
             print("❌ DEBUG: Username (sub) not found in payload.")
             raise credentials_exception
+        if claims_revoked(payload):
+            raise credentials_exception
             
         token_data = schemas.TokenData(username=username)
         print(f"Token data is valid for username: {token_data.username}")
+        # Read-your-writes: decides whether this user's reads may use a replica
+        set_session_user(db, token_data.username)
 
     except JWTError as e:
         # --- THIS WILL PRINT THE EXACT JWT ERROR ---
@@ -72,6 +91,58 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
         print(f"❌ DEBUG: User '{token_data.username}' not found in the database.")
         raise credentials_exception
     
+    set_actor(db, user.id)
     print(f"✅ DEBUG: User '{user.username}' found and authenticated.")
     print("----------------------------------------\n")
     return user
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """The claims of a valid, unrevoked access token, or None. Checking never touches the database for live tokens."""
+    from jose import JWTError, jwt
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    return None if claims_revoked(payload) else payload
+
+def claims_revoked(payload: dict) -> bool:
+    """Whether the token itself (`jti`) or the login it came from (`fam`) has been revoked."""
+    return revocations.is_revoked(payload.get("jti")) or revocations.is_revoked(payload.get("fam"))
+
+def username_from_token(token: str) -> Optional[str]:
+    """The username in a valid access token, or None; for callers outside the request dependencies (e.g. WebSockets)."""
+    payload = decode_access_token(token)
+    return payload.get("sub") if payload else None
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def create_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> tuple[str, str]:
+    """
+    Issues a refresh token (added to the session; the caller commits) and
+    returns it with its family id, which the access tokens issued alongside
+    carry as their `fam` claim. Only the token's hash is stored. Pass the
+    family of the token it replaces when rotating.
+    """
+    token = secrets.token_urlsafe(32)
+    family_id = family_id or uuid.uuid4().hex
+    db.add(models.RefreshToken(
+        user_id=user_id,
+        family_id=family_id,
+        token_hash=hash_refresh_token(token),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token, family_id
+
+def revoke_login(db: Session, family_id: str) -> None:
+    """
+    Ends a login: its refresh tokens stop working, and so does every access
+    token issued from it (by their `fam` claim). The caller commits.
+    """
+    now = datetime.now(timezone.utc)
+    db.query(models.RefreshToken).filter(
+        models.RefreshToken.family_id == family_id,
+        models.RefreshToken.revoked_at.is_(None),
+    ).update({"revoked_at": now}, synchronize_session=False)
+    # Access tokens from this login are all gone once the latest possible one expires
+    revocations.revoke(db, family_id, now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
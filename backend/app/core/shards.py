@@ -0,0 +1,493 @@
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import Delete, Insert, MetaData, Table, Update, delete, event, func, insert, inspect, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators, visitors
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter
+
+from app.core.replicas import RoutingSession, new_session_like
+
+# The primary database. It holds everything that isn't per team (users,
+# friendships, activity, the shard directory) plus any team without a
+# directory entry, e.g. teams created before sharding was turned on.
+DEFAULT_SHARD = "default"
+
+# Tables whose rows belong to a team and live on that team's shard. Every
+# shard also carries a copy of `users` so foreign keys and joins still work.
+SHARDED_TABLES = frozenset({
+    "teams", "team_members", "projects", "milestones", "tasks", "task_dependencies",
+    "comments", "attachments", "project_archives", "project_archive_chunks", "task_status_snapshots",
+    "chat_channels", "chat_messages", "chat_read_markers",
+})
+
+# Columns that identify the team a statement is about, directly or through a parent
+_KEY_COLUMNS = {
+    ("teams", "id"): "team",
+    ("team_members", "team_id"): "team",
+    ("projects", "team_id"): "team",
+    ("projects", "id"): "project",
+    ("milestones", "project_id"): "project",
+    ("tasks", "project_id"): "project",
+    ("project_archives", "project_id"): "project",
+    ("project_archive_chunks", "project_id"): "project",
+    ("task_status_snapshots", "project_id"): "project",
+    ("milestones", "id"): "milestone",
+    ("tasks", "id"): "task",
+    ("task_dependencies", "task_id"): "task",
+    ("task_dependencies", "depends_on_id"): "task",
+    ("comments", "task_id"): "task",
+    ("attachments", "task_id"): "task",
+    ("comments", "id"): "comment",
+    ("attachments", "id"): "attachment",
+    ("chat_channels", "team_id"): "team",
+    ("chat_channels", "id"): "channel",
+    ("chat_messages", "channel_id"): "channel",
+    ("chat_read_markers", "channel_id"): "channel",
+}
+
+# session.info keys
+SHARDS_KEY = "shard_router"
+TEAM_KEY = "shard_team_id"  # the team the session is working on
+SHARD_KEY = "shard_name"    # fixes the session to one shard (scatter-gather)
+_USERS_KEY = "shard_changed_users"
+_DROPPED_KEY = "shard_dropped_teams"
+_PLACED_KEY = "shard_placed_teams"
+
+# Scatter-gather queries run side by side, one pooled connection per shard
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="shards")
+
+
+def _inspect(mapper, clause) -> tuple[set[str], list[tuple[str, object]]]:
+    """Names of the tables a statement touches, and the (kind, value) team keys in its criteria."""
+    if clause is None:
+        if mapper is not None and not hasattr(mapper, "tables"):
+            mapper = inspect(mapper, raiseerr=False)  # a mapped class
+        return ({table.name for table in mapper.tables} if mapper is not None else set()), []
+    tables, keys = set(), []
+    for element in visitors.iterate(clause):
+        if isinstance(element, Table):
+            tables.add(element.name)
+        elif isinstance(element, BinaryExpression) and element.operator in (operators.eq, operators.in_op):
+            column, value = element.left, element.right
+            table = getattr(column, "table", None)
+            if isinstance(value, BindParameter) and isinstance(table, Table):
+                kind = _KEY_COLUMNS.get((table.name, column.key))
+                if kind is not None:
+                    keys.append((kind, value))
+    return tables, keys
+
+
+class ShardRouter:
+    """
+    Maps teams to databases through the `team_shards` directory on the primary,
+    and picks the database for each statement a session runs.
+
+    Statements on team tables go to the shard of the team named in their
+    criteria (a team, project, task, milestone, comment or attachment id), or
+    failing that the team the session last worked on. Everything else goes to
+    the primary. Lookups are cached: directory entries for `directory_ttl`
+    seconds (so a move is seen everywhere within that time) and which team a
+    project/task/... belongs to until the process restarts, as that never changes.
+
+    Ids of team rows come from `id_blocks` on the primary, a block at a time,
+    so they are unique across shards and survive a move.
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        shards: dict[str, Engine],
+        metadata: MetaData,
+        directory_ttl: float = 5.0,
+        id_block_size: int = 100,
+    ):
+        self.primary = primary
+        self.engines = {DEFAULT_SHARD: primary, **shards}
+        self.metadata = metadata
+        self.directory_ttl = directory_ttl
+        self.id_block_size = id_block_size
+        self.lock = threading.Lock()
+        self._directory: dict[int, tuple[str, bool, float]] = {}
+        self._teams: dict[tuple[str, int], int] = {}
+        self._ids: dict[str, tuple[int, int]] = {}
+        self._id_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return len(self.engines) > 1
+
+    @property
+    def names(self) -> list[str]:
+        return list(self.engines)
+
+    def _table(self, name: str) -> Table:
+        return self.metadata.tables[name]
+
+    # --- Directory ---
+
+    def lookup(self, team_id: int) -> tuple[str, bool]:
+        """(shard, is moving) for a team."""
+        now = time.monotonic()
+        with self.lock:
+            cached = self._directory.get(team_id)
+        if cached is not None and now - cached[2] < self.directory_ttl:
+            return cached[0], cached[1]
+        directory = self._table("team_shards")
+        with self.primary.connect() as connection:
+            row = connection.execute(
+                select(directory.c.shard, directory.c.state).where(directory.c.team_id == team_id)
+            ).first()
+        shard, moving = DEFAULT_SHARD, False
+        if row is not None:
+            shard, moving = row.shard, getattr(row.state, "name", row.state) == "moving"
+        if shard not in self.engines:
+            raise RuntimeError(f"Team {team_id} is on shard '{shard}', which is not configured.")
+        with self.lock:
+            self._directory[team_id] = (shard, moving, now)
+        return shard, moving
+
+    def set_directory(self, team_id: int, shard: str, moving: bool = False) -> None:
+        directory = self._table("team_shards")
+        values = {"shard": shard, "state": "moving" if moving else "active"}
+        with self.primary.begin() as connection:
+            if not connection.execute(update(directory).where(directory.c.team_id == team_id).values(**values)).rowcount:
+                connection.execute(insert(directory).values(team_id=team_id, **values))
+        self.invalidate(team_id)
+
+    def drop_directory(self, team_ids) -> None:
+        directory = self._table("team_shards")
+        with self.primary.begin() as connection:
+            connection.execute(delete(directory).where(directory.c.team_id.in_(list(team_ids))))
+        for team_id in team_ids:
+            self.invalidate(team_id)
+
+    def invalidate(self, team_id: int) -> None:
+        with self.lock:
+            self._directory.pop(team_id, None)
+
+    def team_counts(self) -> dict[str, int]:
+        """Teams per shard according to the directory."""
+        directory = self._table("team_shards")
+        with self.primary.connect() as connection:
+            counts = dict(connection.execute(
+                select(directory.c.shard, func.count()).group_by(directory.c.shard)
+            ).all())
+        return {name: counts.get(name, 0) for name in self.engines}
+
+    def place_team(self) -> str:
+        """
+        Shard for a new team: the one with the fewest teams. The primary only
+        takes new teams when no other shard is configured.
+        """
+        counts = self.team_counts()
+        candidates = [name for name in self.engines if name != DEFAULT_SHARD] or [DEFAULT_SHARD]
+        return min(candidates, key=lambda name: (counts[name], name))
+
+    # --- Finding a row's team ---
+
+    def _locator(self, kind: str, value):
+        tables = self.metadata.tables
+        projects, tasks = tables["projects"], tables["tasks"]
+        if kind == "project":
+            return select(projects.c.team_id).where(projects.c.id == value)
+        if kind == "channel":
+            channels = tables["chat_channels"]
+            return select(channels.c.team_id).where(channels.c.id == value)
+        if kind == "milestone":
+            milestones = tables["milestones"]
+            return select(projects.c.team_id).join_from(
+                milestones, projects, milestones.c.project_id == projects.c.id
+            ).where(milestones.c.id == value)
+        by_task = select(projects.c.team_id).join_from(tasks, projects, tasks.c.project_id == projects.c.id)
+        if kind == "task":
+            return by_task.where(tasks.c.id == value)
+        child = tables["comments" if kind == "comment" else "attachments"]
+        return by_task.join(child, child.c.task_id == tasks.c.id).where(child.c.id == value)
+
+    def team_for(self, kind: str, value) -> Optional[int]:
+        """The team a project/task/... belongs to, looked up on every shard on a cache miss."""
+        if kind == "team":
+            return value
+        with self.lock:
+            team_id = self._teams.get((kind, value))
+        if team_id is not None:
+            return team_id
+        query = self._locator(kind, value)
+        for engine in self.engines.values():
+            with engine.connect() as connection:
+                team_id = connection.execute(query).scalar()
+            if team_id is not None:
+                with self.lock:
+                    if len(self._teams) > 100000:
+                        self._teams.clear()
+                    self._teams[(kind, value)] = team_id
+                return team_id
+        # Not committed yet (or doesn't exist): the caller falls back to the session's team
+        return None
+
+    def _team_in(self, keys: list[tuple[str, BindParameter]]) -> Optional[int]:
+        for kind, parameter in keys:
+            values = parameter.effective_value
+            for value in values if isinstance(values, (list, tuple)) else [values]:
+                if value is None:
+                    continue
+                team_id = self.team_for(kind, value)
+                if team_id is not None:
+                    return team_id
+        return None
+
+    def _team_of(self, obj) -> Optional[int]:
+        columns = obj.__table__.c
+        if obj.__table__.name == "teams":
+            return obj.id
+        for column, kind in (("team_id", "team"), ("project_id", "project"), ("task_id", "task"), ("channel_id", "channel")):
+            if column in columns and getattr(obj, column, None) is not None:
+                return self.team_for(kind, getattr(obj, column))
+        return None
+
+    # --- Routing ---
+
+    def shard_for(self, session: Session, mapper, clause, writing: bool) -> Optional[str]:
+        """Shard a statement should run on, or None if it only touches the primary's own tables."""
+        tables, keys = _inspect(mapper, clause)
+        if not tables & SHARDED_TABLES:
+            return None
+        if session.info.get(SHARD_KEY):
+            return session.info[SHARD_KEY]
+        team_id = self._team_in(keys)
+        if team_id is not None:
+            session.info[TEAM_KEY] = team_id
+        else:
+            team_id = session.info.get(TEAM_KEY)
+        if team_id is None:
+            return DEFAULT_SHARD
+        shard, moving = self.lookup(team_id)
+        if writing and moving:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="This team is being moved to another database. Please try again shortly.",
+                headers={"Retry-After": str(int(self.directory_ttl) + 1)},
+            )
+        return shard
+
+    def engine(self, name: str) -> Engine:
+        return self.engines[name]
+
+    # --- Ids ---
+
+    def _max_id(self, table_name: str) -> int:
+        table = self._table(table_name)
+        highest = 0
+        for engine in self.engines.values():
+            with engine.connect() as connection:
+                highest = max(highest, connection.execute(select(func.max(table.c.id))).scalar() or 0)
+        return highest
+
+    def _reserve(self, table_name: str, size: int) -> int:
+        """Reserves `size` ids of a table on the primary and returns the end of the block."""
+        blocks = self._table("id_blocks")
+        for _ in range(3):
+            with self.primary.begin() as connection:
+                reserved = connection.execute(
+                    update(blocks).where(blocks.c.table_name == table_name).values(next_id=blocks.c.next_id + size)
+                ).rowcount
+                if reserved:
+                    return connection.execute(select(blocks.c.next_id).where(blocks.c.table_name == table_name)).scalar_one()
+            # First use: start above every id already handed out on any shard
+            try:
+                with self.primary.begin() as connection:
+                    connection.execute(insert(blocks).values(table_name=table_name, next_id=self._max_id(table_name) + 1))
+            except IntegrityError:
+                pass
+        raise RuntimeError(f"Could not reserve ids for {table_name}.")
+
+    def allocate_ids(self, table_name: str, count: int) -> list[int]:
+        ids = []
+        with self._id_lock:
+            next_id, end = self._ids.get(table_name, (0, 0))
+            while len(ids) < count:
+                if next_id >= end:
+                    size = max(self.id_block_size, count - len(ids))
+                    end = self._reserve(table_name, size)
+                    next_id = end - size
+                take = min(end - next_id, count - len(ids))
+                ids.extend(range(next_id, next_id + take))
+                next_id += take
+            self._ids[table_name] = (next_id, end)
+        return ids
+
+    # --- Flush ---
+
+    def prepare_flush(self, session: Session) -> None:
+        """
+        Before a flush: hands out ids to new team rows, places new teams, and
+        pins the session to the one shard its pending changes belong to.
+        """
+        new = [obj for obj in session.new if obj.__table__.name in SHARDED_TABLES]
+        needs_id = defaultdict(list)
+        for obj in new:
+            if "id" in obj.__table__.c and obj.__table__.c.id.primary_key and obj.id is None:
+                needs_id[obj.__table__.name].append(obj)
+        for table_name, objs in needs_id.items():
+            for obj, new_id in zip(objs, self.allocate_ids(table_name, len(objs))):
+                obj.id = new_id
+
+        # New teams in one flush all go to the same shard, as one session only writes to one
+        new_teams = [obj.id for obj in new if obj.__table__.name == "teams"]
+        placed = self.place_team() if new_teams else None
+
+        changed = [obj for obj in (*session.new, *session.dirty, *session.deleted) if obj.__table__.name in SHARDED_TABLES]
+        team_ids = {self._team_of(obj) for obj in changed} - {None}
+        if not team_ids:
+            return
+        placements = {team_id: (placed, False) if team_id in new_teams else self.lookup(team_id) for team_id in team_ids}
+        if len({shard for shard, _ in placements.values()}) > 1:
+            raise RuntimeError("A session can only write to one shard at a time.")
+        if any(moving for _, moving in placements.values()):
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="This team is being moved to another database. Please try again shortly.",
+                headers={"Retry-After": str(int(self.directory_ttl) + 1)},
+            )
+        if not session.info.get(SHARD_KEY):
+            session.info[TEAM_KEY] = next(iter(team_ids))
+
+        # The directory is on the primary and the team on its shard, so the
+        # entry is written now and removed again if the transaction rolls back
+        for team_id in new_teams:
+            self.set_directory(team_id, placed)
+        if new_teams:
+            session.info.setdefault(_PLACED_KEY, set()).update(new_teams)
+
+        dropped = {obj.id for obj in session.deleted if obj.__table__.name == "teams"}
+        if dropped:
+            session.info.setdefault(_DROPPED_KEY, set()).update(dropped)
+
+    # --- Users ---
+
+    def mirror_users(self, user_ids, shards: Optional[list[str]] = None) -> None:
+        """
+        Copies users from the primary to the other shards (or removes them
+        there), so team rows can reference and join them. Password hashes stay
+        on the primary; logins only ever read it.
+        """
+        users = self._table("users")
+        user_ids = list(user_ids)
+        if not user_ids:
+            return
+        with self.primary.connect() as connection:
+            rows = [dict(row._mapping) for row in connection.execute(select(users).where(users.c.id.in_(user_ids)))]
+        gone = set(user_ids) - {row["id"] for row in rows}
+        for name in shards or self.names:
+            if name == DEFAULT_SHARD:
+                continue
+            with self.engines[name].begin() as connection:
+                if gone:
+                    # Cascades to (or nulls out) their rows on this shard
+                    connection.execute(delete(users).where(users.c.id.in_(gone)))
+                for row in rows:
+                    values = {**row, "password": ""}
+                    if not connection.execute(update(users).where(users.c.id == row["id"]).values(**values)).rowcount:
+                        connection.execute(insert(users).values(**values))
+
+
+class ShardRoutingSession(RoutingSession):
+    """
+    RoutingSession that also sends statements on team tables to the team's
+    shard. Whatever stays on the primary is routed to replicas as before.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        router: Optional[ShardRouter] = self.info.get(SHARDS_KEY)
+        if router is not None and router.enabled:
+            writing = self._flushing or isinstance(clause, (Insert, Update, Delete))
+            shard = router.shard_for(self, mapper, clause, writing)
+            if shard is not None and shard != DEFAULT_SHARD:
+                return router.engine(shard)
+        return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+
+def pin_team(db: Session, team_id: int) -> None:
+    """Points the session's team-scoped statements at the shard holding this team."""
+    db.info[TEAM_KEY] = team_id
+
+def allocate_ids(db: Session, table_name: str, count: int) -> Optional[list[int]]:
+    """Ids for rows inserted without the ORM (which does this itself), or None without sharding."""
+    router: Optional[ShardRouter] = db.info.get(SHARDS_KEY)
+    if router is None or not router.enabled:
+        return None
+    return router.allocate_ids(table_name, count)
+
+def scatter(factory, db: Session, fn: Callable[[Session], list]) -> list:
+    """
+    Runs `fn` on a session fixed to each shard, in parallel, and returns the
+    results concatenated. Without sharding it just runs `fn(db)`.
+    """
+    router: Optional[ShardRouter] = db.info.get(SHARDS_KEY)
+    if router is None or not router.enabled:
+        return list(fn(db))
+
+    def run(name: str) -> list:
+        session = new_session_like(factory, db)
+        session.info[SHARD_KEY] = name
+        try:
+            return list(fn(session))
+        finally:
+            session.close()
+
+    results = []
+    for rows in _executor.map(run, router.names):
+        results.extend(rows)
+    return results
+
+
+@event.listens_for(ShardRoutingSession, "before_flush")
+def _before_flush(session, flush_context, instances):
+    router: Optional[ShardRouter] = session.info.get(SHARDS_KEY)
+    if router is not None and router.enabled:
+        router.prepare_flush(session)
+
+@event.listens_for(ShardRoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    router: Optional[ShardRouter] = session.info.get(SHARDS_KEY)
+    if router is None or not router.enabled:
+        return
+    # Users are copied to the other shards once the change is committed
+    changed = {obj.id for obj in (*session.new, *session.dirty, *session.deleted) if obj.__table__.name == "users"}
+    if changed:
+        session.info.setdefault(_USERS_KEY, set()).update(changed)
+
+@event.listens_for(ShardRoutingSession, "after_commit")
+def _after_commit(session):
+    router: Optional[ShardRouter] = session.info.get(SHARDS_KEY)
+    if router is None:
+        return
+    session.info.pop(_PLACED_KEY, None)
+    users = session.info.pop(_USERS_KEY, None)
+    if users:
+        router.mirror_users(users)
+    dropped = session.info.pop(_DROPPED_KEY, None)
+    if dropped:
+        router.drop_directory(dropped)
+
+@event.listens_for(ShardRoutingSession, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_USERS_KEY, None)
+    session.info.pop(_DROPPED_KEY, None)
+
+@event.listens_for(ShardRoutingSession, "after_transaction_end")
+def _after_transaction_end(session, transaction):
+    # Also runs when a session is closed without committing, which has no after_rollback
+    if transaction.parent is not None:
+        return
+    placed = session.info.pop(_PLACED_KEY, None)
+    router: Optional[ShardRouter] = session.info.get(SHARDS_KEY)
+    if placed and router is not None:
+        # Teams that were never saved must not stay in the directory
+        router.drop_directory(placed)
@@ -0,0 +1,54 @@
+import threading
+import time
+from sqlalchemy.orm import configure_mappers
+
+from app.core.config import settings
+from app.db import replica_engines, shard_router
+
+def warm_up(state) -> None:
+    """
+    Pays the first-request costs up front: mapper configuration, a few pooled
+    connections to the primary and each shard and replica, and loading the JWT
+    and password-hashing backends.
+    Sets `state.ready` when done, or `state.warmup_error` if something failed
+    (e.g. the database is unreachable), in which case the app stays not ready.
+    """
+    started = time.perf_counter()
+    try:
+        configure_mappers()
+
+        # Open the connections side by side so each pool keeps that many around
+        connections = [
+            pooled.connect()
+            for pooled in [*shard_router.engines.values(), *replica_engines]
+            for _ in range(max(settings.WARMUP_CONNECTIONS, 1))
+        ]
+        try:
+            for connection in connections:
+                connection.exec_driver_sql("SELECT 1")
+        finally:
+            for connection in connections:
+                connection.close()
+
+        from jose import jwt
+        from app.core.security import ALGORITHM, SECRET_KEY, create_access_token, get_password_context
+        jwt.decode(create_access_token({"sub": "warmup"}), SECRET_KEY, algorithms=[ALGORITHM])
+        # Loads the bcrypt backend without the cost of hashing a real password
+        get_password_context().dummy_verify()
+
+        if settings.SENDGRID_API_KEY:
+            import sendgrid  # noqa: F401
+    except Exception as e:
+        state.warmup_error = str(e)
+        print(f"ERROR: Startup warm-up failed: {e}")
+        return
+    state.ready = True
+    print(f"--- Warm-up finished in {time.perf_counter() - started:.2f}s ---")
+
+def start_warm_up(state) -> threading.Thread:
+    """Runs the warm-up in the background so the server can answer liveness checks meanwhile."""
+    state.ready = False
+    state.warmup_error = None
+    thread = threading.Thread(target=warm_up, args=(state,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
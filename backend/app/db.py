@@ -1,25 +1,61 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
-from dotenv import load_dotenv
+from fastapi import Request
 
-# Load env vars
-load_dotenv()
+from app.core.config import settings
+from app.core.replicas import READ_ONLY_KEY, ROUTER_KEY, ReplicaRouter
+from app.core.shards import SHARDS_KEY, ShardRouter, ShardRoutingSession
 
-DATABASE_URL = os.getenv("DATABASE_URL")
+DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def _create_engine(url: str):
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        # SQLite only enforces foreign keys (and so ON DELETE CASCADE) when asked to, per connection
+        @event.listens_for(engine, "connect")
+        def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+    return engine
+
+# The primary takes every write; read-only requests may be served by a replica
+engine = _create_engine(DATABASE_URL)
+replica_engines = [_create_engine(url) for url in settings.REPLICA_DATABASE_URLS]
+
+replica_router = ReplicaRouter(
+    engine,
+    replica_engines,
+    sticky_seconds=settings.READ_YOUR_WRITES_SECONDS,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_seconds=settings.REPLICA_LAG_CHECK_SECONDS,
+)
 
 Base = declarative_base()
 
+# Team data can be spread over several databases; see app/core/shards.py
+shard_router = ShardRouter(
+    engine,
+    {name: _create_engine(url) for name, url in settings.SHARD_DATABASE_URLS.items()},
+    Base.metadata,
+    directory_ttl=settings.SHARD_DIRECTORY_TTL_SECONDS,
+)
+SessionLocal = sessionmaker(
+    class_=ShardRoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine,
+    info={ROUTER_KEY: replica_router, SHARDS_KEY: shard_router},
+)
+
 # --- CENTRALIZED DATABASE SESSION DEPENDENCY ---
-def get_db():
+def get_db(request: Request):
     """
     FastAPI dependency to create and manage a database session.
+    Sessions for GET/HEAD requests read from a replica when one is configured.
     """
-    db = SessionLocal()
+    db = SessionLocal(info={READ_ONLY_KEY: request.method in ("GET", "HEAD")})
     try:
         yield db
     finally:
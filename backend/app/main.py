@@ -1,45 +1,136 @@
-from fastapi import FastAPI
+import importlib
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm.exc import StaleDataError
 
-# Import your API routers
-from app.api.v1 import users, teams, friends, projects # 1. Import the new projects router
-from app.db import Base, engine
+from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.warmup import start_warm_up
+from app.schemas.activity import ActivityMetrics
+from app.utils.activity import activity_buffer, activity_writer
+from app.utils.chat import chat_hub
 
 # This line is for initial development.
 # In a real production environment, you should rely solely on Alembic migrations.
 # Base.metadata.create_all(bind=engine)
 
-app = FastAPI(
-    title="TaskMaster API",
-    description="The backend API for the TaskMaster Project Management Tool.",
-    version="1.0.0"
-)
-
-# --- CORS middleware setup ---
-origins = [
-    "http://localhost:5173",  # React default development server
+# --- API routers: (module in app.api.v1, prefix, tag) ---
+# Only the routers enabled in settings.ENABLED_ROUTERS (all by default) are imported.
+ROUTERS = [
+    ("users", "/users", "User Authentication & Management"),
+    ("auth", "/auth", "Authentication"),
+    ("teams", "/teams", "Teams & Collaboration"),
+    ("friends", "/friends", "Friends & Social"),
+    ("projects", "/projects", "Project Management"),
+    ("tasks", "/tasks", "Task Management"),
+    ("activity", "/activity", "Activity"),
+    ("deletion_jobs", "/deletion-jobs", "Deletion Jobs"),
+    ("exports", "/exports", "Exports"),
+    ("imports", "/imports", "Imports"),
+    ("dashboard", "/dashboard", "Dashboard"),
+    ("timeline", "/timeline", "Timeline"),
+    ("notifications", "/notifications", "Notifications"),
+    ("calendar", "/calendar", "Calendar Feeds"),
+    ("chat", "/chat", "Chat"),
+    ("presence", "/presence", "Presence"),
 ]
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# --- Include the API routers ---
-app.include_router(users.router, prefix="/users", tags=["User Authentication & Management"])
-app.include_router(teams.router, prefix="/teams", tags=["Teams & Collaboration"])
-app.include_router(friends.router, prefix="/friends", tags=["Friends & Social"])
-app.include_router(projects.router, prefix="/projects", tags=["Project Management"]) # 2. Include the new projects router
-
-
-# Root endpoint for a basic API health check
-@app.get("/", tags=["Health Check"])
-def read_root():
-    """
-    A simple health check endpoint to confirm the API is running.
-    """
-    return {"status": "ok", "message": "Welcome to the TaskMaster API"}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Background writer that drains the activity buffer into activity_log
+    activity_writer.start()
+    # Batches chat messages into the database and fans them out to open sockets
+    chat_hub.start()
+    # /ready answers 503 until the warm-up has finished
+    start_warm_up(app.state)
+    yield
+    chat_hub.stop()
+    activity_writer.stop()
+
+def create_app() -> FastAPI:
+    """Builds the FastAPI application from the already loaded settings."""
+    app = FastAPI(
+        title="TaskMaster API",
+        description="The backend API for the TaskMaster Project Management Tool.",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.ready = False
+    app.state.warmup_error = None
+
+    # --- CORS middleware setup ---
+    origins = [
+        "http://localhost:5173",  # React default development server
+    ]
+
+    # Retried POSTs carrying an Idempotency-Key get the first response back instead of running again
+    app.add_middleware(
+        IdempotencyMiddleware,
+        ttl=settings.IDEMPOTENCY_TTL_SECONDS,
+        max_keys=settings.IDEMPOTENCY_MAX_KEYS,
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # Projects, milestones and team members carry a version column; an ORM flush
+    # that finds the row already moved on by another request is a conflict, not a crash
+    @app.exception_handler(StaleDataError)
+    async def stale_data_conflict(request: Request, exc: StaleDataError):
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT,
+            content={"detail": "This was changed by someone else in the meantime. Reload and try again."},
+        )
+
+    # --- Include the API routers ---
+    known = {name for name, _, _ in ROUTERS}
+    unknown = set(settings.ENABLED_ROUTERS) - known
+    if unknown:
+        raise ValueError(f"Unknown router(s) in ENABLED_ROUTERS: {', '.join(sorted(unknown))}")
+    for name, prefix, tag in ROUTERS:
+        if settings.ENABLED_ROUTERS and name not in settings.ENABLED_ROUTERS:
+            continue
+        module = importlib.import_module(f"app.api.v1.{name}")
+        app.include_router(module.router, prefix=prefix, tags=[tag])
+
+    # Root endpoint for a basic API health check
+    @app.get("/", tags=["Health Check"])
+    def read_root():
+        """
+        A simple health check endpoint to confirm the API is running.
+        """
+        return {"status": "ok", "message": "Welcome to the TaskMaster API"}
+
+    @app.get("/ready", tags=["Health Check"])
+    def read_ready():
+        """
+        Readiness check: 503 until the startup warm-up (database pool, token and
+        password backends) has completed.
+        """
+        if not app.state.ready:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=app.state.warmup_error or "Warming up.",
+            )
+        return {"status": "ready"}
+
+    # Operator endpoints sit outside the API routers, with /ready, and are not
+    # meant to be routed to from the public internet
+    @app.get("/metrics/activity", response_model=ActivityMetrics, tags=["Health Check"])
+    def read_activity_metrics():
+        """
+        Reports this worker's activity buffer fill level and writer throughput,
+        including how many events were dropped because the buffer was full.
+        """
+        return activity_buffer.metrics()
+
+    return app
 
+app = create_app()
@@ -4,17 +4,37 @@
 from .user import User
 from .team import Team, TeamMember, TeamRoleEnum, InvitationStatusEnum
 from .project import Project, ProjectStatusEnum
-from .task import Task, Comment, Attachment, TaskStatusEnum, TaskPriorityEnum
-from .friendship import Friendship, FriendshipStatusEnum
+from .task import Task, TaskDependency, Comment, Attachment, TaskStatusEnum, TaskPriorityEnum
+from .friendship import Friendship, FriendshipStatusEnum, canonical_pair
 from .milestone import Milestone, MilestoneStatusEnum # 1. Import new models
+from .otp import OneTimePassword, OTPPurposeEnum
+from .activity import ActivityLog
+from .deletion_job import DeletionJob, DeletionTargetEnum, DeletionJobStatusEnum
+from .archive import ProjectArchive, ProjectArchiveChunk, ArchiveStateEnum
+from .shard import TeamShard, TeamShardStateEnum, IdBlock
+from .notification import Notification, NotificationCounter
+from .calendar_feed import CalendarFeed
+from .snapshot import TaskStatusSnapshot
+from .chat import ChatChannel, ChatMessage, ChatReadMarker
+from .auth_token import RefreshToken, RevokedToken
 
 # You can optionally define __all__ to control what `from app.models import *` imports
 __all__ = [
     "User",
     "Team", "TeamMember", "TeamRoleEnum", "InvitationStatusEnum",
     "Project", "ProjectStatusEnum",
-    "Task", "Comment", "Attachment", "TaskStatusEnum", "TaskPriorityEnum",
-    "Friendship", "FriendshipStatusEnum",
+    "Task", "TaskDependency", "Comment", "Attachment", "TaskStatusEnum", "TaskPriorityEnum",
+    "Friendship", "FriendshipStatusEnum", "canonical_pair",
     "Milestone", "MilestoneStatusEnum", # 2. Add to __all__
+    "OneTimePassword", "OTPPurposeEnum",
+    "ActivityLog",
+    "DeletionJob", "DeletionTargetEnum", "DeletionJobStatusEnum",
+    "ProjectArchive", "ProjectArchiveChunk", "ArchiveStateEnum",
+    "TeamShard", "TeamShardStateEnum", "IdBlock",
+    "Notification", "NotificationCounter",
+    "CalendarFeed",
+    "TaskStatusSnapshot",
+    "ChatChannel", "ChatMessage", "ChatReadMarker",
+    "RefreshToken", "RevokedToken",
 ]
 
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, Index
+from sqlalchemy.sql import func
+from app.db import Base
+
+class ActivityLog(Base):
+    """
+    Append-only history of changes to teams, members, projects, milestones, tasks
+    and friendships. Rows are only ever inserted (in batches, by the activity
+    writer). On Postgres the migration creates it range-partitioned by month on
+    occurred_at, so old months can be detached or dropped wholesale.
+    """
+    __tablename__ = "activity_log"
+
+    # In Postgres the primary key is (id, occurred_at), since a partitioned table's key
+    # must include the partition key (see the migration); id alone is unique regardless.
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    occurred_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    actor_id = Column(Integer, nullable=True)
+    team_id = Column(Integer, nullable=True)
+    project_id = Column(Integer, nullable=True)
+    entity_type = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=True)
+    action = Column(String, nullable=False)  # "created", "updated" or "deleted"
+    changes = Column(JSON, nullable=True)
+
+    # No foreign keys: history outlives the rows it describes
+    __table_args__ = (
+        Index('ix_activity_log_team_id_id', 'team_id', 'id'),
+        Index('ix_activity_log_project_id_id', 'project_id', 'id'),
+    )
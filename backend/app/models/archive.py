@@ -0,0 +1,49 @@
+import enum
+from sqlalchemy import Column, Integer, DateTime, Enum, ForeignKey, LargeBinary, Boolean, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db import Base
+from .project import ProjectStatusEnum
+
+class ArchiveStateEnum(enum.Enum):
+    archiving = "archiving"
+    archived = "archived"
+    restoring = "restoring"
+
+class ProjectArchive(Base):
+    """
+    Cold-storage record for an archived project. The project row and its
+    milestones stay where they are; its tasks, with their comments, attachments
+    and dependencies, are moved out of the hot tables into ProjectArchiveChunk rows.
+    """
+    __tablename__ = "project_archives"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    state = Column(Enum(ArchiveStateEnum), nullable=False, default=ArchiveStateEnum.archiving)
+    # What the project goes back to on restore
+    previous_status = Column(Enum(ProjectStatusEnum), nullable=True)
+
+    task_count = Column(Integer, nullable=False, default=0)
+    comment_count = Column(Integer, nullable=False, default=0)
+    attachment_count = Column(Integer, nullable=False, default=0)
+    dependency_count = Column(Integer, nullable=False, default=0)
+    raw_bytes = Column(Integer, nullable=False, default=0)
+    stored_bytes = Column(Integer, nullable=False, default=0)
+
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ProjectArchiveChunk(Base):
+    """One zlib-compressed JSON batch of an archived project's task rows."""
+    __tablename__ = "project_archive_chunks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)
+    task_count = Column(Integer, nullable=False, default=0)
+    payload = Column(LargeBinary, nullable=False)
+    # Set once a restore has put this chunk's tasks back (its dependencies go last)
+    restored = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        UniqueConstraint('project_id', 'seq', name='_archive_chunk_project_seq_uc'),
+    )
@@ -0,0 +1,38 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db import Base
+
+class RefreshToken(Base):
+    """
+    A long-lived token that can be swapped, once, for a new access token and
+    a new refresh token. Tokens issued from the same login share a family, so
+    a reused (stolen) one can revoke every token descended from that login.
+    Only the SHA-256 of the token is stored.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(String(32), nullable=False, index=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    # Set when the token has been exchanged for its successor
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class RevokedToken(Base):
+    """
+    Access tokens revoked before they expire: one token by its `jti` claim, or
+    every token of a login by the family id in their `fam` claim (both are
+    random 128-bit hex ids, so they share the column). This is the
+    authoritative list behind the in-memory filter each worker checks; rows
+    are useless once `expires_at` passes and are purged.
+    """
+    __tablename__ = "revoked_tokens"
+
+    # Increasing, so workers can pick up new revocations with `id > last seen`
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(32), nullable=False, unique=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now())
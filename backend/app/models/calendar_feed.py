@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from app.db import Base
+
+class CalendarFeed(Base):
+    """
+    A secret iCalendar feed URL. Calendar apps can't log in, so the token in
+    the URL is the credential; only its SHA-256 is stored. A feed without a
+    team covers every team the user is in.
+    """
+    __tablename__ = "calendar_feeds"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    # Not a foreign key: the team may live on another shard
+    team_id = Column(Integer, nullable=True)
+    token_hash = Column(String(64), nullable=False, unique=True, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,52 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, text
+from sqlalchemy.sql import func
+from app.db import Base
+
+class ChatChannel(Base):
+    """A team's chat room (project_id NULL), or one per project of the team."""
+    __tablename__ = "chat_channels"
+
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False, index=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=True)
+    name = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint('team_id', 'project_id', name='_chat_channel_team_project_uc'),
+        # NULLs are distinct in the constraint above, so one team channel per team needs its own index
+        Index(
+            'uq_chat_channels_team_channel', 'team_id', unique=True,
+            postgresql_where=text('project_id IS NULL'), sqlite_where=text('project_id IS NULL'),
+        ),
+    )
+
+class ChatMessage(Base):
+    """
+    One chat message. Append-only and written in batches by the chat hub (see
+    app/utils/chat.py). On PostgreSQL the table is partitioned by month of
+    created_at (see the migration; the chat writer thread creates upcoming
+    months), so old months can be detached or dropped without touching
+    recent ones.
+    """
+    __tablename__ = "chat_messages"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    channel_id = Column(Integer, ForeignKey("chat_channels.id", ondelete="CASCADE"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    body = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        # History pages and "everything after my read marker" are range scans on this
+        Index('ix_chat_messages_channel_id_id', 'channel_id', 'id'),
+    )
+
+class ChatReadMarker(Base):
+    """The newest message a user has read in a channel; only ever moves forward."""
+    __tablename__ = "chat_read_markers"
+
+    channel_id = Column(Integer, ForeignKey("chat_channels.id", ondelete="CASCADE"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_read_id = Column(BigInteger().with_variant(Integer, "sqlite"), nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,45 @@
+import enum
+from sqlalchemy import Column, Integer, String, DateTime, Enum, ForeignKey
+from sqlalchemy.sql import func
+from app.db import Base
+
+class DeletionTargetEnum(enum.Enum):
+    team = "team"
+    project = "project"
+
+class DeletionJobStatusEnum(enum.Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+class DeletionJob(Base):
+    """
+    Progress of a team or project being deleted in the background, a chunk of
+    rows per transaction. Kept in the database so any worker can report on it.
+    """
+    __tablename__ = "deletion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    target_type = Column(Enum(DeletionTargetEnum), nullable=False)
+    # Not a foreign key: the target is gone by the time the job finishes
+    target_id = Column(Integer, nullable=False)
+    requested_by_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+
+    status = Column(Enum(DeletionJobStatusEnum), nullable=False, default=DeletionJobStatusEnum.pending)
+    total_rows = Column(Integer, nullable=False, default=0)
+    deleted_rows = Column(Integer, nullable=False, default=0)
+    error = Column(String, nullable=True)
+    # Runs started so far; a job that keeps failing is given up after MAX_ATTEMPTS (app/utils/deletion.py)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Refreshed with every chunk; a running job that stops refreshing it has lost its worker
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    @property
+    def progress(self) -> float:
+        if self.status == DeletionJobStatusEnum.completed:
+            return 1.0
+        return min(self.deleted_rows / self.total_rows, 1.0) if self.total_rows else 0.0
@@ -9,13 +9,31 @@ class FriendshipStatusEnum(enum.Enum):
     accepted = "accepted"
     blocked = "blocked" # For future features like blocking users
 
+def canonical_pair(user_a: int, user_b: int) -> tuple[int, int]:
+    """Orders two user ids as (low, high) so a pair has exactly one representation."""
+    return (user_a, user_b) if user_a < user_b else (user_b, user_a)
+
+def _pair_low_default(context):
+    params = context.get_current_parameters()
+    return min(params["requester_id"], params["addressee_id"])
+
+def _pair_high_default(context):
+    params = context.get_current_parameters()
+    return max(params["requester_id"], params["addressee_id"])
+
 class Friendship(Base):
     __tablename__ = "friendships"
 
     id = Column(Integer, primary_key=True, index=True)
 
-    requester_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    addressee_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    requester_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    addressee_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # Canonical (low, high) ordering of the two user ids, filled in on insert.
+    # A pair is found with one index seek and (a, b) / (b, a) can't both exist.
+    user_low_id = Column(Integer, nullable=False, default=_pair_low_default)
+    user_high_id = Column(Integer, nullable=False, default=_pair_high_default)
+
     status = Column(Enum(FriendshipStatusEnum), nullable=False, default=FriendshipStatusEnum.pending)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
@@ -23,7 +41,7 @@ class Friendship(Base):
     requester = relationship("User", foreign_keys=[requester_id], back_populates="sent_friend_requests")
     addressee = relationship("User", foreign_keys=[addressee_id], back_populates="received_friend_requests")
 
-    # Ensures a user can't send a request to the same person twice
+    # Ensures only one friendship row can exist between two users, in either direction
     __table_args__ = (
-        UniqueConstraint('requester_id', 'addressee_id', name='_requester_addressee_uc'),
+        UniqueConstraint('user_low_id', 'user_high_id', name='_friendship_pair_uc'),
     )
\ No newline at end of file
@@ -1,6 +1,6 @@
 import enum
 # 1. Import 'Enum' from sqlalchemy alongside the other types
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -20,10 +20,18 @@ class Milestone(Base):
     
     # 2. This line will now work correctly because 'Enum' is imported
     status = Column(Enum(MilestoneStatusEnum), nullable=False, default=MilestoneStatusEnum.upcoming)
+    # Optimistic-concurrency counter, as on projects
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Foreign Key to the project this milestone belongs to
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
 
     # Relationship back to the project
     project = relationship("Project", back_populates="milestones")
 
+    # Serves the timeline's "milestones of these projects due in this range" scan
+    __table_args__ = (
+        Index('ix_milestones_project_id_due_date', 'project_id', 'due_date'),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
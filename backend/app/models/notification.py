@@ -0,0 +1,38 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.db import Base
+
+class Notification(Base):
+    """
+    One entry in a user's inbox. Events are fanned out when they happen: one
+    row per recipient, written in batches (see app/utils/notifications.py), so
+    reading an inbox never has to look at teams, friendships or tasks.
+    """
+    __tablename__ = "notifications"
+
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(String, nullable=False)  # "team_invitation", "friend_request", "task_assigned"
+    actor_id = Column(Integer, nullable=True)
+    # What the notification is about; no foreign keys, as these may live on another shard
+    team_id = Column(Integer, nullable=True)
+    entity_type = Column(String, nullable=True)
+    entity_id = Column(Integer, nullable=True)
+    payload = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    read_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Keyset pagination of an inbox, newest first
+        Index('ix_notifications_user_id_id', 'user_id', 'id'),
+    )
+
+class NotificationCounter(Base):
+    """
+    A user's number of unread notifications, kept up to date in the same
+    transaction as every insert and mark-read, so the badge is one key lookup.
+    """
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0, server_default="0")
@@ -0,0 +1,26 @@
+import enum
+from sqlalchemy import Column, Integer, String, DateTime, Enum, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db import Base
+
+class OTPPurposeEnum(enum.Enum):
+    signup = "signup"
+    password_reset = "password_reset"
+
+class OneTimePassword(Base):
+    __tablename__ = "otp_codes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, nullable=False)
+    purpose = Column(Enum(OTPPurposeEnum), nullable=False)
+
+    # Only an HMAC of the code is stored, never the code itself
+    code_hash = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # One live code per email and purpose; re-sending replaces it
+    __table_args__ = (
+        UniqueConstraint('email', 'purpose', name='_otp_email_purpose_uc'),
+    )
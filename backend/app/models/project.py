@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -20,18 +20,26 @@ class Project(Base):
     status = Column(Enum(ProjectStatusEnum), nullable=False, default=ProjectStatusEnum.active)
     due_date = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped on every change; edits can name the version they were made against
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Foreign Key to the team that owns the project
-    team_id = Column(Integer, ForeignKey("teams.id"), nullable=False)
+    team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
 
     # --- RELATIONSHIPS ---
     # The team object this project belongs to
     team = relationship("Team", back_populates="projects")
     
     # The list of tasks within this project (for Module 4)
-    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan")
+    tasks = relationship("Task", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
     
     # --- NEW: Relationship to Milestones ---
     # A project can have multiple milestones associated with it.
-    milestones = relationship("Milestone", back_populates="project", cascade="all, delete-orphan")
+    milestones = relationship("Milestone", back_populates="project", cascade="all, delete-orphan", passive_deletes=True)
+
+    # Serves the timeline's "projects of these teams due in this range" scan
+    __table_args__ = (
+        Index('ix_projects_team_id_due_date', 'team_id', 'due_date'),
+    )
+    __mapper_args__ = {"version_id_col": version}
 
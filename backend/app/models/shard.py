@@ -0,0 +1,33 @@
+import enum
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Enum
+from sqlalchemy.sql import func
+from app.db import Base
+
+class TeamShardStateEnum(enum.Enum):
+    active = "active"
+    moving = "moving"
+
+class TeamShard(Base):
+    """
+    Shard directory: which database holds a team and everything under it.
+    Lives on the primary. Teams without an entry are on the "default" shard.
+    """
+    __tablename__ = "team_shards"
+
+    # Not a foreign key: the team row itself lives on the shard
+    team_id = Column(Integer, primary_key=True)
+    shard = Column(String, nullable=False, index=True)
+    # While moving, the team's rows can be read but not written
+    state = Column(Enum(TeamShardStateEnum), nullable=False, default=TeamShardStateEnum.active)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class IdBlock(Base):
+    """
+    Next free id of a sharded table. Ids are handed out from here in blocks,
+    so rows created on different shards never collide and keep their ids when
+    a team is moved.
+    """
+    __tablename__ = "id_blocks"
+
+    table_name = Column(String, primary_key=True)
+    next_id = Column(BigInteger, nullable=False)
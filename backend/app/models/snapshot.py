@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, Date, ForeignKey
+from app.db import Base
+
+class TaskStatusSnapshot(Base):
+    """
+    Task counts by status for one project (or milestone) on one day, written
+    nightly by snapshot_tasks.py. Burndown and velocity charts read a few
+    hundred of these rows instead of replaying every task's history.
+    """
+    __tablename__ = "task_status_snapshots"
+
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True)
+    # 0 for the whole project. Tasks aren't linked to milestones, so a
+    # milestone's row counts the project's tasks due on or before its due date.
+    milestone_id = Column(Integer, primary_key=True, default=0, server_default="0")
+    snapshot_date = Column(Date, primary_key=True, index=True)
+
+    todo = Column(Integer, nullable=False, default=0)
+    in_progress = Column(Integer, nullable=False, default=0)
+    done = Column(Integer, nullable=False, default=0)
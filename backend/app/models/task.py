@@ -1,5 +1,5 @@
 import enum
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Text, Index, UniqueConstraint, CheckConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db import Base
@@ -27,20 +27,53 @@ class Task(Base):
     status = Column(Enum(TaskStatusEnum), nullable=False, default=TaskStatusEnum.todo)
     priority = Column(Enum(TaskPriorityEnum), nullable=False, default=TaskPriorityEnum.medium)
     due_date = Column(DateTime(timezone=True), nullable=True)
+    # Planned effort in days; drives the critical-path schedule
+    estimated_days = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Foreign Keys
-    project_id = Column(Integer, ForeignKey("projects.id"), nullable=False)
-    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    project_id = Column(Integer, ForeignKey("projects.id", ondelete="CASCADE"), nullable=False)
+    assignee_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
 
     # Relationships
     project = relationship("Project", back_populates="tasks")
     assignee = relationship("User", back_populates="tasks_assigned", foreign_keys=[assignee_id])
-    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
-    attachments = relationship("Attachment", back_populates="task", cascade="all, delete-orphan")
+    comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+    attachments = relationship("Attachment", back_populates="task", cascade="all, delete-orphan", passive_deletes=True)
+    dependencies = relationship(
+        "TaskDependency", foreign_keys="[TaskDependency.task_id]", back_populates="task",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+    dependents = relationship(
+        "TaskDependency", foreign_keys="[TaskDependency.depends_on_id]", back_populates="depends_on",
+        cascade="all, delete-orphan", passive_deletes=True
+    )
+
+    # Serves the timeline's "tasks of these projects due in this range" scan
+    __table_args__ = (
+        Index('ix_tasks_project_id_due_date', 'project_id', 'due_date'),
+    )
 
 # --- Supporting Models for Tasks ---
 
+class TaskDependency(Base):
+    """`task` can't start until `depends_on` is finished. Both tasks belong to the same project."""
+    __tablename__ = "task_dependencies"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    depends_on_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    task = relationship("Task", foreign_keys=[task_id], back_populates="dependencies")
+    depends_on = relationship("Task", foreign_keys=[depends_on_id], back_populates="dependents")
+
+    __table_args__ = (
+        UniqueConstraint('task_id', 'depends_on_id', name='_task_depends_on_uc'),
+        CheckConstraint('task_id <> depends_on_id', name='_task_not_self_dependent_ck'),
+    )
+
 class Comment(Base):
     __tablename__ = "comments"
     
@@ -49,8 +82,8 @@ class Comment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Foreign Keys
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Relationships
     user = relationship("User", back_populates="comments")
@@ -65,8 +98,8 @@ class Attachment(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Foreign Keys
-    uploader_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
+    uploader_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id", ondelete="CASCADE"), nullable=False, index=True)
 
     # Relationships
     uploader = relationship("User", back_populates="attachments")
@@ -22,12 +22,14 @@ class Team(Base):
     name = Column(String, index=True, nullable=False)
     description = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    owner_id = Column(Integer, ForeignKey("users.id"))
+    owner_id = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"))
 
     # Relationships
+    # Children are removed by ON DELETE CASCADE in the database; passive_deletes
+    # stops the ORM from loading every one of them just to delete it row by row
     owner = relationship("User", back_populates="owned_teams")
-    members = relationship("TeamMember", back_populates="team", cascade="all, delete-orphan")
-    projects = relationship("Project", back_populates="team", cascade="all, delete-orphan")
+    members = relationship("TeamMember", back_populates="team", cascade="all, delete-orphan", passive_deletes=True)
+    projects = relationship("Project", back_populates="team", cascade="all, delete-orphan", passive_deletes=True)
 
     __table_args__ = (
         UniqueConstraint('name', 'owner_id', name='_team_name_owner_uc'),
@@ -43,12 +45,16 @@ class TeamMember(Base):
     id = Column(Integer, primary_key=True, index=True)
     # --- END FIX ---
 
-    user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
-    team_id = Column(Integer, ForeignKey('teams.id'), nullable=False)
+    user_id = Column(Integer, ForeignKey('users.id', ondelete="CASCADE"), nullable=False, index=True)
+    team_id = Column(Integer, ForeignKey('teams.id', ondelete="CASCADE"), nullable=False, index=True)
     role = Column(Enum(TeamRoleEnum), nullable=False, default=TeamRoleEnum.member)
     status = Column(Enum(InvitationStatusEnum), nullable=False, default=InvitationStatusEnum.pending)
     joined_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Optimistic-concurrency counter for role changes, as on projects
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Relationships
     user = relationship("User", back_populates="teams")
-    team = relationship("Team", back_populates="members")
\ No newline at end of file
+    team = relationship("Team", back_populates="members")
+
+    __mapper_args__ = {"version_id_col": version}
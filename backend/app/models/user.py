@@ -14,29 +14,29 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     is_active = Column(Boolean, default=False)
-    otp = Column(String, nullable=True)
-    otp_expires_at = Column(DateTime(timezone=True), nullable=True)
 
     # --- TEAM RELATIONSHIPS ---
-    owned_teams = relationship("Team", back_populates="owner", foreign_keys="[Team.owner_id]")
-    teams = relationship("TeamMember", back_populates="user", cascade="all, delete-orphan")
+    owned_teams = relationship("Team", back_populates="owner", foreign_keys="[Team.owner_id]", passive_deletes=True)
+    teams = relationship("TeamMember", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
 
     # --- PROJECT/TASK RELATIONSHIPS ---
-    tasks_assigned = relationship("Task", back_populates="assignee", foreign_keys="[Task.assignee_id]")
-    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan")
-    attachments = relationship("Attachment", back_populates="uploader", foreign_keys="[Attachment.uploader_id]")
+    tasks_assigned = relationship("Task", back_populates="assignee", foreign_keys="[Task.assignee_id]", passive_deletes=True)
+    comments = relationship("Comment", back_populates="user", cascade="all, delete-orphan", passive_deletes=True)
+    attachments = relationship("Attachment", back_populates="uploader", foreign_keys="[Attachment.uploader_id]", passive_deletes=True)
 
     # --- NEW: FRIENDSHIP RELATIONSHIPS ---
     sent_friend_requests = relationship(
         "Friendship",
         foreign_keys="[Friendship.requester_id]",
         back_populates="requester",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
     received_friend_requests = relationship(
         "Friendship",
         foreign_keys="[Friendship.addressee_id]",
         back_populates="addressee",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
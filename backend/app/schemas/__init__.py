@@ -1,11 +1,12 @@
 # This file makes it easy to import all your Pydantic schemas from one place.
 
 # ... (existing user, team, and friendship imports) ...
-from .user import ( User, UserCreate, Token, TokenData, UsernameCheckRequest,
+from .user import ( User, UserCreate, Token, TokenData, TokenRefresh, LogoutRequest, UsernameCheckRequest,
     UsernameCheckResponse, OTPVerify, PasswordResetRequest, PasswordResetConfirm )
 from .team import ( TeamMemberBase, TeamMember, TeamMemberUpdate, Team, TeamCreate, TeamUpdate,
-    TeamInvite, InvitationResponse, TeamInvitation, InvitationConfirmation, TeamMemberPermissions )
-from .friendship import ( FriendRequestCreate, FriendRequestResponse, Friendship, PendingFriendRequest )
+    TeamInvite, InvitationResponse, TeamInvitation, InvitationConfirmation, TeamMemberPermissions, MyTeamRole )
+from .friendship import ( FriendRequestCreate, FriendRequestResponse, Friendship, PendingFriendRequest,
+    MutualFriends, FriendSuggestion )
 from .project import ( Project, ProjectCreate, ProjectUpdate )
 
 # --- NEW: Import schemas from your milestone schema file ---
@@ -14,18 +15,45 @@ from .milestone import (
     MilestoneCreate,
     MilestoneUpdate
 )
+from .dashboard import ( DashboardProject, DashboardTeam, DashboardBootstrap )
+from .timeline import ( TimelineItemKind, TimelineItem, TimelinePage )
+from .task import ( TaskDependencyCreate, TaskDependency, TaskScheduleEntry, ProjectSchedule )
+from .activity import ( ActivityEntry, ActivityPage, ActivityMetrics )
+from .deletion_job import ( DeletionJobCreate, DeletionJob )
+from .archive import ( ProjectArchiveStatus, ArchivedComment, ArchivedAttachment, ArchivedTask, ArchivedTaskPage )
+from .bulk_import import ( TaskImportRow, MilestoneImportRow, ImportRowError, ImportReport )
+from .notification import ( Notification, NotificationPage, UnreadCount, NotificationMarkRead, NotificationMarkReadResult )
+from .calendar_feed import ( CalendarFeedCreate, CalendarFeed, CalendarFeedCreated )
+from .workload import ( PriorityCounts, WorkloadTotals, MemberWorkload, TeamWorkload )
+from .burndown import ( BurndownPoint, BurndownSeries, VelocityForecast )
+from .chat import ( ChatChannelCreate, ChatChannel, ChatMessageCreate, ChatMessage, ChatMessagePage, ChatReadMarkerUpdate, ChatReadMarker )
+from .presence import ( OnlineMember, TeamPresence, PresenceHeartbeat )
 
 # You can optionally define __all__ to control what `from app.schemas import *` imports
 __all__ = [
     # ... (existing schemas) ...
-    "User", "UserCreate", "Token", "TokenData", "UsernameCheckRequest",
+    "User", "UserCreate", "Token", "TokenData", "TokenRefresh", "LogoutRequest", "UsernameCheckRequest",
     "UsernameCheckResponse", "OTPVerify", "PasswordResetRequest", "PasswordResetConfirm",
     "TeamMemberBase", "TeamMember", "TeamMemberUpdate", "Team", "TeamCreate", "TeamUpdate",
-    "TeamInvite", "InvitationResponse", "TeamInvitation", "InvitationConfirmation", "TeamMemberPermissions",
+    "TeamInvite", "InvitationResponse", "TeamInvitation", "InvitationConfirmation", "TeamMemberPermissions", "MyTeamRole",
     "FriendRequestCreate", "FriendRequestResponse", "Friendship", "PendingFriendRequest",
+    "MutualFriends", "FriendSuggestion",
     "Project", "ProjectCreate", "ProjectUpdate",
     
     # --- NEW: Add milestone schemas to __all__ ---
-    "Milestone", "MilestoneCreate", "MilestoneUpdate"
+    "Milestone", "MilestoneCreate", "MilestoneUpdate",
+    "DashboardProject", "DashboardTeam", "DashboardBootstrap",
+    "TimelineItemKind", "TimelineItem", "TimelinePage",
+    "TaskDependencyCreate", "TaskDependency", "TaskScheduleEntry", "ProjectSchedule",
+    "ActivityEntry", "ActivityPage", "ActivityMetrics",
+    "DeletionJobCreate", "DeletionJob",
+    "ProjectArchiveStatus", "ArchivedComment", "ArchivedAttachment", "ArchivedTask", "ArchivedTaskPage",
+    "TaskImportRow", "MilestoneImportRow", "ImportRowError", "ImportReport",
+    "Notification", "NotificationPage", "UnreadCount", "NotificationMarkRead", "NotificationMarkReadResult",
+    "CalendarFeedCreate", "CalendarFeed", "CalendarFeedCreated",
+    "PriorityCounts", "WorkloadTotals", "MemberWorkload", "TeamWorkload",
+    "BurndownPoint", "BurndownSeries", "VelocityForecast",
+    "ChatChannelCreate", "ChatChannel", "ChatMessageCreate", "ChatMessage", "ChatMessagePage", "ChatReadMarkerUpdate", "ChatReadMarker",
+    "OnlineMember", "TeamPresence", "PresenceHeartbeat",
 ]
 
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, Any
+from datetime import datetime
+
+# One recorded change
+class ActivityEntry(BaseModel):
+    id: int
+    occurred_at: datetime
+    actor_id: Optional[int] = None
+    team_id: Optional[int] = None
+    project_id: Optional[int] = None
+    entity_type: str
+    entity_id: Optional[int] = None
+    action: str
+    changes: Optional[dict[str, Any]] = None
+    model_config = ConfigDict(from_attributes=True)
+
+# A page of the feed, newest first; pass next_cursor back as `before` for older entries
+class ActivityPage(BaseModel):
+    items: List[ActivityEntry] = []
+    next_cursor: Optional[int] = None
+
+# Health of the in-memory buffer between request handlers and the log writer
+class ActivityMetrics(BaseModel):
+    buffered: int
+    capacity: int
+    fill_ratio: float
+    high_watermark: int
+    enqueued: int
+    written: int
+    dropped: int
+    failed_batches: int
+    last_flush_at: Optional[datetime] = None
+    last_flush_seconds: float
@@ -0,0 +1,53 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+
+from app.models.archive import ArchiveStateEnum
+from app.models.task import TaskStatusEnum, TaskPriorityEnum
+
+# Where a project's cold-storage move stands, and how much it took out of the hot tables
+class ProjectArchiveStatus(BaseModel):
+    project_id: int
+    state: ArchiveStateEnum
+    task_count: int
+    comment_count: int
+    attachment_count: int
+    dependency_count: int
+    raw_bytes: int
+    stored_bytes: int
+    archived_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+class ArchivedComment(BaseModel):
+    id: int
+    content: str
+    user_id: int
+    created_at: Optional[datetime] = None
+
+class ArchivedAttachment(BaseModel):
+    id: int
+    file_name: str
+    file_path: str
+    uploader_id: int
+    created_at: Optional[datetime] = None
+
+# A task as read back from cold storage (read-only)
+class ArchivedTask(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    status: TaskStatusEnum
+    priority: TaskPriorityEnum
+    due_date: Optional[datetime] = None
+    estimated_days: int
+    assignee_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    comments: List[ArchivedComment] = []
+    attachments: List[ArchivedAttachment] = []
+    depends_on: List[int] = []
+
+# One stored chunk of archived tasks; pass next_cursor back as `after` for the next
+class ArchivedTaskPage(BaseModel):
+    archive: ProjectArchiveStatus
+    items: List[ArchivedTask] = []
+    next_cursor: Optional[int] = None
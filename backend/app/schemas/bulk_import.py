@@ -0,0 +1,69 @@
+import enum
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List
+from datetime import datetime
+
+from app.models.task import TaskStatusEnum, TaskPriorityEnum
+from app.models.milestone import MilestoneStatusEnum
+
+def _normalized(text: str) -> str:
+    return text.strip().lower().replace(" ", "_").replace("-", "_")
+
+def _enum_member(enum_class: type[enum.Enum], value):
+    # Accept either the display value ("In Progress") or the name ("in_progress"), any case
+    if isinstance(value, str):
+        wanted = _normalized(value)
+        for member in enum_class:
+            if wanted in (_normalized(member.value), member.name):
+                return member
+    return value
+
+# One task row of an import file
+class TaskImportRow(BaseModel):
+    title: str = Field(min_length=1)
+    description: Optional[str] = None
+    status: TaskStatusEnum = TaskStatusEnum.todo
+    priority: TaskPriorityEnum = TaskPriorityEnum.medium
+    due_date: Optional[datetime] = None
+    estimated_days: int = Field(1, ge=0)
+    # Username or email of a member of the project's team
+    assignee: Optional[str] = None
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def _status(cls, value):
+        return _enum_member(TaskStatusEnum, value)
+
+    @field_validator("priority", mode="before")
+    @classmethod
+    def _priority(cls, value):
+        return _enum_member(TaskPriorityEnum, value)
+
+# One milestone row of an import file
+class MilestoneImportRow(BaseModel):
+    name: str = Field(min_length=1)
+    description: Optional[str] = None
+    due_date: datetime
+    status: MilestoneStatusEnum = MilestoneStatusEnum.upcoming
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def _status(cls, value):
+        return _enum_member(MilestoneStatusEnum, value)
+
+# Why one input row (1-based, not counting a CSV header) was rejected
+class ImportRowError(BaseModel):
+    row: int
+    errors: List[str] = []
+
+class ImportReport(BaseModel):
+    kind: str
+    dry_run: bool
+    method: str  # "copy" or "executemany"
+    total_rows: int
+    imported: int
+    failed: int
+    errors: List[ImportRowError] = []
+    errors_truncated: bool = False
+    seconds: float
+    rows_per_second: float
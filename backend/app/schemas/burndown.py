@@ -0,0 +1,32 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
+from datetime import date
+
+# Task counts by status on one day
+class BurndownPoint(BaseModel):
+    snapshot_date: date
+    todo: int
+    in_progress: int
+    done: int
+    model_config = ConfigDict(from_attributes=True)
+
+# Daily series for a project, or for a milestone (milestone_id > 0)
+class BurndownSeries(BaseModel):
+    project_id: int
+    milestone_id: int = 0
+    points: List[BurndownPoint] = []
+
+# Velocity over the last `days` days of snapshots and when "remaining" is projected to reach zero:
+# forecast_date at the current velocity, trend_forecast_date along the remaining-work trend line
+class VelocityForecast(BaseModel):
+    project_id: int
+    milestone_id: int = 0
+    days: int
+    remaining: Optional[int] = None
+    velocity_per_day: float
+    velocity_per_week: float
+    net_burn_per_day: float
+    forecast_date: Optional[date] = None
+    trend_forecast_date: Optional[date] = None
+    target_date: Optional[date] = None
+    on_track: Optional[bool] = None
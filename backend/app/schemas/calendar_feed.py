@@ -0,0 +1,17 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+# A feed of one team's deadlines, or (without team_id) of all the user's teams
+class CalendarFeedCreate(BaseModel):
+    team_id: Optional[int] = None
+
+class CalendarFeed(BaseModel):
+    id: int
+    team_id: Optional[int] = None
+    created_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+# Returned once, when the feed is created; the URL can't be shown again
+class CalendarFeedCreated(CalendarFeed):
+    url: str
@@ -0,0 +1,40 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List
+from datetime import datetime
+
+# Opens the team's channel, or a project's when project_id is given
+class ChatChannelCreate(BaseModel):
+    project_id: Optional[int] = None
+
+class ChatChannel(BaseModel):
+    id: int
+    team_id: int
+    project_id: Optional[int] = None
+    name: str
+    last_message_id: Optional[int] = None
+    last_read_id: int = 0
+    model_config = ConfigDict(from_attributes=True)
+
+class ChatMessageCreate(BaseModel):
+    body: str
+
+class ChatMessage(BaseModel):
+    id: int
+    channel_id: int
+    user_id: Optional[int] = None
+    body: str
+    created_at: datetime
+    model_config = ConfigDict(from_attributes=True)
+
+# A page of history, newest first; pass next_cursor back as `before` for older messages
+class ChatMessagePage(BaseModel):
+    items: List[ChatMessage] = []
+    next_cursor: Optional[int] = None
+    last_read_id: int = 0
+
+class ChatReadMarkerUpdate(BaseModel):
+    last_read_id: int = Field(..., ge=0)
+
+class ChatReadMarker(BaseModel):
+    channel_id: int
+    last_read_id: int
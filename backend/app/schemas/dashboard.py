@@ -0,0 +1,38 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+from app.models.project import ProjectStatusEnum
+from app.models.team import TeamRoleEnum
+from .user import User
+from .team import TeamInvitation, TeamPermissions
+from .friendship import PendingFriendRequest
+
+# Compact project listing (no tasks/milestones) for the dashboard cards
+class DashboardProject(BaseModel):
+    id: int
+    team_id: int
+    name: str
+    description: Optional[str] = None
+    status: ProjectStatusEnum
+    due_date: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+# A team the user belongs to, along with their role and the team's projects
+class DashboardTeam(BaseModel):
+    id: int
+    name: str
+    description: Optional[str] = None
+    owner_id: int
+    role: TeamRoleEnum
+    is_owner: bool
+    is_admin: bool
+    permissions: TeamPermissions
+    projects: List[DashboardProject] = []
+
+# Everything the dashboard needs on first load, in a single response
+class DashboardBootstrap(BaseModel):
+    user: User
+    teams: List[DashboardTeam] = []
+    pending_invitations: List[TeamInvitation] = []
+    friends: List[User] = []
+    pending_friend_requests: List[PendingFriendRequest] = []
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional
+from datetime import datetime
+
+from app.models.deletion_job import DeletionTargetEnum, DeletionJobStatusEnum
+
+# Request to delete a team or project in the background
+class DeletionJobCreate(BaseModel):
+    target_type: DeletionTargetEnum
+    target_id: int
+
+# Status of a background team/project deletion; progress runs from 0.0 to 1.0
+class DeletionJob(BaseModel):
+    id: int
+    target_type: DeletionTargetEnum
+    target_id: int
+    status: DeletionJobStatusEnum
+    total_rows: int
+    deleted_rows: int
+    progress: float
+    error: Optional[str] = None
+    attempts: int = 0
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
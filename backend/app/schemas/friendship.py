@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import Optional, List
 from app.models.friendship import FriendshipStatusEnum
 from .user import User # Import the full User schema for display
 
@@ -25,3 +25,16 @@ class PendingFriendRequest(BaseModel):
     requester: User # Show who sent the request
     status: FriendshipStatusEnum
     model_config = ConfigDict(from_attributes=True)
+
+class MutualFriends(BaseModel):
+    """Schema for the friends the current user has in common with another user."""
+    user_id: int
+    mutual_count: int
+    mutual_friends: List[User] = []
+
+class FriendSuggestion(BaseModel):
+    """Schema for a ranked friend-of-friend suggestion."""
+    user: User
+    mutual_friends: int
+    shared_teams: int
+    score: float
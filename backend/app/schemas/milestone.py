@@ -20,11 +20,14 @@ class MilestoneUpdate(BaseModel):
     description: Optional[str] = None
     due_date: Optional[datetime] = None
     status: Optional[MilestoneStatusEnum] = None
+    # Version being edited (409 if it has changed since)
+    version: Optional[int] = None
 
 # Full schema for representing a milestone in API responses
 class Milestone(MilestoneBase):
     id: int
     project_id: int
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
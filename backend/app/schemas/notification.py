@@ -0,0 +1,35 @@
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Any
+from datetime import datetime
+
+# One entry in the inbox
+class Notification(BaseModel):
+    id: int
+    kind: str
+    actor_id: Optional[int] = None
+    team_id: Optional[int] = None
+    entity_type: Optional[str] = None
+    entity_id: Optional[int] = None
+    payload: Optional[dict[str, Any]] = None
+    created_at: datetime
+    read_at: Optional[datetime] = None
+    model_config = ConfigDict(from_attributes=True)
+
+# A page of the inbox, newest first; pass next_cursor back as `before` for older entries
+class NotificationPage(BaseModel):
+    items: List[Notification] = []
+    next_cursor: Optional[int] = None
+    unread_count: int
+
+class UnreadCount(BaseModel):
+    unread_count: int
+
+# Which notifications to mark as read: the given ids, everything up to and
+# including `up_to` (e.g. the newest id on screen), or all of them if neither is set
+class NotificationMarkRead(BaseModel):
+    ids: Optional[List[int]] = Field(None, max_length=500)
+    up_to: Optional[int] = None
+
+class NotificationMarkReadResult(BaseModel):
+    marked: int
+    unread_count: int
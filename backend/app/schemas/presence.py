@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import List
+from datetime import datetime
+
+class OnlineMember(BaseModel):
+    user_id: int
+    username: str
+    last_seen: datetime
+
+class TeamPresence(BaseModel):
+    team_id: int
+    online: List[OnlineMember] = []
+
+# Tells clients how often to send heartbeats to stay online
+class PresenceHeartbeat(BaseModel):
+    online_for_seconds: float
@@ -19,12 +19,15 @@ class ProjectUpdate(BaseModel):
     description: Optional[str] = None
     due_date: Optional[datetime] = None
     status: Optional[ProjectStatusEnum] = None
+    # The version the edit was made against; a newer one on the server gives 409
+    version: Optional[int] = None
 
 # Full schema for representing a project in API responses
 class Project(ProjectBase):
     id: int
     team_id: int
     created_at: datetime
+    version: int
     tasks: List = []
     milestones: List[Milestone] = [] # 2. Add milestones to the response model
 
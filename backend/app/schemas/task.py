@@ -0,0 +1,31 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
+from datetime import datetime
+
+class TaskDependencyCreate(BaseModel):
+    depends_on_id: int
+
+class TaskDependency(BaseModel):
+    id: int
+    task_id: int
+    depends_on_id: int
+    model_config = ConfigDict(from_attributes=True)
+
+# Where one task sits in the project's critical-path schedule (all values in days)
+class TaskScheduleEntry(BaseModel):
+    task_id: int
+    duration: int
+    earliest_start: int
+    earliest_finish: int
+    slack: int
+    is_critical: bool
+    due_date: Optional[datetime] = None
+    projected_finish: datetime
+    is_late: bool
+
+class ProjectSchedule(BaseModel):
+    project_id: int
+    makespan_days: int
+    order: List[int] = []
+    critical_path: List[int] = []
+    tasks: List[TaskScheduleEntry] = []
@@ -29,6 +29,8 @@ class TeamUpdate(BaseModel):
 
 class TeamMemberUpdate(BaseModel):
     role: TeamRoleEnum
+    # Version being edited (409 if it has changed since)
+    version: Optional[int] = None
 
 class InvitationResponse(BaseModel):
     accept: bool
@@ -38,6 +40,7 @@ class TeamMember(TeamMemberBase):
     id: int
     user: UserBase
     status: InvitationStatusEnum
+    version: int
     model_config = ConfigDict(from_attributes=True)
 
 class Team(TeamCreate):
@@ -63,6 +66,14 @@ class TeamPermissions(BaseModel):
     can_delete_team: bool
     can_manage_settings: bool
 
+# One entry of GET /teams/my-roles
+class MyTeamRole(BaseModel):
+    team_id: int
+    role: TeamRoleEnum
+    is_owner: bool
+    is_admin: bool
+    permissions: TeamPermissions
+
 class TeamMemberPermissions(BaseModel):
     user_id: int
     role: TeamRoleEnum
@@ -0,0 +1,24 @@
+import enum
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class TimelineItemKind(str, enum.Enum):
+    milestone = "milestone"
+    project = "project"
+    task = "task"
+
+# One dated entry on the cross-team timeline
+class TimelineItem(BaseModel):
+    kind: TimelineItemKind
+    id: int
+    title: str
+    due_date: datetime
+    status: str
+    project_id: int
+    team_id: int
+
+# A page of timeline entries; pass next_cursor back as `after` to continue
+class TimelinePage(BaseModel):
+    items: List[TimelineItem] = []
+    next_cursor: Optional[str] = None
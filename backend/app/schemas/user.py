@@ -4,6 +4,16 @@ from typing import Optional
 class Token(BaseModel):
     access_token: str
     token_type: str
+    # Swap for a new pair at /auth/refresh before the access token's expires_in seconds run out
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None
+
+class TokenRefresh(BaseModel):
+    refresh_token: str
+
+# Revokes the current access token, and the refresh token's whole login if one is given
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 class TokenData(BaseModel):
     username: Optional[str] = None
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+from app.models.team import TeamRoleEnum
+
+class PriorityCounts(BaseModel):
+    high: int = 0
+    medium: int = 0
+    low: int = 0
+
+# A member's open tasks across every team they belong to, this one included
+class WorkloadTotals(BaseModel):
+    open_tasks: int = 0
+    high: int = 0
+    overdue: int = 0
+    due_soon: int = 0
+    teams: int = 0
+
+# One member's open (not done) tasks in the team's projects
+class MemberWorkload(BaseModel):
+    user_id: int
+    username: str
+    full_name: Optional[str] = None
+    role: TeamRoleEnum
+    open_tasks: int
+    by_priority: PriorityCounts
+    in_progress: int
+    overdue: int
+    due_soon: int
+    next_due_date: Optional[datetime] = None
+    projects: int
+    all_teams: WorkloadTotals = WorkloadTotals()
+
+# Members ordered most loaded first; may be up to a few seconds old (see computed_at)
+class TeamWorkload(BaseModel):
+    team_id: int
+    computed_at: datetime
+    members: List[MemberWorkload] = []
@@ -0,0 +1,58 @@
+import os
+import sys
+import tempfile
+
+# Every test runs against one throwaway SQLite file unless DATABASE_URL points
+# somewhere else. A file rather than sqlite://, so separate connections (and
+# threads) see the same data. Set before anything imports app.db.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'tests.db')}")
+
+# Lets `app` be imported whichever directory pytest is started from
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.core.security import get_current_user
+from app.db import Base, SessionLocal, engine
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    """Creates the tables once for the whole run."""
+    Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def make_user(db):
+    """Creates an active user named `username` and returns it, loaded and detached."""
+    def make(username: str) -> models.User:
+        user = models.User(username=username, email=f"{username}@example.com", password="x", is_active=True)
+        db.add(user)
+        db.commit()
+        db.refresh(user)
+        db.expunge(user)
+        return user
+    return make
+
+
+@pytest.fixture
+def client_as():
+    """A TestClient for the whole app with `user` logged in, without going through tokens."""
+    from app.main import create_app
+
+    def client(user: models.User) -> TestClient:
+        app = create_app()
+        app.dependency_overrides[get_current_user] = lambda: user
+        return TestClient(app)
+    return client
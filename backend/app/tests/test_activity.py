@@ -0,0 +1,74 @@
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import create_app
+from app.utils.activity import activity_writer, set_actor
+
+
+def _project_with_history(db, owner) -> models.Project:
+    """A team and project created as `owner`, whose tasks are added and one renamed, with the log written."""
+    set_actor(db, owner.id)
+    team = models.Team(name="act team", owner_id=owner.id)
+    db.add(team)
+    db.flush()
+    db.add(models.TeamMember(team_id=team.id, user_id=owner.id, role=models.TeamRoleEnum.admin,
+                             status=models.InvitationStatusEnum.accepted))
+    project = models.Project(name="act project", team_id=team.id)
+    db.add(project)
+    db.commit()
+    tasks = [models.Task(title=f"act {i}", project_id=project.id) for i in range(5)]
+    db.add_all(tasks)
+    db.commit()
+    db.refresh(tasks[0])
+    tasks[0].title = "act renamed"
+    db.commit()
+    activity_writer.flush()
+    return project
+
+
+def test_project_feed_pages_newest_first(db, make_user, client_as):
+    owner = make_user("act_owner")
+    project = _project_with_history(db, owner)
+    client = client_as(owner)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"before": cursor} if cursor is not None else {})}
+        page = client.get(f"/activity/projects/{project.id}", params=params).json()
+        assert len(page["items"]) <= 2
+        seen += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    # Project created, five tasks added, one renamed; each exactly once, newest first
+    ids = [entry["id"] for entry in seen]
+    assert ids == sorted(ids, reverse=True) and len(set(ids)) == len(ids) == 7
+    assert (seen[0]["entity_type"], seen[0]["action"]) == ("tasks", "updated")
+    assert seen[0]["changes"] == {"title": ["act 0", "act renamed"]}
+    assert (seen[-1]["entity_type"], seen[-1]["action"]) == ("projects", "created")
+    assert {entry["actor_id"] for entry in seen} == {owner.id}
+    # Task events only knew their project; the writer filled in the team
+    assert {entry["team_id"] for entry in seen} == {project.team_id}
+
+
+def test_team_feed_includes_its_projects_and_is_members_only(db, make_user, client_as):
+    owner, stranger = make_user("act_team_owner"), make_user("act_team_stranger")
+    project = _project_with_history(db, owner)
+
+    feed = client_as(owner).get(f"/activity/teams/{project.team_id}", params={"limit": 200}).json()
+    kinds = {(entry["entity_type"], entry["action"]) for entry in feed["items"]}
+    assert {("teams", "created"), ("team_members", "created"), ("projects", "created"), ("tasks", "updated")} <= kinds
+
+    outsider = client_as(stranger)
+    assert outsider.get(f"/activity/teams/{project.team_id}").status_code == 404
+    assert outsider.get(f"/activity/projects/{project.id}").status_code == 404
+
+
+def test_writer_metrics_are_an_operator_endpoint(make_user, client_as):
+    # No longer handed to any logged-in user under the API
+    assert client_as(make_user("act_metrics_user")).get("/activity/metrics").status_code == 404
+
+    metrics = TestClient(create_app()).get("/metrics/activity")
+    assert metrics.status_code == 200
+    assert {"buffered", "capacity", "dropped", "written"} <= metrics.json().keys()
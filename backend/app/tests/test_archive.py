@@ -0,0 +1,90 @@
+from app import models
+from app.utils import archive
+
+
+def _project(db, owner, name: str, status=models.ProjectStatusEnum.on_hold) -> models.Project:
+    team = models.Team(name=name, owner_id=owner.id)
+    db.add(team)
+    db.flush()
+    db.add(models.TeamMember(team_id=team.id, user_id=owner.id, role=models.TeamRoleEnum.admin,
+                             status=models.InvitationStatusEnum.accepted))
+    project = models.Project(name=f"{name} project", team_id=team.id, status=status)
+    db.add(project)
+    db.commit()
+    return project
+
+
+def _hot_tasks(db, project_id: int) -> list[models.Task]:
+    db.expire_all()
+    return db.query(models.Task).filter(models.Task.project_id == project_id).order_by(models.Task.id).all()
+
+
+def test_archive_and_restore_round_trip(db, make_user, client_as):
+    owner, commenter = make_user("arc_owner"), make_user("arc_commenter")
+    project = _project(db, owner, "arc round trip")
+    tasks = [models.Task(title=f"arc {i}", project_id=project.id, assignee_id=commenter.id) for i in range(5)]
+    db.add_all(tasks)
+    db.flush()
+    # A chain, so every chunk holds tasks whose blockers are in another chunk
+    db.add_all([models.TaskDependency(task_id=later.id, depends_on_id=earlier.id) for earlier, later in zip(tasks, tasks[1:])])
+    db.add_all([
+        models.Comment(content="by the owner", user_id=owner.id, task_id=tasks[0].id),
+        models.Comment(content="by the commenter", user_id=commenter.id, task_id=tasks[0].id),
+        models.Attachment(file_name="spec.pdf", file_path="s3://spec.pdf", uploader_id=owner.id, task_id=tasks[3].id),
+    ])
+    db.commit()
+    task_ids = [task.id for task in tasks]
+    client = client_as(owner)
+
+    chunk_size = archive.CHUNK_SIZE
+    archive.CHUNK_SIZE = 2
+    try:
+        archived = client.post(f"/projects/{project.id}/archive")
+    finally:
+        archive.CHUNK_SIZE = chunk_size
+    assert archived.status_code == 202
+    assert _hot_tasks(db, project.id) == []
+
+    items, cursor, pages = [], None, 0
+    while True:
+        page = client.get(f"/projects/{project.id}/archive", params={"after": cursor} if cursor is not None else {}).json()
+        items += page["items"]
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    status = page["archive"]
+    assert (status["state"], status["task_count"], status["comment_count"], status["dependency_count"]) == ("archived", 5, 2, 4)
+    assert pages == 3 and sorted(item["id"] for item in items) == task_ids
+    by_id = {item["id"]: item for item in items}
+    assert by_id[task_ids[4]]["depends_on"] == [task_ids[3]]
+    assert [a["file_name"] for a in by_id[task_ids[3]]["attachments"]] == ["spec.pdf"]
+
+    # Deleted while archived: the restore does what ON DELETE would have done
+    db.query(models.User).filter(models.User.id == commenter.id).delete()
+    db.commit()
+
+    assert client.post(f"/projects/{project.id}/restore").status_code == 202
+    restored = _hot_tasks(db, project.id)
+    assert [task.id for task in restored] == task_ids
+    assert {task.assignee_id for task in restored} == {None}
+    assert [c.content for c in db.query(models.Comment).filter(models.Comment.task_id == task_ids[0])] == ["by the owner"]
+    assert db.query(models.TaskDependency).filter(models.TaskDependency.task_id.in_(task_ids)).count() == 4
+    assert db.get(models.Project, project.id).status == models.ProjectStatusEnum.on_hold
+    assert db.get(models.ProjectArchive, project.id) is None
+    assert db.query(models.ProjectArchiveChunk).filter(models.ProjectArchiveChunk.project_id == project.id).count() == 0
+
+
+def test_project_archived_before_cold_storage_can_be_restored(db, make_user, client_as):
+    owner = make_user("arc_legacy")
+    project = _project(db, owner, "arc legacy", status=models.ProjectStatusEnum.archived)
+    db.add(models.Task(title="arc legacy task", project_id=project.id))
+    db.commit()
+    client = client_as(owner)
+
+    assert client.get(f"/projects/{project.id}/archive").status_code == 404
+    assert client.post(f"/projects/{project.id}/restore").status_code == 202
+    db.expire_all()
+    assert db.get(models.Project, project.id).status == models.ProjectStatusEnum.active
+    assert [task.title for task in _hot_tasks(db, project.id)] == ["arc legacy task"]
+    assert db.get(models.ProjectArchive, project.id) is None
@@ -0,0 +1,100 @@
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from app import models
+from app.utils.burndown import take_snapshot, velocity_forecast
+
+START = date(2030, 1, 1)
+
+
+def _series(*points):
+    """(day offset, todo, in_progress, done) tuples as snapshot rows."""
+    return [
+        SimpleNamespace(snapshot_date=START + timedelta(days=day), todo=todo, in_progress=in_progress, done=done)
+        for day, todo, in_progress, done in points
+    ]
+
+
+def test_missing_days_carry_the_previous_counts_forward():
+    # The runs on days 1 and 2 were skipped; three tasks were done by day 3
+    forecast = velocity_forecast(_series((0, 6, 0, 0), (3, 2, 1, 3)), window=30)
+    assert forecast["days"] == 4
+    assert forecast["remaining"] == 3
+    # Three finished over three day-to-day steps, not over the one step between rows
+    assert forecast["velocity_per_day"] == 1.0
+    assert forecast["velocity_per_week"] == 7.0
+    assert forecast["forecast_date"] == START + timedelta(days=6)
+
+
+def test_net_burn_is_the_slope_of_remaining():
+    forecast = velocity_forecast(_series((0, 10, 0, 0), (1, 6, 2, 2), (2, 4, 2, 4), (3, 4, 0, 6)), window=30)
+    assert forecast["net_burn_per_day"] == 2.0
+    assert forecast["trend_forecast_date"] == START + timedelta(days=5)
+
+
+def test_added_scope_slows_the_trend_but_not_velocity():
+    # One task finished and one added every day
+    forecast = velocity_forecast(_series(*((day, 5, 0, day) for day in range(5))), window=30)
+    assert forecast["velocity_per_day"] == 1.0
+    assert forecast["net_burn_per_day"] == 0.0
+    assert forecast["forecast_date"] == START + timedelta(days=9)
+    assert forecast["trend_forecast_date"] is None
+
+
+def test_only_the_last_window_days_count():
+    # Fast at first, then stalled for the last five days
+    points = [(day, 10 - 2 * day, 0, 2 * day) for day in range(4)] + [(day, 4, 0, 6) for day in range(4, 9)]
+    forecast = velocity_forecast(_series(*points), window=5)
+    assert forecast["days"] == 5
+    assert forecast["velocity_per_day"] == 0.0
+    assert forecast["forecast_date"] is None
+
+
+def test_on_track_against_the_target():
+    series = _series((0, 4, 0, 0), (1, 3, 0, 1), (2, 2, 0, 2))
+    assert velocity_forecast(series, 30, target=START + timedelta(days=4))["on_track"] is True
+    assert velocity_forecast(series, 30, target=START + timedelta(days=3))["on_track"] is False
+    assert velocity_forecast(series, 30)["on_track"] is None
+    # Nothing left: on track whatever the date, and finished on the last day
+    finished = velocity_forecast(_series((0, 1, 0, 0), (1, 0, 0, 1)), 30, target=START)
+    assert finished["on_track"] is True
+    assert finished["forecast_date"] == finished["trend_forecast_date"] == START + timedelta(days=1)
+    # Stalled: no forecast, so not on track
+    assert velocity_forecast(_series((0, 2, 0, 0), (1, 2, 0, 0)), 30, target=START + timedelta(days=99))["on_track"] is False
+
+
+def test_too_little_history():
+    assert velocity_forecast([], 30)["days"] == 0
+    single = velocity_forecast(_series((0, 3, 1, 2)), 30)
+    assert (single["days"], single["remaining"], single["forecast_date"]) == (1, 4, None)
+
+
+def test_snapshot_day_is_the_utc_date(db):
+    team = models.Team(name="burndown")
+    db.add(team)
+    db.flush()
+    project = models.Project(name="burndown", team_id=team.id)
+    db.add(project)
+    db.commit()
+    project_id = project.id
+
+    # A server fourteen hours ahead of UTC is on tomorrow's date for most of the day
+    previous = os.environ.get("TZ")
+    os.environ["TZ"] = "Etc/GMT-14"
+    time.tzset()
+    try:
+        take_snapshot()
+    finally:
+        if previous is None:
+            del os.environ["TZ"]
+        else:
+            os.environ["TZ"] = previous
+        time.tzset()
+
+    days = db.query(models.TaskStatusSnapshot.snapshot_date).filter(
+        models.TaskStatusSnapshot.project_id == project_id
+    ).all()
+    assert days == [(datetime.now(timezone.utc).date(),)]
+
@@ -0,0 +1,116 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app import models
+from app.db import engine
+from app.main import create_app
+from app.utils.calendar_feed import _escape, _fold, calendar_cache, hash_token
+
+DUE = datetime(2030, 3, 14, 12, 0, tzinfo=timezone.utc)
+
+
+def test_escape():
+    assert _escape(r"a,b;c\d") == r"a\,b\;c\\d"
+    assert _escape("one\r\ntwo\nthree") == "one\\ntwo\\nthree"
+
+
+def test_fold_keeps_lines_short_and_utf8_whole():
+    line = "DESCRIPTION:" + "Überprüfung der Maßnahmen; " * 10
+    folded = _fold(line)
+    parts = folded.split("\r\n")
+    assert len(parts) > 1
+    assert all(len(part.encode()) <= 75 for part in parts)
+    assert all(part.startswith(" ") for part in parts[1:])
+    # Unfolding (dropping CRLF + space) gives the line back
+    assert folded.replace("\r\n ", "") == line
+    assert _fold("SUMMARY:short") == "SUMMARY:short"
+
+
+def _seed(db):
+    """A team with one milestone and two dated tasks, one assigned to the feed's owner; returns the task ids."""
+    owner = models.User(username="cal_owner", email="cal_owner@example.com", password="x", is_active=True)
+    other = models.User(username="cal_other", email="cal_other@example.com", password="x", is_active=True)
+    db.add_all([owner, other])
+    db.flush()
+    team = models.Team(name="Calendar team", owner_id=owner.id)
+    db.add(team)
+    db.flush()
+    db.add_all([
+        models.TeamMember(team_id=team.id, user_id=owner.id, role=models.TeamRoleEnum.admin,
+                          status=models.InvitationStatusEnum.accepted),
+        models.TeamMember(team_id=team.id, user_id=other.id, status=models.InvitationStatusEnum.accepted),
+    ])
+    project = models.Project(name="Launch", team_id=team.id)
+    db.add(project)
+    db.flush()
+    milestone = models.Milestone(name="Beta", due_date=DUE, project_id=project.id)
+    mine = models.Task(title="Write docs", due_date=DUE, project_id=project.id, assignee_id=owner.id)
+    theirs = models.Task(title="Fix bugs", due_date=DUE, project_id=project.id, assignee_id=other.id)
+    db.add_all([milestone, mine, theirs])
+    db.add(models.CalendarFeed(user_id=owner.id, team_id=None, token_hash=hash_token("user-feed")))
+    db.add(models.CalendarFeed(user_id=owner.id, team_id=team.id, token_hash=hash_token("team-feed")))
+    db.commit()
+    return mine.id, theirs.id
+
+
+def _count_queries():
+    count = [0]
+    def listener(*args):
+        count[0] += 1
+    event.listen(engine, "before_cursor_execute", listener)
+    return count, lambda: event.remove(engine, "before_cursor_execute", listener)
+
+
+def test_feeds_etag_304_and_stale_event_refresh(db):
+    calendar_cache.clear()
+    mine_id, theirs_id = _seed(db)
+    client = TestClient(create_app())
+
+    user_feed = client.get("/calendar/user-feed.ics")
+    assert user_feed.status_code == 200
+    assert user_feed.headers["content-type"].startswith("text/calendar")
+    assert "SUMMARY:Milestone: Beta" in user_feed.text
+    # The user feed only has the owner's own tasks; the team feed has all of them
+    assert f"UID:task-{mine_id}@taskmaster" in user_feed.text
+    assert f"UID:task-{theirs_id}@taskmaster" not in user_feed.text
+    team_feed = client.get("/calendar/team-feed.ics")
+    assert f"UID:task-{theirs_id}@taskmaster" in team_feed.text
+    assert "X-WR-CALNAME:Calendar team" in team_feed.text
+    assert team_feed.headers["ETag"] != user_feed.headers["ETag"]
+    assert client.get("/calendar/no-such-feed.ics").status_code == 404
+
+    etag = user_feed.headers["ETag"]
+    count, stop = _count_queries()
+    try:
+        not_modified = client.get("/calendar/user-feed.ics", headers={"If-None-Match": etag})
+        since = client.get("/calendar/user-feed.ics", headers={"If-Modified-Since": user_feed.headers["Last-Modified"]})
+    finally:
+        stop()
+    assert (not_modified.status_code, since.status_code) == (304, 304)
+    assert not_modified.headers["ETag"] == etag
+    assert not_modified.content == b""
+    assert count[0] == 0
+    earlier = format_datetime(datetime(2001, 1, 1, tzinfo=timezone.utc), usegmt=True)
+    assert client.get("/calendar/user-feed.ics", headers={"If-Modified-Since": earlier}).status_code == 200
+
+    # Moving one task marks just that event stale; the next poll re-reads it alone
+    db.get(models.Task, mine_id).due_date = DUE + timedelta(days=7)
+    db.commit()
+    count, stop = _count_queries()
+    try:
+        changed = client.get("/calendar/user-feed.ics", headers={"If-None-Match": etag})
+    finally:
+        stop()
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert "DTSTART;VALUE=DATE:20300321" in changed.text
+    assert count[0] == 1
+
+    # A task that loses its due date drops out of the feed
+    db.get(models.Task, mine_id).due_date = None
+    db.commit()
+    assert f"UID:task-{mine_id}@taskmaster" not in client.get("/calendar/user-feed.ics").text
+
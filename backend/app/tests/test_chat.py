@@ -0,0 +1,150 @@
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app import models
+from app.core.revocation import revocations
+from app.core.security import create_access_token, decode_access_token
+from app.db import engine
+from app.main import create_app
+from app.utils import chat
+from app.utils.chat import _upsert_markers, last_read_id
+
+
+def _team(db, name: str, *members) -> int:
+    """A team with all of `members` in it (the first as admin) and its channel; returns the channel id."""
+    team = models.Team(name=name, owner_id=members[0].id)
+    db.add(team)
+    db.flush()
+    db.add_all([
+        models.TeamMember(team_id=team.id, user_id=user.id, status=models.InvitationStatusEnum.accepted,
+                          role=models.TeamRoleEnum.admin if i == 0 else models.TeamRoleEnum.member)
+        for i, user in enumerate(members)
+    ])
+    channel = models.ChatChannel(team_id=team.id, name=name)
+    db.add(channel)
+    db.commit()
+    return channel.id
+
+
+def _socket(client: TestClient, channel_id: int, token: str, after: int = None):
+    query = f"?token={token}" + (f"&after={after}" if after is not None else "")
+    return client.websocket_connect(f"/chat/channels/{channel_id}/ws{query}")
+
+
+def _stale_membership():
+    """Makes every connection re-check its membership and token on its next frame."""
+    ttl = chat.MEMBERSHIP_TTL_SECONDS
+    chat.MEMBERSHIP_TTL_SECONDS = -1
+    return ttl
+
+
+def test_socket_round_trip_and_backfill(db, make_user):
+    alice, bob = make_user("chat_alice"), make_user("chat_bob")
+    channel_id = _team(db, "chat round trip", alice, bob)
+    alice_token, bob_token = create_access_token({"sub": alice.username}), create_access_token({"sub": bob.username})
+
+    with TestClient(create_app()) as client:
+        with _socket(client, channel_id, alice_token) as alice_ws, _socket(client, channel_id, bob_token) as bob_ws:
+            alice_ws.send_json({"type": "ping"})
+            assert alice_ws.receive_json() == {"type": "pong"}
+
+            alice_ws.send_json({"type": "message", "body": "hello", "client_id": "c1"})
+            # The sender gets the message itself, then the ack with its saved id
+            message, ack = alice_ws.receive_json(), alice_ws.receive_json()
+            assert (message["type"], message["body"], message["user_id"]) == ("message", "hello", alice.id)
+            assert ack == {"type": "ack", "client_id": "c1", "id": message["id"]}
+            assert bob_ws.receive_json() == message
+
+            bob_ws.send_json({"type": "message", "body": " ", "client_id": "c2"})
+            assert bob_ws.receive_json()["type"] == "error"
+
+        # Sent over REST while nobody is connected
+        posted = client.post(f"/chat/channels/{channel_id}/messages", json={"body": "missed it"},
+                             headers={"Authorization": f"Bearer {alice_token}"})
+        assert posted.status_code == 201
+        assert (posted.json()["body"], posted.json()["user_id"]) == ("missed it", alice.id)
+
+        # Reconnecting with the last id seen replays what was missed
+        with _socket(client, channel_id, bob_token, after=message["id"]) as bob_ws:
+            replayed = bob_ws.receive_json()
+            assert (replayed["id"], replayed["body"]) == (posted.json()["id"], "missed it")
+
+        history = client.get(f"/chat/channels/{channel_id}/messages",
+                             headers={"Authorization": f"Bearer {bob_token}"}).json()
+        assert [m["body"] for m in history["items"]] == ["missed it", "hello"]
+
+
+def test_read_markers_only_move_forward(db, make_user):
+    reader = make_user("chat_reader")
+    channel_id = _team(db, "chat markers", reader)
+
+    def mark(last_read):
+        with engine.begin() as connection:
+            _upsert_markers(connection, [{"channel_id": channel_id, "user_id": reader.id, "last_read_id": last_read}])
+        db.expire_all()
+        return last_read_id(db, channel_id, reader.id)
+
+    assert mark(10) == 10
+    assert mark(4) == 10
+    assert mark(12) == 12
+    # The REST path goes through the same upsert
+    token = create_access_token({"sub": reader.username})
+    with TestClient(create_app()) as client:
+        response = client.put(f"/chat/channels/{channel_id}/read", json={"last_read_id": 3},
+                              headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"channel_id": channel_id, "last_read_id": 12}
+
+
+def test_socket_closed_when_member_removed(db, make_user):
+    admin, leaver = make_user("chat_admin"), make_user("chat_leaver")
+    channel_id = _team(db, "chat removal", admin, leaver)
+    token = create_access_token({"sub": leaver.username})
+
+    with TestClient(create_app()) as client:
+        with _socket(client, channel_id, token) as ws:
+            ws.send_json({"type": "message", "body": "still here", "client_id": "c1"})
+            assert ws.receive_json()["body"] == "still here"
+            ws.receive_json()  # ack
+
+            db.query(models.TeamMember).filter(models.TeamMember.user_id == leaver.id).delete()
+            db.commit()
+            ttl = _stale_membership()
+            try:
+                ws.send_json({"type": "message", "body": "gone", "client_id": "c2"})
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    ws.receive_json()
+            finally:
+                chat.MEMBERSHIP_TTL_SECONDS = ttl
+        assert closed.value.code == 1008
+
+        # And cannot come back
+        with pytest.raises(WebSocketDisconnect) as refused:
+            with _socket(client, channel_id, token) as ws:
+                ws.receive_json()
+        assert refused.value.code == 1008
+
+
+def test_socket_closed_when_token_revoked(db, make_user):
+    member = make_user("chat_logout")
+    channel_id = _team(db, "chat revoked", member)
+    token = create_access_token({"sub": member.username})
+    claims = decode_access_token(token)
+
+    with TestClient(create_app()) as client:
+        with _socket(client, channel_id, token) as ws:
+            ws.send_json({"type": "ping"})
+            assert ws.receive_json() == {"type": "pong"}
+
+            revocations.revoke(db, claims["jti"], datetime.fromtimestamp(claims["exp"], timezone.utc))
+            db.commit()
+            ttl = _stale_membership()
+            try:
+                ws.send_json({"type": "read", "last_read_id": 1})
+                with pytest.raises(WebSocketDisconnect) as closed:
+                    ws.receive_json()
+            finally:
+                chat.MEMBERSHIP_TTL_SECONDS = ttl
+        assert closed.value.code == 1008
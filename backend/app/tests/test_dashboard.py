@@ -0,0 +1,53 @@
+from app import models
+from app.api.v1 import dashboard
+from app.core.config import settings
+
+ACCEPTED, PENDING = models.InvitationStatusEnum.accepted, models.InvitationStatusEnum.pending
+
+
+def _seed(db, me, boss, pal, fan):
+    """A team with a project, an invitation to another, a friend and a friend request."""
+    mine, theirs = models.Team(name="dash mine", owner_id=me.id), models.Team(name="dash theirs", owner_id=boss.id)
+    db.add_all([mine, theirs])
+    db.flush()
+    db.add_all([
+        models.TeamMember(team_id=mine.id, user_id=me.id, role=models.TeamRoleEnum.admin, status=ACCEPTED),
+        models.TeamMember(team_id=theirs.id, user_id=boss.id, role=models.TeamRoleEnum.admin, status=ACCEPTED),
+        models.TeamMember(team_id=theirs.id, user_id=me.id, status=PENDING),
+        models.Project(name="dash project", team_id=mine.id),
+        models.Friendship(requester_id=pal.id, addressee_id=me.id, status=models.FriendshipStatusEnum.accepted),
+        models.Friendship(requester_id=fan.id, addressee_id=me.id, status=models.FriendshipStatusEnum.pending),
+    ])
+    db.commit()
+    return mine.id, theirs.id
+
+
+def _check(body, me, mine_id, theirs_id):
+    assert body["user"]["username"] == me.username
+    assert [(team["id"], team["is_owner"]) for team in body["teams"]] == [(mine_id, True)]
+    assert [project["name"] for project in body["teams"][0]["projects"]] == ["dash project"]
+    assert [invitation["team"]["id"] for invitation in body["pending_invitations"]] == [theirs_id]
+    assert [friend["username"] for friend in body["friends"]] == ["dash_pal"]
+    assert [request["requester"]["username"] for request in body["pending_friend_requests"]] == ["dash_fan"]
+
+
+def test_bootstrap_in_parallel_and_when_the_pool_is_busy(db, make_user, client_as):
+    me, boss, pal, fan = (make_user(f"dash_{name}") for name in ("me", "boss", "pal", "fan"))
+    mine_id, theirs_id = _seed(db, me, boss, pal, fan)
+    client = client_as(me)
+
+    response = client.get("/dashboard/bootstrap")
+    assert response.status_code == 200
+    _check(response.json(), me, mine_id, theirs_id)
+
+    # Every parallel slot taken by other requests: the gatherers run on the request's own thread
+    taken = 0
+    while dashboard._parallel_slots.acquire(blocking=False):
+        taken += 1
+    try:
+        assert taken == settings.DASHBOARD_PARALLEL_REQUESTS
+        busy = client.get("/dashboard/bootstrap")
+    finally:
+        for _ in range(taken):
+            dashboard._parallel_slots.release()
+    assert busy.json() == response.json()
@@ -0,0 +1,97 @@
+from datetime import datetime, timezone
+
+from app import models
+from app.utils import deletion
+from app.utils.deletion import LEASE, MAX_ATTEMPTS, is_stale, run_deletion_job, stale_job_ids
+
+JOBS = "/deletion-jobs/"
+
+
+def _team(db, owner, name: str, tasks: int = 3) -> int:
+    """A team owned by `owner` with one project holding `tasks` tasks and a milestone."""
+    team = models.Team(name=name, owner_id=owner.id)
+    db.add(team)
+    db.flush()
+    db.add(models.TeamMember(team_id=team.id, user_id=owner.id, role=models.TeamRoleEnum.admin,
+                             status=models.InvitationStatusEnum.accepted))
+    project = models.Project(name=f"{name} project", team_id=team.id)
+    db.add(project)
+    db.flush()
+    db.add_all([models.Task(title=f"{name} {i}", project_id=project.id) for i in range(tasks)])
+    db.add(models.Milestone(name=f"{name} milestone", due_date=datetime(2030, 1, 1, tzinfo=timezone.utc),
+                            project_id=project.id))
+    db.commit()
+    return team.id
+
+
+def _failing_drain(db, job, project_id):
+    raise RuntimeError("database went away")
+
+
+def test_team_deletion_runs_to_completion(db, make_user, client_as):
+    owner = make_user("del_owner")
+    team_id = _team(db, owner, "del whole")
+    client = client_as(owner)
+
+    response = client.post(JOBS, json={"target_type": "team", "target_id": team_id})
+    assert response.status_code == 202
+    job = client.get(f"{JOBS}{response.json()['id']}").json()
+    assert (job["status"], job["progress"], job["attempts"]) == ("completed", 1.0, 1)
+    assert db.get(models.Team, team_id) is None
+    assert db.query(models.Project).filter(models.Project.team_id == team_id).count() == 0
+
+
+def test_failed_team_deletion_is_retried_by_its_owner(db, make_user, client_as):
+    owner, stranger = make_user("del_retry_owner"), make_user("del_retry_stranger")
+    team_id = _team(db, owner, "del retry")
+    client = client_as(owner)
+
+    drain = deletion._drain_project
+    deletion._drain_project = _failing_drain
+    try:
+        first = client.post(JOBS, json={"target_type": "team", "target_id": team_id}).json()
+    finally:
+        deletion._drain_project = drain
+    failed = client.get(f"{JOBS}{first['id']}").json()
+    assert (failed["status"], failed["error"], failed["attempts"]) == ("failed", "database went away", 1)
+    # Half deleted: the memberships are gone but the team is still there
+    assert db.query(models.TeamMember).filter(models.TeamMember.team_id == team_id).count() == 0
+    assert db.get(models.Team, team_id) is not None
+
+    # Nobody else can touch it, but the owner who started it can ask again
+    assert client_as(stranger).post(JOBS, json={"target_type": "team", "target_id": team_id}).status_code == 404
+    again = client.post(JOBS, json={"target_type": "team", "target_id": team_id})
+    assert again.status_code == 202 and again.json()["id"] == first["id"]
+    done = client.get(f"{JOBS}{first['id']}").json()
+    assert (done["status"], done["attempts"]) == ("completed", 2)
+    db.expire_all()
+    assert db.get(models.Team, team_id) is None
+
+
+def test_sweep_picks_up_failed_and_abandoned_jobs_until_out_of_attempts(db, make_user):
+    owner = make_user("del_sweep_owner")
+    now = datetime.now(timezone.utc)
+    failed = models.DeletionJob(target_type=models.DeletionTargetEnum.project, target_id=10 ** 6,
+                                status=models.DeletionJobStatusEnum.failed, attempts=1, requested_by_id=owner.id)
+    spent = models.DeletionJob(target_type=models.DeletionTargetEnum.project, target_id=10 ** 6 + 1,
+                               status=models.DeletionJobStatusEnum.failed, attempts=MAX_ATTEMPTS)
+    abandoned = models.DeletionJob(target_type=models.DeletionTargetEnum.project, target_id=10 ** 6 + 2,
+                                   status=models.DeletionJobStatusEnum.running, heartbeat_at=now - 2 * LEASE)
+    busy = models.DeletionJob(target_type=models.DeletionTargetEnum.project, target_id=10 ** 6 + 3,
+                              status=models.DeletionJobStatusEnum.running, heartbeat_at=now)
+    db.add_all([failed, spent, abandoned, busy])
+    db.commit()
+
+    assert [is_stale(job, now) for job in (failed, spent, abandoned, busy)] == [True, False, True, False]
+    swept = set(stale_job_ids(db)) & {failed.id, spent.id, abandoned.id, busy.id}
+    assert swept == {failed.id, abandoned.id}
+
+    # The projects are long gone, so the retries just finish
+    for job in (failed, spent, abandoned, busy):
+        run_deletion_job(job.id)
+    db.expire_all()
+    assert [job.status for job in (failed, spent, abandoned, busy)] == [
+        models.DeletionJobStatusEnum.completed, models.DeletionJobStatusEnum.failed,
+        models.DeletionJobStatusEnum.completed, models.DeletionJobStatusEnum.running,
+    ]
+    assert (failed.attempts, spent.attempts) == (2, MAX_ATTEMPTS)
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+from app import models
+from app.api.v1 import exports
+
+
+def _team_with_tasks(db, owner, name: str, tasks: int) -> models.Project:
+    team = models.Team(name=name, owner_id=owner.id)
+    db.add(team)
+    db.flush()
+    db.add(models.TeamMember(team_id=team.id, user_id=owner.id, role=models.TeamRoleEnum.admin,
+                             status=models.InvitationStatusEnum.accepted))
+    project = models.Project(name=f"{name} project", team_id=team.id)
+    db.add(project)
+    db.flush()
+    db.add_all([
+        models.Task(title=f"{name}, task {i}", project_id=project.id, assignee_id=owner.id if i % 2 else None,
+                    status=models.TaskStatusEnum.done if i % 3 == 0 else models.TaskStatusEnum.todo)
+        for i in range(tasks)
+    ])
+    db.commit()
+    return project
+
+
+def test_csv_streams_every_row_across_batches(db, make_user, client_as):
+    owner = make_user("exp_owner")
+    project = _team_with_tasks(db, owner, "exp csv", tasks=7)
+    client = client_as(owner)
+
+    batch_size = exports.BATCH_SIZE
+    exports.BATCH_SIZE = 3
+    try:
+        response = client.get(f"/exports/projects/{project.id}/tasks")
+    finally:
+        exports.BATCH_SIZE = batch_size
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == f'attachment; filename="project-{project.id}-tasks.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == [f"exp csv, task {i}" for i in range(7)]
+    assert [row["assignee_username"] for row in rows[:2]] == ["", "exp_owner"]
+    assert {row["status"] for row in rows} == {"Done", "To Do"}
+
+
+def test_ndjson_filters_and_team_scope(db, make_user, client_as):
+    owner, outsider = make_user("exp_nd_owner"), make_user("exp_nd_outsider")
+    project = _team_with_tasks(db, owner, "exp nd", tasks=6)
+    _team_with_tasks(db, outsider, "exp other", tasks=2)
+    client = client_as(owner)
+
+    response = client.get(f"/exports/teams/{project.team_id}/tasks",
+                          params={"format": "ndjson", "status": "Done", "assignee_id": owner.id})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["title"] for row in rows] == ["exp nd, task 3"]
+    assert (rows[0]["status"], rows[0]["assignee_username"], rows[0]["project_id"]) == ("Done", "exp_nd_owner", project.id)
+
+    # Everything of the team's, nothing of the other team's
+    everything = client.get(f"/exports/teams/{project.team_id}/tasks", params={"format": "ndjson"}).text.splitlines()
+    assert len(everything) == 6
+    assert client_as(outsider).get(f"/exports/projects/{project.id}/tasks").status_code == 404
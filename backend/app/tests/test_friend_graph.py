@@ -0,0 +1,104 @@
+from app import models
+from app.utils.friend_graph import FriendGraph
+
+ACCEPTED = models.FriendshipStatusEnum.accepted
+
+
+class FakeSession:
+    """Answers FriendGraph's one query from a list of rows, running `during` while it does."""
+
+    def __init__(self, rows, during=None):
+        self.rows = rows
+        self.during = during
+        self.queries = 0
+
+    def query(self, *columns):
+        return self
+
+    def filter(self, *criteria):
+        return self
+
+    def all(self):
+        self.queries += 1
+        if self.during:
+            self.during()
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+def _graph(db, **kwargs) -> FriendGraph:
+    return FriendGraph(session_factory=lambda: db, **kwargs)
+
+
+def test_loads_are_cached_and_kept_up_to_date_by_hooks():
+    db = FakeSession([(1, 2, ACCEPTED), (3, 1, ACCEPTED)])
+    graph = _graph(db)
+    assert graph.friends_of(1) == {2, 3}
+    graph.add_friendship(1, 4)
+    graph.remove_friendship(1, 2)
+    assert graph.friends_of(1) == {3, 4}
+    assert db.queries == 1
+
+
+def test_load_that_raced_a_hook_is_not_cached():
+    # The query read the graph from before 1 and 4 became friends; the hook ran while it did
+    db = FakeSession([(1, 2, ACCEPTED)], during=lambda: graph.add_friendship(1, 4))
+    graph = _graph(db)
+    assert graph.friends_of(1) == {2}
+    db.during = None
+    db.rows = [(1, 2, ACCEPTED), (1, 4, ACCEPTED)]
+    assert graph.friends_of(1) == {2, 4}
+    assert db.queries == 2
+
+
+def test_returned_sets_are_copies():
+    db = FakeSession([(1, 2, ACCEPTED)])
+    graph = _graph(db)
+    graph.friends_of(1).add(99)
+    graph.mutual_friends(1, 2)
+    assert graph.friends_of(1) == {2}
+
+
+def test_cache_is_bounded():
+    db = FakeSession([])
+    graph = _graph(db, max_users=3)
+    for user_id in range(10):
+        graph.friends_of(user_id)
+        assert len(graph._friends) <= 3
+
+
+
+def test_entries_expire_so_other_workers_changes_show_up():
+    db = FakeSession([(1, 2, ACCEPTED)])
+    graph = _graph(db, ttl=0)
+    assert graph.friends_of(1) == {2}
+    # Another worker accepted 1 and 3; no hook ran here
+    db.rows = [(1, 2, ACCEPTED), (3, 1, ACCEPTED)]
+    assert graph.friends_of(1) == {2, 3}
+    assert db.queries == 2
+
+
+def test_forget_user_clears_them_from_other_users_sets():
+    db = FakeSession([(1, 2, ACCEPTED), (1, 3, models.FriendshipStatusEnum.pending)])
+    graph = _graph(db)
+    graph.friends_of(1)
+    # 2's own entry was never loaded, but 1's set still names them
+    graph.forget_user(2)
+    assert graph.friends_of(1) == set()
+    graph.forget_user(3)
+    assert graph._pending[1] == set()
+
+
+def test_friends_list_reads_the_database(db, make_user, client_as):
+    me, ann, ben, cat = (make_user(f"fg_{name}") for name in ("me", "ann", "ben", "cat"))
+    # Written without going through the endpoints, as another worker would
+    db.add_all([
+        models.Friendship(requester_id=me.id, addressee_id=ann.id, status=ACCEPTED),
+        models.Friendship(requester_id=ben.id, addressee_id=me.id, status=ACCEPTED),
+        models.Friendship(requester_id=me.id, addressee_id=cat.id, status=models.FriendshipStatusEnum.pending),
+    ])
+    db.commit()
+    friends = client_as(me).get("/friends/").json()
+    assert sorted(friend["username"] for friend in friends) == ["fg_ann", "fg_ben"]
@@ -0,0 +1,61 @@
+import threading
+
+from fastapi import HTTPException
+
+from app import models, schemas
+from app.db import SessionLocal
+from app.api.v1 import friends
+
+
+def test_simultaneous_reverse_requests(make_user):
+    """
+    Two users send each other a friend request at the same moment. Both pass the
+    existence check before either commits, so only the (low, high) pair constraint
+    stands between them: exactly one request must succeed.
+    """
+    alice_id = make_user("pair_alice").id
+    bob_id = make_user("pair_bob").id
+
+    both_checked = threading.Barrier(2)
+    outcomes = []
+
+    def send(sender_id: int, addressee_username: str):
+        db = SessionLocal()
+        commit = db.commit
+
+        def commit_after_both_checked():
+            both_checked.wait(timeout=10)
+            commit()
+
+        db.commit = commit_after_both_checked
+        try:
+            sender = db.get(models.User, sender_id)
+            friends.send_friend_request(schemas.FriendRequestCreate(addressee_username=addressee_username), db, sender)
+            outcomes.append("created")
+        except HTTPException as e:
+            outcomes.append(e.status_code)
+        finally:
+            db.close()
+
+    threads = [
+        threading.Thread(target=send, args=(alice_id, "pair_bob")),
+        threading.Thread(target=send, args=(bob_id, "pair_alice")),
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    db = SessionLocal()
+    try:
+        low_id, high_id = models.canonical_pair(alice_id, bob_id)
+        rows = db.query(models.Friendship).filter(
+            models.Friendship.user_low_id == low_id,
+            models.Friendship.user_high_id == high_id
+        ).count()
+    finally:
+        db.close()
+
+    assert sorted(outcomes, key=str) == [400, "created"], outcomes
+    assert rows == 1
+
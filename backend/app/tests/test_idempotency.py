@@ -0,0 +1,135 @@
+import asyncio
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request
+
+from app.core import idempotency
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.security import create_access_token
+
+
+def _setup():
+    """A bare app behind the middleware whose endpoints count how often they really run."""
+    app = FastAPI()
+    app.add_middleware(IdempotencyMiddleware, ttl=60, wait_seconds=5)
+    calls = {"create": 0, "fail": 0, "upload": 0}
+
+    @app.post("/items")
+    async def create(item: dict):
+        calls["create"] += 1
+        await asyncio.sleep(0.05)
+        return {"id": calls["create"], **item}
+
+    @app.post("/upload")
+    async def upload(request: Request):
+        calls["upload"] += 1
+        return {"size": len(await request.body())}
+
+    @app.post("/flaky")
+    async def flaky():
+        calls["fail"] += 1
+        if calls["fail"] == 1:
+            raise HTTPException(status_code=503, detail="Try again.")
+        return {"ok": True}
+
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+    return client, calls
+
+
+def _headers(key: str, username: str = "alice") -> dict:
+    return {"Authorization": f"Bearer {create_access_token({'sub': username})}", "Idempotency-Key": key}
+
+
+def test_retry_replays_the_first_response():
+    async def run():
+        client, calls = _setup()
+        first = await client.post("/items", json={"name": "a"}, headers=_headers("k1"))
+        retry = await client.post("/items", json={"name": "a"}, headers=_headers("k1"))
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json() == {"id": 1, "name": "a"}
+        assert retry.headers["idempotent-replayed"] == "true"
+        assert calls["create"] == 1
+        # Another caller's identical key is a different request
+        other = await client.post("/items", json={"name": "a"}, headers=_headers("k1", username="bob"))
+        assert other.json()["id"] == 2
+    asyncio.run(run())
+
+
+def test_key_reused_for_a_different_request():
+    async def run():
+        client, calls = _setup()
+        await client.post("/items", json={"name": "a"}, headers=_headers("k1"))
+        reused = await client.post("/items", json={"name": "b"}, headers=_headers("k1"))
+        assert reused.status_code == 422
+        assert calls["create"] == 1
+    asyncio.run(run())
+
+
+def test_concurrent_duplicates_run_once():
+    async def run():
+        client, calls = _setup()
+        responses = await asyncio.gather(*(
+            client.post("/items", json={"name": "a"}, headers=_headers("k1")) for _ in range(5)
+        ))
+        assert calls["create"] == 1
+        assert {r.json()["id"] for r in responses} == {1}
+        assert sum(r.headers.get("idempotent-replayed") == "true" for r in responses) == 4
+    asyncio.run(run())
+
+
+def test_server_errors_are_not_replayed():
+    async def run():
+        client, calls = _setup()
+        assert (await client.post("/flaky", headers=_headers("k1"))).status_code == 503
+        assert (await client.post("/flaky", headers=_headers("k1"))).json() == {"ok": True}
+        assert calls["fail"] == 2
+    asyncio.run(run())
+
+
+def test_requests_without_a_key_are_untouched():
+    async def run():
+        client, calls = _setup()
+        for _ in range(2):
+            await client.post("/items", json={"name": "a"}, headers={"Authorization": _headers("k1")["Authorization"]})
+        assert calls["create"] == 2
+    asyncio.run(run())
+
+
+
+def test_keyed_on_the_user_not_the_token():
+    async def run():
+        client, calls = _setup()
+        # A new token for the same user (e.g. after a refresh) still replays
+        first = await client.post("/items", json={"name": "a"}, headers=_headers("k1"))
+        retry = await client.post("/items", json={"name": "a"}, headers=_headers("k1"))
+        assert retry.json() == first.json() and calls["create"] == 1
+        # A token that does not verify is left for the endpoint to reject
+        forged = {"Authorization": "Bearer alice", "Idempotency-Key": "k1"}
+        await client.post("/items", json={"name": "a"}, headers=forged)
+        assert calls["create"] == 2
+    asyncio.run(run())
+
+
+def test_malformed_content_length_is_a_400():
+    async def run():
+        client, calls = _setup()
+        response = await client.post("/items", content=b'{"name": "a"}',
+                                     headers={**_headers("k1"), "Content-Length": "lots"})
+        assert response.status_code == 400
+        assert calls["create"] == 0
+    asyncio.run(run())
+
+
+def test_large_chunked_bodies_pass_through():
+    async def chunks():
+        for _ in range(4):
+            yield b"x" * (idempotency.MAX_BODY_BYTES // 2)
+
+    async def run():
+        client, calls = _setup()
+        for _ in range(2):
+            response = await client.post("/upload", content=chunks(), headers=_headers("k1"))
+            assert response.json() == {"size": 2 * idempotency.MAX_BODY_BYTES}
+            assert "idempotent-replayed" not in response.headers
+        assert calls["upload"] == 2
+    asyncio.run(run())
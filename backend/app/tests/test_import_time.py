@@ -0,0 +1,50 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Cumulative import time allowed for app.main, in milliseconds
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "2500"))
+# Providers that should only be imported on first use (or by the warm-up), never at import time
+LAZY_MODULES = ("sendgrid", "passlib", "jose")
+
+
+def measure_import(module: str = "app.main") -> dict[str, tuple[int, int]]:
+    """
+    Imports `module` in a fresh interpreter under `-X importtime` and returns
+    {module name: (self µs, cumulative µs)} for everything it pulled in.
+    """
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'import_time.db')}")
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    # The first run writes the .pyc files; time the second one
+    subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, check=True)
+    result = subprocess.run(command, cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def test_import_time_within_budget():
+    timings = measure_import()
+    cumulative_ms = timings["app.main"][1] / 1000
+    assert cumulative_ms <= IMPORT_TIME_BUDGET_MS, (
+        f"Importing app.main took {cumulative_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)"
+    )
+    eager = sorted(name for name in timings if name.split(".")[0] in LAZY_MODULES)
+    assert not eager, f"Imported at startup but should be lazy: {', '.join(eager)}"
+
+
+if __name__ == "__main__":
+    timings = measure_import()
+    print(f"--- app.main: {timings['app.main'][1] / 1000:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms) ---")
+    slowest = sorted(timings.items(), key=lambda item: item[1][0], reverse=True)[:20]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f"{self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {name}")
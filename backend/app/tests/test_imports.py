@@ -0,0 +1,78 @@
+import json
+
+from app import models
+
+
+def _project(db, admin, member, name: str) -> models.Project:
+    team = models.Team(name=name, owner_id=admin.id)
+    db.add(team)
+    db.flush()
+    db.add_all([
+        models.TeamMember(team_id=team.id, user_id=admin.id, role=models.TeamRoleEnum.admin,
+                          status=models.InvitationStatusEnum.accepted),
+        models.TeamMember(team_id=team.id, user_id=member.id, role=models.TeamRoleEnum.member,
+                          status=models.InvitationStatusEnum.accepted),
+    ])
+    project = models.Project(name=f"{name} project", team_id=team.id)
+    db.add(project)
+    db.commit()
+    return project
+
+
+TASKS_CSV = (
+    "title,status,priority,due_date,estimated_days,assignee\n"
+    "Write spec,In Progress,high,2031-01-10T00:00:00Z,3,imp_member\n"
+    "Review spec,todo,,,,imp_member@example.com\n"
+    ",todo,,,,\n"
+    "Ship it,someday,,,,\n"
+    "Celebrate,,,,,imp_stranger\n"
+)
+
+
+def test_csv_tasks_skip_bad_rows_and_dry_run_saves_nothing(db, make_user, client_as):
+    admin, member, stranger = make_user("imp_admin"), make_user("imp_member"), make_user("imp_stranger")
+    project = _project(db, admin, member, "imp tasks")
+    client = client_as(admin)
+
+    def upload(**params):
+        files = {"file": ("tasks.csv", TASKS_CSV.encode(), "text/csv")}
+        return client.post(f"/imports/projects/{project.id}/tasks", files=files, params=params).json()
+
+    dry = upload(dry_run=True)
+    assert (dry["dry_run"], dry["total_rows"], dry["imported"], dry["failed"]) == (True, 5, 2, 3)
+    assert [error["row"] for error in dry["errors"]] == [3, 4, 5]
+    assert "imp_stranger" in dry["errors"][2]["errors"][0]
+    assert db.query(models.Task).filter(models.Task.project_id == project.id).count() == 0
+
+    report = upload()
+    assert (report["imported"], report["failed"]) == (2, 3)
+    tasks = db.query(models.Task).filter(models.Task.project_id == project.id).order_by(models.Task.id).all()
+    assert [(t.title, t.status, t.priority, t.estimated_days, t.assignee_id) for t in tasks] == [
+        ("Write spec", models.TaskStatusEnum.in_progress, models.TaskPriorityEnum.high, 3, member.id),
+        ("Review spec", models.TaskStatusEnum.todo, models.TaskPriorityEnum.medium, 1, member.id),
+    ]
+
+
+def test_ndjson_milestones_and_access(db, make_user, client_as):
+    admin, member = make_user("imp_ms_admin"), make_user("imp_ms_member")
+    project = _project(db, admin, member, "imp milestones")
+    lines = [
+        json.dumps({"name": "Beta", "due_date": "2031-02-01T00:00:00Z"}),
+        "{not json",
+        json.dumps({"name": "No date"}),
+        "",
+        json.dumps({"name": "GA", "due_date": "2031-03-01T00:00:00Z", "status": "completed"}),
+    ]
+    files = {"file": ("milestones.jsonl", "\n".join(lines).encode(), "application/x-ndjson")}
+
+    report = client_as(admin).post(f"/imports/projects/{project.id}/milestones", files=files).json()
+    assert (report["total_rows"], report["imported"], report["failed"]) == (4, 2, 2)
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    names = db.query(models.Milestone.name).filter(models.Milestone.project_id == project.id).order_by(models.Milestone.id)
+    assert [name for name, in names] == ["Beta", "GA"]
+
+    # Only admins import, and the format has to be known
+    as_member = client_as(member).post(f"/imports/projects/{project.id}/milestones", files=files)
+    assert as_member.status_code == 403
+    unknown = {"file": ("milestones.txt", b"name\n", "text/plain")}
+    assert client_as(admin).post(f"/imports/projects/{project.id}/milestones", files=unknown).status_code == 400
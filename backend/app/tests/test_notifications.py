@@ -0,0 +1,98 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from app import models
+from app.utils import notifications
+from app.utils.notifications import mark_read, notify, unread_count
+
+
+def _inbox(db, user_id: int) -> list[models.Notification]:
+    return db.query(models.Notification).filter(models.Notification.user_id == user_id).order_by(models.Notification.id).all()
+
+
+def test_fan_out_on_commit_with_counter_upsert(db, make_user):
+    actor, ann, ben = (make_user(f"nt_{name}").id for name in ("fan_actor", "fan_ann", "fan_ben"))
+    batch_size = notifications.BATCH_SIZE
+    notifications.BATCH_SIZE = 1
+    try:
+        team = models.Team(name="fan-out", owner_id=actor)
+        db.add(team)
+        # The entity has no id yet; it is resolved as the transaction commits
+        notify(db, [ann, ben, actor, ann], "team_invitation", actor_id=actor, entity=team, payload={"team_name": "fan-out"})
+        assert _inbox(db, ann) == []
+        db.commit()
+        rows = [row for user_id in (ann, ben) for row in _inbox(db, user_id)]
+        assert [(row.user_id, row.kind, row.entity_type, row.entity_id) for row in rows] == [
+            (ann, "team_invitation", "teams", team.id),
+            (ben, "team_invitation", "teams", team.id),
+        ]
+        assert rows[0].payload == {"team_name": "fan-out"}
+        # Nobody hears about their own action
+        assert _inbox(db, actor) == []
+        assert (unread_count(db, ann), unread_count(db, ben), unread_count(db, actor)) == (1, 1, 0)
+
+        # The counters exist now, so this takes the ON CONFLICT branch
+        notify(db, [ann], "task_assigned", actor_id=actor)
+        notify(db, [ann, ben], "task_assigned", actor_id=actor)
+        db.commit()
+        assert (unread_count(db, ann), unread_count(db, ben)) == (3, 2)
+    finally:
+        notifications.BATCH_SIZE = batch_size
+
+
+def test_rollback_discards_queued_notifications(db, make_user):
+    actor, ann = (make_user(f"nt_{name}").id for name in ("rb_actor", "rb_ann"))
+    # As in an endpoint: the notification goes with a write that then fails
+    team = models.Team(name="rolled back", owner_id=actor)
+    db.add(team)
+    db.flush()
+    notify(db, [ann], "team_invitation", actor_id=actor, entity=team)
+    db.rollback()
+    # A later commit on the same session must not send what was rolled back
+    db.commit()
+    assert _inbox(db, ann) == []
+    assert unread_count(db, ann) == 0
+
+
+def test_mark_read_keeps_the_counter_in_step_and_never_negative(db, make_user):
+    actor, ann = (make_user(f"nt_{name}").id for name in ("mr_actor", "mr_ann"))
+    for _ in range(5):
+        notify(db, [ann], "task_assigned", actor_id=actor)
+    db.commit()
+    ids = [row.id for row in _inbox(db, ann)]
+
+    assert mark_read(db, ann, ids=ids[:1]) == 1
+    assert mark_read(db, ann, ids=ids[:1]) == 0
+    assert mark_read(db, ann, up_to=ids[2]) == 2
+    db.commit()
+    assert unread_count(db, ann) == 2
+
+    # A counter that has drifted below the real number is clamped at zero, not taken negative
+    db.execute(update(models.NotificationCounter).where(models.NotificationCounter.user_id == ann).values(unread=1))
+    assert mark_read(db, ann) == 2
+    db.commit()
+    assert unread_count(db, ann) == 0
+    assert all(row.read_at is not None for row in _inbox(db, ann))
+    assert mark_read(db, ann) == 0
+
+
+
+def test_notifications_commit_with_the_change_or_not_at_all(db, make_user):
+    actor, ann = (make_user(f"nt_{name}").id for name in ("tx_actor", "tx_ann"))
+    team = models.Team(name="same transaction", owner_id=actor)
+    db.add(team)
+    notify(db, [ann], "team_invitation", actor_id=actor, entity=team)
+    # A savepoint commit leaves them queued for the real one
+    db.begin_nested().commit()
+    assert _inbox(db, ann) == []
+    db.commit()
+    assert len(_inbox(db, ann)) == 1
+
+    # A write that cannot be stored fails the commit, taking the change with it
+    db.add(models.Team(name="never saved", owner_id=actor))
+    notify(db, [10 ** 9], "team_invitation", actor_id=actor)
+    with pytest.raises(IntegrityError):
+        db.commit()
+    db.rollback()
+    assert db.query(models.Team).filter(models.Team.name == "never saved").count() == 0
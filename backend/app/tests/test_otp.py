@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app import models
+from app.db import SessionLocal
+from app.utils.otp import MAX_ATTEMPTS, DatabaseOTPStore, MemoryOTPStore, OTPStore
+
+SIGNUP = models.OTPPurposeEnum.signup
+RESET = models.OTPPurposeEnum.password_reset
+
+
+def _stores():
+    return [MemoryOTPStore(), DatabaseOTPStore()]
+
+
+def _wrong(code: str) -> str:
+    return "000000" if code != "000000" else "111111"
+
+
+def test_code_is_single_use_and_per_purpose():
+    for store in _stores():
+        db = SessionLocal()
+        try:
+            code = store.issue(db, "Single@Example.com", SIGNUP)
+            assert not store.verify(db, "single@example.com", RESET, code)
+            assert store.verify(db, "single@example.com", SIGNUP, code)
+            db.commit()
+            assert not store.verify(db, "single@example.com", SIGNUP, code)
+        finally:
+            db.close()
+
+
+def test_reissue_replaces_the_old_code():
+    for store in _stores():
+        db = SessionLocal()
+        try:
+            first = store.issue(db, "again@example.com", SIGNUP)
+            second = store.issue(db, "again@example.com", SIGNUP)
+            if first != second:
+                assert not store.verify(db, "again@example.com", SIGNUP, first)
+            assert store.verify(db, "again@example.com", SIGNUP, second)
+            db.commit()
+        finally:
+            db.close()
+
+
+def test_code_is_burned_after_too_many_wrong_guesses():
+    for store in _stores():
+        db = SessionLocal()
+        try:
+            code = store.issue(db, "guess@example.com", SIGNUP)
+            for _ in range(MAX_ATTEMPTS):
+                assert not store.verify(db, "guess@example.com", SIGNUP, _wrong(code))
+            assert not store.verify(db, "guess@example.com", SIGNUP, code)
+        finally:
+            db.close()
+
+
+def test_expired_codes_fail_and_are_purged(db):
+    memory, database = _stores()
+    memory_code = memory.issue(db, "old@example.com", SIGNUP)
+    memory._codes[("old@example.com", SIGNUP)][2] = datetime.now(timezone.utc) - timedelta(seconds=1)
+    assert memory.purge_expired() == 1
+    assert not memory.verify(db, "old@example.com", SIGNUP, memory_code)
+
+    database_code = database.issue(db, "old@example.com", SIGNUP)
+    database.issue(db, "purged@example.com", SIGNUP)
+    db.query(models.OneTimePassword).update({"expires_at": datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+    assert not database.verify(db, "old@example.com", SIGNUP, database_code)
+    assert database.purge_expired(db) >= 1
+    assert db.query(models.OneTimePassword).filter(models.OneTimePassword.email == "purged@example.com").count() == 0
+
+
+class _RacingStore(DatabaseOTPStore):
+    """Lets another request insert the row between this one's lookup and its insert."""
+
+    def __init__(self):
+        self.raced = False
+
+    def _row(self, db, email, purpose):
+        row = super()._row(db, email, purpose)
+        if not self.raced:
+            self.raced = True
+            DatabaseOTPStore().issue(other := SessionLocal(), email, purpose)
+            other.close()
+        return row
+
+
+def test_concurrent_issue_overwrites_instead_of_failing(db):
+    # As in signup, where the new account is committed along with the code
+    db.add(models.User(username="otp_race", email="race@example.com", password="x", is_active=False))
+    code = _RacingStore().issue(db, "race@example.com", SIGNUP)
+    assert db.query(models.User).filter(models.User.username == "otp_race").count() == 1
+    assert db.query(models.OneTimePassword).filter(models.OneTimePassword.email == "race@example.com").count() == 1
+    assert DatabaseOTPStore().verify(db, "race@example.com", SIGNUP, code)
+    db.commit()
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        OTPStore()
+
@@ -0,0 +1,64 @@
+import pytest
+
+from app.utils.presence import MemoryPresenceStore, PresenceStore, RedisPresenceStore
+
+
+class FakeRedis:
+    """The sorted-set commands RedisPresenceStore uses, over a dict."""
+
+    def __init__(self):
+        self.sets = {}
+
+    def zadd(self, key, mapping):
+        self.sets.setdefault(key, {}).update(mapping)
+
+    def zmscore(self, key, members):
+        scores = self.sets.get(key, {})
+        return [scores.get(member) for member in members]
+
+    def zremrangebyscore(self, key, low, high):
+        scores = self.sets.get(key, {})
+        for member in [m for m, score in scores.items() if score <= high]:
+            del scores[member]
+
+    def delete(self, key):
+        self.sets.pop(key, None)
+
+
+def test_users_expire_after_their_last_heartbeat():
+    store = MemoryPresenceStore(ttl=60)
+    store.touch("alice", 1000)
+    store.touch("bob", 1010)
+    assert store.last_seen(["alice", "bob", "carol"], 1020) == {"alice": 1000, "bob": 1010}
+    # Alice keeps sending heartbeats, Bob stops
+    store.touch("alice", 1050)
+    assert store.last_seen(["alice", "bob"], 1075) == {"alice": 1050}
+    assert store.last_seen(["alice", "bob"], 1110) == {}
+    assert len(store._expiry) == 0
+
+
+def test_heap_holds_one_entry_per_online_user():
+    store = MemoryPresenceStore(ttl=60)
+    for second in range(100):
+        store.touch("alice", 1000 + second)
+    assert len(store._expiry) == 1
+    assert store.last_seen(["alice"], 1150) == {"alice": 1099}
+    store.touch("alice", 1200)
+    assert store.last_seen(["alice"], 1200) == {"alice": 1200}
+
+
+def test_redis_store_is_shared_between_workers():
+    client = FakeRedis()
+    one, other = RedisPresenceStore(ttl=60, client=client), RedisPresenceStore(ttl=60, client=client)
+    one.touch("alice", 1000)
+    other.touch("bob", 1030)
+    assert other.last_seen(["alice", "bob", "carol"], 1040) == {"alice": 1000, "bob": 1030}
+    # Alice is past the TTL: ignored on read, then trimmed from the set
+    assert one.last_seen(["alice", "bob"], 1070) == {"bob": 1030}
+    assert "alice" not in client.sets["presence:last_seen"]
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        PresenceStore()
+
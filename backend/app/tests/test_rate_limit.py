@@ -0,0 +1,91 @@
+import ipaddress
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core import rate_limit
+from app.core.config import settings
+from app.core.rate_limit import MemoryRateLimitStore, RateLimit, RateLimitStore, client_ip, configure_store, get_store
+
+
+def test_burst_then_refill():
+    store = MemoryRateLimitStore()
+    limit = RateLimit.per_minute(60, burst=3)  # one token a second
+    assert [store.consume("k", limit, 100.0) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.consume("k", limit, 100.0) == pytest.approx(1.0)
+    # Half a token has come back, so the wait is half a second
+    assert store.consume("k", limit, 100.5) == pytest.approx(0.5)
+    assert store.consume("k", limit, 101.0) == 0.0
+    # A long idle spell refills up to the burst size and no further
+    assert [store.consume("k", limit, 1000.0) for _ in range(4)][-1] > 0
+    assert store.consume("other", limit, 1000.0) == 0.0
+
+
+def test_idle_buckets_are_swept():
+    store = MemoryRateLimitStore(idle_ttl=10, sweep_interval=1)
+    limit = RateLimit.per_hour(10)
+    store.consume("old", limit, store._next_sweep)
+    store.consume("new", limit, store._next_sweep + 20)
+    assert len(store) == 1
+
+
+def test_store_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitStore()
+
+
+def _request(peer: str, forwarded_for: list[str] = ()) -> Request:
+    headers = [(b"x-forwarded-for", value.encode()) for value in forwarded_for]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "client": (peer, 1234)})
+
+
+def test_forwarded_for_is_only_believed_from_trusted_proxies():
+    trusted = rate_limit._trusted_proxies
+    rate_limit._trusted_proxies = [ipaddress.ip_network("10.0.0.0/8")]
+    try:
+        # Straight from the internet: the header is the client's own claim
+        assert client_ip(_request("203.0.113.9", ["198.51.100.1"])) == "203.0.113.9"
+        # Through nginx: the address nginx appended
+        assert client_ip(_request("10.0.0.2", ["198.51.100.1"])) == "198.51.100.1"
+        # A spoofed entry to the left of the real one is ignored, across repeated headers too
+        assert client_ip(_request("10.0.0.2", ["1.2.3.4, 198.51.100.1"])) == "198.51.100.1"
+        assert client_ip(_request("10.0.0.2", ["1.2.3.4", "198.51.100.1, 10.0.0.3"])) == "198.51.100.1"
+        # Nothing but proxies: the furthest one is the best we have
+        assert client_ip(_request("10.0.0.2", ["10.0.0.3"])) == "10.0.0.3"
+        assert client_ip(_request("10.0.0.2")) == "10.0.0.2"
+    finally:
+        rate_limit._trusted_proxies = trusted
+
+
+def test_429_with_retry_after():
+    enabled, store = settings.RATE_LIMIT_ENABLED, get_store()
+    settings.RATE_LIMIT_ENABLED = True
+    configure_store(MemoryRateLimitStore())
+    try:
+        _check_429_with_retry_after()
+    finally:
+        settings.RATE_LIMIT_ENABLED = enabled
+        configure_store(store)
+
+
+def _check_429_with_retry_after():
+    app = FastAPI()
+    limited = rate_limit.rate_limit(
+        "login", per_ip=RateLimit.per_minute(100), per_account=RateLimit.per_minute(2), account_field="username"
+    )
+
+    @app.post("/login", dependencies=[Depends(limited)])
+    def login(body: dict):
+        return {}
+
+    client = TestClient(app)
+    assert client.post("/login", json={"username": "Alice"}).status_code == 200
+    assert client.post("/login", json={"username": "alice "}).status_code == 200
+    response = client.post("/login", json={"username": "ALICE"})
+    assert response.status_code == 429
+    # Two a minute: the next token is 30 seconds away
+    assert response.headers["Retry-After"] == "30"
+    assert client.post("/login", json={"username": "bob"}).status_code == 200
+
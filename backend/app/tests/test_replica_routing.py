@@ -0,0 +1,86 @@
+import os
+import tempfile
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base
+from app.core.replicas import READ_ONLY_KEY, ROUTER_KEY, ReplicaRouter, RoutingSession, set_session_user
+
+
+def _setup(lag: float = 0.0, sticky_seconds: float = 5.0):
+    """
+    A primary and a "replica" as two separate SQLite files. Nothing replicates
+    between them, so where a row can be read from shows where the read went.
+    """
+    directory = tempfile.mkdtemp()
+    primary = create_engine(f"sqlite:///{os.path.join(directory, 'primary.db')}")
+    replica = create_engine(f"sqlite:///{os.path.join(directory, 'replica.db')}")
+    Base.metadata.create_all(bind=primary)
+    Base.metadata.create_all(bind=replica)
+    router = ReplicaRouter(primary, [replica], sticky_seconds=sticky_seconds, max_lag_seconds=10, lag_probe=lambda engine: lag)
+    factory = sessionmaker(class_=RoutingSession, autoflush=False, bind=primary, info={ROUTER_KEY: router})
+    return router, factory
+
+
+def _add_user(factory, username: str, acting_as: str = None) -> None:
+    db = factory()
+    if acting_as:
+        set_session_user(db, acting_as)
+    db.add(models.User(username=username, email=f"{username}@example.com", password="x", is_active=True))
+    db.commit()
+    db.close()
+
+
+def _visible(factory, username: str, acting_as: str = None) -> bool:
+    db = factory(info={READ_ONLY_KEY: True})
+    if acting_as:
+        set_session_user(db, acting_as)
+    try:
+        return db.query(models.User).filter(models.User.username == username).first() is not None
+    finally:
+        db.close()
+
+
+def test_reads_go_to_replica_and_writes_to_primary():
+    router, factory = _setup()
+    _add_user(factory, "written")
+    # Only the primary has the row, so a read-only session can't see it...
+    assert not _visible(factory, "written")
+    # ...while a read in a read-write session goes to the primary
+    db = factory()
+    assert db.query(models.User).filter(models.User.username == "written").first() is not None
+    db.close()
+
+
+def test_read_your_writes():
+    router, factory = _setup()
+    _add_user(factory, "mine", acting_as="writer")
+    assert _visible(factory, "mine", acting_as="writer")
+    # Other users aren't pinned by someone else's write
+    assert not _visible(factory, "mine", acting_as="someone_else")
+
+
+def test_read_your_writes_expires_once_replicas_catch_up():
+    router, factory = _setup(sticky_seconds=0)
+    _add_user(factory, "mine", acting_as="writer")
+    assert not _visible(factory, "mine", acting_as="writer")
+
+
+def test_lagging_replica_is_skipped():
+    router, factory = _setup(lag=60)
+    _add_user(factory, "fresh")
+    assert _visible(factory, "fresh")
+    assert list(router.replica_lags().values()) == [60]
+
+
+def test_session_stays_on_primary_after_writing():
+    router, factory = _setup()
+    db = factory(info={READ_ONLY_KEY: True})
+    db.add(models.User(username="inline", email="inline@example.com", password="x", is_active=True))
+    db.flush()
+    assert db.query(models.User).filter(models.User.username == "inline").first() is not None
+    db.rollback()
+    db.close()
+
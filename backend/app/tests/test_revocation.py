@@ -0,0 +1,62 @@
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from app import models
+from app.core.revocation import BloomFilter, revocations
+from app.db import SessionLocal
+
+
+def test_bloom_filter_never_misses_an_added_item():
+    bloom = BloomFilter(capacity=10000)
+    added = [uuid.uuid4().hex for _ in range(10000)]
+    for jti in added:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in added)
+    # Items that already looked present (false positives) are not counted twice
+    assert 9800 < bloom.count <= 10000
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    for _ in range(10000):
+        bloom.add(uuid.uuid4().hex)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(20000))
+    # 1% expected at capacity; allow for chance
+    assert false_positives < 20000 * 0.02
+    # About 1.2 bytes per item
+    assert len(bloom._array) < 10000 * 1.3
+
+
+
+def test_revoking_the_same_token_twice_does_not_fail(db):
+    jti = uuid.uuid4().hex
+    expires_at = datetime.now(timezone.utc) + timedelta(minutes=15)
+    # Twice before committing, as when one logout revokes a token by id and by its login
+    revocations.revoke(db, jti, expires_at)
+    revocations.revoke(db, jti, expires_at)
+    db.commit()
+
+    # And from two requests at once
+    start = threading.Barrier(2)
+    errors = []
+
+    def logout():
+        session = SessionLocal()
+        try:
+            start.wait(timeout=10)
+            revocations.revoke(session, jti, expires_at)
+            session.commit()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=logout) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert db.query(models.RevokedToken).filter(models.RevokedToken.jti == jti).count() == 1
+    assert revocations.is_revoked(jti)
@@ -0,0 +1,156 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base, _create_engine
+from app.core.shards import DEFAULT_SHARD, SHARDS_KEY, ShardRouter, ShardRoutingSession, pin_team, scatter
+from app.utils import shard_move
+
+
+def _setup(*shards: str):
+    """A primary plus one SQLite file per named shard, and a session factory routing across them."""
+    directory = tempfile.mkdtemp()
+    primary = _create_engine(f"sqlite:///{os.path.join(directory, 'primary.db')}")
+    engines = {name: _create_engine(f"sqlite:///{os.path.join(directory, f'{name}.db')}") for name in shards}
+    for engine in (primary, *engines.values()):
+        Base.metadata.create_all(bind=engine)
+    router = ShardRouter(primary, engines, Base.metadata, directory_ttl=60, id_block_size=10)
+    factory = sessionmaker(class_=ShardRoutingSession, autoflush=False, bind=primary, info={SHARDS_KEY: router})
+    return router, factory
+
+
+@contextmanager
+def _moving_with(router):
+    """Points shard_move at the test's router, and back at the app's afterwards."""
+    previous = shard_move.shard_router
+    shard_move.shard_router = router
+    try:
+        yield
+    finally:
+        shard_move.shard_router = previous
+
+
+def _stored_on(router, name: str, model, id_: int) -> bool:
+    db = sessionmaker(bind=router.engine(name))()
+    try:
+        return db.get(model, id_) is not None
+    finally:
+        db.close()
+
+
+def _create_team(factory, name: str, tasks: int = 2) -> tuple[int, int, list[int]]:
+    """A user with a team, a project and some tasks. Returns (user id, team id, task ids)."""
+    db = factory()
+    user = models.User(username=f"{name}_owner", email=f"{name}@example.com", password="x", is_active=True)
+    db.add(user)
+    db.commit()
+    team = models.Team(name=name, owner_id=user.id)
+    db.add(team)
+    db.flush()
+    db.add(models.TeamMember(user_id=user.id, team_id=team.id, role=models.TeamRoleEnum.admin, status=models.InvitationStatusEnum.accepted))
+    project = models.Project(name=f"{name} project", team_id=team.id)
+    db.add(project)
+    db.flush()
+    task_objs = [models.Task(title=f"{name} task {i}", project_id=project.id, assignee_id=user.id) for i in range(tasks)]
+    db.add_all(task_objs)
+    db.commit()
+    ids = user.id, team.id, [task.id for task in task_objs]
+    db.close()
+    return ids
+
+
+def test_new_teams_are_spread_over_shards():
+    router, factory = _setup("a", "b")
+    _, first, _ = _create_team(factory, "first")
+    _, second, _ = _create_team(factory, "second")
+    placed = {router.lookup(first)[0], router.lookup(second)[0]}
+    assert placed == {"a", "b"}
+    for team_id in (first, second):
+        shard = router.lookup(team_id)[0]
+        assert _stored_on(router, shard, models.Team, team_id)
+        assert not _stored_on(router, DEFAULT_SHARD, models.Team, team_id)
+
+
+def test_ids_are_unique_across_shards():
+    router, factory = _setup("a", "b")
+    task_ids = []
+    for name in ("one", "two", "three"):
+        task_ids.extend(_create_team(factory, name, tasks=15)[2])
+    assert len(set(task_ids)) == len(task_ids)
+
+
+def test_unsaved_teams_leave_no_directory_entry():
+    router, factory = _setup("a", "b")
+    db = factory()
+    db.add(models.Team(name=None))
+    try:
+        db.commit()
+        assert False, "a team without a name should not save"
+    except IntegrityError:
+        db.rollback()
+    db.add(models.Team(name="abandoned"))
+    db.flush()
+    assert sum(router.team_counts().values()) == 1
+    db.close()
+    assert sum(router.team_counts().values()) == 0
+
+
+def test_queries_follow_the_team():
+    router, factory = _setup("a", "b")
+    user_id, team_id, task_ids = _create_team(factory, "routed")
+    db = factory()
+    # By the task id alone...
+    assert db.query(models.Task).filter(models.Task.id == task_ids[0]).first() is not None
+    db.close()
+    # ...and by the team the session was pinned to
+    db = factory()
+    pin_team(db, team_id)
+    assert db.query(models.Project).count() == 1
+    db.close()
+    # Users are copied to the team's shard, so the owner can be joined there
+    assert _stored_on(router, router.lookup(team_id)[0], models.User, user_id)
+
+
+def test_scatter_collects_from_every_shard():
+    router, factory = _setup("a", "b")
+    _create_team(factory, "left")
+    _create_team(factory, "right")
+    db = factory()
+    names = scatter(factory, db, lambda session: [team.name for team in session.query(models.Team).all()])
+    db.close()
+    assert sorted(names) == ["left", "right"]
+
+
+def test_move_team_keeps_ids_and_rows():
+    router, factory = _setup("a", "b")
+    _, team_id, task_ids = _create_team(factory, "mover", tasks=3)
+    source = router.lookup(team_id)[0]
+    target = "b" if source == "a" else "a"
+    with _moving_with(router):
+        copied = shard_move.move_team(team_id, target, wait=0)
+    assert copied["tasks"] == 3
+    assert router.lookup(team_id) == (target, False)
+    assert not _stored_on(router, source, models.Team, team_id)
+    db = factory()
+    assert sorted(task.id for task in db.query(models.Task).filter(models.Task.project_id.in_(
+        [project.id for project in db.query(models.Project).filter(models.Project.team_id == team_id)]
+    ))) == sorted(task_ids)
+    db.close()
+
+
+def test_rebalance_drains_a_shard():
+    router, factory = _setup("a", "b")
+    for name in ("one", "two", "three"):
+        _create_team(factory, name)
+    with _moving_with(router):
+        plan = shard_move.rebalance_plan(drain="a")
+        assert plan and all(source == "a" and target == "b" for _, source, target in plan)
+        for team_id, _, target in plan:
+            shard_move.move_team(team_id, target, wait=0)
+        assert shard_move.teams_on("a") == []
+        assert len(shard_move.teams_on("b")) == 3
+
@@ -0,0 +1,34 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi.testclient import TestClient
+
+from app import models
+from app.main import create_app
+from app.utils import email
+
+
+def test_signing_up_again_takes_over_the_pending_account_and_restarts_its_clock(db):
+    # Left unverified since the day before yesterday
+    stale = datetime.now(timezone.utc) - timedelta(days=2)
+    db.add(models.User(username="su_first", email="su_again@example.com", password="x", is_active=False, created_at=stale))
+    db.commit()
+
+    sent = []
+    send_otp_email = email.send_otp_email
+    email.send_otp_email = lambda email, otp: sent.append((email, otp))
+    try:
+        response = TestClient(create_app()).post("/users/signup", json={
+            "username": "su_second", "email": "su_again@example.com", "password": "s3cret-pass", "full_name": "Again",
+        })
+    finally:
+        email.send_otp_email = send_otp_email
+    assert response.status_code == 201
+    assert [address for address, _ in sent] == ["su_again@example.com"]
+
+    db.expire_all()
+    users = db.query(models.User).filter(models.User.email == "su_again@example.com").all()
+    assert [user.username for user in users] == ["su_second"]
+    created_at = users[0].created_at
+    created_at = created_at if created_at.tzinfo else created_at.replace(tzinfo=timezone.utc)
+    # Not old enough for the inactive-user cleanup while the new code is still valid
+    assert created_at > datetime.now(timezone.utc) - timedelta(hours=1)
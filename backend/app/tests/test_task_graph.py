@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+from app.utils.task_graph import CycleError, ProjectGraph, TaskGraphCache
+
+
+def _rebuilt(graph: ProjectGraph) -> ProjectGraph:
+    """The same tasks and edges loaded from scratch, as a cache miss would."""
+    return ProjectGraph(
+        ((task_id, graph.duration[task_id], graph.due_date[task_id]) for task_id in graph.duration),
+        ((pred, succ) for pred, succs in graph.succs.items() for succ in succs),
+    )
+
+
+def _longest_chain(graph: ProjectGraph) -> int:
+    """Makespan by brute force: the longest chain of work ending at each task, memoised."""
+    finish = {}
+    def earliest_finish(task_id):
+        if task_id not in finish:
+            finish[task_id] = graph.duration[task_id] + max((earliest_finish(p) for p in graph.preds[task_id]), default=0)
+        return finish[task_id]
+    return max((earliest_finish(task_id) for task_id in graph.duration), default=0)
+
+
+def _assert_matches_rebuild(graph: ProjectGraph) -> None:
+    fresh = _rebuilt(graph)
+    assert graph.head == fresh.head
+    assert graph.tail == fresh.tail
+    assert graph.makespan == fresh.makespan == _longest_chain(graph)
+    assert graph.critical_path() == fresh.critical_path()
+    path = graph.critical_path()
+    assert sum(graph.duration[task_id] for task_id in path) == graph.makespan
+    assert all(succ in graph.succs[pred] for pred, succ in zip(path, path[1:]))
+    assert all(graph.slack(task_id) == 0 for task_id in path)
+    assert all(graph.slack(task_id) >= 0 for task_id in graph.duration)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_updates_match_a_full_rebuild(seed):
+    rng = random.Random(seed)
+    graph = ProjectGraph(((task_id, rng.randint(0, 5), None) for task_id in range(1, 16)), [])
+    for step in range(300):
+        tasks = list(graph.duration)
+        operation = rng.random()
+        if operation < 0.45:
+            pred, succ = rng.sample(tasks, 2)
+            if graph.would_create_cycle(pred, succ):
+                with pytest.raises(CycleError):
+                    graph.add_edge(pred, succ)
+            else:
+                graph.add_edge(pred, succ)
+        elif operation < 0.7:
+            edges = [(pred, succ) for pred, succs in graph.succs.items() for succ in succs]
+            if edges:
+                graph.remove_edge(*rng.choice(edges))
+        elif operation < 0.95:
+            graph.set_duration(rng.choice(tasks), rng.randint(0, 5))
+        else:
+            graph.add_task(max(tasks) + 1, rng.randint(0, 5), None)
+        _assert_matches_rebuild(graph)
+
+
+def test_rejected_edge_leaves_graph_unchanged():
+    graph = ProjectGraph([(1, 2, None), (2, 3, None), (3, 1, None)], [(1, 2), (2, 3)])
+    with pytest.raises(CycleError):
+        graph.add_edge(3, 1)
+    assert graph.succs[3] == set()
+    assert graph.makespan == 6
+    assert graph.critical_path() == [1, 2, 3]
+
+
+def test_cache_drops_a_graph_that_is_out_of_step():
+    cache = TaskGraphCache()
+    graph = ProjectGraph([(1, 1, None), (2, 1, None)], [(1, 2)])
+    cache._graphs[7] = (float("inf"), graph)
+    cache.apply([("edge_added", 7, 2, 1)])
+    assert cache.peek(7) is None
+
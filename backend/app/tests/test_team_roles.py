@@ -0,0 +1,56 @@
+import copy
+
+from app import models
+from app.api.v1.teams import PERMISSION_MATRIX
+
+ADMIN, MANAGER, MEMBER = models.TeamRoleEnum.admin, models.TeamRoleEnum.manager, models.TeamRoleEnum.member
+ACCEPTED, PENDING = models.InvitationStatusEnum.accepted, models.InvitationStatusEnum.pending
+
+
+def _seed(db, me, boss):
+    """Teams covering every (role, owner) combination for `me`, plus one pending invitation and one stranger's team."""
+    memberships = [
+        (me, ADMIN, ACCEPTED), (boss, ADMIN, ACCEPTED), (boss, MANAGER, ACCEPTED), (boss, MEMBER, ACCEPTED),
+        (me, MEMBER, ACCEPTED), (boss, ADMIN, PENDING), (boss, ADMIN, None),
+    ]
+    team_ids = []
+    for index, (owner, role, status) in enumerate(memberships):
+        team = models.Team(name=f"roles {index}", owner_id=owner.id)
+        db.add(team)
+        db.flush()
+        team_ids.append(team.id)
+        if status is not None:
+            db.add(models.TeamMember(team_id=team.id, user_id=me.id, role=role, status=status))
+    db.commit()
+    return team_ids
+
+
+def test_my_roles_matches_my_role_for_every_team(db, make_user, client_as):
+    me, boss = make_user("roles_me"), make_user("roles_boss")
+    team_ids = _seed(db, me, boss)
+    client = client_as(me)
+    matrix_before = copy.deepcopy(PERMISSION_MATRIX)
+
+    response = client.get("/teams/my-roles")
+    assert response.status_code == 200
+    roles = response.json()
+    # Accepted memberships only, by team id
+    accepted = team_ids[:5]
+    assert [entry["team_id"] for entry in roles] == accepted
+
+    for entry in roles:
+        single = client.get(f"/teams/{entry['team_id']}/my-role")
+        assert single.status_code == 200
+        assert {"team_id": entry["team_id"], **single.json()} == entry
+
+    by_team = {entry["team_id"]: entry for entry in roles}
+    assert by_team[team_ids[0]]["is_owner"] and by_team[team_ids[0]]["permissions"]["can_delete_team"]
+    assert by_team[team_ids[4]]["is_owner"] and not by_team[team_ids[4]]["is_admin"]
+    assert not by_team[team_ids[2]]["permissions"]["can_invite_members"]
+
+    # No entry and no access for a pending invitation or someone else's team
+    for team_id in team_ids[5:]:
+        assert client.get(f"/teams/{team_id}/my-role").status_code == 404
+    # Responses share the compiled entries; none of this may have changed them
+    assert PERMISSION_MATRIX == matrix_before
+
@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta, timezone
+
+from app import models
+
+START = datetime(2031, 3, 1, tzinfo=timezone.utc)
+
+
+def _project(db, owner, name: str, member: bool = True) -> models.Project:
+    team = models.Team(name=name, owner_id=owner.id)
+    db.add(team)
+    db.flush()
+    if member:
+        db.add(models.TeamMember(team_id=team.id, user_id=owner.id, role=models.TeamRoleEnum.admin,
+                                 status=models.InvitationStatusEnum.accepted))
+    project = models.Project(name=f"{name} project", team_id=team.id, due_date=START + timedelta(days=3))
+    db.add(project)
+    db.flush()
+    return project
+
+
+def _pages(client, **params) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        page = client.get("/timeline/", params={**params, **({"after": cursor} if cursor else {})})
+        assert page.status_code == 200
+        pages.append(page.json()["items"])
+        cursor = page.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def test_pages_across_teams_in_due_date_order_without_gaps(db, make_user, client_as):
+    user, other = make_user("tl_user"), make_user("tl_other")
+    first, second = _project(db, user, "tl first"), _project(db, user, "tl second")
+    hidden = _project(db, other, "tl hidden", member=False)
+    day = START + timedelta(days=1)
+    # Several items share a due date, so the page boundaries fall inside ties
+    db.add_all([models.Task(title=f"tl task {i}", project_id=project.id, due_date=day)
+                for i, project in enumerate([first, second, first, second])])
+    db.add_all([
+        models.Milestone(name="tl milestone", project_id=second.id, due_date=day),
+        models.Task(title="tl later", project_id=first.id, due_date=START + timedelta(days=2)),
+        models.Task(title="tl done", project_id=first.id, due_date=day, status=models.TaskStatusEnum.done),
+        models.Task(title="tl not mine", project_id=hidden.id, due_date=day),
+        models.Task(title="tl out of range", project_id=first.id, due_date=START + timedelta(days=30)),
+    ])
+    db.commit()
+    client = client_as(user)
+    window = {"start": START.isoformat(), "end": (START + timedelta(days=14)).isoformat()}
+
+    everything = _pages(client, **window, limit=500)[0]
+    titles = [item["title"] for item in everything]
+    assert titles[0] == "tl milestone"
+    assert titles[1:5] == sorted(titles[1:5]) and set(titles[1:5]) == {f"tl task {i}" for i in range(4)}
+    assert titles[5:] == ["tl later", "tl first project", "tl second project"]
+
+    pages = _pages(client, **window, limit=2)
+    assert all(len(page) <= 2 for page in pages)
+    assert [item for page in pages for item in page] == everything
+
+    with_done = _pages(client, **window, limit=3, include_completed=True)
+    assert len([item for page in with_done for item in page]) == len(everything) + 1
+
+
+def test_bad_ranges_and_cursors_are_rejected(make_user, client_as):
+    client = client_as(make_user("tl_bad"))
+    assert client.get("/timeline/", params={"start": START.isoformat(), "end": START.isoformat()}).status_code == 400
+    assert client.get("/timeline/", params={"after": "not a cursor"}).status_code == 400
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+
+from app import models
+from app.utils.workload import compute_workload
+
+HIGH, MEDIUM, LOW = models.TaskPriorityEnum.high, models.TaskPriorityEnum.medium, models.TaskPriorityEnum.low
+ACCEPTED, PENDING = models.InvitationStatusEnum.accepted, models.InvitationStatusEnum.pending
+
+
+def _build(db):
+    """Two teams sharing one member, with tasks chosen to land in every bucket."""
+    now = datetime.now(timezone.utc)
+    ann, ben, cat, dan = (models.User(username=f"wl_{name}", email=f"wl_{name}@example.com", password="x", is_active=True)
+                          for name in ("ann", "ben", "cat", "dan"))
+    db.add_all([ann, ben, cat, dan])
+    db.flush()
+    team, other_team = models.Team(name="wl team", owner_id=ann.id), models.Team(name="wl other", owner_id=ben.id)
+    db.add_all([team, other_team])
+    db.flush()
+    db.add_all([
+        models.TeamMember(team_id=team.id, user_id=ann.id, role=models.TeamRoleEnum.admin, status=ACCEPTED),
+        models.TeamMember(team_id=team.id, user_id=ben.id, status=ACCEPTED),
+        models.TeamMember(team_id=team.id, user_id=cat.id, status=ACCEPTED),
+        # Invited but not yet in: not reported
+        models.TeamMember(team_id=team.id, user_id=dan.id, status=PENDING),
+        models.TeamMember(team_id=other_team.id, user_id=ben.id, status=ACCEPTED),
+    ])
+    alpha, beta = models.Project(name="alpha", team_id=team.id), models.Project(name="beta", team_id=team.id)
+    shelved = models.Project(name="shelved", team_id=team.id, status=models.ProjectStatusEnum.archived)
+    elsewhere = models.Project(name="elsewhere", team_id=other_team.id)
+    db.add_all([alpha, beta, shelved, elsewhere])
+    db.flush()
+
+    def task(project, assignee, priority=MEDIUM, due_in=None, status=models.TaskStatusEnum.todo):
+        due_date = now + timedelta(days=due_in) if due_in is not None else None
+        db.add(models.Task(title="t", project_id=project.id, assignee_id=assignee.id, priority=priority,
+                           due_date=due_date, status=status))
+
+    task(alpha, ann, HIGH, due_in=-2)
+    task(alpha, ann, HIGH, due_in=3, status=models.TaskStatusEnum.in_progress)
+    task(beta, ann, LOW, due_in=30)
+    task(beta, ann, due_in=-1, status=models.TaskStatusEnum.done)  # finished: not counted
+    task(shelved, ann, HIGH, due_in=-5)  # archived project: not counted
+    task(alpha, ben, MEDIUM, due_in=6)
+    task(elsewhere, ben, HIGH, due_in=-1)  # other team: only in ben's totals
+    task(elsewhere, ben, LOW)
+    task(alpha, dan, HIGH)
+    db.commit()
+    return team.id, {user.username: user.id for user in (ann, ben, cat, dan)}
+
+
+def test_workload_report_on_hand_built_data(db):
+    team_id, users = _build(db)
+    report = compute_workload(db, team_id)
+
+    members = {member["username"]: member for member in report["members"]}
+    assert set(members) == {"wl_ann", "wl_ben", "wl_cat"}
+    # Most overdue first, then most open tasks
+    assert [member["username"] for member in report["members"]] == ["wl_ann", "wl_ben", "wl_cat"]
+
+    ann = members["wl_ann"]
+    assert ann["open_tasks"] == 3
+    assert ann["by_priority"] == {"high": 2, "medium": 0, "low": 1}
+    assert (ann["in_progress"], ann["overdue"], ann["due_soon"], ann["projects"]) == (1, 1, 1, 2)
+    assert ann["next_due_date"] is not None
+    assert ann["all_teams"] == {"open_tasks": 3, "high": 2, "overdue": 1, "due_soon": 1, "teams": 1}
+
+    ben = members["wl_ben"]
+    assert (ben["open_tasks"], ben["overdue"], ben["due_soon"], ben["projects"]) == (1, 0, 1, 1)
+    assert ben["by_priority"] == {"high": 0, "medium": 1, "low": 0}
+    assert ben["all_teams"] == {"open_tasks": 3, "high": 1, "overdue": 1, "due_soon": 1, "teams": 2}
+
+    cat = members["wl_cat"]
+    assert (cat["open_tasks"], cat["overdue"], cat["projects"], cat["next_due_date"]) == (0, 0, 0, None)
+    assert cat["by_priority"] == {"high": 0, "medium": 0, "low": 0}
+    assert cat["all_teams"]["open_tasks"] == 0
+
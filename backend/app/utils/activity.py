@@ -0,0 +1,320 @@
+import enum
+import threading
+import time
+from collections import deque
+from datetime import datetime, date, timezone
+from typing import Optional
+from sqlalchemy import event, inspect, insert, select, text
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+
+from app import models
+from app.db import SessionLocal
+
+# Models whose inserts, updates and deletes are recorded
+TRACKED_MODELS = (
+    models.Team, models.TeamMember, models.Project, models.Milestone,
+    models.Task, models.TaskDependency, models.Friendship,
+)
+# Columns never copied into the log
+_EXCLUDED_COLUMNS = {"password", "code_hash", "version"}
+
+ACTOR_KEY = "activity_actor_id"
+
+
+def set_actor(db: Session, user_id: int) -> None:
+    """Records who is making changes through this session (set by get_current_user)."""
+    db.info[ACTOR_KEY] = user_id
+
+
+# --- Ring Buffer ---
+
+class ActivityBuffer:
+    """
+    Bounded in-memory queue between request handlers and the writer thread.
+    When it is full the oldest events are dropped rather than blocking requests;
+    the counters below expose how close to that the system is running.
+    """
+
+    def __init__(self, capacity: int = 50_000):
+        self.capacity = capacity
+        self._events: deque = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Event()
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed_batches = 0
+        self.high_watermark = 0
+        self.last_flush_at: Optional[float] = None
+        self.last_flush_seconds = 0.0
+
+    def push_many(self, events: list[dict]) -> None:
+        with self._lock:
+            overflow = len(self._events) + len(events) - self.capacity
+            if overflow > 0:
+                from_buffer = min(overflow, len(self._events))
+                for _ in range(from_buffer):
+                    self._events.popleft()
+                events = events[overflow - from_buffer:]
+                self.dropped += overflow
+            self._events.extend(events)
+            self.enqueued += len(events)
+            self.high_watermark = max(self.high_watermark, len(self._events))
+        self._not_empty.set()
+
+    def pop_batch(self, size: int) -> list[dict]:
+        with self._lock:
+            batch = [self._events.popleft() for _ in range(min(size, len(self._events)))]
+            if not self._events:
+                self._not_empty.clear()
+            return batch
+
+    def requeue(self, batch: list[dict]) -> None:
+        """Puts a batch that failed to write back at the front, dropping it if there is no room."""
+        with self._lock:
+            room = self.capacity - len(self._events)
+            keep = batch[-room:] if room > 0 else []
+            self.dropped += len(batch) - len(keep)
+            self._events.extendleft(reversed(keep))
+        self._not_empty.set()
+
+    def wait(self, timeout: float) -> None:
+        self._not_empty.wait(timeout)
+
+    def wake(self) -> None:
+        self._not_empty.set()
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def metrics(self) -> dict:
+        size = len(self._events)
+        return {
+            "buffered": size,
+            "capacity": self.capacity,
+            "fill_ratio": size / self.capacity if self.capacity else 0.0,
+            "high_watermark": self.high_watermark,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "last_flush_at": datetime.fromtimestamp(self.last_flush_at, timezone.utc) if self.last_flush_at else None,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+
+activity_buffer = ActivityBuffer()
+
+
+# --- Background Writer ---
+
+class ActivityWriter:
+    """Drains the buffer into activity_log with one multi-row INSERT per batch."""
+
+    def __init__(self, buffer: ActivityBuffer, batch_size: int = 500, flush_interval: float = 1.0):
+        self.buffer = buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="activity-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self.buffer.wake()
+        if self._thread:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _maintain_partitions(self) -> None:
+        db = SessionLocal()
+        try:
+            ensure_partitions(db)
+        except Exception as e:
+            db.rollback()
+            print(f"Error creating activity_log partitions: {e}")
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        self._maintain_partitions()
+        next_maintenance = time.monotonic() + 86400
+        while not self._stop.is_set():
+            if time.monotonic() >= next_maintenance:
+                self._maintain_partitions()
+                next_maintenance = time.monotonic() + 86400
+            self.buffer.wait(self.flush_interval)
+            # Give a trickle of events a moment to accumulate into a real batch
+            if len(self.buffer) < self.batch_size:
+                self._stop.wait(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> int:
+        """Writes everything currently buffered; returns the number of rows written."""
+        total = 0
+        while True:
+            batch = self.buffer.pop_batch(self.batch_size)
+            if not batch:
+                return total
+            started = time.perf_counter()
+            db = SessionLocal()
+            try:
+                _resolve_team_ids(db, batch)
+                db.execute(insert(models.ActivityLog), batch)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                self.buffer.failed_batches += 1
+                self.buffer.requeue(batch)
+                print(f"Error writing {len(batch)} activity event(s): {e}")
+                return total
+            finally:
+                db.close()
+            self.buffer.written += len(batch)
+            self.buffer.last_flush_at = time.time()
+            self.buffer.last_flush_seconds = time.perf_counter() - started
+            total += len(batch)
+
+
+def _month_start(year: int, month: int) -> date:
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+def ensure_partitions(db: Session, months_ahead: int = 3) -> None:
+    """
+    Creates the monthly activity_log partitions for this month and the next few
+    (Postgres only). Rows outside them land in activity_log_default, so a missed
+    run never loses events, but keeping ahead of time keeps monthly pruning working.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return
+    today = date.today()
+    for offset in range(months_ahead + 1):
+        start = _month_start(today.year, today.month + offset)
+        end = _month_start(today.year, today.month + offset + 1)
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS activity_log_{start:%Y_%m} PARTITION OF activity_log "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        ))
+    db.commit()
+
+
+def _resolve_team_ids(db: Session, batch: list[dict]) -> None:
+    # Events about milestones/tasks may only know their project; look up all teams at once
+    missing = {e["project_id"] for e in batch if e["team_id"] is None and e["project_id"] is not None}
+    if not missing:
+        return
+    teams = dict(db.execute(
+        select(models.Project.id, models.Project.team_id).where(models.Project.id.in_(missing))
+    ).all())
+    for e in batch:
+        if e["team_id"] is None and e["project_id"] is not None:
+            e["team_id"] = teams.get(e["project_id"])
+
+
+activity_writer = ActivityWriter(activity_buffer)
+
+
+# --- Capturing Changes ---
+
+def _jsonable(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+def _identity_mapped(session: Session, model, pk):
+    # Only look in the identity map, so capturing never adds queries to a flush
+    if pk is None:
+        return None
+    return session.identity_map.get(identity_key(model, pk))
+
+def _scope(session: Session, obj) -> tuple[Optional[int], Optional[int]]:
+    """(team_id, project_id) an event belongs to, as far as can be told without querying."""
+    if isinstance(obj, models.Team):
+        return obj.id, None
+    if isinstance(obj, models.TeamMember):
+        return obj.team_id, None
+    if isinstance(obj, models.Project):
+        return obj.team_id, obj.id
+    if isinstance(obj, (models.Milestone, models.Task)):
+        project = _identity_mapped(session, models.Project, obj.project_id)
+        return (project.team_id if project else None), obj.project_id
+    if isinstance(obj, models.TaskDependency):
+        task = _identity_mapped(session, models.Task, obj.task_id)
+        if task is None:
+            return None, None
+        project = _identity_mapped(session, models.Project, task.project_id)
+        return (project.team_id if project else None), task.project_id
+    return None, None
+
+def _event(session: Session, obj, action: str, changes: Optional[dict]) -> dict:
+    team_id, project_id = _scope(session, obj)
+    return {
+        "occurred_at": datetime.now(timezone.utc),
+        "actor_id": session.info.get(ACTOR_KEY),
+        "team_id": team_id,
+        "project_id": project_id,
+        "entity_type": obj.__tablename__,
+        "entity_id": getattr(obj, "id", None),
+        "action": action,
+        "changes": changes,
+    }
+
+def _column_values(obj) -> dict:
+    # state.dict holds only what is already loaded; server defaults that would need
+    # a SELECT to fetch (e.g. created_at) are left out
+    state = inspect(obj)
+    return {
+        key: _jsonable(state.dict[key])
+        for key in state.mapper.column_attrs.keys()
+        if key in state.dict and key not in _EXCLUDED_COLUMNS
+    }
+
+def _column_changes(obj) -> dict:
+    state = inspect(obj)
+    changes = {}
+    for key in state.mapper.column_attrs.keys():
+        if key in _EXCLUDED_COLUMNS:
+            continue
+        history = state.attrs[key].history
+        if history.has_changes():
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+            changes[key] = [_jsonable(old), _jsonable(new)]
+    return changes
+
+
+_PENDING_KEY = "activity_events"
+
+@event.listens_for(Session, "after_flush")
+def _capture_activity(session: Session, flush_context) -> None:
+    events = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, TRACKED_MODELS):
+            events.append(_event(session, obj, "created", _column_values(obj)))
+    for obj in session.dirty:
+        if isinstance(obj, TRACKED_MODELS):
+            changes = _column_changes(obj)
+            if changes:
+                events.append(_event(session, obj, "updated", changes))
+    for obj in session.deleted:
+        if isinstance(obj, TRACKED_MODELS):
+            events.append(_event(session, obj, "deleted", None))
+
+@event.listens_for(Session, "after_commit")
+def _enqueue_activity(session: Session) -> None:
+    events = session.info.pop(_PENDING_KEY, None)
+    if events:
+        activity_buffer.push_many(events)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_activity(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,246 @@
+import enum
+import json
+import zlib
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import DateTime, Enum, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.utils.calendar_feed import calendar_cache
+from app.utils.task_graph import ProjectGraph, task_graph_cache
+
+# Tasks moved per transaction (their comments, attachments and dependencies go along)
+CHUNK_SIZE = 500
+
+_TASKS = models.Task.__table__
+_COMMENTS = models.Comment.__table__
+_ATTACHMENTS = models.Attachment.__table__
+_DEPENDENCIES = models.TaskDependency.__table__
+
+
+# --- Encoding ---
+
+def _dump_rows(table, rows) -> list[dict]:
+    records = []
+    for row in rows:
+        record = {}
+        for column in table.columns:
+            value = row._mapping[column]
+            if isinstance(value, enum.Enum):
+                value = value.name
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            record[column.name] = value
+        records.append(record)
+    return records
+
+def _load_rows(table, records: list[dict]) -> list[dict]:
+    for record in records:
+        for column in table.columns:
+            value = record.get(column.name)
+            if value is None:
+                continue
+            if isinstance(column.type, Enum) and column.type.enum_class is not None:
+                record[column.name] = column.type.enum_class[value]
+            elif isinstance(column.type, DateTime):
+                record[column.name] = datetime.fromisoformat(value)
+    return records
+
+def decode_chunk(chunk: models.ProjectArchiveChunk) -> dict[str, list[dict]]:
+    payload = json.loads(zlib.decompress(chunk.payload))
+    return {
+        "tasks": _load_rows(_TASKS, payload["tasks"]),
+        "comments": _load_rows(_COMMENTS, payload["comments"]),
+        "attachments": _load_rows(_ATTACHMENTS, payload["attachments"]),
+        "dependencies": _load_rows(_DEPENDENCIES, payload["dependencies"]),
+    }
+
+
+# --- Starting ---
+
+def start_archive(db: Session, project: models.Project) -> models.ProjectArchive:
+    """Marks a project archived and records that its rows are to be moved out. Commits."""
+    archive = db.get(models.ProjectArchive, project.id)
+    if archive is None:
+        archive = models.ProjectArchive(project_id=project.id, previous_status=project.status)
+        db.add(archive)
+    archive.state = models.ArchiveStateEnum.archiving
+    project.status = models.ProjectStatusEnum.archived
+    db.commit()
+    db.refresh(archive)
+    return archive
+
+def start_restore(db: Session, project: models.Project, status: Optional[models.ProjectStatusEnum] = None) -> models.ProjectArchive:
+    """
+    Records that an archived project's rows are to be moved back, and gives the
+    project back its status from before archiving (or `status`). Commits.
+    """
+    archive = db.get(models.ProjectArchive, project.id)
+    archive.state = models.ArchiveStateEnum.restoring
+    project.status = status or archive.previous_status or models.ProjectStatusEnum.active
+    db.commit()
+    db.refresh(archive)
+    return archive
+
+
+# --- Moving Rows ---
+
+def _dependents_first(db: Session, project_id: int) -> list[int]:
+    """
+    The project's remaining task ids, every task ahead of the tasks it depends on.
+    Archiving in this order means that when a chunk is deleted, every dependency
+    edge the cascade takes with it has already been saved with its dependent task.
+    """
+    task_ids = db.scalars(select(_TASKS.c.id).where(_TASKS.c.project_id == project_id)).all()
+    edges = db.execute(
+        select(_DEPENDENCIES.c.depends_on_id, _DEPENDENCIES.c.task_id)
+        .join(_TASKS, _TASKS.c.id == _DEPENDENCIES.c.task_id)
+        .where(_TASKS.c.project_id == project_id)
+    ).all()
+    graph = ProjectGraph(((task_id, 0, None) for task_id in task_ids), edges)
+    return graph.topological_order()[::-1]
+
+def _archive_chunk(db: Session, archive: models.ProjectArchive, seq: int, task_ids: list[int]) -> None:
+    payload = {
+        "tasks": _dump_rows(_TASKS, db.execute(select(_TASKS).where(_TASKS.c.id.in_(task_ids)))),
+        "comments": _dump_rows(_COMMENTS, db.execute(select(_COMMENTS).where(_COMMENTS.c.task_id.in_(task_ids)))),
+        "attachments": _dump_rows(_ATTACHMENTS, db.execute(select(_ATTACHMENTS).where(_ATTACHMENTS.c.task_id.in_(task_ids)))),
+        "dependencies": _dump_rows(_DEPENDENCIES, db.execute(
+            select(_DEPENDENCIES).where(_DEPENDENCIES.c.task_id.in_(task_ids))
+        )),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    compressed = zlib.compress(raw, 6)
+
+    db.add(models.ProjectArchiveChunk(
+        project_id=archive.project_id, seq=seq, task_count=len(task_ids), payload=compressed
+    ))
+    # Comments, attachments and dependencies go with their tasks (ON DELETE CASCADE)
+    db.execute(delete(models.Task).where(models.Task.id.in_(task_ids)).execution_options(synchronize_session=False))
+
+    archive.task_count += len(payload["tasks"])
+    archive.comment_count += len(payload["comments"])
+    archive.attachment_count += len(payload["attachments"])
+    archive.dependency_count += len(payload["dependencies"])
+    archive.raw_bytes += len(raw)
+    archive.stored_bytes += len(compressed)
+    db.commit()
+
+def archive_project(project_id: int) -> None:
+    """
+    Moves an archiving project's tasks into compressed chunks, one transaction
+    per chunk, so a crash or restart only ever loses the chunk in flight.
+    Safe to run again; it carries on from whatever is still in the hot tables.
+    """
+    db = SessionLocal()
+    try:
+        archive = db.get(models.ProjectArchive, project_id)
+        if archive is None or archive.state != models.ArchiveStateEnum.archiving:
+            return
+        seq = db.scalar(
+            select(func.coalesce(func.max(models.ProjectArchiveChunk.seq), -1))
+            .where(models.ProjectArchiveChunk.project_id == project_id)
+        ) + 1
+        while order := _dependents_first(db, project_id):
+            for start in range(0, len(order), CHUNK_SIZE):
+                _archive_chunk(db, archive, seq, order[start:start + CHUNK_SIZE])
+                task_graph_cache.invalidate(project_id)
+                calendar_cache.invalidate_project(project_id)
+                seq += 1
+        archive.state = models.ArchiveStateEnum.archived
+        archive.archived_at = datetime.now(timezone.utc)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error archiving project {project_id}: {e}")
+    finally:
+        db.close()
+
+def _existing_user_ids(db: Session, records: dict[str, list[dict]]) -> set[int]:
+    wanted = {t["assignee_id"] for t in records["tasks"] if t["assignee_id"] is not None}
+    wanted.update(c["user_id"] for c in records["comments"])
+    wanted.update(a["uploader_id"] for a in records["attachments"])
+    if not wanted:
+        return set()
+    return set(db.scalars(select(models.User.id).where(models.User.id.in_(wanted))))
+
+def restore_project(project_id: int) -> None:
+    """
+    Moves an archived project's rows back into the hot tables: tasks, comments
+    and attachments chunk by chunk, then the dependencies once every task they
+    point at is back. Rows belonging to users deleted in the meantime get what
+    ON DELETE would have done to them. Safe to run again after a failure.
+    """
+    db = SessionLocal()
+    try:
+        archive = db.get(models.ProjectArchive, project_id)
+        if archive is None or archive.state != models.ArchiveStateEnum.restoring:
+            return
+        chunks = db.query(models.ProjectArchiveChunk).filter(
+            models.ProjectArchiveChunk.project_id == project_id
+        ).order_by(models.ProjectArchiveChunk.seq)
+
+        for chunk in chunks.filter(models.ProjectArchiveChunk.restored == False).all():
+            records = decode_chunk(chunk)
+            users = _existing_user_ids(db, records)
+            for task in records["tasks"]:
+                if task["assignee_id"] not in users:
+                    task["assignee_id"] = None
+            comments = [c for c in records["comments"] if c["user_id"] in users]
+            attachments = [a for a in records["attachments"] if a["uploader_id"] in users]
+            for table, rows in ((_TASKS, records["tasks"]), (_COMMENTS, comments), (_ATTACHMENTS, attachments)):
+                if rows:
+                    db.execute(insert(table), rows)
+            chunk.restored = True
+            db.commit()
+
+        for chunk in chunks.all():
+            dependencies = decode_chunk(chunk)["dependencies"]
+            if dependencies:
+                db.execute(insert(_DEPENDENCIES), dependencies)
+            db.delete(chunk)
+            db.commit()
+
+        db.delete(archive)
+        db.commit()
+        task_graph_cache.invalidate(project_id)
+        calendar_cache.invalidate_project(project_id)
+    except Exception as e:
+        db.rollback()
+        print(f"Error restoring project {project_id}: {e}")
+    finally:
+        db.close()
+
+
+# --- Reading ---
+
+def read_archived_tasks(db: Session, project_id: int, after: Optional[int] = None) -> tuple[list[dict], Optional[int]]:
+    """
+    One chunk's worth of an archived project's tasks, each with its comments,
+    attachments and the ids of the tasks it depends on, plus the cursor for the
+    next chunk (None on the last one).
+    """
+    query = db.query(models.ProjectArchiveChunk).filter(models.ProjectArchiveChunk.project_id == project_id)
+    if after is not None:
+        query = query.filter(models.ProjectArchiveChunk.seq > after)
+    chunks = query.order_by(models.ProjectArchiveChunk.seq).limit(2).all()
+    if not chunks:
+        return [], None
+
+    records = decode_chunk(chunks[0])
+    comments, attachments, depends_on = defaultdict(list), defaultdict(list), defaultdict(list)
+    for comment in records["comments"]:
+        comments[comment["task_id"]].append(comment)
+    for attachment in records["attachments"]:
+        attachments[attachment["task_id"]].append(attachment)
+    for dependency in records["dependencies"]:
+        depends_on[dependency["task_id"]].append(dependency["depends_on_id"])
+
+    items = [
+        {**task, "comments": comments[task["id"]], "attachments": attachments[task["id"]], "depends_on": depends_on[task["id"]]}
+        for task in records["tasks"]
+    ]
+    return items, (chunks[0].seq if len(chunks) > 1 else None)
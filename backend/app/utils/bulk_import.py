@@ -0,0 +1,263 @@
+import csv
+import enum
+import io
+import json
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.core.shards import allocate_ids, pin_team
+from app.utils.activity import activity_buffer
+from app.utils.notifications import notify_many
+from app.utils.calendar_feed import calendar_cache
+from app.utils.workload import workload_cache
+from app.utils.task_graph import task_graph_cache
+
+# Rows validated, resolved and loaded together
+BATCH_SIZE = 5000
+# Rejected rows listed individually in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 1000
+
+_KINDS = {
+    "tasks": (models.Task, schemas.TaskImportRow),
+    "milestones": (models.Milestone, schemas.MilestoneImportRow),
+}
+# Columns loaded for each kind, in COPY order
+_COLUMNS = {
+    "tasks": ["project_id", "title", "description", "status", "priority", "due_date", "estimated_days", "assignee_id"],
+    "milestones": ["project_id", "name", "description", "due_date", "status"],
+}
+
+
+# --- Reading ---
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """
+    Yields (row number, record, parse error) for each data row of a CSV (with
+    header) or NDJSON stream, without reading the whole input into memory.
+    Empty CSV cells are treated as missing.
+    """
+    if fmt == "csv":
+        for number, record in enumerate(csv.DictReader(lines), start=1):
+            yield number, {k.strip(): v.strip() for k, v in record.items() if k and v is not None and v.strip()}, None
+        return
+    number = 0
+    for line in lines:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Each line must be a JSON object."
+            continue
+        yield number, record, None
+
+def _batches(iterable: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _error_messages(error: ValidationError) -> list[str]:
+    return [f"{'.'.join(str(part) for part in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()]
+
+
+# --- Loading ---
+
+def _resolve_assignees(db: Session, team_id: int, identifiers: set[str]) -> dict[str, int]:
+    """Maps usernames/emails to user ids in one query, only for accepted members of the team."""
+    if not identifiers:
+        return {}
+    lowered = {identifier.lower() for identifier in identifiers}
+    rows = db.execute(
+        select(models.User.id, models.User.username, models.User.email)
+        .join(models.TeamMember, models.TeamMember.user_id == models.User.id)
+        .where(
+            models.TeamMember.team_id == team_id,
+            models.TeamMember.status == models.InvitationStatusEnum.accepted,
+            or_(models.User.username.in_(identifiers), models.User.email.in_(lowered)),
+        )
+    ).all()
+    resolved = {}
+    for user_id, username, email in rows:
+        resolved[username] = user_id
+        resolved[email.lower()] = user_id
+    return resolved
+
+def _copy_value(value):
+    if isinstance(value, enum.Enum):
+        # Postgres enum columns hold the member names
+        return value.name
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+def _load_copy(db: Session, kind: str, rows: list[dict]) -> None:
+    """
+    COPY the batch into a per-transaction staging table, then move it across with
+    one INSERT ... SELECT so the target's constraints and defaults apply as usual.
+    """
+    model = _KINDS[kind][0]
+    table = model.__tablename__
+    names = (["id"] if "id" in rows[0] else []) + _COLUMNS[kind]
+    columns = ", ".join(names)
+    staging = f"{table}_import_staging"
+    connection = db.connection(bind_arguments={"mapper": model})
+    connection.exec_driver_sql(
+        f"CREATE TEMP TABLE IF NOT EXISTS {staging} ON COMMIT DROP AS SELECT {columns} FROM {table} WITH NO DATA"
+    )
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_copy_value(row[column]) for column in names])
+    buffer.seek(0)
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {staging} ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+    connection.exec_driver_sql(f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging}")
+    connection.exec_driver_sql(f"TRUNCATE {staging}")
+
+def _load_executemany(db: Session, kind: str, rows: list[dict]) -> None:
+    db.execute(insert(_KINDS[kind][0]), rows)
+
+
+def import_rows(
+    db: Session,
+    project: models.Project,
+    kind: str,
+    lines: Iterable[str],
+    fmt: str,
+    dry_run: bool = False,
+    actor_id: Optional[int] = None,
+) -> dict:
+    """
+    Validates and loads task or milestone rows into a project, a batch at a time.
+    Invalid rows are skipped and reported; the valid ones are committed together
+    at the end. With dry_run everything is loaded and then rolled back, so the
+    report still reflects what the database would have accepted.
+    """
+    started = time.perf_counter()
+    model, row_schema = _KINDS[kind]
+    project_id, team_id = project.id, project.team_id
+    pin_team(db, team_id)
+    method = "copy" if db.get_bind(model).dialect.name == "postgresql" else "executemany"
+    load = _load_copy if method == "copy" else _load_executemany
+    total = imported = failed = 0
+    errors: list[dict] = []
+    assigned: Counter = Counter()
+
+    def reject(number: int, messages: list[str]) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": number, "errors": messages})
+
+    try:
+        for batch in _batches(iter_records(lines, fmt), BATCH_SIZE):
+            valid = []
+            for number, record, parse_error in batch:
+                total += 1
+                if parse_error:
+                    reject(number, [parse_error])
+                    continue
+                try:
+                    valid.append((number, row_schema.model_validate(record)))
+                except ValidationError as e:
+                    reject(number, _error_messages(e))
+
+            assignees = {}
+            if kind == "tasks":
+                assignees = _resolve_assignees(db, team_id, {row.assignee for _, row in valid if row.assignee})
+
+            rows = []
+            for number, row in valid:
+                values = row.model_dump()
+                if kind == "tasks":
+                    assignee = values.pop("assignee")
+                    values["assignee_id"] = None
+                    if assignee:
+                        values["assignee_id"] = assignees.get(assignee) or assignees.get(assignee.lower())
+                        if values["assignee_id"] is None:
+                            reject(number, [f"assignee: '{assignee}' is not a member of this team"])
+                            continue
+                values["project_id"] = project_id
+                rows.append(values)
+                if values.get("assignee_id") is not None:
+                    assigned[values["assignee_id"]] += 1
+
+            if rows:
+                # With several shards the ids come from the shared allocator, not the shard's sequence
+                ids = allocate_ids(db, model.__tablename__, len(rows))
+                if ids:
+                    for values, new_id in zip(rows, ids):
+                        values["id"] = new_id
+                load(db, kind, rows)
+                imported += len(rows)
+
+        if dry_run:
+            db.rollback()
+        else:
+            # One inbox entry per assignee, however many tasks they were given
+            notify_many(db, [
+                {
+                    "user_id": user_id,
+                    "kind": "task_assigned",
+                    "actor_id": actor_id,
+                    "team_id": team_id,
+                    "entity_type": "projects",
+                    "entity_id": project_id,
+                    "payload": {"project_name": project.name, "count": count},
+                }
+                for user_id, count in sorted(assigned.items()) if user_id != actor_id
+            ])
+            db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    if imported and not dry_run:
+        if kind == "tasks":
+            task_graph_cache.invalidate(project_id)
+            calendar_cache.invalidate_project(project_id)
+            workload_cache.invalidate_users(assigned)
+        # Core inserts skip the per-row activity hooks; record the import as one entry
+        activity_buffer.push_many([{
+            "occurred_at": datetime.now(timezone.utc),
+            "actor_id": actor_id,
+            "team_id": team_id,
+            "project_id": project_id,
+            "entity_type": model.__tablename__,
+            "entity_id": None,
+            "action": "imported",
+            "changes": {"rows": imported},
+        }])
+
+    errors.sort(key=lambda error: error["row"])
+    seconds = time.perf_counter() - started
+    return {
+        "kind": kind,
+        "dry_run": dry_run,
+        "method": method,
+        "total_rows": total,
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(total / seconds, 1) if seconds else 0.0,
+    }
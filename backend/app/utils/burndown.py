@@ -0,0 +1,133 @@
+import math
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import and_, case, delete, func, insert, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import shard_router
+
+_SNAPSHOT_COLUMNS = ["snapshot_date", "project_id", "milestone_id", "todo", "in_progress", "done"]
+
+
+def _count(status: models.TaskStatusEnum):
+    return func.sum(case((models.Task.status == status, 1), else_=0))
+
+def _snapshot_select(day: date):
+    """Today's counts for every live project (milestone_id 0) and every milestone, as one SELECT."""
+    live = models.Project.status != models.ProjectStatusEnum.archived
+    projects = select(
+        literal(day).label("snapshot_date"),
+        models.Project.id.label("project_id"),
+        literal(0).label("milestone_id"),
+        func.coalesce(_count(models.TaskStatusEnum.todo), 0),
+        func.coalesce(_count(models.TaskStatusEnum.in_progress), 0),
+        func.coalesce(_count(models.TaskStatusEnum.done), 0),
+    ).outerjoin(models.Task, models.Task.project_id == models.Project.id).where(live).group_by(models.Project.id)
+
+    milestones = select(
+        literal(day).label("snapshot_date"),
+        models.Milestone.project_id.label("project_id"),
+        models.Milestone.id.label("milestone_id"),
+        func.coalesce(_count(models.TaskStatusEnum.todo), 0),
+        func.coalesce(_count(models.TaskStatusEnum.in_progress), 0),
+        func.coalesce(_count(models.TaskStatusEnum.done), 0),
+    ).join(
+        models.Project, models.Project.id == models.Milestone.project_id
+    ).outerjoin(
+        models.Task, and_(models.Task.project_id == models.Milestone.project_id, models.Task.due_date <= models.Milestone.due_date)
+    ).where(live).group_by(models.Milestone.id, models.Milestone.project_id)
+
+    return union_all(projects, milestones)
+
+def take_snapshot(day: Optional[date] = None) -> dict[str, int]:
+    """
+    Records the day's counts on every shard with one INSERT ... SELECT each,
+    replacing any rows already written for that day (so reruns are safe).
+    The day defaults to today in UTC, the calendar the read endpoints use.
+    Returns the number of rows written per shard.
+    """
+    day = day or datetime.now(timezone.utc).date()
+    table = models.TaskStatusSnapshot.__table__
+    written = {}
+    for name, engine in shard_router.engines.items():
+        with engine.begin() as connection:
+            connection.execute(delete(table).where(table.c.snapshot_date == day))
+            written[name] = connection.execute(
+                insert(table).from_select(_SNAPSHOT_COLUMNS, _snapshot_select(day))
+            ).rowcount
+    return written
+
+
+# --- Reading ---
+
+def read_series(db: Session, project_id: int, milestone_id: int, start: date, end: date) -> list:
+    return db.query(models.TaskStatusSnapshot).filter(
+        models.TaskStatusSnapshot.project_id == project_id,
+        models.TaskStatusSnapshot.milestone_id == milestone_id,
+        models.TaskStatusSnapshot.snapshot_date >= start,
+        models.TaskStatusSnapshot.snapshot_date <= end,
+    ).order_by(models.TaskStatusSnapshot.snapshot_date).all()
+
+def velocity_forecast(snapshots: list, window: int, target: Optional[date] = None) -> dict:
+    """
+    Velocity and completion forecast from a snapshot series, vectorized over
+    the whole window. Missing days (a skipped nightly run) carry the previous
+    day's counts forward.
+
+    - velocity: mean tasks finished per day (increases in `done`).
+    - net burn: the slope of a least-squares line through the remaining
+      (not done) counts, so scope added along the way slows it down.
+    Each gives a forecast date for remaining reaching zero, if it is burning down.
+    """
+    import numpy as np
+
+    result = {
+        "days": 0, "remaining": None, "velocity_per_day": 0.0, "velocity_per_week": 0.0,
+        "net_burn_per_day": 0.0, "forecast_date": None, "trend_forecast_date": None,
+        "target_date": target, "on_track": None,
+    }
+    if not snapshots:
+        return result
+
+    ordinals = np.fromiter((s.snapshot_date.toordinal() for s in snapshots), dtype=np.int64, count=len(snapshots))
+    done = np.fromiter((s.done for s in snapshots), dtype=np.float64, count=len(snapshots))
+    remaining = np.fromiter((s.todo + s.in_progress for s in snapshots), dtype=np.float64, count=len(snapshots))
+
+    # Forward-fill onto one point per calendar day, then keep the last `window` days
+    days = np.arange(ordinals[0], ordinals[-1] + 1)
+    filled = np.searchsorted(ordinals, days, side="right") - 1
+    done, remaining, days = done[filled][-window:], remaining[filled][-window:], days[-window:]
+
+    last_day, left = date.fromordinal(int(days[-1])), float(remaining[-1])
+    result.update(days=int(days.size), remaining=int(left))
+    if days.size < 2:
+        return result
+
+    velocity = float(np.clip(np.diff(done), 0, None).mean())
+    slope = float(np.polyfit(days - days[0], remaining, 1)[0])
+    result.update(
+        velocity_per_day=round(velocity, 3),
+        velocity_per_week=round(velocity * 7, 3),
+        net_burn_per_day=round(-slope, 3),
+    )
+    if left == 0:
+        result.update(forecast_date=last_day, trend_forecast_date=last_day)
+    else:
+        result["forecast_date"] = _date_after(last_day, left, velocity)
+        # A flat series fits a slope of +-1e-16 or so, which is not burning down
+        if result["net_burn_per_day"] > 0:
+            result["trend_forecast_date"] = _date_after(last_day, left, -slope)
+    if target is not None:
+        result["on_track"] = left == 0 or (result["forecast_date"] is not None and result["forecast_date"] <= target)
+    return result
+
+
+def _date_after(day: date, left: float, per_day: float) -> Optional[date]:
+    """When `left` runs out at `per_day`; None if it isn't going down or won't within the calendar."""
+    if per_day <= 0:
+        return None
+    try:
+        return day + timedelta(days=math.ceil(left / per_day))
+    except OverflowError:
+        return None
@@ -0,0 +1,380 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.core.shards import pin_team, scatter
+
+PRODID = "-//TaskMaster//Deadlines//EN"
+
+
+def hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+# --- iCalendar Rendering ---
+
+def _escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+def _fold(line: str) -> str:
+    # Content lines are at most 75 octets; continuations start with a space
+    encoded = line.encode()
+    parts = []
+    limit = 75
+    while len(encoded) > limit:
+        cut = limit
+        while encoded[cut] & 0xC0 == 0x80:  # don't split a UTF-8 sequence
+            cut -= 1
+        parts.append(encoded[:cut].decode())
+        encoded = encoded[cut:]
+        limit = 74
+    parts.append(encoded.decode())
+    return "\r\n ".join(parts)
+
+def _lines(*lines: str) -> str:
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+def _render_event(kind: str, item_id: int, title: str, description: Optional[str], due_date: datetime,
+                  status: str, project_name: str) -> str:
+    """One all-day VEVENT on the item's due date (in UTC)."""
+    due = (due_date if due_date.tzinfo else due_date.replace(tzinfo=timezone.utc)).astimezone(timezone.utc).date()
+    summary = f"Milestone: {title}" if kind == "milestone" else title
+    details = f"Project: {project_name}\nStatus: {status}"
+    if description:
+        details += f"\n\n{description}"
+    return _lines(
+        "BEGIN:VEVENT",
+        f"UID:{kind}-{item_id}@taskmaster",
+        # Fixed, so regenerating an unchanged event gives the same bytes (and ETag)
+        f"DTSTAMP:{due:%Y%m%d}T000000Z",
+        f"DTSTART;VALUE=DATE:{due:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{due + timedelta(days=1):%Y%m%d}",
+        f"SUMMARY:{_escape(summary)}",
+        f"DESCRIPTION:{_escape(details)}",
+        "END:VEVENT",
+    )
+
+def render_calendar(name: str, events: list[str]) -> str:
+    return (
+        _lines("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN",
+               f"X-WR-CALNAME:{_escape(name)}")
+        + "".join(events)
+        + _lines("END:VCALENDAR")
+    )
+
+
+# --- Loading ---
+
+def _milestone_query(team_id: int):
+    return select(
+        models.Milestone.id, models.Milestone.name, models.Milestone.description, models.Milestone.due_date,
+        models.Milestone.status, models.Project.name.label("project_name"),
+    ).join(models.Project, models.Project.id == models.Milestone.project_id).where(models.Project.team_id == team_id)
+
+def _task_query(team_id: int):
+    return select(
+        models.Task.id, models.Task.title, models.Task.description, models.Task.due_date, models.Task.status,
+        models.Task.assignee_id, models.Project.name.label("project_name"),
+    ).join(models.Project, models.Project.id == models.Task.project_id).where(
+        models.Project.team_id == team_id,
+        models.Task.due_date != None,
+    )
+
+def _load_events(db: Session, team_id: int, milestone_ids=None, task_ids=None) -> dict:
+    """(kind, id) -> (assignee id, VEVENT) for the team's dated milestones and tasks, or just the given ones."""
+    events = {}
+    milestones, tasks = _milestone_query(team_id), _task_query(team_id)
+    if milestone_ids is not None:
+        milestones = milestones.where(models.Milestone.id.in_(milestone_ids))
+    if task_ids is not None:
+        tasks = tasks.where(models.Task.id.in_(task_ids))
+    if milestone_ids is None or milestone_ids:
+        for row in db.execute(milestones):
+            events[("milestone", row.id)] = (None, _render_event(
+                "milestone", row.id, row.name, row.description, row.due_date, row.status.value, row.project_name
+            ))
+    if task_ids is None or task_ids:
+        for row in db.execute(tasks):
+            events[("task", row.id)] = (row.assignee_id, _render_event(
+                "task", row.id, row.title, row.description, row.due_date, row.status.value, row.project_name
+            ))
+    return events
+
+
+class TeamCalendar:
+    """A team's rendered events, plus what is needed to keep them current."""
+
+    def __init__(self, name: str, projects: set[int], events: dict):
+        self.name = name
+        self.projects = projects
+        self.events = events
+        self.stale: set[tuple[str, int]] = set()
+        self.needs_reload = False
+        self.loaded_at = time.monotonic()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.digest = self._digest()
+
+    def _digest(self) -> str:
+        hasher = hashlib.sha1()
+        for key in sorted(self.events):
+            hasher.update(self.events[key][1].encode())
+        return hasher.hexdigest()
+
+    def changed(self) -> None:
+        digest = self._digest()
+        if digest != self.digest:
+            self.digest = digest
+            self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+# --- Cache ---
+
+class CalendarCache:
+    """
+    Everything a feed poll needs, kept in memory: which feed a token belongs
+    to, which teams a user is in, and each team's rendered events. When a
+    milestone or task changes, only that event is marked stale and re-read on
+    the next poll; a changed project or team reloads the team. A poll whose
+    ETag still matches is answered without a query. Entries also expire after
+    `ttl` seconds, so changes made by other workers are picked up.
+
+    Loads read from the primary: they usually run right after a change, and a
+    lagging replica would cache the old version.
+    """
+
+    def __init__(self, max_teams: int = 1024, ttl: float = 300):
+        self.lock = threading.Lock()
+        self._teams: OrderedDict[int, TeamCalendar] = OrderedDict()
+        self._project_teams: dict[int, int] = {}
+        self._members: dict[int, tuple[float, frozenset[int]]] = {}
+        self._feeds: dict[str, tuple[float, Optional[tuple[int, int, Optional[int]]]]] = {}
+        self._max_teams = max_teams
+        self._ttl = ttl
+
+    def _fresh(self, loaded_at: float) -> bool:
+        return time.monotonic() - loaded_at < self._ttl
+
+    # --- Feeds and memberships ---
+
+    def feed(self, token_hash: str) -> Optional[tuple[int, int, Optional[int]]]:
+        """(feed id, user id, team id) for a token, or None if there is no such feed."""
+        with self.lock:
+            cached = self._feeds.get(token_hash)
+        if cached and self._fresh(cached[0]):
+            return cached[1]
+        db = SessionLocal()
+        try:
+            row = db.execute(
+                select(models.CalendarFeed.id, models.CalendarFeed.user_id, models.CalendarFeed.team_id)
+                .where(models.CalendarFeed.token_hash == token_hash)
+            ).first()
+        finally:
+            db.close()
+        feed = tuple(row) if row else None
+        with self.lock:
+            if len(self._feeds) > 100000:
+                self._feeds.clear()
+            self._feeds[token_hash] = (time.monotonic(), feed)
+        return feed
+
+    def teams_of(self, user_id: int) -> frozenset[int]:
+        """Teams the user has accepted membership in, across every shard."""
+        with self.lock:
+            cached = self._members.get(user_id)
+        if cached and self._fresh(cached[0]):
+            return cached[1]
+        db = SessionLocal()
+        try:
+            team_ids = frozenset(scatter(SessionLocal, db, lambda shard_db: shard_db.scalars(
+                select(models.TeamMember.team_id).where(
+                    models.TeamMember.user_id == user_id,
+                    models.TeamMember.status == models.InvitationStatusEnum.accepted,
+                )
+            ).all()))
+        finally:
+            db.close()
+        with self.lock:
+            if len(self._members) > 100000:
+                self._members.clear()
+            self._members[user_id] = (time.monotonic(), team_ids)
+        return team_ids
+
+    # --- Team calendars ---
+
+    def _load_team(self, team_id: int) -> Optional[TeamCalendar]:
+        db = SessionLocal()
+        try:
+            pin_team(db, team_id)
+            name = db.scalar(select(models.Team.name).where(models.Team.id == team_id))
+            if name is None:
+                return None
+            projects = set(db.scalars(select(models.Project.id).where(models.Project.team_id == team_id)))
+            return TeamCalendar(name, projects, _load_events(db, team_id))
+        finally:
+            db.close()
+
+    def _refresh(self, team_id: int, calendar: TeamCalendar) -> None:
+        with self.lock:
+            stale, calendar.stale = calendar.stale, set()
+        db = SessionLocal()
+        try:
+            pin_team(db, team_id)
+            milestone_ids = [item_id for kind, item_id in stale if kind == "milestone"]
+            task_ids = [item_id for kind, item_id in stale if kind == "task"]
+            fresh = _load_events(db, team_id, milestone_ids, task_ids)
+        finally:
+            db.close()
+        with self.lock:
+            for key in stale:
+                # Gone, moved to another team or no longer dated
+                calendar.events.pop(key, None)
+            calendar.events.update(fresh)
+            calendar.changed()
+
+    def team(self, team_id: int) -> Optional[TeamCalendar]:
+        """The team's calendar, brought up to date (reading only what changed), or None if the team is gone."""
+        with self.lock:
+            calendar = self._teams.get(team_id)
+            if calendar is not None:
+                self._teams.move_to_end(team_id)
+        if calendar is None or calendar.needs_reload or not self._fresh(calendar.loaded_at):
+            loaded = self._load_team(team_id)
+            with self.lock:
+                if loaded is None:
+                    self._teams.pop(team_id, None)
+                    return None
+                if calendar is not None and calendar.digest == loaded.digest:
+                    loaded.last_modified = calendar.last_modified
+                calendar = self._teams[team_id] = loaded
+                self._teams.move_to_end(team_id)
+                self._project_teams.update((project_id, team_id) for project_id in loaded.projects)
+                while len(self._teams) > self._max_teams:
+                    evicted = self._teams.popitem(last=False)[1]
+                    for project_id in evicted.projects:
+                        self._project_teams.pop(project_id, None)
+        elif calendar.stale:
+            self._refresh(team_id, calendar)
+        return calendar
+
+    # --- Invalidation ---
+
+    def invalidate_project(self, project_id: int) -> None:
+        """Reloads the project's team on the next poll (for changes made without the ORM)."""
+        with self.lock:
+            team_id = self._project_teams.get(project_id)
+            if team_id in self._teams:
+                self._teams[team_id].needs_reload = True
+
+    def apply(self, changes: list[tuple]) -> None:
+        with self.lock:
+            for change in changes:
+                kind = change[0]
+                if kind in ("milestone", "task"):
+                    _, item_id, project_id = change
+                    calendar = self._teams.get(self._project_teams.get(project_id))
+                    if calendar is not None:
+                        calendar.stale.add((kind, item_id))
+                elif kind == "team":
+                    if change[1] in self._teams:
+                        self._teams[change[1]].needs_reload = True
+                elif kind == "member":
+                    self._members.pop(change[1], None)
+                elif kind == "feed":
+                    self._feeds.pop(change[1], None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self._teams.clear()
+            self._project_teams.clear()
+            self._members.clear()
+            self._feeds.clear()
+
+
+calendar_cache = CalendarCache()
+
+
+# --- Feeds ---
+
+def build_feed(user_id: int, team_id: Optional[int]) -> Optional[tuple[str, datetime, Callable[[], str]]]:
+    """
+    (ETag, Last-Modified, render) for a feed, or None if the user has lost
+    access to it. Rendering the body is deferred, so a 304 never builds it.
+    A user feed holds the milestones of all their teams and the tasks assigned
+    to them; a team feed holds all of the team's milestones and tasks.
+    """
+    team_ids = calendar_cache.teams_of(user_id)
+    if team_id is not None:
+        if team_id not in team_ids:
+            return None
+        team_ids = [team_id]
+    calendars = [(tid, calendar) for tid in sorted(team_ids) if (calendar := calendar_cache.team(tid)) is not None]
+
+    scope = f"team:{team_id}" if team_id is not None else f"user:{user_id}"
+    etag = hashlib.sha1(
+        (scope + "|" + "|".join(f"{tid}:{calendar.digest}" for tid, calendar in calendars)).encode()
+    ).hexdigest()
+    last_modified = max(
+        (calendar.last_modified for _, calendar in calendars),
+        default=datetime(2000, 1, 1, tzinfo=timezone.utc),
+    )
+
+    def render() -> str:
+        events = []
+        with calendar_cache.lock:
+            for _, calendar in calendars:
+                for key in sorted(calendar.events):
+                    assignee_id, vevent = calendar.events[key]
+                    if team_id is not None or assignee_id is None or assignee_id == user_id:
+                        events.append(vevent)
+        name = calendars[0][1].name if team_id is not None and calendars else "TaskMaster deadlines"
+        return render_calendar(name, events)
+
+    return f'"{etag}"', last_modified, render
+
+
+# --- Session Hooks ---
+# Changes are collected at flush time and applied only once the transaction commits.
+
+_PENDING_KEY = "calendar_changes"
+
+@event.listens_for(Session, "after_flush")
+def _collect_calendar_changes(session: Session, flush_context) -> None:
+    changes = session.info.setdefault(_PENDING_KEY, [])
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (models.Milestone, models.Task)):
+            kind = "milestone" if isinstance(obj, models.Milestone) else "task"
+            changes.append((kind, obj.id, obj.project_id))
+            # Moved between projects: the old project's team loses the event
+            for project_id in inspect(obj).attrs.project_id.history.deleted:
+                changes.append((kind, obj.id, project_id))
+        elif isinstance(obj, models.Project):
+            # Renamed, moved or deleted (taking its tasks with it)
+            changes.append(("team", obj.team_id))
+            for team_id in inspect(obj).attrs.team_id.history.deleted:
+                changes.append(("team", team_id))
+        elif isinstance(obj, models.Team):
+            changes.append(("team", obj.id))
+        elif isinstance(obj, models.TeamMember):
+            changes.append(("member", obj.user_id))
+        elif isinstance(obj, models.CalendarFeed):
+            changes.append(("feed", obj.token_hash))
+
+@event.listens_for(Session, "after_commit")
+def _apply_calendar_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        calendar_cache.apply(changes)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_calendar_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
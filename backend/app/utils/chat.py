@@ -0,0 +1,332 @@
+import asyncio
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from typing import Optional
+from sqlalchemy import case, insert, select, text, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.shards import DEFAULT_SHARD
+from app.db import shard_router
+
+# Longest message accepted, in characters
+MAX_MESSAGE_LENGTH = 4000
+# Frames queued for one connection before it is treated as too slow and closed
+OUTBOX_SIZE = 1000
+# How long a connection trusts its membership check before re-checking
+MEMBERSHIP_TTL_SECONDS = 60
+
+
+# --- Connections ---
+
+@dataclass(eq=False)
+class ChatConnection:
+    """
+    One open WebSocket: who it is, the channel it listens to, and its outgoing
+    frames. `token_expires_at` (wall clock) and the token claims come from the
+    access token it was opened with; the socket is closed when that token
+    expires or is revoked.
+    """
+    websocket: object
+    user_id: int
+    channel_id: int
+    team_id: int
+    checked_at: float
+    token_expires_at: Optional[float] = None
+    token_claims: dict = field(default_factory=dict)
+    outbox: asyncio.Queue = field(default_factory=lambda: asyncio.Queue(OUTBOX_SIZE))
+
+    def membership_stale(self) -> bool:
+        return time.monotonic() - self.checked_at > MEMBERSHIP_TTL_SECONDS
+
+    def token_expired(self) -> bool:
+        return self.token_expires_at is not None and time.time() >= self.token_expires_at
+
+
+def message_frame(message: dict) -> str:
+    return json.dumps({
+        "type": "message",
+        "id": message["id"],
+        "channel_id": message["channel_id"],
+        "user_id": message["user_id"],
+        "body": message["body"],
+        "created_at": message["created_at"].isoformat(),
+    })
+
+
+# --- Hub ---
+
+class ChatHub:
+    """
+    Connects the chat WebSockets of this process. Sent messages go into a
+    queue that a writer thread drains with one multi-row INSERT per shard per
+    batch; once saved they are fanned out on the event loop to every
+    connection on the channel, each through its own bounded outbox so one slow
+    reader never holds up the rest. Read markers are coalesced and written
+    with the same batches.
+
+    Fan-out is per process: with several workers, members connected to
+    another worker see new messages when they next load history.
+    """
+
+    def __init__(self, batch_size: int = 1000, flush_interval: float = 0.5):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._channels: dict[int, set[ChatConnection]] = defaultdict(set)
+        self._pending: deque = deque()
+        self._markers: dict[tuple[int, int], tuple[int, int]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.saved = 0
+        self.failed = 0
+        self.delivered = 0
+        self.dropped_connections = 0
+
+    # --- Connections ---
+
+    def join(self, connection: ChatConnection) -> None:
+        self._channels[connection.channel_id].add(connection)
+
+    def leave(self, connection: ChatConnection) -> None:
+        listeners = self._channels.get(connection.channel_id)
+        if listeners is not None:
+            listeners.discard(connection)
+            if not listeners:
+                del self._channels[connection.channel_id]
+
+    def connections(self) -> int:
+        return sum(len(listeners) for listeners in self._channels.values())
+
+    # --- Sending ---
+
+    def post(self, team_id: int, channel_id: int, user_id: int, body: str) -> asyncio.Future:
+        """Queues a message; the future resolves to the saved row (as a dict) once it is written."""
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        with self._lock:
+            self._pending.append((team_id, {"channel_id": channel_id, "user_id": user_id, "body": body}, future))
+        self._wake.set()
+        return future
+
+    def mark_read(self, team_id: int, channel_id: int, user_id: int, last_read_id: int) -> None:
+        """Queues a read marker; only the highest per channel and user is written."""
+        with self._lock:
+            current = self._markers.get((channel_id, user_id))
+            if current is None or current[1] < last_read_id:
+                self._markers[(channel_id, user_id)] = (team_id, last_read_id)
+        self._wake.set()
+
+    @staticmethod
+    def _resolve(saved: list[tuple[dict, asyncio.Future]], failed: list[tuple[Exception, asyncio.Future]]) -> None:
+        """Runs on the senders' event loop: completes their futures."""
+        for error, future in failed:
+            if not future.done():
+                future.set_exception(error)
+        for message, future in saved:
+            if not future.done():
+                future.set_result(message)
+
+    def _deliver(self, saved: list[tuple[dict, asyncio.Future]]) -> None:
+        """Runs on the event loop: fans the saved messages out to the channels' connections."""
+        for message, _ in saved:
+            frame = message_frame(message)
+            for connection in list(self._channels.get(message["channel_id"], ())):
+                if connection.token_expired():
+                    # Nothing more for a socket whose credentials have run out
+                    self.leave(connection)
+                    asyncio.ensure_future(connection.websocket.close(code=1008))
+                    continue
+                try:
+                    connection.outbox.put_nowait((message["id"], frame))
+                    self.delivered += 1
+                except asyncio.QueueFull:
+                    # Too far behind to catch up live; it can reconnect and backfill
+                    self.leave(connection)
+                    self.dropped_connections += 1
+                    asyncio.ensure_future(connection.websocket.close(code=1013))
+
+    # --- Writer thread ---
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chat-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self.flush()
+
+    def _maintain_partitions(self) -> None:
+        for name, engine in shard_router.engines.items():
+            try:
+                ensure_partitions(engine)
+            except Exception as e:
+                print(f"Error creating chat_messages partitions on shard '{name}': {e}")
+
+    def _run(self) -> None:
+        self._maintain_partitions()
+        next_maintenance = time.monotonic() + 86400
+        while not self._stop.is_set():
+            if time.monotonic() >= next_maintenance:
+                self._maintain_partitions()
+                next_maintenance = time.monotonic() + 86400
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Writes everything queued so far, a batch at a time. Returns how many messages were saved."""
+        total = 0
+        while True:
+            with self._lock:
+                batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+                markers, self._markers = self._markers, {}
+            if not batch and not markers:
+                return total
+            saved, failed = write_messages(batch, markers)
+            self.saved += len(saved)
+            self.failed += len(failed)
+            total += len(saved)
+            by_loop = defaultdict(lambda: ([], []))
+            for item in saved:
+                by_loop[item[1].get_loop()][0].append(item)
+            for item in failed:
+                by_loop[item[1].get_loop()][1].append(item)
+            for loop, (loop_saved, loop_failed) in by_loop.items():
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(self._resolve, loop_saved, loop_failed)
+            if saved and self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._deliver, saved)
+
+
+chat_hub = ChatHub()
+
+
+# --- Storage ---
+
+def _shard_of(team_id: int) -> tuple[str, bool]:
+    return shard_router.lookup(team_id) if shard_router.enabled else (DEFAULT_SHARD, False)
+
+def write_messages(batch: list[tuple], markers: dict) -> tuple[list, list]:
+    """
+    Saves queued (team_id, row, future) messages with one INSERT per shard and
+    writes the read markers. Returns (saved rows, future) and (error, future) pairs.
+    """
+    now = datetime.now(timezone.utc)
+    by_shard, saved, failed = defaultdict(list), [], []
+    for team_id, row, future in batch:
+        shard, moving = _shard_of(team_id)
+        if moving:
+            failed.append((RuntimeError("This team is being moved to another database. Please try again shortly."), future))
+        else:
+            by_shard[shard].append(({**row, "created_at": now}, future))
+    markers_by_shard = defaultdict(list)
+    for (channel_id, user_id), (team_id, last_read_id) in markers.items():
+        markers_by_shard[_shard_of(team_id)[0]].append({"channel_id": channel_id, "user_id": user_id, "last_read_id": last_read_id})
+
+    table = models.ChatMessage.__table__
+    for shard in set(by_shard) | set(markers_by_shard):
+        items = by_shard.get(shard, [])
+        rows = [row for row, _ in items]
+        try:
+            with shard_router.engine(shard).begin() as connection:
+                if rows:
+                    ids = shard_router.allocate_ids("chat_messages", len(rows)) if shard_router.enabled else None
+                    if ids is not None:
+                        for row, new_id in zip(rows, ids):
+                            row["id"] = new_id
+                        connection.execute(insert(table), rows)
+                    else:
+                        stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+                        for row, new_id in zip(rows, connection.execute(stmt, rows).scalars()):
+                            row["id"] = new_id
+                if markers_by_shard.get(shard):
+                    _upsert_markers(connection, markers_by_shard[shard])
+        except Exception as e:
+            print(f"Error writing {len(rows)} chat message(s) on shard '{shard}': {e}")
+            failed.extend((RuntimeError("The message could not be saved."), future) for _, future in items)
+            continue
+        saved.extend(items)
+    return saved, failed
+
+def _upsert_markers(connection, rows: list[dict]) -> None:
+    table = models.ChatReadMarker.__table__
+    rows.sort(key=lambda row: (row["channel_id"], row["user_id"]))
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.channel_id, table.c.user_id],
+            set_={"last_read_id": case(
+                (stmt.excluded.last_read_id > table.c.last_read_id, stmt.excluded.last_read_id),
+                else_=table.c.last_read_id,
+            )},
+        )
+        connection.execute(stmt, rows)
+        return
+    for row in rows:
+        if not connection.execute(
+            update(table).where(table.c.channel_id == row["channel_id"], table.c.user_id == row["user_id"])
+            .values(last_read_id=case((table.c.last_read_id < row["last_read_id"], row["last_read_id"]), else_=table.c.last_read_id))
+        ).rowcount:
+            connection.execute(insert(table).values(**row))
+
+def set_read_marker(db: Session, channel_id: int, user_id: int, last_read_id: int) -> None:
+    """Moves a user's read marker forward straight away (the REST path; WebSockets go through the hub)."""
+    # Bound through the model, so it goes to the team's shard like the rest of the session
+    _upsert_markers(db.connection(bind_arguments={"mapper": models.ChatReadMarker}), [{"channel_id": channel_id, "user_id": user_id, "last_read_id": last_read_id}])
+
+def read_history(db: Session, channel_id: int, before: Optional[int] = None, after: Optional[int] = None, limit: int = 50) -> list:
+    """
+    Keyset page of a channel's messages from the (channel_id, id) index: older
+    than `before`, newest first, or (for catching up) newer than `after`, oldest first.
+    """
+    query = db.query(models.ChatMessage).filter(models.ChatMessage.channel_id == channel_id)
+    if after is not None:
+        return query.filter(models.ChatMessage.id > after).order_by(models.ChatMessage.id).limit(limit).all()
+    if before is not None:
+        query = query.filter(models.ChatMessage.id < before)
+    return query.order_by(models.ChatMessage.id.desc()).limit(limit).all()
+
+def last_read_id(db: Session, channel_id: int, user_id: int) -> int:
+    return db.scalar(select(models.ChatReadMarker.last_read_id).where(
+        models.ChatReadMarker.channel_id == channel_id, models.ChatReadMarker.user_id == user_id
+    )) or 0
+
+
+# --- Partitions ---
+
+def _month_start(year: int, month: int) -> date:
+    return date(year + (month - 1) // 12, (month - 1) % 12 + 1, 1)
+
+def ensure_partitions(engine, months_ahead: int = 3) -> None:
+    """
+    Creates the monthly chat_messages partitions for this month and the next few
+    (Postgres only), like the activity log's. Rows outside them land in
+    chat_messages_default.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    today = date.today()
+    with engine.begin() as connection:
+        for offset in range(months_ahead + 1):
+            start = _month_start(today.year, today.month + offset)
+            end = _month_start(today.year, today.month + offset + 1)
+            connection.execute(text(
+                f"CREATE TABLE IF NOT EXISTS chat_messages_{start:%Y_%m} PARTITION OF chat_messages "
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+            ))
@@ -0,0 +1,180 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.utils.activity import set_actor
+from app.utils.calendar_feed import calendar_cache
+from app.utils.task_graph import task_graph_cache
+
+# Rows removed per transaction; comments, attachments and dependencies of the
+# deleted tasks go with them through ON DELETE CASCADE
+CHUNK_SIZE = 1000
+# A job that has not committed a chunk for this long is taken to have lost its worker
+LEASE = timedelta(minutes=5)
+# Runs a job gets before a failure is final and only a new request starts it again
+MAX_ATTEMPTS = 5
+
+
+def _count(db: Session, model, *criteria) -> int:
+    return db.execute(select(func.count()).select_from(model).where(*criteria)).scalar_one()
+
+def _project_rows(db: Session, project_id: int) -> int:
+    return (
+        _count(db, models.Task, models.Task.project_id == project_id)
+        + _count(db, models.Milestone, models.Milestone.project_id == project_id)
+        + 1
+    )
+
+def _delete_chunk(db: Session, model, *criteria, chunk_size: int = CHUNK_SIZE) -> int:
+    """Deletes up to chunk_size matching rows in one statement without loading them."""
+    ids = select(model.id).where(*criteria).limit(chunk_size)
+    result = db.execute(
+        delete(model).where(model.id.in_(ids)).execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+def is_stale(job: models.DeletionJob, now: Optional[datetime] = None) -> bool:
+    """
+    Whether a job should be run again because nothing is working on it: it
+    failed and has attempts left, or it is unfinished and has gone a whole
+    LEASE without progress.
+    """
+    if job.status == models.DeletionJobStatusEnum.failed:
+        return job.attempts < MAX_ATTEMPTS
+    if job.status not in (models.DeletionJobStatusEnum.pending, models.DeletionJobStatusEnum.running):
+        return False
+    last = job.heartbeat_at or job.created_at
+    return last is not None and _as_utc(last) < (now or datetime.now(timezone.utc)) - LEASE
+
+def stale_job_ids(db: Session) -> list[int]:
+    """Jobs to run again (see is_stale), oldest first."""
+    jobs = db.scalars(select(models.DeletionJob).where(
+        models.DeletionJob.status != models.DeletionJobStatusEnum.completed
+    ).order_by(models.DeletionJob.id)).all()
+    now = datetime.now(timezone.utc)
+    return [job.id for job in jobs if is_stale(job, now)]
+
+def _claim(db: Session, job_id: int) -> bool:
+    """
+    Marks the job running for this worker in one UPDATE, unless it is finished,
+    has failed MAX_ATTEMPTS times or another worker still holds its lease.
+    Counts the attempt. Commits.
+    """
+    now = datetime.now(timezone.utc)
+    job = models.DeletionJob
+    claimed = db.execute(
+        update(job).where(
+            job.id == job_id,
+            or_(
+                job.status == models.DeletionJobStatusEnum.pending,
+                and_(job.status == models.DeletionJobStatusEnum.failed, job.attempts < MAX_ATTEMPTS),
+                and_(
+                    job.status == models.DeletionJobStatusEnum.running,
+                    or_(job.heartbeat_at == None, job.heartbeat_at < now - LEASE),
+                ),
+            ),
+        ).values(status=models.DeletionJobStatusEnum.running, error=None, heartbeat_at=now, attempts=job.attempts + 1)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    db.commit()
+    return bool(claimed)
+
+def _checkpoint(db: Session, job: models.DeletionJob) -> None:
+    """Commits a chunk along with the job's progress, renewing its lease."""
+    job.heartbeat_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def start_deletion_job(db: Session, target_type: models.DeletionTargetEnum, target_id: int, user_id: int) -> models.DeletionJob:
+    """
+    Records a deletion job and sizes it. For teams the memberships are removed
+    straight away, so the team disappears for everyone while the rest is deleted
+    in the background by run_deletion_job. Commits.
+    """
+    job = models.DeletionJob(target_type=target_type, target_id=target_id, requested_by_id=user_id)
+    if target_type == models.DeletionTargetEnum.team:
+        project_ids = db.scalars(select(models.Project.id).where(models.Project.team_id == target_id)).all()
+        job.total_rows = sum(_project_rows(db, pid) for pid in project_ids) + 1
+        removed = db.execute(
+            delete(models.TeamMember).where(models.TeamMember.team_id == target_id)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        job.total_rows += removed
+        job.deleted_rows = removed
+    else:
+        job.total_rows = _project_rows(db, target_id)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _drain_project(db: Session, job: models.DeletionJob, project_id: int) -> None:
+    for model in (models.Task, models.Milestone):
+        while True:
+            deleted = _delete_chunk(db, model, model.project_id == project_id)
+            if not deleted:
+                break
+            job.deleted_rows += deleted
+            _checkpoint(db, job)
+            if model is models.Task:
+                task_graph_cache.invalidate(project_id)
+                calendar_cache.invalidate_project(project_id)
+    # The (now empty) project itself goes through the ORM so it is logged like any other delete
+    project = db.get(models.Project, project_id)
+    if project is not None:
+        db.delete(project)
+        job.deleted_rows += 1
+        _checkpoint(db, job)
+
+
+def run_deletion_job(job_id: int) -> None:
+    """
+    Works through a deletion job a chunk at a time, committing progress after
+    every chunk. Deleting is idempotent, so running a failed job again picks up
+    where it stopped (up to MAX_ATTEMPTS runs), and so does running a job whose
+    worker died: once it has gone a LEASE without progress, the next run takes
+    it over.
+    """
+    db = SessionLocal()
+    try:
+        if not _claim(db, job_id):
+            return
+        job = db.get(models.DeletionJob, job_id)
+        if job.requested_by_id is not None:
+            set_actor(db, job.requested_by_id)
+        try:
+            if job.target_type == models.DeletionTargetEnum.team:
+                project_ids = db.scalars(
+                    select(models.Project.id).where(models.Project.team_id == job.target_id)
+                ).all()
+                for project_id in project_ids:
+                    _drain_project(db, job, project_id)
+                while deleted := _delete_chunk(db, models.TeamMember, models.TeamMember.team_id == job.target_id):
+                    job.deleted_rows += deleted
+                team = db.get(models.Team, job.target_id)
+                if team is not None:
+                    db.delete(team)
+                    job.deleted_rows += 1
+            else:
+                _drain_project(db, job, job.target_id)
+            job.status = models.DeletionJobStatusEnum.completed
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            job.status = models.DeletionJobStatusEnum.failed
+            job.error = str(e)[:500]
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+            print(f"Error running deletion job {job_id}: {e}")
+    finally:
+        db.close()
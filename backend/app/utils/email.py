@@ -1,23 +1,17 @@
 import random
 import string
-import os
-from dotenv import load_dotenv
 from fastapi import HTTPException
 from datetime import datetime  # <-- MOVED THIS IMPORT TO THE TOP
 
-# Import the SendGrid library
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-
-load_dotenv()
+from app.core.config import settings
 
 # --- Helper to get required environment variables ---
 def get_email_config():
-    """Fetches and returns common email configuration from environment variables."""
-    sendgrid_api_key = os.environ.get('SENDGRID_API_KEY')
-    sender_email = os.environ.get('SENDER_EMAIL')
-    # Set a default frontend URL for local development if not specified
-    frontend_url = os.environ.get('FRONTEND_URL', 'http://localhost:5173')
+    """Fetches and returns common email configuration from the app settings."""
+    sendgrid_api_key = settings.SENDGRID_API_KEY
+    sender_email = settings.SENDER_EMAIL
+    # Defaults to the local frontend dev server when not specified
+    frontend_url = settings.FRONTEND_URL
     
     if not sendgrid_api_key or not sender_email:
         print("\n--- WARNING: SendGrid environment variables (SENDGRID_API_KEY, SENDER_EMAIL) are not set. ---")
@@ -64,6 +58,10 @@ def _send_email(recipient_email: str, subject: str, html_content: str):
         print(f"To: {recipient_email}\nSubject: {subject}\n--- Body ---\n{html_content}\n------------------\n")
         return
 
+    # The SendGrid client is only imported when an email is actually sent
+    from sendgrid import SendGridAPIClient
+    from sendgrid.helpers.mail import Mail
+
     message = Mail(
         from_email=sender_email,
         to_emails=recipient_email,
@@ -0,0 +1,207 @@
+import heapq
+import threading
+import time
+from collections import Counter
+from typing import Callable, Optional
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session, aliased
+
+from app import models
+from app.db import SessionLocal
+
+# How much one shared team counts for, relative to one mutual friend, when ranking suggestions
+TEAM_WEIGHT = 0.5
+
+
+class FriendGraph:
+    """
+    In-memory adjacency cache of the friendship graph.
+
+    A user's neighbourhood is loaded from the database the first time it is needed
+    (one column-only query for any number of users) and then kept up to date by the
+    friend endpoints via the add/remove hooks below, so mutual-friend counts and
+    suggestions are computed with set operations instead of queries. The hooks
+    only run in the worker that made the change, so entries also expire after
+    `ttl` seconds and changes made elsewhere are picked up.
+
+    Loads read from the primary: they usually follow a change, and a lagging
+    replica would cache the old neighbourhood.
+    """
+
+    def __init__(self, max_users: int = 100000, ttl: float = 300, session_factory: Optional[Callable[[], Session]] = None):
+        self._lock = threading.Lock()
+        self._friends: dict[int, set[int]] = {}
+        self._pending: dict[int, set[int]] = {}
+        self._loaded_at: dict[int, float] = {}
+        self._max_users = max_users
+        self._ttl = ttl
+        self._session_factory = session_factory or SessionLocal
+        # Bumped by every update hook, so a load that raced one is not cached
+        self._generation = 0
+
+    # --- Loading ---
+
+    def _load(self, user_ids) -> tuple[dict[int, set[int]], dict[int, set[int]]]:
+        """
+        Copies of the friend and pending sets of `user_ids`, reading any that
+        are not cached (or have expired) in one query. The hooks run after their
+        commit, so if none ran while the query did, its result is current and is
+        cached; otherwise it is only used for this call.
+        """
+        user_ids = set(user_ids)
+        now = time.monotonic()
+        with self._lock:
+            friends = {
+                uid: set(self._friends[uid]) for uid in user_ids
+                if uid in self._friends and now - self._loaded_at[uid] < self._ttl
+            }
+            pending = {uid: set(self._pending[uid]) for uid in friends}
+            generation = self._generation
+        missing = user_ids - friends.keys()
+        if not missing:
+            return friends, pending
+        db = self._session_factory()
+        try:
+            rows = db.query(
+                models.Friendship.requester_id, models.Friendship.addressee_id, models.Friendship.status
+            ).filter(
+                or_(models.Friendship.requester_id.in_(missing), models.Friendship.addressee_id.in_(missing))
+            ).all()
+        finally:
+            db.close()
+        loaded_friends = {uid: set() for uid in missing}
+        loaded_pending = {uid: set() for uid in missing}
+        for requester_id, addressee_id, status in rows:
+            if status == models.FriendshipStatusEnum.accepted:
+                target = loaded_friends
+            elif status == models.FriendshipStatusEnum.pending:
+                target = loaded_pending
+            else:
+                continue
+            if requester_id in target:
+                target[requester_id].add(addressee_id)
+            if addressee_id in target:
+                target[addressee_id].add(requester_id)
+        with self._lock:
+            if self._generation == generation:
+                if len(self._friends) + len(missing) > self._max_users:
+                    self._friends.clear()
+                    self._pending.clear()
+                    self._loaded_at.clear()
+                loaded_at = time.monotonic()
+                for uid in missing:
+                    self._friends[uid] = set(loaded_friends[uid])
+                    self._pending[uid] = set(loaded_pending[uid])
+                    self._loaded_at[uid] = loaded_at
+        friends.update(loaded_friends)
+        pending.update(loaded_pending)
+        return friends, pending
+
+    # --- Update Hooks ---
+    # Called after the change is committed.
+
+    def add_pending(self, requester_id: int, addressee_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            if requester_id in self._pending:
+                self._pending[requester_id].add(addressee_id)
+            if addressee_id in self._pending:
+                self._pending[addressee_id].add(requester_id)
+
+    def remove_pending(self, requester_id: int, addressee_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            if requester_id in self._pending:
+                self._pending[requester_id].discard(addressee_id)
+            if addressee_id in self._pending:
+                self._pending[addressee_id].discard(requester_id)
+
+    def add_friendship(self, user_a: int, user_b: int) -> None:
+        self.remove_pending(user_a, user_b)
+        with self._lock:
+            self._generation += 1
+            if user_a in self._friends:
+                self._friends[user_a].add(user_b)
+            if user_b in self._friends:
+                self._friends[user_b].add(user_a)
+
+    def remove_friendship(self, user_a: int, user_b: int) -> None:
+        with self._lock:
+            self._generation += 1
+            if user_a in self._friends:
+                self._friends[user_a].discard(user_b)
+            if user_b in self._friends:
+                self._friends[user_b].discard(user_a)
+
+    def forget_user(self, user_id: int) -> None:
+        """Drops a user (e.g. a deleted account) from the cache entirely, including other users' sets."""
+        with self._lock:
+            self._generation += 1
+            self._friends.pop(user_id, None)
+            self._pending.pop(user_id, None)
+            self._loaded_at.pop(user_id, None)
+            # Their own entry may never have been loaded, so every set is checked
+            for neighbours in (*self._friends.values(), *self._pending.values()):
+                neighbours.discard(user_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._friends.clear()
+            self._pending.clear()
+            self._loaded_at.clear()
+
+    # --- Queries ---
+
+    def friends_of(self, user_id: int) -> set[int]:
+        return self._load([user_id])[0][user_id]
+
+    def mutual_friends(self, user_id: int, other_id: int) -> set[int]:
+        friends, _ = self._load([user_id, other_id])
+        # set & set iterates the smaller operand, so this is O(min(len(a), len(b)))
+        return friends[user_id] & friends[other_id]
+
+    def suggestions(self, db: Session, user_id: int, limit: int = 10) -> list[tuple[int, int, int, float]]:
+        """
+        Ranks friend-of-friend candidates for a user by mutual friends, plus shared
+        team membership weighted by TEAM_WEIGHT (counted through `db`).
+        Returns (user_id, mutual_friends, shared_teams, score) tuples, best first.
+        """
+        own_friends, own_pending = self._load([user_id])
+        friends, pending = own_friends[user_id], own_pending[user_id]
+        friends_of_friends, _ = self._load(friends)
+        mutual_counts = Counter()
+        for friend_id in friends:
+            mutual_counts.update(friends_of_friends[friend_id])
+
+        team_counts = Counter(dict(_shared_team_counts(db, user_id)))
+
+        excluded = friends | pending | {user_id}
+        candidates = (set(mutual_counts) | set(team_counts)) - excluded
+        ranked = heapq.nlargest(
+            limit,
+            candidates,
+            key=lambda uid: (mutual_counts[uid] + TEAM_WEIGHT * team_counts[uid], -uid)
+        )
+        return [
+            (uid, mutual_counts[uid], team_counts[uid], mutual_counts[uid] + TEAM_WEIGHT * team_counts[uid])
+            for uid in ranked
+        ]
+
+
+def _shared_team_counts(db: Session, user_id: int):
+    """Returns (other_user_id, shared_team_count) for everyone sharing an accepted team with the user."""
+    mine = aliased(models.TeamMember)
+    theirs = aliased(models.TeamMember)
+    return db.query(theirs.user_id, func.count(theirs.team_id)).join(
+        mine, mine.team_id == theirs.team_id
+    ).filter(
+        mine.user_id == user_id,
+        mine.status == models.InvitationStatusEnum.accepted,
+        theirs.status == models.InvitationStatusEnum.accepted,
+        theirs.user_id != user_id
+    ).group_by(theirs.user_id).all()
+
+
+# Process-wide instance used by the friends endpoints
+friend_graph = FriendGraph()
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from typing import Optional
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.utils.activity import ACTOR_KEY, activity_buffer
+from app.utils.calendar_feed import calendar_cache
+from app.utils.workload import workload_cache
+
+
+def update_returning(db: Session, model, criteria: list, values: dict, team_id, version: Optional[int] = None):
+    """
+    Edits one row with a single UPDATE ... WHERE ... RETURNING and bumps its
+    version, instead of loading it, checking permissions, flushing and
+    refreshing it one query at a time.
+
+    `criteria` should fold the caller's permission check into the WHERE clause,
+    and `team_id` is an expression for the row's team, returned alongside it.
+    With `version` the row is only changed if it is still at that version.
+    Returns the updated object, loaded and kept current through the commit, or
+    None if nothing matched; the caller then works out whether the row is
+    missing, off limits or was changed in the meantime.
+    """
+    stmt = update(model).where(*criteria)
+    if version is not None:
+        stmt = stmt.where(model.version == version)
+    stmt = stmt.values(**values, version=model.version + 1).returning(model, team_id.label("team_id"))
+    row = db.execute(stmt, execution_options={"populate_existing": True}).first()
+    if row is None:
+        return None
+    obj, row_team_id = row
+    # Everything the response needs came back with the UPDATE; nothing to re-read after commit
+    db.expire_on_commit = False
+    db.info.setdefault(_PENDING_KEY, []).append((obj, row_team_id, values, db.info.get(ACTOR_KEY)))
+    return obj
+
+def check_version(obj, version: Optional[int]) -> None:
+    """409 if the row has moved on from the version an edit was made against."""
+    if version is not None and obj.version != version:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"This was changed by someone else in the meantime (now at version {obj.version}). Reload and try again.",
+        )
+
+
+# --- Session Hooks ---
+# The UPDATE bypasses the flush, so the hooks that watch it (activity log,
+# calendar and workload caches) are told here, once the transaction commits.
+
+_PENDING_KEY = "guarded_updates"
+
+def _announce(obj, team_id: int, values: dict, actor_id: Optional[int]) -> None:
+    project_id = obj.id if isinstance(obj, models.Project) else getattr(obj, "project_id", None)
+    activity_buffer.push_many([{
+        "occurred_at": datetime.now(timezone.utc),
+        "actor_id": actor_id,
+        "team_id": team_id,
+        "project_id": project_id,
+        "entity_type": obj.__tablename__,
+        "entity_id": obj.id,
+        "action": "updated",
+        # The previous values would take the SELECT this path avoids
+        "changes": {key: [None, value] for key, value in jsonable_encoder(values).items()},
+    }])
+    if isinstance(obj, models.Milestone):
+        calendar_cache.apply([("milestone", obj.id, obj.project_id)])
+    elif isinstance(obj, models.Project):
+        calendar_cache.apply([("team", team_id)])
+    elif isinstance(obj, models.TeamMember):
+        workload_cache.invalidate_team(team_id)
+
+@event.listens_for(Session, "after_commit")
+def _apply_guarded_updates(session: Session) -> None:
+    for pending in session.info.pop(_PENDING_KEY, None) or []:
+        _announce(*pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_guarded_updates(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,149 @@
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from sqlalchemy import case, event, insert, inspect, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+
+# Inbox rows written per multi-row INSERT
+BATCH_SIZE = 1000
+
+# session.info key for rows waiting for the session to commit
+_PENDING_KEY = "pending_notifications"
+
+
+# --- Fan-out ---
+
+def notify_many(db: Session, rows: list[dict]) -> None:
+    """
+    Queues inbox rows (dicts of Notification columns) on the session. They are
+    written as part of its commit, all at once; if it rolls back they are dropped.
+    """
+    if rows:
+        db.info.setdefault(_PENDING_KEY, []).extend(rows)
+
+def notify(
+    db: Session,
+    user_ids: Iterable[int],
+    kind: str,
+    actor_id: Optional[int] = None,
+    team_id: Optional[int] = None,
+    entity=None,
+    payload: Optional[dict] = None,
+) -> None:
+    """
+    Fans one event out to every recipient's inbox as the session commits.
+    `entity` is the row it is about, which may not have an id yet. Nobody is
+    notified of their own action.
+    """
+    notify_many(db, [
+        {
+            "user_id": user_id,
+            "kind": kind,
+            "actor_id": actor_id,
+            "team_id": team_id,
+            "entity": entity,
+            "payload": payload,
+        }
+        for user_id in sorted(set(user_ids) - {actor_id, None})
+    ])
+
+def _resolve(row: dict) -> dict:
+    entity = row.pop("entity", None)
+    if entity is not None:
+        # The identity outlives the commit that expired the object's attributes
+        state = inspect(entity)
+        row["entity_type"] = state.mapper.local_table.name
+        row["entity_id"] = state.identity[0] if state.identity else None
+    return row
+
+def write_notifications(db: Session, rows: list[dict]) -> int:
+    """Inserts inbox rows in multi-row batches and bumps the recipients' unread counters."""
+    now = datetime.now(timezone.utc)
+    rows = [{"created_at": now, **_resolve(dict(row))} for row in rows]
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(models.Notification), rows[start:start + BATCH_SIZE])
+    _add_unread(db, Counter(row["user_id"] for row in rows))
+    return len(rows)
+
+def _add_unread(db: Session, deltas: dict[int, int]) -> None:
+    table = models.NotificationCounter.__table__
+    # Sorted, so concurrent fan-outs lock counters in the same order
+    rows = [{"user_id": user_id, "unread": deltas[user_id]} for user_id in sorted(deltas)]
+    dialect = db.get_bind(models.NotificationCounter).dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"unread": table.c.unread + stmt.excluded.unread},
+        )
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        if not db.execute(update(table).where(table.c.user_id == row["user_id"]).values(unread=table.c.unread + row["unread"])).rowcount:
+            db.execute(insert(table).values(**row))
+
+
+# --- Reading ---
+
+def unread_count(db: Session, user_id: int) -> int:
+    return db.scalar(select(models.NotificationCounter.unread).where(models.NotificationCounter.user_id == user_id)) or 0
+
+def mark_read(
+    db: Session,
+    user_id: int,
+    ids: Optional[list[int]] = None,
+    up_to: Optional[int] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+) -> int:
+    """
+    Marks a user's unread notifications as read in one UPDATE: the given ids,
+    everything up to and including `up_to`, those about one entity, or all of
+    them. Returns how many changed; the counter drops by the same amount.
+    """
+    stmt = update(models.Notification).where(
+        models.Notification.user_id == user_id,
+        models.Notification.read_at.is_(None),
+    )
+    if ids is not None:
+        stmt = stmt.where(models.Notification.id.in_(ids))
+    if up_to is not None:
+        stmt = stmt.where(models.Notification.id <= up_to)
+    if entity_type is not None:
+        stmt = stmt.where(models.Notification.entity_type == entity_type, models.Notification.entity_id == entity_id)
+    marked = db.execute(
+        stmt.values(read_at=datetime.now(timezone.utc)).execution_options(synchronize_session=False)
+    ).rowcount
+    if marked:
+        counter = models.NotificationCounter
+        db.execute(
+            update(counter).where(counter.user_id == user_id).values(
+                unread=case((counter.unread > marked, counter.unread - marked), else_=0)
+            )
+        )
+    return marked
+
+
+# --- Session Hooks ---
+# The rows are written by the commit that carries the change they describe, so
+# a notification is never lost once its change has committed, nor sent for one
+# that rolled back.
+
+@event.listens_for(Session, "before_commit")
+def _write_pending(session: Session) -> None:
+    if session.in_nested_transaction():
+        # Only the outermost commit makes anything permanent
+        return
+    rows = session.info.pop(_PENDING_KEY, None)
+    if not rows:
+        return
+    # Gives new entities their ids before the rows refer to them
+    session.flush()
+    write_notifications(session, rows)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,148 @@
+import hashlib
+import hmac
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.security import SECRET_KEY
+from app.utils.email import generate_otp
+
+OTP_TTL = timedelta(minutes=10)
+MAX_ATTEMPTS = 5
+
+
+def _hash_code(email: str, purpose: models.OTPPurposeEnum, code: str) -> str:
+    message = f"{email.lower()}:{purpose.value}:{code}".encode()
+    return hmac.new(SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+class OTPStore(ABC):
+    """
+    Issues and checks one-time passwords, keeping them off the users table.
+
+    Codes are stored as HMACs with an attempt counter; a code is burned after
+    MAX_ATTEMPTS wrong guesses. `verify` consumes a correct code but leaves the
+    commit to the caller, so e.g. activating the account and burning the code
+    land in the same transaction. Failed attempts are committed immediately.
+    """
+
+    @abstractmethod
+    def issue(self, db: Session, email: str, purpose: models.OTPPurposeEnum) -> str:
+        """Replaces any earlier code for this email and purpose with a new one, and returns it."""
+
+    @abstractmethod
+    def verify(self, db: Session, email: str, purpose: models.OTPPurposeEnum, code: str) -> bool:
+        """Whether `code` is the live code for this email and purpose."""
+
+    @abstractmethod
+    def purge_expired(self, db: Session) -> int:
+        """Deletes expired codes; returns how many."""
+
+
+class DatabaseOTPStore(OTPStore):
+    """Keeps codes in the `otp_codes` table; works across workers."""
+
+    def _row(self, db: Session, email: str, purpose: models.OTPPurposeEnum):
+        return db.query(models.OneTimePassword).filter(
+            models.OneTimePassword.email == email.lower(),
+            models.OneTimePassword.purpose == purpose
+        ).first()
+
+    def issue(self, db: Session, email: str, purpose: models.OTPPurposeEnum) -> str:
+        code = generate_otp()
+        values = dict(code_hash=_hash_code(email, purpose, code), attempts=0, expires_at=datetime.now(timezone.utc) + OTP_TTL)
+        row = self._row(db, email, purpose)
+        if row is None:
+            try:
+                # In a savepoint, so losing the race below keeps the caller's other changes
+                with db.begin_nested():
+                    db.add(models.OneTimePassword(email=email.lower(), purpose=purpose, **values))
+            except IntegrityError:
+                # A concurrent request for the same email inserted the row first; overwrite its code
+                row = self._row(db, email, purpose)
+        if row is not None:
+            for key, value in values.items():
+                setattr(row, key, value)
+        db.commit()
+        return code
+
+    def verify(self, db: Session, email: str, purpose: models.OTPPurposeEnum, code: str) -> bool:
+        row = db.query(models.OneTimePassword).filter(
+            models.OneTimePassword.email == email.lower(),
+            models.OneTimePassword.purpose == purpose
+        ).with_for_update().first()
+        if row is None:
+            return False
+        if _as_utc(row.expires_at) < datetime.now(timezone.utc):
+            db.delete(row)
+            db.commit()
+            return False
+        if not hmac.compare_digest(row.code_hash, _hash_code(email, purpose, code)):
+            row.attempts += 1
+            if row.attempts >= MAX_ATTEMPTS:
+                db.delete(row)
+            db.commit()
+            return False
+        db.delete(row)
+        return True
+
+    def purge_expired(self, db: Session) -> int:
+        """Deletes every expired code in one set-based statement (served by the expires_at index)."""
+        deleted = db.query(models.OneTimePassword).filter(
+            models.OneTimePassword.expires_at < datetime.now(timezone.utc)
+        ).delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+
+class MemoryOTPStore(OTPStore):
+    """Keeps codes in a per-process dict with TTL expiry; for single-node setups."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._codes: dict[tuple[str, models.OTPPurposeEnum], list] = {}
+
+    def issue(self, db: Session, email: str, purpose: models.OTPPurposeEnum) -> str:
+        code = generate_otp()
+        expires_at = datetime.now(timezone.utc) + OTP_TTL
+        with self._lock:
+            self._codes[(email.lower(), purpose)] = [_hash_code(email, purpose, code), 0, expires_at]
+        return code
+
+    def verify(self, db: Session, email: str, purpose: models.OTPPurposeEnum, code: str) -> bool:
+        key = (email.lower(), purpose)
+        with self._lock:
+            entry = self._codes.get(key)
+            if entry is None:
+                return False
+            code_hash, attempts, expires_at = entry
+            if expires_at < datetime.now(timezone.utc):
+                del self._codes[key]
+                return False
+            if not hmac.compare_digest(code_hash, _hash_code(email, purpose, code)):
+                entry[1] = attempts + 1
+                if entry[1] >= MAX_ATTEMPTS:
+                    del self._codes[key]
+                return False
+            del self._codes[key]
+            return True
+
+    def purge_expired(self, db: Session = None) -> int:
+        now = datetime.now(timezone.utc)
+        with self._lock:
+            expired = [key for key, entry in self._codes.items() if entry[2] < now]
+            for key in expired:
+                del self._codes[key]
+        return len(expired)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+otp_store: OTPStore = MemoryOTPStore() if settings.OTP_BACKEND == "memory" else DatabaseOTPStore()
@@ -0,0 +1,274 @@
+import heapq
+from abc import ABC, abstractmethod
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.config import settings
+from app.core.security import claims_revoked, decode_access_token
+from app.core.shards import pin_team
+from app.db import SessionLocal
+
+# How long a decoded access token is reused before it is decoded again (never past its expiry)
+TOKEN_CACHE_SECONDS = 300
+
+
+# --- Stores ---
+
+class PresenceStore(ABC):
+    """
+    Who has sent a heartbeat in the last `ttl` seconds, by username. The
+    in-memory store is per-process; with several workers, set
+    PRESENCE_REDIS_URL to share one RedisPresenceStore between them (or plug
+    in another backend with `configure_store()`).
+    """
+
+    @abstractmethod
+    def touch(self, username: str, now: float) -> None:
+        """Records a heartbeat; `now` is wall-clock time so workers agree on it."""
+
+    @abstractmethod
+    def last_seen(self, usernames: Iterable[str], now: float) -> dict[str, float]:
+        """Last heartbeat of each of `usernames` that is still online."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Forgets everyone."""
+
+
+class MemoryPresenceStore(PresenceStore):
+    """
+    Per-process map of username to last heartbeat, with a min-heap of expiry
+    times. A heartbeat is a dict write; the heap holds one entry per online
+    user (pushed when they come online, re-pushed if they were still active
+    when it came due), so expiring users costs O(log n) each and never
+    scans the map.
+    """
+
+    def __init__(self, ttl: float = 60):
+        self._ttl = ttl
+        self._seen: dict[str, float] = {}
+        self._expiry: list[tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def touch(self, username: str, now: float) -> None:
+        with self._lock:
+            if username not in self._seen:
+                heapq.heappush(self._expiry, (now + self._ttl, username))
+            self._seen[username] = now
+
+    def last_seen(self, usernames: Iterable[str], now: float) -> dict[str, float]:
+        with self._lock:
+            self._expire(now)
+            return {name: self._seen[name] for name in usernames if name in self._seen}
+
+    def _expire(self, now: float) -> None:
+        while self._expiry and self._expiry[0][0] <= now:
+            _, username = heapq.heappop(self._expiry)
+            seen = self._seen.get(username)
+            if seen is not None and seen + self._ttl > now:
+                # Still sending heartbeats; check again when the latest one runs out
+                heapq.heappush(self._expiry, (seen + self._ttl, username))
+            else:
+                self._seen.pop(username, None)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._seen.clear()
+            self._expiry.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._expire(time.time())
+            return len(self._seen)
+
+
+class RedisPresenceStore(PresenceStore):
+    """
+    Presence shared by every worker: one Redis sorted set of username to last
+    heartbeat time. A heartbeat is one ZADD and a presence query one ZMSCORE
+    (a network round trip each, rather than the memory store's dict write);
+    users past the TTL are trimmed with ZREMRANGEBYSCORE at most every
+    `trim_interval` seconds, and ignored on read until then.
+    """
+
+    def __init__(self, url: Optional[str] = None, ttl: float = 60, key: str = "presence:last_seen",
+                 trim_interval: float = 5, client=None):
+        if client is None:
+            # Only needed when a shared store is configured
+            import redis
+            client = redis.Redis.from_url(url)
+        self._client = client
+        self._ttl = ttl
+        self._key = key
+        self._trim_interval = trim_interval
+        self._next_trim = 0.0
+
+    def touch(self, username: str, now: float) -> None:
+        self._client.zadd(self._key, {username: now})
+
+    def last_seen(self, usernames: Iterable[str], now: float) -> dict[str, float]:
+        names = list(usernames)
+        if now >= self._next_trim:
+            self._next_trim = now + self._trim_interval
+            self._client.zremrangebyscore(self._key, "-inf", now - self._ttl)
+        if not names:
+            return {}
+        scores = self._client.zmscore(self._key, names)
+        return {name: score for name, score in zip(names, scores) if score is not None and score + self._ttl > now}
+
+    def reset(self) -> None:
+        self._client.delete(self._key)
+
+
+_store: PresenceStore = (
+    RedisPresenceStore(settings.PRESENCE_REDIS_URL, ttl=settings.PRESENCE_TTL_SECONDS)
+    if settings.PRESENCE_REDIS_URL else MemoryPresenceStore(ttl=settings.PRESENCE_TTL_SECONDS)
+)
+
+def configure_store(store: PresenceStore) -> None:
+    """Swaps the backing store, e.g. for a shared backend or a fresh one in tests."""
+    global _store
+    _store = store
+
+def get_store() -> PresenceStore:
+    return _store
+
+
+# --- Heartbeats ---
+
+_tokens: dict[str, tuple[float, Optional[dict]]] = {}
+
+def token_subject(token: str) -> Optional[str]:
+    """
+    The username in a live access token, or None. Decoded claims are cached
+    until the token expires (or TOKEN_CACHE_SECONDS, if sooner), and a cached
+    token is still checked against the revocation filter on every use.
+    """
+    now = time.time()
+    cached = _tokens.get(token)
+    if cached is None or cached[0] <= now:
+        claims = decode_access_token(token)
+        until = now + TOKEN_CACHE_SECONDS
+        if claims and claims.get("exp") is not None:
+            until = min(until, claims["exp"])
+        if len(_tokens) > 100000:
+            _tokens.clear()
+        cached = _tokens[token] = (until, claims)
+    elif cached[1] is not None and claims_revoked(cached[1]):
+        return None
+    return cached[1].get("sub") if cached[1] else None
+
+def heartbeat(username: str) -> None:
+    """Marks the user online: a store write, never a database query."""
+    _store.touch(username, time.time())
+
+
+# --- Team Members ---
+
+class TeamMemberCache:
+    """
+    Each team's accepted members (user id to username), kept for `ttl`
+    seconds and dropped as soon as the team's membership changes, so
+    presence queries answer from memory.
+    """
+
+    def __init__(self, ttl: float = 300, max_teams: int = 4096):
+        self._lock = threading.Lock()
+        self._teams: dict[int, tuple[float, dict[int, str]]] = {}
+        self._ttl = ttl
+        self._max_teams = max_teams
+
+    def members(self, team_ids: Iterable[int]) -> dict[int, dict[int, str]]:
+        """Members of each team; teams that do not exist come back empty."""
+        now = time.monotonic()
+        result, missing = {}, []
+        with self._lock:
+            for team_id in team_ids:
+                cached = self._teams.get(team_id)
+                if cached and now - cached[0] < self._ttl:
+                    result[team_id] = cached[1]
+                else:
+                    missing.append(team_id)
+        for team_id in missing:
+            result[team_id] = self._load(team_id)
+        return result
+
+    def _load(self, team_id: int) -> dict[int, str]:
+        db = SessionLocal()
+        try:
+            pin_team(db, team_id)
+            rows = db.execute(
+                select(models.TeamMember.user_id).where(
+                    models.TeamMember.team_id == team_id,
+                    models.TeamMember.status == models.InvitationStatusEnum.accepted,
+                )
+            ).scalars().all()
+        finally:
+            db.close()
+        # Users are not sharded, so their names are a second query rather than a join
+        members = _usernames(rows)
+        with self._lock:
+            if len(self._teams) >= self._max_teams:
+                self._teams.clear()
+            self._teams[team_id] = (time.monotonic(), members)
+        return members
+
+    def invalidate_team(self, team_id: int) -> None:
+        with self._lock:
+            self._teams.pop(team_id, None)
+
+
+def _usernames(user_ids: list[int]) -> dict[int, str]:
+    if not user_ids:
+        return {}
+    db = SessionLocal()
+    try:
+        return dict(db.execute(
+            select(models.User.id, models.User.username).where(models.User.id.in_(user_ids))
+        ).all())
+    finally:
+        db.close()
+
+
+team_members = TeamMemberCache()
+
+
+def team_presence(team_ids: list[int]) -> dict[int, list[dict]]:
+    """Online members of each team with when they were last seen, most recent first."""
+    members = team_members.members(team_ids)
+    seen = _store.last_seen({name for team in members.values() for name in team.values()}, time.time())
+    result = {}
+    for team_id in team_ids:
+        online = [
+            {"user_id": user_id, "username": username, "last_seen": datetime.fromtimestamp(seen[username], timezone.utc)}
+            for user_id, username in members[team_id].items() if username in seen
+        ]
+        online.sort(key=lambda member: member["last_seen"], reverse=True)
+        result[team_id] = online
+    return result
+
+
+# --- Session Hooks ---
+# Changes are collected at flush time and applied only once the transaction commits.
+
+_PENDING_KEY = "presence_member_changes"
+
+@event.listens_for(Session, "after_flush")
+def _collect_member_changes(session: Session, flush_context) -> None:
+    teams = {obj.team_id for obj in (*session.new, *session.dirty, *session.deleted) if isinstance(obj, models.TeamMember)}
+    if teams:
+        session.info.setdefault(_PENDING_KEY, set()).update(teams)
+
+@event.listens_for(Session, "after_commit")
+def _apply_member_changes(session: Session) -> None:
+    for team_id in session.info.pop(_PENDING_KEY, None) or ():
+        team_members.invalidate_team(team_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_member_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,169 @@
+import time
+from typing import Optional
+from sqlalchemy import delete, insert, select
+
+from app import models  # noqa: F401  (registers the tables on Base.metadata)
+from app.db import Base, shard_router
+from app.core.shards import DEFAULT_SHARD, SHARDED_TABLES
+
+# Rows read and inserted together while copying a team
+BATCH_SIZE = 1000
+
+# Columns of team rows that point at users, who must exist on the target first
+_USER_COLUMNS = [
+    ("teams", "owner_id"),
+    ("team_members", "user_id"),
+    ("tasks", "assignee_id"),
+    ("comments", "user_id"),
+    ("attachments", "uploader_id"),
+    ("chat_messages", "user_id"),
+    ("chat_read_markers", "user_id"),
+]
+
+
+def _team_rows(team_id: int) -> list:
+    """(table, criteria) for every row that belongs to the team, parents before children."""
+    tables = Base.metadata.tables
+    projects, tasks = tables["projects"], tables["tasks"]
+    project_ids = select(projects.c.id).where(projects.c.team_id == team_id)
+    task_ids = select(tasks.c.id).where(tasks.c.project_id.in_(project_ids))
+    channels = tables["chat_channels"]
+    channel_ids = select(channels.c.id).where(channels.c.team_id == team_id)
+    rows = [
+        (tables["teams"], tables["teams"].c.id == team_id),
+        (tables["team_members"], tables["team_members"].c.team_id == team_id),
+        (projects, projects.c.team_id == team_id),
+        (tables["milestones"], tables["milestones"].c.project_id.in_(project_ids)),
+        (tasks, tasks.c.project_id.in_(project_ids)),
+        (tables["task_dependencies"], tables["task_dependencies"].c.task_id.in_(task_ids)),
+        (tables["comments"], tables["comments"].c.task_id.in_(task_ids)),
+        (tables["attachments"], tables["attachments"].c.task_id.in_(task_ids)),
+        (tables["project_archives"], tables["project_archives"].c.project_id.in_(project_ids)),
+        (tables["project_archive_chunks"], tables["project_archive_chunks"].c.project_id.in_(project_ids)),
+        (tables["task_status_snapshots"], tables["task_status_snapshots"].c.project_id.in_(project_ids)),
+        (channels, channels.c.team_id == team_id),
+        (tables["chat_messages"], tables["chat_messages"].c.channel_id.in_(channel_ids)),
+        (tables["chat_read_markers"], tables["chat_read_markers"].c.channel_id.in_(channel_ids)),
+    ]
+    assert {table.name for table, _ in rows} == SHARDED_TABLES
+    return rows
+
+def _referenced_users(connection, team_id: int) -> set[int]:
+    criteria = {table.name: where for table, where in _team_rows(team_id)}
+    tables = Base.metadata.tables
+    user_ids = set()
+    for table_name, column in _USER_COLUMNS:
+        table = tables[table_name]
+        user_ids.update(connection.scalars(select(table.c[column]).where(criteria[table_name]).distinct()))
+    user_ids.discard(None)
+    return user_ids
+
+
+def move_team(team_id: int, target: str, wait: Optional[float] = None) -> dict[str, int]:
+    """
+    Moves a team and everything under it to another shard, keeping every id.
+
+    1. The team is marked as moving, and after `wait` seconds (the directory
+       cache lifetime, by default) every process refuses to write to it.
+    2. Its rows are copied to the target in one transaction.
+    3. The directory points at the target; after another `wait` every process
+       reads from there, and the rows are deleted from the source.
+
+    Reads keep working throughout; writes get a 503 for the duration. Returns
+    the number of rows copied per table.
+    """
+    if target not in shard_router.engines:
+        raise ValueError(f"Unknown shard '{target}'.")
+    source, _ = shard_router.lookup(team_id)
+    if source == target:
+        return {}
+    wait = shard_router.directory_ttl if wait is None else wait
+    teams = Base.metadata.tables["teams"]
+    source_engine, target_engine = shard_router.engine(source), shard_router.engine(target)
+
+    with source_engine.connect() as connection:
+        if connection.execute(select(teams.c.id).where(teams.c.id == team_id)).first() is None:
+            raise ValueError(f"Team {team_id} is not on shard '{source}'.")
+        user_ids = _referenced_users(connection, team_id)
+
+    shard_router.set_directory(team_id, source, moving=True)
+    time.sleep(wait)
+    copied = {}
+    try:
+        shard_router.mirror_users(user_ids, shards=[target])
+        with source_engine.connect() as reader, target_engine.begin() as writer:
+            # Leftovers of an earlier attempt that failed half way
+            writer.execute(delete(teams).where(teams.c.id == team_id))
+            for table, criteria in _team_rows(team_id):
+                copied[table.name] = 0
+                result = reader.execution_options(stream_results=True).execute(select(table).where(criteria))
+                for batch in result.partitions(BATCH_SIZE):
+                    writer.execute(insert(table), [dict(row._mapping) for row in batch])
+                    copied[table.name] += len(batch)
+    except Exception:
+        shard_router.set_directory(team_id, source)
+        raise
+
+    shard_router.set_directory(team_id, target, moving=True)
+    time.sleep(wait)
+    with source_engine.begin() as connection:
+        # Everything else goes with it through ON DELETE CASCADE
+        connection.execute(delete(teams).where(teams.c.id == team_id))
+    shard_router.set_directory(team_id, target)
+    return copied
+
+
+# --- Planning ---
+
+def teams_on(shard: str) -> list[int]:
+    """Ids of the teams stored on a shard."""
+    teams = Base.metadata.tables["teams"]
+    with shard_router.engine(shard).connect() as connection:
+        stored = connection.scalars(select(teams.c.id).order_by(teams.c.id)).all()
+    return [team_id for team_id in stored if shard_router.lookup(team_id)[0] == shard]
+
+def rebalance_plan(drain: Optional[str] = None) -> list[tuple[int, str, str]]:
+    """
+    (team id, from, to) moves that even out the number of teams across the
+    non-default shards, or that empty `drain` onto the others.
+    """
+    targets = [name for name in shard_router.names if name not in (DEFAULT_SHARD, drain)]
+    if not targets:
+        return []
+    counts = {name: len(teams_on(name)) for name in shard_router.names}
+    plan = []
+    if drain is not None:
+        for team_id in teams_on(drain):
+            target = min(targets, key=lambda name: (counts[name], name))
+            plan.append((team_id, drain, target))
+            counts[target] += 1
+        return plan
+    pending = {name: teams_on(name) for name in targets}
+    while True:
+        fullest = max(targets, key=lambda name: counts[name])
+        emptiest = min(targets, key=lambda name: counts[name])
+        if counts[fullest] - counts[emptiest] <= 1:
+            return plan
+        plan.append((pending[fullest].pop(), fullest, emptiest))
+        counts[fullest] -= 1
+        counts[emptiest] += 1
+
+
+# --- Users ---
+
+def sync_users(shard: str) -> int:
+    """
+    Brings a shard's copy of the users table up to date with the primary, e.g.
+    for a new shard or after users were deleted in bulk outside the ORM.
+    """
+    users = Base.metadata.tables["users"]
+    with shard_router.primary.connect() as connection:
+        user_ids = set(connection.scalars(select(users.c.id)))
+    with shard_router.engine(shard).begin() as connection:
+        stale = set(connection.scalars(select(users.c.id))) - user_ids
+        if stale:
+            connection.execute(delete(users).where(users.c.id.in_(stale)))
+    ordered = sorted(user_ids)
+    for start in range(0, len(ordered), BATCH_SIZE):
+        shard_router.mirror_users(ordered[start:start + BATCH_SIZE], shards=[shard])
+    return len(ordered)
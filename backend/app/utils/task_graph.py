@@ -0,0 +1,309 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Iterable, Optional
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app import models
+
+
+class CycleError(ValueError):
+    """Raised when a new dependency would make the task graph cyclic."""
+
+
+class ProjectGraph:
+    """
+    The dependency DAG of one project, with a longest-path schedule kept up to date
+    incrementally.
+
+    For every task we keep:
+      head -- earliest finish: its duration plus the longest chain of work before it
+      tail -- its duration plus the longest chain of work that depends on it
+    Both are independent of the project's overall length, so a change only touches
+    the affected subgraph: a new or removed edge u -> v recomputes head for v and
+    its descendants and tail for u and its ancestors. The critical path is every
+    task whose head + tail - duration equals the makespan.
+    """
+
+    def __init__(self, tasks: Iterable[tuple[int, int, Optional[datetime]]], edges: Iterable[tuple[int, int]]):
+        self.duration: dict[int, int] = {}
+        self.due_date: dict[int, Optional[datetime]] = {}
+        self.preds: dict[int, set[int]] = {}
+        self.succs: dict[int, set[int]] = {}
+        for task_id, duration, due_date in tasks:
+            self._add_node(task_id, duration, due_date)
+        for pred, succ in edges:
+            if pred in self.duration and succ in self.duration:
+                self.succs[pred].add(succ)
+                self.preds[succ].add(pred)
+        self.head: dict[int, int] = {}
+        self.tail: dict[int, int] = {}
+        self._order: Optional[list[int]] = None
+        self._update_heads(self.duration)
+        self._update_tails(self.duration)
+
+    def _add_node(self, task_id: int, duration: int, due_date: Optional[datetime]) -> None:
+        self.duration[task_id] = duration
+        self.due_date[task_id] = due_date
+        self.preds.setdefault(task_id, set())
+        self.succs.setdefault(task_id, set())
+
+    # --- Traversal ---
+
+    def _reachable(self, start: Iterable[int], neighbours: dict[int, set[int]]) -> set[int]:
+        seen = set(start)
+        stack = list(seen)
+        while stack:
+            for nxt in neighbours[stack.pop()]:
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return seen
+
+    def _ordered(self, nodes: set[int], inbound: dict[int, set[int]], outbound: dict[int, set[int]]) -> list[int]:
+        """Kahn's algorithm restricted to `nodes` (edges leaving the set are ignored)."""
+        indegree = {n: sum(1 for p in inbound[n] if p in nodes) for n in nodes}
+        queue = deque(sorted(n for n, d in indegree.items() if d == 0))
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            for nxt in outbound[node]:
+                if nxt in indegree:
+                    indegree[nxt] -= 1
+                    if indegree[nxt] == 0:
+                        queue.append(nxt)
+        return order
+
+    def _update_heads(self, changed: Iterable[int]) -> None:
+        affected = self._reachable(changed, self.succs)
+        for node in self._ordered(affected, self.preds, self.succs):
+            self.head[node] = self.duration[node] + max((self.head[p] for p in self.preds[node]), default=0)
+
+    def _update_tails(self, changed: Iterable[int]) -> None:
+        affected = self._reachable(changed, self.preds)
+        for node in self._ordered(affected, self.succs, self.preds):
+            self.tail[node] = self.duration[node] + max((self.tail[s] for s in self.succs[node]), default=0)
+
+    # --- Mutations ---
+
+    def would_create_cycle(self, pred: int, succ: int) -> bool:
+        return pred == succ or pred in self._reachable([succ], self.succs)
+
+    def add_edge(self, pred: int, succ: int) -> None:
+        if self.would_create_cycle(pred, succ):
+            raise CycleError(f"Task {succ} already leads to task {pred}.")
+        self.succs[pred].add(succ)
+        self.preds[succ].add(pred)
+        self._order = None
+        self._update_heads([succ])
+        self._update_tails([pred])
+
+    def remove_edge(self, pred: int, succ: int) -> None:
+        if succ not in self.succs.get(pred, ()):
+            return
+        self.succs[pred].discard(succ)
+        self.preds[succ].discard(pred)
+        self._order = None
+        self._update_heads([succ])
+        self._update_tails([pred])
+
+    def add_task(self, task_id: int, duration: int, due_date: Optional[datetime]) -> None:
+        self._add_node(task_id, duration, due_date)
+        self.head[task_id] = self.tail[task_id] = duration
+        self._order = None
+
+    def set_duration(self, task_id: int, duration: int) -> None:
+        if self.duration.get(task_id) == duration:
+            return
+        self.duration[task_id] = duration
+        self._update_heads([task_id])
+        self._update_tails([task_id])
+
+    def set_due_date(self, task_id: int, due_date: Optional[datetime]) -> None:
+        # Due dates only feed the lateness flags, which are derived at read time
+        self.due_date[task_id] = due_date
+
+    # --- Reads ---
+
+    @property
+    def makespan(self) -> int:
+        return max(self.head.values(), default=0)
+
+    def topological_order(self) -> list[int]:
+        if self._order is None:
+            self._order = self._ordered(set(self.duration), self.preds, self.succs)
+        return self._order
+
+    def slack(self, task_id: int) -> int:
+        return self.makespan - (self.head[task_id] + self.tail[task_id] - self.duration[task_id])
+
+    def critical_path(self) -> list[int]:
+        makespan = self.makespan
+        if not makespan:
+            return []
+        node = min(n for n in self.duration if not self.preds[n] and self.tail[n] == makespan)
+        path = [node]
+        while True:
+            nxt = [
+                s for s in self.succs[node]
+                if self.tail[s] == self.tail[node] - self.duration[node] and self.head[s] == self.head[node] + self.duration[s]
+            ]
+            if not nxt:
+                return path
+            node = min(nxt)
+            path.append(node)
+
+
+def effective_duration(task: models.Task) -> int:
+    """Remaining work in days; finished tasks no longer hold anything up."""
+    if task.status == models.TaskStatusEnum.done:
+        return 0
+    return task.estimated_days if task.estimated_days is not None else 1
+
+
+class TaskGraphCache:
+    """
+    Per-project ProjectGraph cache (LRU, with a TTL so other workers' writes are
+    picked up). Task and dependency writes are applied incrementally through the
+    session hooks at the bottom of this module. Hold `lock` while reading a graph.
+    """
+
+    def __init__(self, max_projects: int = 256, ttl: float = 300):
+        self.lock = threading.RLock()
+        self._graphs: OrderedDict[int, tuple[float, ProjectGraph]] = OrderedDict()
+        self._max_projects = max_projects
+        self._ttl = ttl
+
+    def _load(self, db: Session, project_id: int) -> ProjectGraph:
+        tasks = db.query(
+            models.Task.id, models.Task.estimated_days, models.Task.status, models.Task.due_date
+        ).filter(models.Task.project_id == project_id).all()
+        edges = db.query(models.TaskDependency.depends_on_id, models.TaskDependency.task_id).join(
+            models.Task, models.Task.id == models.TaskDependency.task_id
+        ).filter(models.Task.project_id == project_id).all()
+        return ProjectGraph(
+            ((t.id, effective_duration(t), t.due_date) for t in tasks),
+            ((pred, succ) for pred, succ in edges)
+        )
+
+    def get(self, db: Session, project_id: int) -> ProjectGraph:
+        with self.lock:
+            cached = self._graphs.get(project_id)
+            if cached and time.monotonic() - cached[0] < self._ttl:
+                self._graphs.move_to_end(project_id)
+                return cached[1]
+        graph = self._load(db, project_id)
+        with self.lock:
+            self._graphs[project_id] = (time.monotonic(), graph)
+            self._graphs.move_to_end(project_id)
+            while len(self._graphs) > self._max_projects:
+                self._graphs.popitem(last=False)
+        return graph
+
+    def peek(self, project_id: int) -> Optional[ProjectGraph]:
+        with self.lock:
+            cached = self._graphs.get(project_id)
+            return cached[1] if cached else None
+
+    def invalidate(self, project_id: int) -> None:
+        with self.lock:
+            self._graphs.pop(project_id, None)
+
+    def clear(self) -> None:
+        with self.lock:
+            self._graphs.clear()
+
+    # --- Applying committed changes ---
+
+    def apply(self, changes: list[tuple]) -> None:
+        with self.lock:
+            for change in changes:
+                kind, project_id = change[0], change[1]
+                graph = self.peek(project_id)
+                if graph is None:
+                    continue
+                try:
+                    if kind == "edge_added":
+                        graph.add_edge(change[2], change[3])
+                    elif kind == "edge_removed":
+                        graph.remove_edge(change[2], change[3])
+                    elif kind == "task_added":
+                        graph.add_task(change[2], change[3], change[4])
+                    elif kind == "task_changed":
+                        if change[2] not in graph.duration:
+                            raise KeyError(change[2])
+                        graph.set_duration(change[2], change[3])
+                        graph.set_due_date(change[2], change[4])
+                    else:
+                        self.invalidate(project_id)
+                except (CycleError, KeyError):
+                    # Out of step with the database; rebuild on next read
+                    self.invalidate(project_id)
+
+
+task_graph_cache = TaskGraphCache()
+
+
+def creates_cycle(db: Session, depends_on_id: int, task_id: int) -> bool:
+    """
+    Whether making `task_id` depend on `depends_on_id` would close a cycle, i.e.
+    `depends_on_id` already (transitively) depends on `task_id`. Checked against the
+    database with a recursive CTE so it holds across workers, not just this cache.
+    """
+    if depends_on_id == task_id:
+        return True
+    deps = models.TaskDependency.__table__
+    downstream = select(deps.c.task_id).where(deps.c.depends_on_id == task_id).cte("downstream", recursive=True)
+    downstream = downstream.union(
+        select(deps.c.task_id).join(downstream, deps.c.depends_on_id == downstream.c.task_id)
+    )
+    found = db.execute(select(downstream.c.task_id).where(downstream.c.task_id == depends_on_id).limit(1)).first()
+    return found is not None
+
+
+# --- Session Hooks ---
+# Changes are collected at flush time and applied only once the transaction commits.
+
+_PENDING_KEY = "task_graph_changes"
+
+@event.listens_for(Session, "after_flush")
+def _collect_task_graph_changes(session: Session, flush_context) -> None:
+    changes = session.info.setdefault(_PENDING_KEY, [])
+    for obj in session.new:
+        if isinstance(obj, models.Task):
+            changes.append(("task_added", obj.project_id, obj.id, effective_duration(obj), obj.due_date))
+        elif isinstance(obj, models.TaskDependency):
+            project_id = session.get(models.Task, obj.task_id).project_id
+            changes.append(("edge_added", project_id, obj.depends_on_id, obj.task_id))
+    for obj in session.dirty:
+        if isinstance(obj, models.Task):
+            state = inspect(obj)
+            if any(state.attrs[a].history.has_changes() for a in ("estimated_days", "status", "due_date")):
+                changes.append(("task_changed", obj.project_id, obj.id, effective_duration(obj), obj.due_date))
+            if state.attrs.project_id.history.has_changes():
+                for project_id in state.attrs.project_id.history.deleted:
+                    changes.append(("invalidate", project_id))
+                changes.append(("invalidate", obj.project_id))
+    for obj in session.deleted:
+        if isinstance(obj, models.Task):
+            changes.append(("invalidate", obj.project_id))
+        elif isinstance(obj, models.Project):
+            # Its tasks are removed by the database's ON DELETE CASCADE, out of the ORM's sight
+            changes.append(("invalidate", obj.id))
+        elif isinstance(obj, models.TaskDependency):
+            task = session.get(models.Task, obj.task_id)
+            if task is not None:
+                changes.append(("edge_removed", task.project_id, obj.depends_on_id, obj.task_id))
+
+@event.listens_for(Session, "after_commit")
+def _apply_task_graph_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if changes:
+        task_graph_cache.apply(changes)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_task_graph_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,192 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, case, event, func, inspect, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.core.shards import scatter
+from app.db import SessionLocal
+
+# Tasks due within this many days count as "due soon"
+DUE_SOON_DAYS = 7
+
+_OPEN = models.Task.status != models.TaskStatusEnum.done
+_TOTALS = ("open_tasks", "high", "overdue", "due_soon", "teams")
+
+
+def _count(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+def workload_query(team_id: int, now: datetime):
+    """
+    One row per accepted member of the team: their open tasks in the team's
+    (non-archived) projects, by priority, overdue and due soon, and the next
+    due date. A single GROUP BY over team_members LEFT JOIN tasks, which uses
+    the tasks.assignee_id index.
+    """
+    team_projects = select(models.Project.id).where(
+        models.Project.team_id == team_id,
+        models.Project.status != models.ProjectStatusEnum.archived,
+    )
+    task = models.Task
+    return select(
+        models.TeamMember.user_id,
+        models.User.username,
+        models.User.full_name,
+        models.TeamMember.role,
+        func.count(task.id).label("open_tasks"),
+        _count(task.priority == models.TaskPriorityEnum.high).label("high"),
+        _count(task.priority == models.TaskPriorityEnum.medium).label("medium"),
+        _count(task.priority == models.TaskPriorityEnum.low).label("low"),
+        _count(task.status == models.TaskStatusEnum.in_progress).label("in_progress"),
+        _count(task.due_date < now).label("overdue"),
+        _count(and_(task.due_date >= now, task.due_date < now + timedelta(days=DUE_SOON_DAYS))).label("due_soon"),
+        func.min(case((task.due_date >= now, task.due_date))).label("next_due_date"),
+        func.count(task.project_id.distinct()).label("projects"),
+    ).join(
+        models.User, models.User.id == models.TeamMember.user_id
+    ).outerjoin(
+        task, and_(task.assignee_id == models.TeamMember.user_id, _OPEN, task.project_id.in_(team_projects))
+    ).where(
+        models.TeamMember.team_id == team_id,
+        models.TeamMember.status == models.InvitationStatusEnum.accepted,
+    ).group_by(
+        models.TeamMember.user_id, models.User.username, models.User.full_name, models.TeamMember.role
+    )
+
+def all_teams_query(user_ids: list[int], now: datetime):
+    """
+    One row per user with open tasks in any team's (non-archived) projects:
+    the same GROUP BY over tasks, keyed on assignee instead of membership.
+    """
+    task = models.Task
+    return select(
+        task.assignee_id,
+        func.count(task.id).label("open_tasks"),
+        _count(task.priority == models.TaskPriorityEnum.high).label("high"),
+        _count(task.due_date < now).label("overdue"),
+        _count(and_(task.due_date >= now, task.due_date < now + timedelta(days=DUE_SOON_DAYS))).label("due_soon"),
+        func.count(models.Project.team_id.distinct()).label("teams"),
+    ).join(
+        models.Project, models.Project.id == task.project_id
+    ).where(
+        task.assignee_id.in_(user_ids),
+        _OPEN,
+        models.Project.status != models.ProjectStatusEnum.archived,
+    ).group_by(task.assignee_id)
+
+def _all_teams_totals(db: Session, user_ids: list[int], now: datetime) -> dict[int, dict]:
+    # Members' other teams can be on any shard; each team is on exactly one, so the counts add up
+    rows = scatter(SessionLocal, db, lambda shard_db: shard_db.execute(all_teams_query(user_ids, now)).all())
+    totals: dict[int, dict] = {}
+    for row in rows:
+        total = totals.setdefault(row.assignee_id, dict.fromkeys(_TOTALS, 0))
+        for field in _TOTALS:
+            total[field] += getattr(row, field) or 0
+    return totals
+
+def compute_workload(db: Session, team_id: int) -> dict:
+    now = datetime.now(timezone.utc)
+    members = [
+        {
+            "user_id": row.user_id,
+            "username": row.username,
+            "full_name": row.full_name,
+            "role": row.role,
+            "open_tasks": row.open_tasks,
+            "by_priority": {"high": row.high or 0, "medium": row.medium or 0, "low": row.low or 0},
+            "in_progress": row.in_progress or 0,
+            "overdue": row.overdue or 0,
+            "due_soon": row.due_soon or 0,
+            "next_due_date": row.next_due_date,
+            "projects": row.projects,
+        }
+        for row in db.execute(workload_query(team_id, now))
+    ]
+    if members:
+        totals = _all_teams_totals(db, [m["user_id"] for m in members], now)
+        for member in members:
+            member["all_teams"] = totals.get(member["user_id"], dict.fromkeys(_TOTALS, 0))
+    # Most loaded first: overdue work, then open tasks
+    members.sort(key=lambda m: (-m["overdue"], -m["open_tasks"], m["username"]))
+    return {"team_id": team_id, "computed_at": now, "members": members}
+
+
+class WorkloadCache:
+    """
+    Per-team workload reports, kept for `ttl` seconds. A team's report is
+    dropped as soon as a task assigned (or newly assigned) to one of its
+    members changes, in this team or any other, or its membership changes; the TTL covers overdue counts
+    ticking over and writes made by other workers.
+    """
+
+    def __init__(self, ttl: float = 30, max_teams: int = 1024):
+        self._lock = threading.Lock()
+        self._reports: dict[int, tuple[float, frozenset[int], dict]] = {}
+        self._ttl = ttl
+        self._max_teams = max_teams
+
+    def get(self, db: Session, team_id: int) -> dict:
+        with self._lock:
+            cached = self._reports.get(team_id)
+        if cached and time.monotonic() - cached[0] < self._ttl:
+            return cached[2]
+        report = compute_workload(db, team_id)
+        members = frozenset(m["user_id"] for m in report["members"])
+        with self._lock:
+            if len(self._reports) >= self._max_teams:
+                self._reports.clear()
+            self._reports[team_id] = (time.monotonic(), members, report)
+        return report
+
+    def invalidate_users(self, user_ids) -> None:
+        user_ids = set(user_ids)
+        with self._lock:
+            for team_id in [t for t, (_, members, _) in self._reports.items() if members & user_ids]:
+                del self._reports[team_id]
+
+    def invalidate_team(self, team_id: int) -> None:
+        with self._lock:
+            self._reports.pop(team_id, None)
+
+
+workload_cache = WorkloadCache()
+
+
+# --- Session Hooks ---
+# Changes are collected at flush time and applied only once the transaction commits.
+
+_PENDING_KEY = "workload_changes"
+_TASK_FIELDS = ("assignee_id", "status", "priority", "due_date", "project_id")
+
+@event.listens_for(Session, "after_flush")
+def _collect_workload_changes(session: Session, flush_context) -> None:
+    changes = session.info.setdefault(_PENDING_KEY, [])
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, models.Task) and obj.assignee_id is not None:
+            changes.append(("users", {obj.assignee_id}))
+        elif isinstance(obj, models.TeamMember):
+            changes.append(("team", obj.team_id))
+    for obj in session.dirty:
+        if isinstance(obj, models.Task):
+            state = inspect(obj)
+            if any(state.attrs[field].history.has_changes() for field in _TASK_FIELDS):
+                # Both the previous and the new assignee's numbers change
+                users = {obj.assignee_id, *state.attrs.assignee_id.history.deleted} - {None}
+                if users:
+                    changes.append(("users", users))
+        elif isinstance(obj, models.TeamMember):
+            changes.append(("team", obj.team_id))
+
+@event.listens_for(Session, "after_commit")
+def _apply_workload_changes(session: Session) -> None:
+    for kind, value in session.info.pop(_PENDING_KEY, None) or []:
+        if kind == "users":
+            workload_cache.invalidate_users(value)
+        else:
+            workload_cache.invalidate_team(value)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_workload_changes(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,53 @@
+import os
+from datetime import datetime, timezone
+
+# Add the project root to the Python path to allow imports from 'app'
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+from app.db import SessionLocal
+from app.utils.archive import start_archive, archive_project, restore_project
+
+def sweep_archives():
+    """
+    Finishes any project archive or restore that was interrupted, and moves
+    projects that were marked archived without going through the API (e.g. by
+    hand in the database) into cold storage.
+    """
+    print(f"--- Running project archive sweep at {datetime.now(timezone.utc)} ---")
+    db = SessionLocal()
+    try:
+        unarchived = db.query(models.Project).outerjoin(
+            models.ProjectArchive, models.ProjectArchive.project_id == models.Project.id
+        ).filter(
+            models.Project.status == models.ProjectStatusEnum.archived,
+            models.ProjectArchive.project_id == None
+        ).all()
+        for project in unarchived:
+            start_archive(db, project)
+
+        pending = db.query(models.ProjectArchive.project_id, models.ProjectArchive.state).filter(
+            models.ProjectArchive.state != models.ArchiveStateEnum.archived
+        ).all()
+        if not pending:
+            print("No projects to archive or restore.")
+            return
+
+        for project_id, state in pending:
+            if state == models.ArchiveStateEnum.archiving:
+                archive_project(project_id)
+                print(f"Archived project {project_id}.")
+            else:
+                restore_project(project_id)
+                print(f"Restored project {project_id}.")
+
+    except Exception as e:
+        print(f"ERROR: An error occurred during the archive sweep: {e}")
+        db.rollback()
+    finally:
+        db.close()
+        print("--- Archive sweep finished ---")
+
+if __name__ == "__main__":
+    sweep_archives()
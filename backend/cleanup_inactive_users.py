@@ -2,13 +2,15 @@ import os
 from datetime import datetime, timedelta, timezone
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
 
 # Add the project root to the Python path to allow imports from 'app'
 import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from app.core.config import settings
 from app.models.user import User
+from app.utils.otp import DatabaseOTPStore
+from app.core.revocation import purge_expired as purge_expired_tokens
 
 def cleanup_users():
     """
@@ -17,8 +19,7 @@ def cleanup_users():
     """
     print(f"--- Running inactive user cleanup at {datetime.now(timezone.utc)} ---")
     
-    load_dotenv()
-    database_url = os.getenv("DATABASE_URL")
+    database_url = settings.DATABASE_URL
 
     if not database_url:
         print("ERROR: DATABASE_URL not found in .env file. Exiting.")
@@ -37,22 +38,27 @@ def cleanup_users():
         return
 
     try:
+        # Expired OTPs go in a single DELETE ... WHERE expires_at < now()
+        num_purged = DatabaseOTPStore().purge_expired(db)
+        print(f"Purged {num_purged} expired OTP(s).")
+
+        # Revocations only matter until the token would have expired anyway
+        num_revoked, num_refresh = purge_expired_tokens(db)
+        print(f"Purged {num_revoked} expired revocation(s) and {num_refresh} expired refresh token(s).")
+
         cleanup_threshold = datetime.now(timezone.utc) - timedelta(hours=24)
         
-        users_to_delete = db.query(User).filter(
+        # One set-based DELETE; anything the users own is removed by ON DELETE CASCADE
+        num_deleted = db.query(User).filter(
             User.is_active == False,
             User.created_at < cleanup_threshold
-        ).all()
-        
-        if not users_to_delete:
+        ).delete(synchronize_session=False)
+
+        if not num_deleted:
+            db.rollback()
             print("No inactive users to delete.")
             return
 
-        num_deleted = len(users_to_delete)
-        
-        for user in users_to_delete:
-            db.delete(user)
-            
         db.commit()
         print(f"SUCCESS: Successfully deleted {num_deleted} inactive user(s).")
 
@@ -0,0 +1,53 @@
+import argparse
+import os
+import json
+
+# Add the project root to the Python path to allow imports from 'app'
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app import models
+from app.db import SessionLocal
+from app.utils.bulk_import import import_rows
+
+def main():
+    """
+    Bulk-imports tasks or milestones into a project from a CSV or NDJSON file,
+    e.g. when migrating a customer from another tool:
+
+        python import_data.py tasks 42 export.csv
+        python import_data.py milestones 42 milestones.ndjson --dry-run
+    """
+    parser = argparse.ArgumentParser(description="Bulk-import tasks or milestones into a project.")
+    parser.add_argument("kind", choices=["tasks", "milestones"])
+    parser.add_argument("project_id", type=int)
+    parser.add_argument("path", help="CSV (with header) or NDJSON file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension.")
+    parser.add_argument("--dry-run", action="store_true", help="Validate and load, then roll back.")
+    args = parser.parse_args()
+
+    fmt = args.format or ("ndjson" if args.path.lower().endswith((".ndjson", ".jsonl")) else "csv")
+
+    db = SessionLocal()
+    try:
+        project = db.query(models.Project).filter(models.Project.id == args.project_id).first()
+        if not project:
+            print(f"ERROR: Project {args.project_id} not found.")
+            sys.exit(1)
+        if project.status == models.ProjectStatusEnum.archived:
+            print(f"ERROR: Project {args.project_id} is archived.")
+            sys.exit(1)
+        with open(args.path, encoding="utf-8-sig", newline="") as lines:
+            report = import_rows(db, project, args.kind, lines, fmt, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    for error in report["errors"]:
+        print(f"Row {error['row']}: {'; '.join(error['errors'])}")
+    if report["errors_truncated"]:
+        print(f"... and {report['failed'] - len(report['errors'])} more rejected row(s).")
+    summary = {k: v for k, v in report.items() if k != "errors"}
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import argparse
+import os
+
+# Add the project root to the Python path to allow imports from 'app'
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import shard_router
+from app.utils.shard_move import move_team, rebalance_plan, sync_users, teams_on
+
+def show_status():
+    print("--- Shards ---")
+    for name in shard_router.names:
+        print(f"{name}: {len(teams_on(name))} teams")
+
+def run_moves(plan, dry_run: bool):
+    if not plan:
+        print("Nothing to move.")
+        return
+    for team_id, source, target in plan:
+        if dry_run:
+            print(f"Would move team {team_id}: {source} -> {target}")
+            continue
+        print(f"Moving team {team_id}: {source} -> {target}")
+        copied = move_team(team_id, target)
+        print(f"  copied {sum(copied.values())} rows ({', '.join(f'{k}={v}' for k, v in copied.items() if v)})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and rebalance team shards.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("status", help="Number of teams on each shard")
+    move = commands.add_parser("move", help="Move one team to another shard")
+    move.add_argument("team_id", type=int)
+    move.add_argument("target")
+    rebalance = commands.add_parser("rebalance", help="Even out teams across shards")
+    rebalance.add_argument("--drain", help="Move every team off this shard instead")
+    rebalance.add_argument("--dry-run", action="store_true")
+    sync = commands.add_parser("sync-users", help="Refresh a shard's copy of the users table")
+    sync.add_argument("shard")
+    args = parser.parse_args()
+
+    if not shard_router.enabled:
+        print("Sharding is not configured (set SHARD_DATABASE_URLS).")
+        return
+    if args.command == "status":
+        show_status()
+    elif args.command == "move":
+        run_moves([(args.team_id, shard_router.lookup(args.team_id)[0], args.target)], dry_run=False)
+    elif args.command == "rebalance":
+        run_moves(rebalance_plan(drain=args.drain), dry_run=args.dry_run)
+    else:
+        print(f"Synced {sync_users(args.shard)} users to shard '{args.shard}'.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import os
+from datetime import datetime, timezone
+
+# Add the project root to the Python path to allow imports from 'app'
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.db import SessionLocal
+from app.utils.deletion import run_deletion_job, stale_job_ids
+
+def resume_deletion_jobs():
+    """
+    Finishes background deletions that failed (until they run out of
+    attempts) or whose worker died part way through (a restart or a crash),
+    once they have gone a whole lease without progress. Without it a team
+    deletion is only retried when the user who started it asks again.
+    """
+    print(f"--- Running deletion job sweep at {datetime.now(timezone.utc)} ---")
+    db = SessionLocal()
+    try:
+        job_ids = stale_job_ids(db)
+        if not job_ids:
+            print("No failed or stalled deletion jobs.")
+            return
+
+        for job_id in job_ids:
+            run_deletion_job(job_id)
+            print(f"Resumed deletion job {job_id}.")
+
+    except Exception as e:
+        print(f"ERROR: An error occurred during the deletion job sweep: {e}")
+        db.rollback()
+    finally:
+        db.close()
+        print("--- Deletion job sweep finished ---")
+
+if __name__ == "__main__":
+    resume_deletion_jobs()
@@ -0,0 +1,27 @@
+import os
+from datetime import datetime, timezone
+
+# Add the project root to the Python path to allow imports from 'app'
+import sys
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.utils.burndown import take_snapshot
+
+def snapshot_tasks():
+    """
+    Records today's task counts by status for every live project and milestone,
+    for the burndown and velocity endpoints. Meant to run once a night; running
+    it again the same day replaces that day's rows.
+    """
+    print(f"--- Running task status snapshot at {datetime.now(timezone.utc)} ---")
+    try:
+        written = take_snapshot()
+        for shard, rows in written.items():
+            print(f"Wrote {rows} snapshot row(s) on shard '{shard}'.")
+    except Exception as e:
+        print(f"ERROR: An error occurred while taking the snapshot: {e}")
+    finally:
+        print("--- Task status snapshot finished ---")
+
+if __name__ == "__main__":
+    snapshot_tasks()
@@ -1,6 +1,7 @@
 import { useState, useEffect } from "react";
 import { Link, useNavigate } from "react-router-dom";
 import { getCurrentUser } from "../../services/user_api";
+import { clearTokens } from "../../services/auth";
 import "./DashboardPage.css";
 
 const features = [
@@ -27,7 +28,7 @@ const DashboardPage = () => {
       } catch (error) {
         console.error("Failed to fetch user:", error);
         setUser(null); // Ensure user is null if token is invalid
-        localStorage.removeItem("token");
+        clearTokens();
       } finally {
         setIsLoading(false);
       }
@@ -1,5 +1,6 @@
 import { useState, useEffect } from "react";
 import { getCurrentUser, deleteUser } from "../../services/user_api";
+import { clearTokens, logout } from "../../services/auth";
 import "./ProfilePage.css";
 
 const ProfilePage = () => {
@@ -15,7 +16,7 @@ const ProfilePage = () => {
         setUser(userData);
       } catch (err) {
         setError("Your session may have expired. Please sign in again.");
-        localStorage.removeItem("token");
+        clearTokens();
         setTimeout(() => window.location.href = "/login", 2000);
       } finally {
         setIsLoading(false);
@@ -30,9 +31,9 @@ const ProfilePage = () => {
     setTimeout(() => { setMessage(""); setError(""); }, 3000);
   };
 
-  const handleLogout = () => {
-    localStorage.removeItem("token");
+  const handleLogout = async () => {
     showTemporaryMessage("Logging out...");
+    await logout().catch(() => {});
     setTimeout(() => window.location.href = "/login", 1000);
   };
 
@@ -0,0 +1,84 @@
+import axios from "axios";
+
+// Adjust this baseURL according to your FastAPI server
+const BASE_URL = "http://localhost:8000";
+
+// Access tokens only last a few minutes; the refresh token from login gets a new pair.
+// Each refresh token works once, so concurrent 401s share one in-flight refresh.
+let refreshing = null;
+
+export const saveTokens = (data) => {
+  localStorage.setItem("token", data.access_token);
+  if (data.refresh_token) {
+    localStorage.setItem("refresh_token", data.refresh_token);
+  }
+};
+
+export const clearTokens = () => {
+  localStorage.removeItem("token");
+  localStorage.removeItem("refresh_token");
+};
+
+export const refreshAccessToken = () => {
+  if (!refreshing) {
+    const refreshToken = localStorage.getItem("refresh_token");
+    refreshing = (
+      refreshToken
+        ? axios.post(`${BASE_URL}/auth/refresh`, { refresh_token: refreshToken }).then((res) => {
+            saveTokens(res.data);
+            return res.data.access_token;
+          })
+        : Promise.reject(new Error("No refresh token"))
+    ).finally(() => {
+      refreshing = null;
+    });
+  }
+  return refreshing;
+};
+
+// Attaches the JWT to every request of `api`, and on a 401 refreshes the
+// tokens and retries the request once before giving up.
+export const withAuth = (api) => {
+  api.interceptors.request.use((req) => {
+    const token = localStorage.getItem("token");
+    if (token) {
+      req.headers.Authorization = `Bearer ${token}`;
+    }
+    return req;
+  });
+
+  api.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+      const original = error.config;
+      if (error.response?.status === 401 && original && !original._retried && localStorage.getItem("refresh_token")) {
+        original._retried = true;
+        try {
+          const token = await refreshAccessToken();
+          original.headers.Authorization = `Bearer ${token}`;
+          return api(original);
+        } catch {
+          clearTokens();
+        }
+      }
+      return Promise.reject(error);
+    }
+  );
+  return api;
+};
+
+// ✅ Logout: revokes the access token and this login's refresh tokens on the server
+export const logout = async () => {
+  const token = localStorage.getItem("token");
+  try {
+    if (token) {
+      await axios.post(
+        `${BASE_URL}/auth/logout`,
+        { refresh_token: localStorage.getItem("refresh_token") },
+        { headers: { Authorization: `Bearer ${token}` } }
+      );
+    }
+  } finally {
+    clearTokens();
+  }
+};
@@ -1,27 +1,20 @@
 import axios from "axios";
+import { withAuth, clearTokens } from "./auth";
 
 // Create a dedicated API instance for all friend-related endpoints.
-const API = axios.create({
+// withAuth attaches the JWT token to every request, which is essential for
+// authentication, and refreshes it when it expires.
+const API = withAuth(axios.create({
   baseURL: "http://localhost:8000/friends",
-});
-
-// Use a request interceptor to automatically attach the JWT token
-// to every request, which is essential for authentication.
-API.interceptors.request.use((req) => {
-  const token = localStorage.getItem("token");
-  if (token) {
-    req.headers.Authorization = `Bearer ${token}`;
-  }
-  return req;
-});
+}));
 
 // Use a response interceptor for centralized error handling.
-// This will automatically redirect to the login page on session expiry.
+// This will automatically redirect to the login page once the session can't be refreshed.
 API.interceptors.response.use(
   (response) => response,
   (error) => {
     if (error.response && error.response.status === 401) {
-      localStorage.removeItem("token");
+      clearTokens();
       window.location.href = '/login';
     }
     return Promise.reject(error);
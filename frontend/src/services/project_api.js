@@ -1,18 +1,11 @@
 // src/services/project_api.js (No Changes)
 
 import axios from "axios";
+import { withAuth } from "./auth";
 
-const API = axios.create({
+const API = withAuth(axios.create({
   baseURL: "http://localhost:8000",
-});
-
-API.interceptors.request.use((req) => {
-  const token = localStorage.getItem("token");
-  if (token) {
-    req.headers.Authorization = `Bearer ${token}`;
-  }
-  return req;
-});
+}));
 
 // --- Project API Functions ---
 export const createProjectForTeam = async (teamId, projectData) => {
@@ -1,18 +1,11 @@
 import axios from "axios";
+import { withAuth } from "./auth";
 
 // Create a dedicated API instance for teams
-const API = axios.create({
+// withAuth attaches the JWT token and refreshes it when it expires
+const API = withAuth(axios.create({
   baseURL: "http://localhost:8000/teams",
-});
-
-// Use a request interceptor to automatically attach the JWT token
-API.interceptors.request.use((req) => {
-  const token = localStorage.getItem("token");
-  if (token) {
-    req.headers.Authorization = `Bearer ${token}`;
-  }
-  return req;
-});
+}));
 
 // --- Teams API Functions ---
 export const createTeam = async (teamData) => {
@@ -70,17 +63,9 @@ export const deleteTeam = async (teamId) => {
 };
 
 // --- User Search API Function (from friends endpoint) ---
-const UserSearchAPI = axios.create({ 
+const UserSearchAPI = withAuth(axios.create({ 
   baseURL: "http://localhost:8000/friends" 
-});
-
-UserSearchAPI.interceptors.request.use((req) => {
-  const token = localStorage.getItem("token");
-  if (token) {
-    req.headers.Authorization = `Bearer ${token}`;
-  }
-  return req;
-});
+}));
 
 export const searchUsers = async (username) => {
   const res = await UserSearchAPI.get(`/search?username=${username}`);
@@ -1,9 +1,10 @@
 import axios from "axios";
+import { withAuth, saveTokens, clearTokens } from "./auth";
 
 // Adjust this baseURL according to your FastAPI server
-const API = axios.create({
+const API = withAuth(axios.create({
   baseURL: "http://localhost:8000", // Change to deployed URL later
-});
+}));
 
 // --- USER APIs ---
 
@@ -25,7 +26,7 @@ export const verifyOtp = async (email, otp) => {
   return res.data;
 };
 
-// ✅ Login (returns JWT token)
+// ✅ Login (returns a short-lived JWT and a refresh token)
 export const login = async (username, password) => {
   const formData = new URLSearchParams();
   formData.append("username", username);
@@ -41,7 +42,7 @@ export const login = async (username, password) => {
     headers: { "Content-Type": "application/x-www-form-urlencoded" },
   });
 
-  localStorage.setItem("token", res.data.access_token);
+  saveTokens(res.data);
   return res.data;
 };
 
@@ -64,19 +65,13 @@ export const resetPassword = async (email, otp, newPassword) => {
 
 // ✅ Get Current User Info (requires JWT)
 export const getCurrentUser = async () => {
-  const token = localStorage.getItem("token");
-  const res = await API.get("users/me", {
-    headers: { Authorization: `Bearer ${token}` },
-  });
+  const res = await API.get("users/me");
   return res.data;
 };
 
 // ✅ Delete Current User (requires JWT)
 export const deleteUser = async () => {
-  const token = localStorage.getItem("token");
-  const res = await API.delete("users/me", {
-    headers: { Authorization: `Bearer ${token}` },
-  });
-  localStorage.removeItem("token"); // clear token on delete
+  const res = await API.delete("users/me");
+  clearTokens(); // clear tokens on delete
   return res.status === 204;
 };